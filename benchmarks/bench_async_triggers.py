@@ -0,0 +1,222 @@
+"""
+async 트리거의 동시 호출 처리 확인 (로컬 스텁 서버).
+
+function_app 과 같은 방식으로 sync / async 트리거를 각각 FunctionApp 에 등록하고,
+환율 타이머 1회 + 트렌드 큐 메시지 N개를
+
+    sync   하나의 워커 스레드에서 차례로 호출 (호출마다 요청 지연만큼 블로킹)
+    async  하나의 이벤트 루프에서 동시에 호출 (asyncio.gather)
+
+했을 때의 전체 소요 시간을 비교한다. 하나은행은 --latency 만큼 늦게 답하는 스텁,
+pytrends 는 interest_over_time 에서 --latency 만큼 블로킹하는 리플레이로 대체한다.
+
+사용법:
+    python -m benchmarks.bench_async_triggers [--latency 1.0] [--messages 4]
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import os
+import tempfile
+import time
+
+from benchmarks.bench_pipeline import HANA_REALTIME_PATH, hana_handler
+from benchmarks.fixtures import (
+    ReplayTrendReq,
+    build_hana_average_html,
+    build_hana_realtime_html,
+    build_trends_frame,
+)
+from benchmarks.stub_server import StubServer
+
+ANCHOR_KEYWORD = "해외여행"
+KST = datetime.timezone(datetime.timedelta(hours=9))
+
+
+class _Timer:
+    past_due = False
+
+
+class _Out:
+    def __init__(self):
+        self.value = None
+
+    def set(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+class BlockingReplayTrendReq(ReplayTrendReq):
+    """요청마다 새 인스턴스를 돌려주고 interest_over_time 에서 네트워크 지연만큼 블로킹."""
+
+    def __init__(self, frame, latency_seconds: float):
+        super().__init__(frame)
+        self.latency_seconds = latency_seconds
+
+    def __call__(self, *args, **kwargs):
+        # 동시 호출끼리 build_payload 상태를 공유하지 않도록 호출마다 새 인스턴스
+        return BlockingReplayTrendReq(self.frame, self.latency_seconds)
+
+    def interest_over_time(self):
+        time.sleep(self.latency_seconds)
+        return super().interest_over_time()
+
+
+def _user_functions(register_functions) -> dict:
+    import azure.functions as func
+
+    app = func.FunctionApp()
+    for register in register_functions:
+        register(app)
+    return {f.get_function_name(): f.get_user_function() for f in app.get_functions()}
+
+
+def _seed_average_cache() -> None:
+    # 실시간 파이프라인이 평균 환율을 직접 조회하지 않도록 캐시를 미리 채움
+    from data_sources import exchage_rate_crawler
+    from data_sources.exchange_rate_cache import (
+        get_exchange_rate_backend,
+        save_rate_snapshot,
+    )
+
+    average_rates = exchage_rate_crawler._parse_exchange_rate_table(
+        build_hana_average_html(),
+        exchage_rate_crawler.AVERAGE_EXCHANGE_CRAWL_URL,
+        "seed",
+        KST,
+    )
+    now_kst = datetime.datetime.now(KST)
+    save_rate_snapshot(
+        get_exchange_rate_backend(),
+        "averages",
+        {
+            "daily_avg": average_rates,
+            "monthly_avg": {now_kst.strftime("%Y%m"): average_rates},
+            "yearly_avg": average_rates,
+        },
+        now_kst,
+    )
+
+
+def _queue_messages(frame, count: int) -> list:
+    import azure.functions as func
+
+    keywords = [c for c in frame.columns if c not in ("isPartial", ANCHOR_KEYWORD)]
+    return [
+        func.QueueMessage(
+            body=json.dumps(
+                {"keywords": keywords[i * 4 : i * 4 + 4] + [ANCHOR_KEYWORD]},
+                ensure_ascii=False,
+            ).encode("utf-8")
+        )
+        for i in range(count)
+    ]
+
+
+def run_trigger_comparison(latency: float, messages: int) -> dict:
+    """
+    sync(차례로) / async(동시에) 호출의 소요 시간과 이벤트 수.
+    현재 작업 디렉토리에 캐시/아카이브/로컬 출력 파일을 쓰고, 크롤러 모듈의
+    TrendReq / 하나은행 URL 을 스텁으로 바꿔 둔다 (호출하는 쪽에서 되돌림).
+    """
+    os.environ["DisableCrawlerRandomSleep"] = "true"
+    os.environ["DisableExchangeRateAdaptivePolling"] = "true"
+    # 워커의 동시 처리만 보려고 트렌드 동시 실행 토큰은 끔 (원본 응답 아카이브는 켠 채로)
+    os.environ["DisableGoogleTrendsConcurrencyGate"] = "true"
+
+    from data_sources import exchage_rate_crawler, google_trends_crawler
+    from functions.exchange_rate_trigger import (
+        register_exchange_rate_crawler,
+        register_exchange_rate_crawler_async,
+    )
+    from functions.google_trends_processor import (
+        register_google_trends_processor,
+        register_google_trends_processor_async,
+    )
+
+    sync_functions = _user_functions(
+        [register_exchange_rate_crawler, register_google_trends_processor]
+    )
+    async_functions = _user_functions(
+        [register_exchange_rate_crawler_async, register_google_trends_processor_async]
+    )
+
+    frame = build_trends_frame()
+    google_trends_crawler.TrendReq = BlockingReplayTrendReq(frame, latency)
+    _seed_average_cache()
+
+    routes = {HANA_REALTIME_PATH: hana_handler(build_hana_realtime_html())}
+    with StubServer(routes, latency_seconds=latency) as server:
+        exchage_rate_crawler.REALTIME_EXCHANGE_CRAWL_URL = server.url(
+            HANA_REALTIME_PATH
+        )
+
+        # sync: 워커 스레드 하나가 호출을 하나씩 처리
+        outputs = [_Out() for _ in range(messages + 1)]
+        started = time.perf_counter()
+        sync_functions["exchangeRateCrawler"](_Timer(), outputs[0])
+        for message, output in zip(_queue_messages(frame, messages), outputs[1:]):
+            sync_functions["googleTrendsProcessor"](message, output)
+        sync_elapsed = time.perf_counter() - started
+        sync_events = sum(len(o.get() or []) for o in outputs)
+
+        # async: 이벤트 루프 하나에서 모든 호출을 동시에
+        async def _run_concurrently():
+            outputs = [_Out() for _ in range(messages + 1)]
+            await asyncio.gather(
+                async_functions["exchangeRateCrawler"](_Timer(), outputs[0]),
+                *(
+                    async_functions["googleTrendsProcessor"](message, output)
+                    for message, output in zip(
+                        _queue_messages(frame, messages), outputs[1:]
+                    )
+                ),
+            )
+            return outputs
+
+        started = time.perf_counter()
+        outputs = asyncio.run(_run_concurrently())
+        async_elapsed = time.perf_counter() - started
+        async_events = sum(len(o.get() or []) for o in outputs)
+
+    return {
+        "invocations": messages + 1,
+        "sync_elapsed": sync_elapsed,
+        "sync_events": sync_events,
+        "async_elapsed": async_elapsed,
+        "async_events": async_events,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="async 트리거 동시 호출 확인")
+    parser.add_argument("--latency", type=float, default=1.0, help="업스트림 지연(초)")
+    parser.add_argument("--messages", type=int, default=4, help="트렌드 큐 메시지 수")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.CRITICAL)
+
+    # 캐시/아카이브/로컬 출력 파일은 임시 디렉토리에 씀
+    os.chdir(tempfile.mkdtemp(prefix="bench_async_triggers_"))
+    result = run_trigger_comparison(args.latency, args.messages)
+
+    print(
+        f"upstream latency {args.latency:.1f}s, {result['invocations']} invocations "
+        f"(1 exchangeRateCrawler + {args.messages} googleTrendsProcessor)"
+    )
+    print(
+        f"sync  (serial)      {result['sync_elapsed']:6.2f} s  "
+        f"{result['sync_events']} events"
+    )
+    print(
+        f"async (concurrent)  {result['async_elapsed']:6.2f} s  "
+        f"{result['async_events']} events"
+    )
+
+
+if __name__ == "__main__":
+    main()
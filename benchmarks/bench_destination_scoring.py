@@ -0,0 +1,98 @@
+"""
+여행지 매력도 점수 엔진 벤치마크.
+
+합성한 국가별 신호로 전체 배치 순위(rank_destinations)와
+일부 국가만 바뀐 경우의 증분 갱신(DestinationScoringEngine.update_signal) 시간을 비교한다.
+
+사용법:
+    python -m benchmarks.bench_destination_scoring [--countries 250] [--changed 5]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_sources.destination_scoring import (
+    DestinationScoringEngine,
+    load_scoring_config,
+    rank_destinations,
+)
+
+
+def _synthetic_inputs(countries: int, seed: int = 11):
+    rng = np.random.default_rng(seed)
+    codes = [f"C{i:03d}" for i in range(countries)]
+    exchange_records = [
+        {"country_code_3": code, "exchange_rate_score": float(score)}
+        for code, score in zip(codes, rng.uniform(0, 100, countries))
+    ]
+    trend_events = [
+        {"country_code_3": code, "final_trend_score": float(score)}
+        for code, score in zip(codes, rng.uniform(0, 100, countries))
+    ]
+    # 국가당 항공권 200건 (-1/0/+1)
+    merged_flights = pd.DataFrame(
+        {
+            "도착_국가_3자리": pd.Series(np.repeat(codes, 200), dtype="string"),
+            "점수": rng.integers(-1, 2, countries * 200),
+        }
+    )
+    return codes, exchange_records, trend_events, merged_flights
+
+
+def _timed(func, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="여행지 매력도 점수 엔진 벤치마크")
+    parser.add_argument("--countries", type=int, default=250)
+    parser.add_argument("--changed", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    config = load_scoring_config()
+    codes, exchange_records, trend_events, merged_flights = _synthetic_inputs(
+        args.countries
+    )
+
+    batch_ms = _timed(
+        lambda: rank_destinations(
+            exchange_records, trend_events, merged_flights, config
+        ),
+        args.repeat,
+    )
+
+    engine = DestinationScoringEngine(config)
+    engine.update_signals(
+        rank_destinations(exchange_records, trend_events, merged_flights, config)
+    )
+    rng = np.random.default_rng(3)
+    updates = [
+        pd.Series(
+            rng.uniform(0, 100, args.changed),
+            index=rng.choice(codes, args.changed, replace=False),
+        )
+        for _ in range(args.repeat)
+    ]
+    updates_iter = iter(updates)
+    incremental_ms = _timed(
+        lambda: engine.update_signal("exchange_rate_score", next(updates_iter)),
+        args.repeat,
+    )
+    rank_ms = _timed(lambda: engine.rank(top=10), args.repeat)
+
+    print(f"countries={args.countries}")
+    print(f"batch rank_destinations          {batch_ms:8.2f} ms")
+    print(f"incremental update ({args.changed} changed)   {incremental_ms:8.2f} ms")
+    print(f"engine.rank(top=10)              {rank_ms:8.2f} ms")
+    print(engine.rank(top=5)[["attractiveness_score", "signal_count", "rank"]])
+
+
+if __name__ == "__main__":
+    main()
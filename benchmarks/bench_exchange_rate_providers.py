@@ -0,0 +1,139 @@
+"""
+환율 제공자 헤지 조회 / 교차 검증 시나리오 (로컬 스텁 서버).
+
+하나은행 스텁과 ECB 형식 XML 피드 스텁을 따로 띄워 지연/장애를 주고
+fetch_realtime_rates_hedged 가 어떤 제공자를 채택했는지, 지연과 교차 검증 결과를 출력한다.
+
+    healthy          두 제공자 모두 정상 -> hana 채택 + 교차 검증
+    hana_slow        hana 가 1순위 대기 시간보다 느림 -> reference_xml 채택
+    hana_down        hana 503 -> reference_xml 채택
+    feed_mismatch    피드의 한 통화가 5% 어긋남 -> 교차 검증 경고
+
+사용법:
+    python -m benchmarks.bench_exchange_rate_providers [--budget 2.0]
+"""
+
+import argparse
+import datetime
+import logging
+import os
+import random
+
+from benchmarks.bench_pipeline import HANA_REALTIME_PATH
+from benchmarks.fixtures import build_hana_realtime_html
+from benchmarks.stub_server import StubServer, static_handler
+
+REFERENCE_FEED_PATH = "/stats/eurofxref/eurofxref-daily.xml"
+KST = datetime.timezone(datetime.timedelta(hours=9))
+
+
+def build_reference_rate_xml(
+    hana_rates: list, noise_percent: float = 0.3, skew: dict = None
+) -> bytes:
+    """하나은행 매매기준율을 1 EUR 기준 ECB 피드 형식으로 역변환 (약간의 잡음 포함)"""
+    from data_sources.exchange_rate_providers import HANA_PER_100_UNIT_CURRENCIES
+
+    rng = random.Random(3)
+    skew = skew or {}
+    by_currency = {
+        entry["currency_code"]: entry["standard_rate"] for entry in hana_rates
+    }
+    krw_per_eur = by_currency["EUR"]
+    cubes = [f"<Cube currency='KRW' rate='{krw_per_eur:.2f}'/>"]
+    for currency_code, standard_rate in by_currency.items():
+        if currency_code in ("EUR", "KRW") or not standard_rate:
+            continue
+        krw_per_unit = standard_rate / (
+            100 if currency_code in HANA_PER_100_UNIT_CURRENCIES else 1
+        )
+        krw_per_unit *= 1 + rng.uniform(-noise_percent, noise_percent) / 100
+        krw_per_unit *= 1 + skew.get(currency_code, 0.0) / 100
+        cubes.append(
+            f"<Cube currency='{currency_code}' rate='{krw_per_eur / krw_per_unit:.6f}'/>"
+        )
+    return (
+        "<?xml version='1.0' encoding='UTF-8'?>"
+        "<gesmes:Envelope xmlns:gesmes='http://www.gesmes.org/xml/2002-08-01' "
+        "xmlns='http://www.ecb.int/vocabulary/2002-08-01/eurofxref'>"
+        f"<Cube><Cube time='2025-07-18'>{''.join(cubes)}</Cube></Cube>"
+        "</gesmes:Envelope>"
+    ).encode("utf-8")
+
+
+def run_scenario(name, hana_html, feed_xml, budget, hana_latency=0.0, hana_status=200):
+    from data_sources import exchage_rate_crawler
+    from data_sources.exchange_rate_providers import (
+        HanaBankProvider,
+        ReferenceRateXmlProvider,
+        fetch_realtime_rates_hedged,
+    )
+
+    hana_routes = {
+        HANA_REALTIME_PATH: static_handler(
+            hana_html.encode("utf-8"), "text/html; charset=UTF-8", hana_status
+        )
+    }
+    feed_routes = {REFERENCE_FEED_PATH: static_handler(feed_xml, "text/xml")}
+    with StubServer(hana_routes, latency_seconds=hana_latency) as hana, StubServer(
+        feed_routes
+    ) as feed:
+        exchage_rate_crawler.REALTIME_EXCHANGE_CRAWL_URL = hana.url(HANA_REALTIME_PATH)
+        providers = [
+            HanaBankProvider(),
+            ReferenceRateXmlProvider(feed.url(REFERENCE_FEED_PATH)),
+        ]
+        try:
+            result = fetch_realtime_rates_hedged(
+                providers,
+                datetime.datetime.now(KST),
+                latency_budget_seconds=budget,
+                prefer_primary_seconds=budget / 2,
+                cross_check_grace_seconds=0.5,
+            )
+        except RuntimeError as e:
+            print(f"{name:<16} FAILED {e}")
+            return
+    checks = ", ".join(
+        f"{provider}: {check['compared']} compared, max {check['max_deviation_percent']}%, "
+        f"mismatched {sorted(check['mismatched'])}"
+        for provider, check in result.cross_checks.items()
+    )
+    print(
+        f"{name:<16} provider={result.provider:<14} latency={result.latency_ms:7.1f} ms  "
+        f"{checks or 'no cross-check'}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="환율 제공자 헤지 조회 시나리오")
+    parser.add_argument("--budget", type=float, default=2.0, help="지연 예산(초)")
+    args = parser.parse_args()
+
+    os.environ["DisableCrawlerRandomSleep"] = "true"
+    os.environ.setdefault("DisableRawResponseArchive", "true")
+    logging.basicConfig(level=logging.CRITICAL)
+
+    from data_sources import exchage_rate_crawler
+
+    hana_html = build_hana_realtime_html()
+    hana_rates = exchage_rate_crawler._parse_exchange_rate_table(
+        hana_html,
+        exchage_rate_crawler.REALTIME_EXCHANGE_CRAWL_URL,
+        "1",
+        KST,
+    )
+    feed_xml = build_reference_rate_xml(hana_rates)
+
+    run_scenario("healthy", hana_html, feed_xml, args.budget)
+    run_scenario("hana_slow", hana_html, feed_xml, args.budget, hana_latency=3.0)
+    run_scenario("hana_down", hana_html, feed_xml, args.budget, hana_status=503)
+    run_scenario(
+        "feed_mismatch",
+        hana_html,
+        build_reference_rate_xml(hana_rates, skew={"USD": 5.0}),
+        args.budget,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+저장된 하나은행 HTML 일괄 재파싱 벤치마크.
+
+픽스처 HTML 을 임시 디렉토리(와 tar.gz)에 --files 개 만들어 놓고
+워커 1개 / 워커 N개로 reparse_exchange_rate_archive 를 돌려 처리량을 비교한다.
+
+사용법:
+    python -m benchmarks.bench_exchange_rate_reparser [--files 400] [--workers 0]
+"""
+
+import argparse
+import logging
+import os
+import tarfile
+import tempfile
+import time
+
+from benchmarks.fixtures import build_hana_average_html, build_hana_realtime_html
+from data_sources.exchange_rate_reparser import reparse_exchange_rate_archive
+
+
+def build_snapshot_directory(root: str, file_count: int) -> None:
+    # 5분 간격 실시간 스냅샷 + 하루 한 번 평균 스냅샷을 흉내 냄 (이름에 종류 힌트 없음)
+    realtime_html = build_hana_realtime_html().encode("utf-8")
+    average_html = build_hana_average_html().encode("utf-8")
+    started = time.time() - file_count * 300
+    for index in range(file_count):
+        is_average = index % 96 == 0
+        day_dir = os.path.join(root, f"day={index // 288:03d}")
+        os.makedirs(day_dir, exist_ok=True)
+        path = os.path.join(day_dir, f"snapshot_{index:06d}.html")
+        with open(path, "wb") as f:
+            f.write(average_html if is_average else realtime_html)
+        os.utime(path, (started + index * 300, started + index * 300))
+
+
+def _measure(label: str, input_path: str, workers: int, chunk_size: int) -> None:
+    started = time.perf_counter()
+    records, failures = reparse_exchange_rate_archive(
+        input_path, max_workers=workers, chunk_size=chunk_size
+    )
+    elapsed = time.perf_counter() - started
+    files = records["source_file"].nunique() + len(failures)
+    print(
+        f"{label:<24} workers={workers:<3} {files:6d} files {len(records):8d} rows "
+        f"{elapsed:7.2f} s  ({files / elapsed:7.1f} files/s, {len(failures)} failed)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="환율 HTML 일괄 재파싱 벤치마크")
+    parser.add_argument("--files", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=0, help="0 이면 CPU 수")
+    parser.add_argument("--chunk-size", type=int, default=32)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+    workers = args.workers or os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        snapshot_dir = os.path.join(temp_dir, "snapshots")
+        build_snapshot_directory(snapshot_dir, args.files)
+        tar_path = os.path.join(temp_dir, "snapshots.tar.gz")
+        with tarfile.open(tar_path, "w:gz") as archive:
+            archive.add(snapshot_dir, arcname="snapshots")
+
+        _measure("directory", snapshot_dir, 1, args.chunk_size)
+        _measure("directory", snapshot_dir, workers, args.chunk_size)
+        _measure("tarball", tar_path, workers, args.chunk_size)
+
+
+if __name__ == "__main__":
+    main()
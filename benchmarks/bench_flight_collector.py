@@ -0,0 +1,57 @@
+"""
+로컬 스텁 서버를 상대로 Kiwi 항공권 동시 수집기를 실행해 전체 수집 시간과 처리량을 측정.
+
+사용법: python -m benchmarks.bench_flight_collector [--latency 0.5] [--rps 20] [--concurrency 8]
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.bench_flight_extractor import build_synthetic_payload
+from benchmarks.stub_server import StubServer, kiwi_one_way_handler
+from data_sources.flight_price_collector import (
+    build_destination_queries,
+    fetch_flight_responses,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Kiwi 동시 수집기 벤치마크 (스텁 서버)"
+    )
+    parser.add_argument("--latency", type=float, default=0.5, help="스텁 응답 지연(초)")
+    parser.add_argument("--rps", type=float, default=20.0, help="초당 요청 한도")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--itineraries", type=int, default=200)
+    args = parser.parse_args()
+
+    payload = build_synthetic_payload(args.itineraries, segments=2)
+    queries = build_destination_queries("2025-07-20T00:00:00", "2025-08-03T00:00:00")
+
+    with StubServer(
+        {"/one-way": kiwi_one_way_handler(lambda destination: payload)},
+        latency_seconds=args.latency,
+    ) as server:
+        started = time.perf_counter()
+        responses = asyncio.run(
+            fetch_flight_responses(
+                queries,
+                api_key="stub",
+                url=server.url("/one-way"),
+                requests_per_second=args.rps,
+                max_concurrency=args.concurrency,
+            )
+        )
+        elapsed = time.perf_counter() - started
+
+    total_bytes = sum(len(body) for body in responses.values())
+    print(
+        f"destinations={len(responses)}/{len(queries)}  requests={server.request_count}  "
+        f"elapsed={elapsed:.2f}s  sequential_estimate={len(queries) * args.latency:.2f}s  "
+        f"bytes={total_bytes / 1024 / 1024:.1f} MiB"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+합성 Kiwi 응답(목적지당 1000 itinerary)으로 항공권 추출기 벤치마크.
+
+기존 방식 (json.loads + segment 마다 dict + pd.DataFrame(rows)) 과
+스트리밍 방식 (data_sources.flight_price_extractor) 의 실행 시간과 최대 메모리를 비교한다.
+
+사용법: python -m benchmarks.bench_flight_extractor [--itineraries 1000] [--segments 3] [--repeat 3]
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import random
+import time
+import tracemalloc
+
+from data_sources.flight_price_extractor import extract_flight_info
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LEGACY_EXTRACTOR_PATH = os.path.join(
+    PROJECT_ROOT, "_archive", "flight_price_preprocessing.py"
+)
+
+STATIONS = [
+    ("ICN", "Seoul", "seoul_kr", "KR", 37.46, 126.44),
+    ("NRT", "Tokyo", "tokyo_jp", "JP", 35.77, 140.39),
+    ("BKK", "Bangkok", "bangkok_th", "TH", 13.69, 100.75),
+    ("CDG", "Paris", "paris_fr", "FR", 49.01, 2.55),
+    ("JFK", "New York", "new_york_city_us", "US", 40.64, -73.78),
+]
+
+
+def _station(code, city, legacy_id, country, lat, lng):
+    return {
+        "code": code,
+        "city": {"name": city, "legacyId": legacy_id},
+        "country": {"code": country},
+        "gps": {"lat": lat, "lng": lng},
+    }
+
+
+def build_synthetic_payload(itineraries: int, segments: int, seed: int = 42) -> bytes:
+    rng = random.Random(seed)
+    items = []
+    for _ in range(itineraries):
+        amount = str(rng.randint(200_000, 3_000_000))
+        discounted = rng.random() < 0.2
+        sector_segments = []
+        for _ in range(segments):
+            src, dst = rng.sample(STATIONS, 2)
+            sector_segments.append(
+                {
+                    "segment": {
+                        "source": {
+                            "station": _station(*src),
+                            "localTime": "2025-07-20T10:00:00",
+                        },
+                        "destination": {
+                            "station": _station(*dst),
+                            "localTime": "2025-07-20T14:30:00",
+                        },
+                        "carrier": {"name": "Korean Air", "code": "KE"},
+                        "cabinClass": "ECONOMY",
+                        "duration": rng.randint(3600, 50000),
+                    }
+                }
+            )
+        items.append(
+            {
+                "price": {
+                    "amount": amount,
+                    "priceBeforeDiscount": (
+                        str(int(amount) + 10000) if discounted else amount
+                    ),
+                },
+                "sector": {"sectorSegments": sector_segments},
+            }
+        )
+    return json.dumps({"itineraries": items}, ensure_ascii=False).encode("utf-8")
+
+
+def _load_legacy_extractor():
+    spec = importlib.util.spec_from_file_location(
+        "flight_price_preprocessing", LEGACY_EXTRACTOR_PATH
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.extract_flight_info
+
+
+def _measure(label: str, func, payload: bytes, repeat: int) -> None:
+    # tracemalloc 이 실행 시간을 왜곡하므로 시간과 메모리는 따로 측정
+    timings = []
+    rows = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        df = func(payload)
+        timings.append(time.perf_counter() - started)
+        rows = len(df)
+
+    tracemalloc.start()
+    func(payload)
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{label:<10} rows={rows:>6}  best={min(timings) * 1000:8.1f} ms  "
+        f"peak={peak_bytes / 1024 / 1024:7.1f} MiB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kiwi 항공권 추출기 벤치마크")
+    parser.add_argument("--itineraries", type=int, default=1000)
+    parser.add_argument("--segments", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    payload = build_synthetic_payload(args.itineraries, args.segments)
+    print(
+        f"payload: {args.itineraries} itineraries x {args.segments} segments, "
+        f"{len(payload) / 1024 / 1024:.1f} MiB"
+    )
+
+    legacy_extract = _load_legacy_extractor()
+    _measure(
+        "legacy", lambda body: legacy_extract(json.loads(body)), payload, args.repeat
+    )
+    _measure("streaming", extract_flight_info, payload, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+항공권 가격 통화 환산 벤치마크.
+
+합성 항공권 DataFrame(--rows 행, 도착 국가는 환율 크롤링 대상 국가 중 임의)에
+하나은행 실시간 환율 fixture 로 만든 환산표를 적용해서
+행마다 dict 조회로 환산하는 방식(apply)과 data_sources.flight_price_currency 의
+카테고리/배열 연산 방식의 실행 시간을 비교하고 결과가 같은지 확인한다.
+
+사용법: python -m benchmarks.bench_flight_price_currency [--rows 200000] [--repeat 3]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import pytz
+
+from benchmarks.fixtures import build_hana_realtime_html
+from data_sources import exchage_rate_crawler
+from data_sources.flight_price_currency import (
+    LOCAL_PRICE_COLUMN,
+    USD_PRICE_COLUMN,
+    FlightRateTable,
+    _get_code2_to_currency,
+    convert_flight_prices,
+)
+
+
+def build_flight_frame(rows: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    country_codes = sorted(
+        {
+            info["country_code_2"]
+            for info in exchage_rate_crawler.MASTER_COUNTRY_CRAWLER_MAP.values()
+        }
+    )
+    return pd.DataFrame(
+        {
+            "도착_국가_코드": rng.choice(country_codes, rows),
+            "가격": rng.integers(200_000, 3_000_000, rows).astype("float64"),
+        }
+    )
+
+
+def convert_per_row(flight: pd.DataFrame, rate_table: FlightRateTable) -> pd.DataFrame:
+    # 비교용: 행마다 국가 -> 통화 -> 환율 dict 조회
+    code2_to_currency = _get_code2_to_currency()
+    krw_per_unit = rate_table.krw_per_unit.to_dict()
+    usd_krw = rate_table.usd_krw
+
+    def _convert(row):
+        rate = krw_per_unit.get(code2_to_currency.get(row["도착_국가_코드"]))
+        return pd.Series(
+            {
+                LOCAL_PRICE_COLUMN: round(row["가격"] / rate, 2) if rate else np.nan,
+                USD_PRICE_COLUMN: round(row["가격"] / usd_krw, 2),
+            }
+        )
+
+    return flight.join(flight.apply(_convert, axis=1))
+
+
+def _best_of(repeat: int, function, *args) -> tuple:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="항공권 가격 통화 환산 벤치마크")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rates = exchage_rate_crawler._parse_exchange_rate_table(
+        build_hana_realtime_html(),
+        exchage_rate_crawler.REALTIME_EXCHANGE_CRAWL_URL,
+        "bench",
+        pytz.timezone("Asia/Seoul"),
+    )
+    rate_table = FlightRateTable.from_rates(rates)
+    flight = build_flight_frame(args.rows)
+    print(f"{len(flight)} rows, {len(rate_table)} currencies")
+
+    vectorised_seconds, vectorised = _best_of(
+        args.repeat, convert_flight_prices, flight, rate_table
+    )
+    per_row_seconds, per_row = _best_of(1, convert_per_row, flight, rate_table)
+    for column in (LOCAL_PRICE_COLUMN, USD_PRICE_COLUMN):
+        pd.testing.assert_series_equal(
+            vectorised[column], per_row[column], check_dtype=False
+        )
+
+    print(f"per-row apply  {per_row_seconds * 1000:10.1f} ms")
+    print(
+        f"vectorised     {vectorised_seconds * 1000:10.1f} ms  "
+        f"({per_row_seconds / vectorised_seconds:.0f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+googleTrendsProcessor 동시 실행 수 자동 조절(AIMD) 시뮬레이션.
+
+동시에 --capacity 개를 넘는 요청에 429 를 돌려주는 가짜 Google Trends 에
+--messages 개 큐 메시지를 호스트 최대 병렬 수(--workers, host.json batchSize + newBatchThreshold)로
+보내면서, 고정 동시 실행 수(1, --workers)와 data_sources.google_trends_concurrency 의
+AIMD 제어기 + 로컬 토큰을 비교한다. 429 를 받은 요청은 크롤러처럼 120초 뒤 재시도한다.
+시뮬레이션 1초 = 실제 --ms-per-second 밀리초.
+
+사용법: python -m benchmarks.bench_google_trends_concurrency [--messages 60] [--capacity 3]
+"""
+
+import argparse
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from data_sources.google_trends_concurrency import (
+    AimdConcurrencyController,
+    LocalConcurrencyTokens,
+)
+
+REQUEST_SECONDS = (30, 60)
+RETRY_WAIT_SECONDS = 120
+MAX_ATTEMPTS = 3
+
+
+class FakeTrendsEndpoint:
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.in_flight = 0
+        self.lock = threading.Lock()
+
+    def request(self, sleep) -> bool:
+        with self.lock:
+            self.in_flight += 1
+            rate_limited = self.in_flight > self.capacity
+        try:
+            sleep(random.uniform(*REQUEST_SECONDS))
+            return not rate_limited
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+def simulate(args, fixed_limit: int = None) -> dict:
+    random.seed(args.seed)
+    scale = args.ms_per_second / 1000.0
+    started = time.monotonic()
+
+    def sim_now():
+        return (time.monotonic() - started) / scale
+
+    def sleep(seconds):
+        time.sleep(seconds * scale)
+
+    endpoint = FakeTrendsEndpoint(args.capacity)
+    tokens = LocalConcurrencyTokens()
+    controller = AimdConcurrencyController(max_limit=args.workers)
+    controller_lock = threading.Lock()
+    stats = {"succeeded": 0, "rate_limited": 0, "limits": []}
+
+    def current_limit():
+        with controller_lock:
+            return fixed_limit or controller.current_limit
+
+    def process_message(_):
+        token = tokens.acquire(current_limit, timeout=3600)
+        request_started = sim_now()
+        rate_limited = False
+        try:
+            for attempt in range(MAX_ATTEMPTS):
+                if endpoint.request(sleep):
+                    break
+                rate_limited = True
+                with controller_lock:
+                    stats["rate_limited"] += 1
+                if attempt < MAX_ATTEMPTS - 1:
+                    sleep(RETRY_WAIT_SECONDS)
+            else:
+                return
+            with controller_lock:
+                stats["succeeded"] += 1
+        finally:
+            tokens.release(token)
+            with controller_lock:
+                controller.record(
+                    sim_now() - request_started, rate_limited, now=sim_now()
+                )
+                stats["limits"].append(controller.current_limit)
+
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        list(executor.map(process_message, range(args.messages)))
+
+    elapsed_minutes = sim_now() / 60.0
+    limits = stats["limits"]
+    return {
+        "succeeded": stats["succeeded"],
+        "rate_limited": stats["rate_limited"],
+        "minutes": elapsed_minutes,
+        "throughput_per_minute": stats["succeeded"] / elapsed_minutes,
+        "final_limit": fixed_limit or limits[-1],
+        "mean_limit": fixed_limit or sum(limits) / len(limits),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Google Trends 동시 실행 수 AIMD 시뮬레이션"
+    )
+    parser.add_argument("--messages", type=int, default=60)
+    parser.add_argument("--capacity", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--ms-per-second", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(
+        f"{args.messages} messages, endpoint capacity {args.capacity}, "
+        f"host parallelism {args.workers}"
+    )
+    for name, fixed_limit in (
+        ("fixed 1", 1),
+        (f"fixed {args.workers}", args.workers),
+        ("aimd", None),
+    ):
+        result = simulate(args, fixed_limit)
+        print(
+            f"{name:<9} succeeded {result['succeeded']:>4}  "
+            f"429s {result['rate_limited']:>4}  "
+            f"{result['minutes']:7.1f} min  "
+            f"{result['throughput_per_minute']:5.2f} req/min  "
+            f"limit mean {result['mean_limit']:.1f} final {result['final_limit']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
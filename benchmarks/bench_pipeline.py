@@ -0,0 +1,251 @@
+"""
+전체 크롤러 핫패스 오프라인 벤치마크.
+
+저장된(또는 합성한) 응답 픽스처를 로컬 스텁 서버/리플레이로 제공하고 아래 단계를 실행해
+단계별 wall time, CPU time, 할당 메모리(tracemalloc), 최대 RSS 를 출력한다.
+
+    hana_exchange_rate   get_exchange_rate_data (실시간 + 일/월/연평균 6회 조회)
+    trends_fetch         get_trends_data_for_group (키워드 그룹별, pytrends 리플레이)
+    trends_score         googleTrendsProcessor 점수화 (build_trend_event)
+    kiwi_fetch           Kiwi 동시 수집기 (스텁 서버)
+    flight_extract       extract_flight_info
+
+사용법:
+    python -m benchmarks.bench_pipeline [--fixtures-dir DIR] [--repeat 3] [--keep-sleeps] [--json OUT]
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from benchmarks.fixtures import ReplayTrendReq, load_fixtures
+from benchmarks.stub_server import StubServer, kiwi_one_way_handler, static_handler
+
+HANA_REALTIME_PATH = "/cms/rate/wpfxd651_01i_01.do"
+HANA_AVERAGE_PATH = "/cms/rate/wpfxd651_06i_01.do"
+KIWI_ONE_WAY_PATH = "/one-way"
+
+TREND_KEYWORDS_PER_GROUP = 4
+ANCHOR_KEYWORD = "해외여행"
+
+
+def _peak_rss_mib():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 는 KiB, macOS 는 bytes
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def measure_stage(name: str, func, repeat: int, trace_alloc: bool) -> dict:
+    wall_times = []
+    cpu_times = []
+    result = None
+    for _ in range(repeat):
+        wall_started = time.perf_counter()
+        cpu_started = time.process_time()
+        result = func()
+        cpu_times.append(time.process_time() - cpu_started)
+        wall_times.append(time.perf_counter() - wall_started)
+
+    alloc_peak_mib = None
+    if trace_alloc:
+        # tracemalloc 은 실행 시간을 늘리므로 시간 측정과 별도로 한 번 더 실행
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        alloc_peak_mib = peak / 1024 / 1024
+
+    return {
+        "stage": name,
+        "wall_ms": min(wall_times) * 1000,
+        "cpu_ms": min(cpu_times) * 1000,
+        "alloc_peak_mib": alloc_peak_mib,
+        "peak_rss_mib": _peak_rss_mib(),
+        "result": result,
+    }
+
+
+def hana_handler(html: str):
+    return static_handler(html.encode("utf-8"), "text/html; charset=UTF-8")
+
+
+def run_benchmark(fixtures: dict, repeat: int, trace_alloc: bool) -> list:
+    # 크롤러 모듈은 DisableCrawlerRandomSleep 설정 후에 임포트
+    from data_sources import exchage_rate_crawler, google_trends_crawler
+    from data_sources.flight_price_collector import (
+        build_destination_queries,
+        fetch_flight_responses,
+    )
+    from data_sources.flight_price_extractor import extract_flight_info
+    from functions.google_trends_processor import build_trend_event
+
+    routes = {
+        HANA_REALTIME_PATH: hana_handler(fixtures["hana_realtime_html"]),
+        HANA_AVERAGE_PATH: hana_handler(fixtures["hana_average_html"]),
+        KIWI_ONE_WAY_PATH: kiwi_one_way_handler(
+            lambda destination: fixtures["kiwi_one_way"]
+        ),
+    }
+    results = []
+
+    with StubServer(routes) as server:
+        # 하나은행 URL 을 스텁 주소로 교체 (Referer/파싱 인덱스 분기도 이 값을 기준으로 동작)
+        exchage_rate_crawler.REALTIME_EXCHANGE_CRAWL_URL = server.url(
+            HANA_REALTIME_PATH
+        )
+        exchage_rate_crawler.AVERAGE_EXCHANGE_CRAWL_URL = server.url(HANA_AVERAGE_PATH)
+        results.append(
+            measure_stage(
+                "hana_exchange_rate",
+                exchage_rate_crawler.get_exchange_rate_data,
+                repeat,
+                trace_alloc,
+            )
+        )
+
+        # pytrends 는 Google 세션/토큰 흐름을 흉내 내기 어려워 interest_over_time 프레임을 리플레이
+        google_trends_crawler.TrendReq = ReplayTrendReq(fixtures["trends_frame"])
+        keywords = [
+            column
+            for column in fixtures["trends_frame"].columns
+            if column not in ("isPartial", ANCHOR_KEYWORD)
+        ]
+        keyword_groups = [
+            keywords[i : i + TREND_KEYWORDS_PER_GROUP] + [ANCHOR_KEYWORD]
+            for i in range(0, len(keywords), TREND_KEYWORDS_PER_GROUP)
+        ]
+
+        def _fetch_all_trend_groups():
+            items = []
+            for group in keyword_groups:
+                items.extend(google_trends_crawler.get_trends_data_for_group(group))
+            return items
+
+        trends_fetch = measure_stage(
+            "trends_fetch", _fetch_all_trend_groups, repeat, trace_alloc
+        )
+        results.append(trends_fetch)
+
+        crawled_at_kst = datetime.datetime.now().isoformat()
+        results.append(
+            measure_stage(
+                "trends_score",
+                lambda: [
+                    build_trend_event(item, crawled_at_kst)
+                    for item in trends_fetch["result"]
+                ],
+                repeat,
+                trace_alloc,
+            )
+        )
+
+        queries = build_destination_queries(
+            "2025-07-20T00:00:00", "2025-08-03T00:00:00"
+        )
+        kiwi_fetch = measure_stage(
+            "kiwi_fetch",
+            lambda: asyncio.run(
+                fetch_flight_responses(
+                    queries,
+                    api_key="stub",
+                    url=server.url(KIWI_ONE_WAY_PATH),
+                    requests_per_second=0,
+                )
+            ),
+            repeat,
+            trace_alloc,
+        )
+        results.append(kiwi_fetch)
+
+    results.append(
+        measure_stage(
+            "flight_extract",
+            lambda: [
+                extract_flight_info(body) for body in kiwi_fetch["result"].values()
+            ],
+            repeat,
+            trace_alloc,
+        )
+    )
+    return results
+
+
+def _format_optional(value, fmt: str) -> str:
+    # 값이 없으면 "-" 를 같은 폭/정렬로 채워 표의 열이 밀리지 않게 (">12.2f" -> ">12")
+    if value is not None:
+        return format(value, fmt)
+    spec = re.sub(r"(\.\d+)?[a-zA-Z%]$", "", fmt)
+    # 숫자처럼 정렬 기호가 없으면 오른쪽 정렬
+    if not re.match(r"^.?[<>^]", spec):
+        spec = ">" + spec
+    return format("-", spec)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="크롤러 핫패스 오프라인 벤치마크")
+    parser.add_argument(
+        "--fixtures-dir", default=None, help="저장된 응답 픽스처 디렉토리"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--kiwi-itineraries", type=int, default=1000)
+    parser.add_argument("--no-alloc", action="store_true", help="tracemalloc 측정 생략")
+    parser.add_argument(
+        "--keep-sleeps", action="store_true", help="크롤러의 랜덤 지연을 그대로 유지"
+    )
+    parser.add_argument(
+        "--json", dest="json_path", default=None, help="결과 JSON 저장 경로"
+    )
+    args = parser.parse_args()
+
+    if not args.keep_sleeps:
+        os.environ["DisableCrawlerRandomSleep"] = "true"
+    # 벤치마크 응답은 원본 아카이브에 남기지 않음
+    os.environ.setdefault("DisableRawResponseArchive", "true")
+    # 단계 안의 행 단위 로그가 측정값을 왜곡하지 않도록 WARNING 이상만 출력
+    logging.basicConfig(level=logging.WARNING)
+
+    fixtures = load_fixtures(args.fixtures_dir, args.kiwi_itineraries)
+    results = run_benchmark(fixtures, args.repeat, trace_alloc=not args.no_alloc)
+
+    print(f"{'stage':<20}{'wall ms':>10}{'cpu ms':>10}{'alloc MiB':>12}{'rss MiB':>10}")
+    for row in results:
+        print(
+            f"{row['stage']:<20}{row['wall_ms']:>10.1f}{row['cpu_ms']:>10.1f}"
+            f"{_format_optional(row['alloc_peak_mib'], '>12.2f')}"
+            f"{_format_optional(row['peak_rss_mib'], '>10.1f')}"
+        )
+
+    # 크롤러 내부 단계(fetch/parse/score) 지연 분포
+    from data_sources.stage_metrics import STAGE_METRICS
+
+    print(f"\n{'inner stage':<28}{'count':>8}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, stats in STAGE_METRICS.summary().items():
+        print(
+            f"{name:<28}{stats['count']:>8}{stats['p50_ms']:>10.1f}{stats['p99_ms']:>10.1f}"
+        )
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(
+                [{k: v for k, v in row.items() if k != "result"} for row in results],
+                f,
+                indent=4,
+            )
+
+
+if __name__ == "__main__":
+    main()
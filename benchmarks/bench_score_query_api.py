@@ -0,0 +1,306 @@
+"""
+국가별 점수 HTTP 조회 함수(destinationScores / exchangeRateHistory) 부하 테스트.
+
+임시 최신 상태 저장소에 --countries 개 국가와 환율 이력을 채우고,
+function_app 과 같은 방식으로 등록한 HTTP 함수를 로컬 HTTP 서버로 감싸서
+--clients 개 클라이언트(keep-alive)가 --duration 초 동안 요청을 보냈을 때 초당 요청 수를 잰다.
+
+    full         헤더 없이 순위 페이지 요청 (캐시된 JSON 본문)
+    gzip         Accept-Encoding: gzip
+    conditional  If-None-Match (304, 본문 없음)
+    country      국가별 점수 (임의 국가)
+    rates        국가별 환율 이력
+
+--url 을 주면 로컬 서버 대신 실행 중인 Functions 호스트(func start)에 요청한다.
+
+사용법:
+    python -m benchmarks.bench_score_query_api [--clients 8] [--duration 3]
+    python -m benchmarks.bench_score_query_api --url http://localhost:7071/api
+"""
+
+import argparse
+import datetime
+import http.client
+import os
+import random
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+import numpy as np
+
+
+class FunctionHttpHost:
+    """등록된 HTTP 함수들을 route 패턴으로 찾아 호출하는 최소한의 로컬 호스트"""
+
+    def __init__(self, app):
+        import azure.functions as func
+
+        self._func = func
+        self.routes = []
+        for function in app.get_functions():
+            trigger = function.get_trigger()
+            route = getattr(trigger, "route", None)
+            if route:
+                self.routes.append(
+                    (route.strip("/").split("/"), function.get_user_function())
+                )
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._build_handler())
+        self._httpd.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/api"
+
+    def _match(self, path_parts: list):
+        for pattern, user_function in self.routes:
+            route_params = {}
+            for index, part in enumerate(pattern):
+                name = part.strip("{}?")
+                optional = part.endswith("?}")
+                if part.startswith("{"):
+                    if index < len(path_parts):
+                        route_params[name] = path_parts[index]
+                    elif not optional:
+                        break
+                elif index >= len(path_parts) or path_parts[index] != part:
+                    break
+            else:
+                if len(path_parts) <= len(pattern):
+                    return user_function, route_params
+        return None, None
+
+    def _build_handler(self):
+        host = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # 헤더/본문을 따로 쓰므로 keep-alive 에서 Nagle 지연이 생기지 않게
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                parts = parsed.path.strip("/").split("/")[1:]  # "api" 제외
+                user_function, route_params = host._match(parts)
+                if user_function is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                request = host._func.HttpRequest(
+                    method="GET",
+                    url=self.path,
+                    headers=dict(self.headers.items()),
+                    params=dict(parse_qsl(parsed.query)),
+                    route_params=route_params,
+                    body=b"",
+                )
+                response = user_function(request)
+                body = response.get_body() if response.status_code != 304 else b""
+                self.send_response(response.status_code)
+                for name, value in response.headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", response.mimetype or "text/plain")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def seed_latest_state(store, countries: int, history_points: int, seed: int = 7):
+    from data_sources.latest_state_store import (
+        exchange_rate_state_rows,
+        trend_state_rows,
+    )
+
+    rng = np.random.default_rng(seed)
+    codes = [f"{chr(65 + i // 26 % 26)}{chr(65 + i % 26)}X" for i in range(countries)]
+    now = datetime.datetime.now(datetime.timezone.utc)
+    # 5분 간격 실시간 환율 이력
+    for step in range(history_points, 0, -1):
+        observed_at = (now - datetime.timedelta(minutes=5 * step)).isoformat(
+            timespec="seconds"
+        )
+        store.upsert(
+            "exchange_rate",
+            exchange_rate_state_rows(
+                [
+                    {
+                        "country_code_3": code,
+                        "country_code_2": code[:2],
+                        "currency_code": f"{code[:2]}D",
+                        "realtime_rate": float(rate),
+                        "yearly_avg_rate": 100.0,
+                        "exchange_rate_score": float(np.clip(150 - rate, 0, 100)),
+                        "realtime_crawled_at_utc": observed_at,
+                    }
+                    for code, rate in zip(codes, rng.normal(100, 5, countries))
+                ]
+            ),
+        )
+    store.upsert(
+        "google_trends",
+        trend_state_rows(
+            [
+                {
+                    "country_code_3": code,
+                    "keyword": f"{code} 여행",
+                    "final_trend_score": float(score),
+                    "trend_score_current_interest": int(score),
+                }
+                for code, score in zip(codes, rng.uniform(0, 100, countries))
+            ]
+        ),
+    )
+    return codes
+
+
+def _client(base_url, paths, headers, deadline, results, index):
+    parsed = urlparse(base_url)
+    connection = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=10)
+    count = errors = transferred = 0
+    rng = random.Random(index)
+    while time.perf_counter() < deadline:
+        path = parsed.path + rng.choice(paths)
+        try:
+            connection.request("GET", path, headers=headers)
+            response = connection.getresponse()
+            transferred += len(response.read())
+            if response.status >= 400:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            connection.close()
+            connection = http.client.HTTPConnection(
+                parsed.hostname, parsed.port, timeout=10
+            )
+        count += 1
+    connection.close()
+    results[index] = (count, errors, transferred)
+
+
+def run_scenario(label, base_url, paths, headers, clients, duration):
+    results = [None] * clients
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(
+            target=_client,
+            args=(base_url, paths, headers, deadline, results, index),
+        )
+        for index in range(clients)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    count = sum(r[0] for r in results)
+    errors = sum(r[1] for r in results)
+    transferred = sum(r[2] for r in results)
+    print(
+        f"{label:<12} {count / elapsed:9.0f} req/s  {count:7d} requests  "
+        f"{errors} errors  {transferred / max(count, 1):8.0f} B/response"
+    )
+
+
+def _etag(base_url: str, path: str) -> str:
+    parsed = urlparse(base_url)
+    connection = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=10)
+    connection.request("GET", parsed.path + path)
+    response = connection.getresponse()
+    response.read()
+    connection.close()
+    return response.getheader("ETag")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="점수 HTTP 조회 함수 부하 테스트")
+    parser.add_argument("--url", default=None, help="실행 중인 호스트의 /api 주소")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=3.0)
+    parser.add_argument("--countries", type=int, default=200)
+    parser.add_argument("--history", type=int, default=288, help="국가별 이력 개수")
+    args = parser.parse_args()
+
+    host = None
+    if args.url:
+        base_url = args.url.rstrip("/")
+        codes = None
+    else:
+        work_dir = tempfile.mkdtemp(prefix="bench_score_query_api_")
+        os.environ["LatestStateDbPath"] = os.path.join(work_dir, "latest_state.sqlite3")
+
+        import azure.functions as func
+
+        from data_sources.latest_state_store import get_latest_state_store
+        from functions.score_query_trigger import register_destination_score_api
+
+        codes = seed_latest_state(
+            get_latest_state_store(), args.countries, args.history
+        )
+        app = func.FunctionApp()
+        register_destination_score_api(app)
+        host = FunctionHttpHost(app).__enter__()
+        base_url = host.base_url
+
+    try:
+        page_paths = [f"/scores?page={page}&page_size=50" for page in range(1, 5)]
+        print(f"{args.clients} clients x {args.duration:.0f}s against {base_url}")
+        run_scenario("full", base_url, page_paths, {}, args.clients, args.duration)
+        run_scenario(
+            "gzip",
+            base_url,
+            page_paths,
+            {"Accept-Encoding": "gzip"},
+            args.clients,
+            args.duration,
+        )
+        run_scenario(
+            "conditional",
+            base_url,
+            ["/scores?page=1&page_size=50"],
+            {"If-None-Match": _etag(base_url, "/scores?page=1&page_size=50")},
+            args.clients,
+            args.duration,
+        )
+        if codes:
+            sample = codes[:50]
+            run_scenario(
+                "country",
+                base_url,
+                [f"/scores/{code}" for code in sample],
+                {"Accept-Encoding": "gzip"},
+                args.clients,
+                args.duration,
+            )
+            run_scenario(
+                "rates",
+                base_url,
+                [f"/rates/{code}" for code in sample],
+                {"Accept-Encoding": "gzip"},
+                args.clients,
+                args.duration,
+            )
+    finally:
+        if host is not None:
+            host.__exit__(None, None, None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+오프라인 벤치마크용 응답 픽스처.
+
+--fixtures-dir 로 실제 저장한 응답 파일을 주면 그 파일을 리플레이하고, 없으면
+master_country_crawler.json 의 통화/키워드로 같은 구조의 응답을 합성한다.
+
+    hana_realtime.html     실시간 환율 (wpfxd651_01i_01.do 응답)
+    hana_average.html      일/월/연평균 환율 (wpfxd651_06i_01.do 응답)
+    trends_interest.csv    pytrends interest_over_time() 결과 (date 인덱스 + 키워드 컬럼)
+    kiwi_one_way.json      Kiwi one-way 응답
+"""
+
+import json
+import os
+import random
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_flight_extractor import build_synthetic_payload
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MASTER_MAP_FILE_PATH = os.path.join(
+    PROJECT_ROOT, "config", "master_country_crawler.json"
+)
+
+# 100 단위로 고시되는 통화
+PER_100_UNIT_CURRENCIES = {"JPY", "IDR", "VND", "KHR", "LAK", "IRR", "MNT"}
+
+
+def _load_master_map() -> dict:
+    with open(MASTER_MAP_FILE_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _currency_rows():
+    # (통화 표시 텍스트, 기준 환율) - 통화당 한 행
+    rng = random.Random(7)
+    seen = set()
+    rows = []
+    for country_info in _load_master_map().values():
+        currency_code = country_info.get("currency_code")
+        if not currency_code or currency_code in seen:
+            continue
+        seen.add(currency_code)
+        name = "유로" if currency_code == "EUR" else country_info["country_name_kor"]
+        unit = " (100)" if currency_code in PER_100_UNIT_CURRENCIES else ""
+        rows.append((f"{name} {currency_code}{unit}", rng.uniform(5, 1500)))
+    return rows
+
+
+def _rate_table(rows_html: str) -> str:
+    return (
+        '<div id="searchContentDiv"><table class="tblBasic leftNone">'
+        f"<thead><tr><th>통화</th></tr></thead><tbody>{rows_html}</tbody>"
+        "</table></div>"
+    )
+
+
+def build_hana_realtime_html() -> str:
+    # 실시간 테이블: 최소 11칸, 매입 1 / 매도 3 / 송금 5, 6 / 매매기준율 8
+    rows = []
+    for label, base in _currency_rows():
+        cells = [label] + [
+            f"{base * factor:,.2f}"
+            for factor in (1.0175, 1.75, 0.9825, 1.75, 1.01, 0.99, 1.5, 1.0, 1.0, 0.0)
+        ]
+        rows.append("<tr>" + "".join(f"<td>{c}</td>" for c in cells) + "</tr>")
+    return _rate_table("".join(rows))
+
+
+def build_hana_average_html() -> str:
+    # 평균 테이블: 최소 9칸, 매입 1 / 매도 2 / 송금 3, 4 / 매매기준율 6
+    rows = []
+    for label, base in _currency_rows():
+        cells = [label] + [
+            f"{base * factor:,.2f}"
+            for factor in (1.0175, 0.9825, 1.01, 0.99, 1.0, 1.0, 1.0, 1.0)
+        ]
+        rows.append("<tr>" + "".join(f"<td>{c}</td>" for c in cells) + "</tr>")
+    return _rate_table("".join(rows))
+
+
+def build_trends_frame(days: int = 90) -> pd.DataFrame:
+    # 모든 트렌드 키워드 + 앵커 키워드의 일별 관심도 (0~100)
+    rng = np.random.default_rng(11)
+    keywords = [
+        info["google_trend_keyword_kor"]
+        for info in _load_master_map().values()
+        if info.get("google_trend_keyword_kor")
+    ] + ["해외여행"]
+    index = pd.date_range(end="2025-07-20", periods=days, freq="D", name="date")
+    data = {
+        keyword: np.clip(rng.normal(40, 15, days).round(), 0, 100).astype("int64")
+        for keyword in keywords
+    }
+    frame = pd.DataFrame(data, index=index)
+    frame["isPartial"] = False
+    return frame
+
+
+def _read_if_exists(fixtures_dir, file_name: str, mode: str = "r"):
+    if not fixtures_dir:
+        return None
+    path = os.path.join(fixtures_dir, file_name)
+    if not os.path.exists(path):
+        return None
+    if mode == "rb":
+        with open(path, "rb") as f:
+            return f.read()
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def load_fixtures(fixtures_dir: str = None, kiwi_itineraries: int = 1000) -> dict:
+    trends_csv = _read_if_exists(fixtures_dir, "trends_interest.csv")
+    if trends_csv is not None:
+        trends_frame = pd.read_csv(
+            os.path.join(fixtures_dir, "trends_interest.csv"),
+            index_col="date",
+            parse_dates=True,
+        )
+    else:
+        trends_frame = build_trends_frame()
+
+    return {
+        "hana_realtime_html": _read_if_exists(fixtures_dir, "hana_realtime.html")
+        or build_hana_realtime_html(),
+        "hana_average_html": _read_if_exists(fixtures_dir, "hana_average.html")
+        or build_hana_average_html(),
+        "trends_frame": trends_frame,
+        "kiwi_one_way": _read_if_exists(fixtures_dir, "kiwi_one_way.json", "rb")
+        or build_synthetic_payload(kiwi_itineraries, segments=2),
+    }
+
+
+class ReplayTrendReq:
+    """
+    pytrends.TrendReq 대체. build_payload 로 받은 키워드 컬럼만 골라
+    저장된 interest_over_time() 프레임을 돌려준다.
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+        self.kw_list = []
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        # TrendReq(hl=..., tz=...) 생성자 호출 자리에 그대로 들어가도록
+        return self
+
+    def build_payload(self, kw_list, cat=0, timeframe="today 3-m", geo="", gprop=""):
+        self.kw_list = list(kw_list)
+
+    def interest_over_time(self) -> pd.DataFrame:
+        self.calls += 1
+        columns = [kw for kw in self.kw_list if kw in self.frame.columns]
+        if "isPartial" in self.frame.columns:
+            columns.append("isPartial")
+        return self.frame[columns].copy()
@@ -0,0 +1,153 @@
+"""
+외부 API(kebhana.com, Google Trends, Kiwi/RapidAPI) 대신 응답하는 로컬 HTTP 스텁 서버.
+
+경로별 핸들러를 등록해 백그라운드 스레드에서 띄우고, 크롤러의 URL 만 스텁 주소로 바꿔서
+네트워크 없이 수집 로직을 실행/측정할 때 사용한다.
+
+    with StubServer({"/one-way": kiwi_one_way_handler()}) as server:
+        url = server.url("/one-way")
+"""
+
+import gzip
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class StubResponse:
+    def __init__(
+        self,
+        body: bytes = b"",
+        status: int = 200,
+        content_type: str = "application/json",
+    ):
+        self.body = body
+        self.status = status
+        self.content_type = content_type
+
+
+class StubServer:
+    """
+    routes: 경로 -> handler(method, query: dict, body: bytes) -> StubResponse
+    latency_seconds: 모든 응답 전에 넣는 인위적인 지연 (원격 API 지연 흉내)
+    """
+
+    def __init__(
+        self, routes: dict, latency_seconds: float = 0.0, host: str = "127.0.0.1"
+    ):
+        self.routes = routes
+        self.latency_seconds = latency_seconds
+        self.request_count = 0
+        self.gzip_response_count = 0
+        self._count_lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, 0), self._build_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, path: str) -> str:
+        return self.base_url + path
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _build_handler(self):
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _dispatch(self, method: str) -> None:
+                with server._count_lock:
+                    server.request_count += 1
+                parsed = urlparse(self.path)
+                handler = server.routes.get(parsed.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                request_body = self.rfile.read(length) if length else b""
+
+                if server.latency_seconds:
+                    time.sleep(server.latency_seconds)
+
+                if handler is None:
+                    response = StubResponse(
+                        b"not found", status=404, content_type="text/plain"
+                    )
+                else:
+                    query = parse_qs(parsed.query)
+                    if method == "POST":
+                        query.update(parse_qs(request_body.decode("utf-8", "replace")))
+                    response = handler(method, query, request_body)
+
+                body = response.body
+                self.send_response(response.status)
+                self.send_header("Content-Type", response.content_type)
+                if (
+                    "gzip" in (self.headers.get("Accept-Encoding") or "")
+                    and len(body) > 1024
+                ):
+                    body = gzip.compress(body, compresslevel=5)
+                    self.send_header("Content-Encoding", "gzip")
+                    with server._count_lock:
+                        server.gzip_response_count += 1
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                self._dispatch("GET")
+
+            def do_POST(self):
+                self._dispatch("POST")
+
+            def log_message(self, format, *args):
+                # 스텁 요청 로그는 측정에 방해되므로 출력하지 않음
+                pass
+
+        return _Handler
+
+
+def static_handler(
+    body: bytes, content_type: str = "application/json", status: int = 200
+):
+    """요청과 상관없이 항상 같은 응답을 돌려주는 핸들러 (하나은행 HTML, 환율 피드 등)"""
+
+    def _handler(method, query, request_body):
+        return StubResponse(body, status=status, content_type=content_type)
+
+    return _handler
+
+
+def kiwi_one_way_handler(payload_builder, fail_first: dict = None):
+    """
+    Kiwi one-way 스텁. payload_builder(destination) -> bytes
+    fail_first: {destination 문자열: 처음 N번 503 응답} (재시도 경로 확인용)
+    """
+    remaining_failures = dict(fail_first or {})
+    lock = threading.Lock()
+
+    def _handler(method, query, body):
+        destination = (query.get("destination") or [""])[0]
+        with lock:
+            if remaining_failures.get(destination, 0) > 0:
+                remaining_failures[destination] -= 1
+                return StubResponse(b'{"error": "unavailable"}', status=503)
+        return StubResponse(payload_builder(destination))
+
+    return _handler
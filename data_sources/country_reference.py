@@ -0,0 +1,274 @@
+import logging
+import json
+import os
+import pickle
+import sys
+import tempfile
+
+# 원본 매핑 파일 경로
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config")
+STANDARD_MAP_FILE_PATH = os.path.join(CONFIG_DIR, "standard_country_map.json")
+MASTER_MAP_FILE_PATH = os.path.join(CONFIG_DIR, "master_country_crawler.json")
+
+# 두 파일을 컴파일한 인덱스 캐시 (빌드 단계에서 미리 생성)
+REFERENCE_CACHE_FILE_PATH = os.path.join(CONFIG_DIR, "country_reference.pkl")
+
+# 캐시 포맷이 바뀌면 올려서 이전 캐시를 무효화
+REFERENCE_CACHE_VERSION = 1
+
+# 트렌드 키워드 접미사 ("아르헨티나 여행" -> "아르헨티나")
+TREND_KEYWORD_SUFFIX = " 여행"
+
+# 국가 레코드에 담는 필드 (standard 맵 필드 + master 맵의 크롤러 전용 필드)
+COUNTRY_RECORD_FIELDS = (
+    "korean_name",
+    "english_name",
+    "country_code_3",
+    "country_code_2",
+    "currency_code",
+    "is_euro_zone",
+    "google_trend_keyword_kor",
+)
+
+
+class CountryReference:
+    """
+    standard_country_map.json 과 master_country_crawler.json 을 하나로 합친 국가 참조 인덱스.
+    국가 레코드는 국가당 한 번만 저장하고, 별칭(한글명/영문명/ISO 코드/트렌드 키워드)은
+    정수 country_id 로만 매핑하므로 별칭 수가 늘어도 레코드 메모리는 늘어나지 않는다.
+    반환되는 레코드는 공유 객체이므로 호출 측에서 수정하지 않는다.
+    """
+
+    __slots__ = ("countries", "alias_index", "currency_index", "source_signature")
+
+    def __init__(self, countries, alias_index, currency_index, source_signature=None):
+        self.countries = countries  # tuple[dict], 인덱스 = country_id
+        self.alias_index = alias_index  # dict[str, int]
+        self.currency_index = currency_index  # dict[str, tuple[int, ...]]
+        self.source_signature = source_signature
+
+    def __len__(self) -> int:
+        return len(self.countries)
+
+    def resolve_id(self, alias: str):
+        return self.alias_index.get(alias)
+
+    def resolve(self, alias: str):
+        # 이벤트당 조회는 dict 한 번
+        country_id = self.alias_index.get(alias)
+        return self.countries[country_id] if country_id is not None else None
+
+    def countries_for_currency(self, currency_code: str) -> list:
+        return [self.countries[i] for i in self.currency_index.get(currency_code, ())]
+
+    def crawler_countries(self) -> list:
+        # master_country_crawler.json 에 정의된(= 통화/트렌드 수집 대상) 국가만 반환
+        return [c for c in self.countries if c["google_trend_keyword_kor"]]
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def compile_country_reference(
+    standard_map: dict, master_map: dict, source_signature=None
+) -> CountryReference:
+    countries = []
+    code3_to_id = {}
+
+    def _get_or_create(country_code_3: str) -> int:
+        country_id = code3_to_id.get(country_code_3)
+        if country_id is None:
+            country_id = len(countries)
+            code3_to_id[country_code_3] = country_id
+            countries.append({field: None for field in COUNTRY_RECORD_FIELDS})
+            countries[country_id]["is_euro_zone"] = False
+        return country_id
+
+    # standard 맵은 같은 국가를 여러 키로 중복 저장하므로 country_code_3 기준으로 한 번만 담는다
+    for info in standard_map.values():
+        country_code_3 = info.get("country_code_3")
+        if not country_code_3:
+            continue
+        record = countries[_get_or_create(country_code_3)]
+        for field in (
+            "korean_name",
+            "english_name",
+            "country_code_3",
+            "country_code_2",
+        ):
+            if record[field] is None and info.get(field):
+                record[field] = _intern(info[field])
+
+    # master 맵은 크롤러 전용 필드를 덧붙인다 (이름은 standard 맵이 없을 때만 채움)
+    for master_key, info in master_map.items():
+        country_code_3 = info.get("country_code_3") or master_key
+        record = countries[_get_or_create(country_code_3)]
+        record["korean_name"] = record["korean_name"] or _intern(
+            info.get("country_name_kor")
+        )
+        record["english_name"] = record["english_name"] or _intern(
+            info.get("country_name_eng")
+        )
+        record["country_code_3"] = record["country_code_3"] or _intern(country_code_3)
+        record["country_code_2"] = record["country_code_2"] or _intern(
+            info.get("country_code_2")
+        )
+        record["currency_code"] = _intern(info.get("currency_code"))
+        record["is_euro_zone"] = bool(info.get("is_euro_zone", False))
+        record["google_trend_keyword_kor"] = _intern(
+            info.get("google_trend_keyword_kor")
+        )
+
+    # 별칭 테이블: 원본 맵의 키 + 모든 이름/코드 + 트렌드 키워드 변형
+    alias_index = {}
+
+    def _add_alias(alias, country_id: int) -> None:
+        if alias:
+            alias_index.setdefault(sys.intern(alias), country_id)
+
+    for key, info in standard_map.items():
+        if info.get("country_code_3"):
+            _add_alias(key, code3_to_id[info["country_code_3"]])
+
+    for country_id, record in enumerate(countries):
+        for field in (
+            "korean_name",
+            "english_name",
+            "country_code_3",
+            "country_code_2",
+        ):
+            _add_alias(record[field], country_id)
+        if record["google_trend_keyword_kor"]:
+            _add_alias(record["google_trend_keyword_kor"], country_id)
+        if record["korean_name"]:
+            # googleTrendsProcessor 가 받는 "<국가명> 여행" 키워드를 접미사 제거 없이 바로 조회
+            _add_alias(record["korean_name"] + TREND_KEYWORD_SUFFIX, country_id)
+
+    currency_index = {}
+    for country_id, record in enumerate(countries):
+        if record["currency_code"]:
+            currency_index.setdefault(record["currency_code"], []).append(country_id)
+
+    return CountryReference(
+        countries=tuple(countries),
+        alias_index=alias_index,
+        currency_index={k: tuple(v) for k, v in currency_index.items()},
+        source_signature=source_signature,
+    )
+
+
+def _get_source_signature(paths) -> tuple:
+    # 원본 파일이 바뀌었는지 내용을 읽지 않고 판단 (크기 + 수정 시각)
+    signature = [REFERENCE_CACHE_VERSION]
+    for path in paths:
+        stat = os.stat(path)
+        signature.append((os.path.basename(path), stat.st_size, stat.st_mtime_ns))
+    return tuple(signature)
+
+
+def build_country_reference(
+    standard_map_path: str = STANDARD_MAP_FILE_PATH,
+    master_map_path: str = MASTER_MAP_FILE_PATH,
+) -> CountryReference:
+    with open(standard_map_path, "r", encoding="utf-8") as f:
+        standard_map = json.load(f)
+    with open(master_map_path, "r", encoding="utf-8") as f:
+        master_map = json.load(f)
+    return compile_country_reference(
+        standard_map,
+        master_map,
+        source_signature=_get_source_signature((standard_map_path, master_map_path)),
+    )
+
+
+def save_country_reference(
+    reference: CountryReference, cache_path: str = REFERENCE_CACHE_FILE_PATH
+) -> None:
+    payload = {
+        "countries": reference.countries,
+        "alias_index": reference.alias_index,
+        "currency_index": reference.currency_index,
+        "source_signature": reference.source_signature,
+    }
+    # 동시에 여러 워커가 쓰더라도 깨진 파일이 남지 않도록 임시 파일에 쓴 뒤 교체
+    cache_dir = os.path.dirname(cache_path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_country_reference(
+    cache_path: str = REFERENCE_CACHE_FILE_PATH,
+    standard_map_path: str = STANDARD_MAP_FILE_PATH,
+    master_map_path: str = MASTER_MAP_FILE_PATH,
+) -> CountryReference:
+    """
+    미리 컴파일된 pickle 캐시에서 참조 인덱스를 로드한다.
+    캐시가 없거나 원본 JSON 이 바뀐 경우 다시 컴파일하고, 가능하면 캐시를 갱신한다.
+    """
+    source_signature = _get_source_signature((standard_map_path, master_map_path))
+
+    try:
+        with open(cache_path, "rb") as f:
+            payload = pickle.load(f)
+        if payload.get("source_signature") == source_signature:
+            # 언피클된 문자열은 intern 되지 않으므로 다시 intern
+            alias_index = {sys.intern(k): v for k, v in payload["alias_index"].items()}
+            countries = tuple(
+                {field: _intern(value) for field, value in record.items()}
+                for record in payload["countries"]
+            )
+            return CountryReference(
+                countries=countries,
+                alias_index=alias_index,
+                currency_index=payload["currency_index"],
+                source_signature=source_signature,
+            )
+        logging.info(f"Country reference cache at {cache_path} is stale. Rebuilding.")
+    except FileNotFoundError:
+        logging.info(f"Country reference cache not found at {cache_path}. Building.")
+    except Exception as e:
+        logging.warning(
+            f"Failed to load country reference cache {cache_path}: {e}. Rebuilding."
+        )
+
+    reference = build_country_reference(standard_map_path, master_map_path)
+    try:
+        save_country_reference(reference, cache_path)
+    except OSError as e:
+        # Azure 에서는 패키지 경로가 읽기 전용일 수 있으므로 캐시 저장 실패는 무시
+        logging.warning(f"Could not write country reference cache to {cache_path}: {e}")
+    return reference
+
+
+# --- 프로세스 단위 싱글톤 ---
+_COUNTRY_REFERENCE = None
+
+
+def get_country_reference() -> CountryReference:
+    global _COUNTRY_REFERENCE
+    if _COUNTRY_REFERENCE is None:
+        _COUNTRY_REFERENCE = load_country_reference()
+        logging.info(
+            f"Country reference loaded: {len(_COUNTRY_REFERENCE)} countries, "
+            f"{len(_COUNTRY_REFERENCE.alias_index)} aliases."
+        )
+    return _COUNTRY_REFERENCE
+
+
+# 배포 전 캐시를 미리 컴파일: python -m data_sources.country_reference
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    compiled = build_country_reference()
+    save_country_reference(compiled)
+    print(
+        f"Compiled {len(compiled)} countries / {len(compiled.alias_index)} aliases "
+        f"into {REFERENCE_CACHE_FILE_PATH}"
+    )
@@ -0,0 +1,29 @@
+import math
+
+import numpy as np
+
+# 통화 코드를 고정 슬롯 번호에 배정해 통화별 값을 배열 하나로 유지하는 상태 공용
+# (환율 이력 레코드, 평균 집계, 이상치 탐지)
+# 슬롯 수 (하나은행 고시 통화 ~50개). 바꾸면 기존 이력 파일과 호환되지 않음
+MAX_CURRENCY_SLOTS = 64
+
+
+def assign_slot(slots: dict, currency_code: str):
+    # 통화의 슬롯 번호. 처음 보는 통화는 다음 번호를 배정하고, 슬롯이 다 찼으면 None
+    slot = slots.get(currency_code)
+    if slot is None and len(slots) < MAX_CURRENCY_SLOTS:
+        slot = slots[currency_code] = len(slots)
+    return slot
+
+
+def slot_array_to_json(values: np.ndarray) -> list:
+    # NaN/inf 는 null
+    return [None if not math.isfinite(v) else v for v in values.tolist()]
+
+
+def slot_array_from_json(values, fill=np.nan, dtype="float64") -> np.ndarray:
+    # 저장된 길이만큼 채우고 나머지 슬롯과 null 은 fill
+    array = np.full(MAX_CURRENCY_SLOTS, fill, dtype)
+    if values:
+        array[: len(values)] = [fill if v is None else v for v in values]
+    return array
@@ -0,0 +1,75 @@
+import functools
+import re
+
+# 하나은행 환율표 통화 셀 표기 정규화
+#   "미국 USD"          -> ("USD", 1)
+#   "일본 JPY (100)"    -> ("JPY", 100)   100엔당 원화 고시
+#   "인도네시아 IDR(100)" -> ("IDR", 100)
+# 환율 필드(buy_rate, standard_rate 등)는 은행 고시 단위 그대로 두고,
+# 1 통화 단위당 환율은 *_per_unit 필드로 따로 둔다 (점수/이력/집계 상태와 호환 유지)
+CURRENCY_TEXT_PATTERN = re.compile(
+    r"(?<![A-Z])([A-Z]{3})(?![A-Z])\s*(?:\(\s*(\d+)\s*\))?"
+)
+RATE_TEXT_PATTERN = re.compile(r"^-?\d+(?:\.\d+)?$")
+
+# 하나은행은 이 통화들을 100 단위로 고시 (예: JPY (100)) - 다른 제공자 값도 같은 단위로 맞춘다
+HANA_PER_100_UNIT_CURRENCIES = frozenset(
+    {"JPY", "IDR", "VND", "KHR", "LAK", "IRR", "MNT"}
+)
+# 고시 단위를 표기에서 알 수 없을 때(대체 제공자, 로컬 집계 평균 등) 쓰는 기본 단위
+DEFAULT_QUOTE_UNITS = {code: 100 for code in HANA_PER_100_UNIT_CURRENCIES}
+
+# 통화 셀 문자열 종류는 통화 수(~50) 정도라 결과를 캐시해서 조회마다 정규식을 다시 돌리지 않음
+CURRENCY_TEXT_CACHE_SIZE = 256
+
+
+@functools.lru_cache(maxsize=CURRENCY_TEXT_CACHE_SIZE)
+def parse_currency_text(text: str) -> tuple:
+    """통화 셀 문자열 -> (통화 코드, 고시 단위). 코드가 없으면 (원문, 기본 단위)"""
+    match = CURRENCY_TEXT_PATTERN.search(text)
+    if match is None:
+        code = text.strip()
+        return code, DEFAULT_QUOTE_UNITS.get(code, 1)
+    code, unit = match.groups()
+    return code, int(unit) if unit else DEFAULT_QUOTE_UNITS.get(code, 1)
+
+
+def parse_rate_text(text: str) -> float:
+    """환율 셀 문자열 -> float. 빈 값이나 "-" 는 0.0 (숫자가 아니면 ValueError)"""
+    text = text.replace(",", "").strip()
+    if not text or text == "-":
+        return 0.0
+    if not RATE_TEXT_PATTERN.match(text):
+        raise ValueError(f"could not convert rate text to float: '{text}'")
+    return float(text)
+
+
+def quote_unit(currency_code: str, known_units: dict = None) -> int:
+    if known_units and currency_code in known_units:
+        return known_units[currency_code]
+    return DEFAULT_QUOTE_UNITS.get(currency_code, 1)
+
+
+def per_unit_rate(rate, unit: int):
+    # 고시 단위 환율 -> 1 통화 단위당 원화
+    if rate is None:
+        return None
+    return round(rate / unit, 6)
+
+
+def add_per_unit_rate(entry: dict, unit: int = None) -> dict:
+    # 파싱/제공자 레코드에 고시 단위와 1 단위당 매매기준율을 붙임 (원래 고시 값은 그대로)
+    unit = unit or quote_unit(entry["currency_code"])
+    entry["quote_unit"] = unit
+    entry["standard_rate_per_unit"] = per_unit_rate(entry.get("standard_rate"), unit)
+    return entry
+
+
+def quote_units_from_rates(*rate_lists) -> dict:
+    """파싱한 환율 목록들의 {통화 코드: 고시 단위} (quote_unit 이 있는 항목만)"""
+    units = {}
+    for rates in rate_lists:
+        for entry in rates or []:
+            if "quote_unit" in entry:
+                units[entry["currency_code"]] = entry["quote_unit"]
+    return units
@@ -0,0 +1,325 @@
+import logging
+import datetime
+import json
+import os
+import numpy as np
+import pandas as pd
+
+# 여행지 매력도 점수 설정 (신호별 가중치/정규화 방식)
+SCORING_CONFIG_FILE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "config", "destination_scoring.json"
+)
+
+# 국가별 신호 (0~100 점수로 정규화한 뒤 가중 평균)
+#   exchange_rate_score: 환율 파이프라인 (연평균 대비 실시간 환율, 0~100)
+#   final_trend_score:   트렌드 파이프라인 (0~100)
+#   flight_price_score:  항공권 결합 결과 "점수"(-1/0/+1)의 국가별 평균 (-1~1)
+SIGNAL_COLUMNS = ("exchange_rate_score", "final_trend_score", "flight_price_score")
+
+# 정규화 방식
+#   fixed:  설정한 범위 [lo, hi] 를 0~100 으로 (국가 간 독립, 바뀐 국가만 다시 계산)
+#   minmax: 전체 국가의 최소/최대를 0~100 으로
+#   rank:   전체 국가 내 백분위 순위 (0~100)
+#   zscore: 전체 국가 기준 z-점수를 50 ± 15*z 로 (0~100 으로 자름)
+# fixed 외에는 한 국가 값이 바뀌어도 전체 열을 다시 정규화한다
+NORMALIZATIONS = ("fixed", "minmax", "rank", "zscore")
+
+# 국가 코드로 쓰지 않는 값 (트렌드 앵커 키워드 / 매핑 실패)
+NON_COUNTRY_CODES = {"GLOBAL", "N/A", "", None}
+
+DEFAULT_SCORING_CONFIG = {
+    "signals": {
+        "exchange_rate_score": {
+            "weight": 0.3,
+            "normalization": "fixed",
+            "range": [0, 100],
+        },
+        "final_trend_score": {
+            "weight": 0.4,
+            "normalization": "fixed",
+            "range": [0, 100],
+        },
+        "flight_price_score": {
+            "weight": 0.3,
+            "normalization": "fixed",
+            "range": [-1, 1],
+        },
+    },
+    # 점수를 내기 위한 최소 신호 수 (부족하면 attractiveness_score = NaN)
+    "min_signals": 1,
+}
+
+
+def load_scoring_config(path: str = SCORING_CONFIG_FILE_PATH) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        logging.warning(f"Scoring config not found at {path}. Using defaults.")
+        return DEFAULT_SCORING_CONFIG
+    for signal, signal_config in config.get("signals", {}).items():
+        if signal not in SIGNAL_COLUMNS:
+            raise ValueError(f"Unknown scoring signal: {signal}")
+        if signal_config.get("normalization", "fixed") not in NORMALIZATIONS:
+            raise ValueError(
+                f"Unknown normalization for {signal}: {signal_config.get('normalization')}"
+            )
+    return config
+
+
+def _normalize(values: np.ndarray, signal_config: dict) -> np.ndarray:
+    # 결측(NaN)은 그대로 두고 0~100 으로 변환
+    method = signal_config.get("normalization", "fixed")
+    finite = np.isfinite(values)
+    normalized = np.full(values.shape, np.nan)
+    if not finite.any():
+        return normalized
+    observed = values[finite]
+
+    if method == "fixed":
+        lo, hi = signal_config.get("range", (0.0, 100.0))
+        scaled = (observed - lo) / (hi - lo) * 100.0 if hi > lo else observed * 0.0
+    elif method == "minmax":
+        lo, hi = observed.min(), observed.max()
+        scaled = (
+            (observed - lo) / (hi - lo) * 100.0
+            if hi > lo
+            else np.full_like(observed, 50.0)
+        )
+    elif method == "rank":
+        scaled = pd.Series(observed).rank(pct=True, method="average").to_numpy() * 100.0
+    else:  # zscore
+        std = observed.std()
+        z = (observed - observed.mean()) / std if std > 0 else observed * 0.0
+        scaled = 50.0 + 15.0 * z
+    normalized[finite] = np.clip(scaled, 0.0, 100.0)
+    return normalized
+
+
+def _weighted_scores(normalized: np.ndarray, weights: np.ndarray, min_signals: int):
+    # 행별로 있는 신호의 가중치만으로 가중 평균 (없는 신호는 가중치에서 제외)
+    present = np.isfinite(normalized)
+    weight_matrix = np.where(present, weights, 0.0)
+    weight_sum = weight_matrix.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scores = np.where(present, normalized, 0.0) @ weights / weight_sum
+    coverage = present.sum(axis=1)
+    scores[(coverage < min_signals) | (weight_sum <= 0)] = np.nan
+    return scores, coverage
+
+
+def score_signal_frame(signal_frame: pd.DataFrame, config: dict = None) -> pd.DataFrame:
+    """
+    신호 열(country_code_3 인덱스)을 정규화하고 가중 평균 점수를 붙인 DataFrame 을 반환.
+    설정에 없는 열은 무시하고, 설정에 있지만 없는 열은 결측으로 취급한다.
+    """
+    config = config or DEFAULT_SCORING_CONFIG
+    signal_configs = config.get("signals", {})
+    signals = [s for s in SIGNAL_COLUMNS if s in signal_configs]
+    scored = signal_frame.reindex(columns=signals).astype("float64")
+    for signal in signals:
+        scored[f"{signal}_normalized"] = _normalize(
+            scored[signal].to_numpy(), signal_configs[signal]
+        )
+    weights = np.array([float(signal_configs[s].get("weight", 0.0)) for s in signals])
+    scores, coverage = _weighted_scores(
+        scored[[f"{s}_normalized" for s in signals]].to_numpy(),
+        weights,
+        int(config.get("min_signals", 1)),
+    )
+    scored["attractiveness_score"] = scores
+    scored["signal_count"] = coverage
+    scored.index.name = "country_code_3"
+    return scored
+
+
+class DestinationScoringEngine:
+    """
+    국가(country_code_3)별 최신 신호를 열 단위 DataFrame 으로 유지하고 매력도 점수를 계산한다.
+    update_signal() 은 값이 바뀐 국가만 다시 정규화/점수화하고, rank() 는 전체 순위를 반환한다.
+    """
+
+    def __init__(self, config: dict = None):
+        self.config = config or DEFAULT_SCORING_CONFIG
+        signal_configs = self.config.get("signals", {})
+        self.signals = [s for s in SIGNAL_COLUMNS if s in signal_configs]
+        self.signal_configs = {s: signal_configs[s] for s in self.signals}
+        self.weights = np.array(
+            [float(self.signal_configs[s].get("weight", 0.0)) for s in self.signals]
+        )
+        self.min_signals = int(self.config.get("min_signals", 1))
+        self.normalized_columns = [f"{s}_normalized" for s in self.signals]
+        self.frame = pd.DataFrame(
+            columns=self.signals
+            + self.normalized_columns
+            + ["attractiveness_score", "signal_count", "updated_at"],
+            index=pd.Index([], name="country_code_3", dtype="object"),
+        ).astype(
+            {
+                c: "float64"
+                for c in self.signals
+                + self.normalized_columns
+                + ["attractiveness_score", "signal_count"]
+            }
+        )
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def _ensure_countries(self, countries: pd.Index) -> None:
+        missing = countries.difference(self.frame.index)
+        if len(missing):
+            self.frame = pd.concat(
+                [self.frame, pd.DataFrame(index=missing).astype("float64")]
+            )
+            self.frame.index.name = "country_code_3"
+
+    def update_signal(
+        self, signal: str, values: pd.Series, updated_at: datetime.datetime = None
+    ) -> pd.Index:
+        """
+        signal 열을 국가별 값(values: country_code_3 -> float)으로 갱신한다.
+        값이 실제로 바뀐 국가만 다시 계산하고, 점수가 바뀐 국가 목록을 반환한다.
+        """
+        if signal not in self.signal_configs:
+            raise ValueError(f"Signal {signal} is not configured for scoring")
+        values = values[~values.index.isin(list(NON_COUNTRY_CODES))]
+        values = values[~values.index.duplicated(keep="last")].astype("float64")
+        if values.empty:
+            return pd.Index([])
+        self._ensure_countries(values.index)
+
+        previous = self.frame.loc[values.index, signal]
+        changed_mask = ~(
+            (previous == values) | (previous.isna() & values.isna())
+        ).to_numpy()
+        changed = values.index[changed_mask]
+        if not len(changed):
+            return changed
+        self.frame.loc[changed, signal] = values[changed]
+
+        signal_config = self.signal_configs[signal]
+        normalized_column = f"{signal}_normalized"
+        if signal_config.get("normalization", "fixed") == "fixed":
+            # 국가 간 독립이므로 바뀐 국가만
+            self.frame.loc[changed, normalized_column] = _normalize(
+                self.frame.loc[changed, signal].to_numpy(), signal_config
+            )
+            affected = changed
+        else:
+            # 전체 국가 기준 정규화: 열 전체를 다시 계산하고 값이 바뀐 국가만 점수 갱신
+            before = self.frame[normalized_column].to_numpy()
+            after = _normalize(self.frame[signal].to_numpy(), signal_config)
+            self.frame[normalized_column] = after
+            differs = ~((before == after) | (np.isnan(before) & np.isnan(after)))
+            affected = self.frame.index[differs]
+
+        self._rescore(affected, updated_at)
+        return affected
+
+    def update_signals(
+        self, signal_frame: pd.DataFrame, updated_at: datetime.datetime = None
+    ) -> pd.Index:
+        # 여러 신호 열(country_code_3 인덱스)을 한 번에 갱신
+        affected = pd.Index([])
+        for signal in signal_frame.columns:
+            if signal in self.signal_configs:
+                affected = affected.union(
+                    self.update_signal(signal, signal_frame[signal], updated_at)
+                )
+        return affected
+
+    def _rescore(self, countries: pd.Index, updated_at) -> None:
+        if not len(countries):
+            return
+        normalized = self.frame.loc[countries, self.normalized_columns].to_numpy(
+            dtype="float64"
+        )
+        scores, coverage = _weighted_scores(normalized, self.weights, self.min_signals)
+        self.frame.loc[countries, "attractiveness_score"] = scores
+        self.frame.loc[countries, "signal_count"] = coverage
+        self.frame.loc[countries, "updated_at"] = (
+            updated_at or datetime.datetime.now(datetime.timezone.utc)
+        ).isoformat(timespec="seconds")
+
+    def score(self, country_code_3: str):
+        if country_code_3 not in self.frame.index:
+            return None
+        value = self.frame.at[country_code_3, "attractiveness_score"]
+        return None if pd.isna(value) else float(value)
+
+    def rank(self, top: int = None) -> pd.DataFrame:
+        """매력도 점수 내림차순 순위 (점수 없는 국가 제외)"""
+        ranked = (
+            self.frame.dropna(subset=["attractiveness_score"])
+            .sort_values("attractiveness_score", ascending=False, kind="stable")
+            .assign(
+                rank=lambda df: np.arange(1, len(df) + 1, dtype="int64"),
+            )
+        )
+        return ranked.head(top) if top else ranked
+
+
+# --- 파이프라인 출력 -> 국가별 신호 (country_code_3 인덱스 Series) ---
+
+
+def exchange_rate_signal(records: list) -> pd.Series:
+    # build_exchange_rate_records 결과 (국가별 dict)
+    frame = pd.DataFrame.from_records(
+        records, columns=["country_code_3", "exchange_rate_score"]
+    )
+    return frame.set_index("country_code_3")["exchange_rate_score"].astype("float64")
+
+
+def trend_signal(events: list) -> pd.Series:
+    # build_trend_event 결과 (키워드별 dict). 같은 국가는 마지막 값 사용
+    frame = pd.DataFrame.from_records(
+        events, columns=["country_code_3", "final_trend_score"]
+    )
+    return frame.set_index("country_code_3")["final_trend_score"].astype("float64")
+
+
+def flight_price_signal(merged_flights: pd.DataFrame) -> pd.Series:
+    # merge_flight_frame 결과의 "점수"(-1/0/+1) 를 도착 국가별 평균
+    if merged_flights.empty:
+        return pd.Series(dtype="float64", name="flight_price_score")
+    return (
+        merged_flights.groupby("도착_국가_3자리", observed=True)["점수"]
+        .mean()
+        .rename("flight_price_score")
+        .rename_axis("country_code_3")
+    )
+
+
+def rank_destinations(
+    exchange_records: list = None,
+    trend_events: list = None,
+    merged_flights: pd.DataFrame = None,
+    config: dict = None,
+) -> pd.DataFrame:
+    """
+    세 파이프라인의 최신 결과를 country_code_3 로 결합해 전체 국가 순위를 한 번에 계산한다.
+    (상태 없이 쓰는 배치 API: 열 단위 정규화 + 행렬 곱 한 번)
+    """
+    config = config or DEFAULT_SCORING_CONFIG
+    signals = {}
+    if exchange_records:
+        signals["exchange_rate_score"] = exchange_rate_signal(exchange_records)
+    if trend_events:
+        signals["final_trend_score"] = trend_signal(trend_events)
+    if merged_flights is not None and not merged_flights.empty:
+        signals["flight_price_score"] = flight_price_signal(merged_flights)
+
+    signal_frame = pd.DataFrame(
+        {
+            name: series[~series.index.duplicated(keep="last")]
+            for name, series in signals.items()
+        }
+    )
+    signal_frame = signal_frame[~signal_frame.index.isin(list(NON_COUNTRY_CODES))]
+    scored = score_signal_frame(signal_frame, config)
+    ranked = scored.dropna(subset=["attractiveness_score"]).sort_values(
+        "attractiveness_score", ascending=False, kind="stable"
+    )
+    ranked["rank"] = np.arange(1, len(ranked) + 1, dtype="int64")
+    return ranked
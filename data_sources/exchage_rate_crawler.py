@@ -1,14 +1,28 @@
 import logging
+import asyncio
 import datetime
+import aiohttp
 import requests
 from bs4 import BeautifulSoup
 import json
 import os
 import pytz
-import time
-import random
 import sys
-from data_sources.retry_utils import exchange_rate_api_retry
+from data_sources.currency_units import (
+    add_per_unit_rate,
+    parse_currency_text,
+    parse_rate_text,
+    per_unit_rate,
+    quote_unit,
+    quote_units_from_rates,
+)
+from data_sources.raw_response_archive import archive_raw_response
+from data_sources.retry_utils import (
+    exchange_rate_api_retry,
+    exchange_rate_api_retry_async,
+    random_sleep,
+)
+from data_sources.stage_metrics import STAGE_METRICS, sampled_debug
 
 
 # 평균 환율 (일평균, 월평균, 연평균) 조회용 URL
@@ -103,203 +117,252 @@ def get_kst_date_yyyy_mm_dd(dt: datetime.date) -> str:
     return dt.strftime("%Y-%m-%d")
 
 
-# 내부 헬퍼 함수: 실제 웹 요청 및 HTML 파싱
-@exchange_rate_api_retry
-def _fetch_and_parse_exchange_rate(
-    target_url: str, headers: dict, data: dict, kst_timezone: pytz.timezone
+# 내부 헬퍼 함수: 환율 테이블 HTML 파싱
+def _parse_exchange_rate_table(
+    html: str, target_url: str, log_inquiry_code, kst_timezone: pytz.timezone
 ) -> list:
     all_extracted_rates = []
 
-    try:
-        # headers 딕셔너리를 복사하여 Referer를 추가
-        current_request_headers = headers.copy()  # headers 인자를 복사하여 사용
+    soup = BeautifulSoup(html, "html.parser")
+    exchange_rate_table = soup.find("table", class_="tblBasic leftNone")
+
+    if exchange_rate_table:
+        table_body = exchange_rate_table.find("tbody")
+        if not table_body:
+            logging.error(
+                f"Table body not found for URL: {target_url}, Inquiry Code: {log_inquiry_code}. Full HTML: {html[:1000]}"
+            )
+            raise ValueError("tbody not found in exchange rate table.")
+
+        rows = table_body.find_all("tr")
+
+        # URL에 따른 파싱 로직 및 인덱스 설정 (환율 필드 -> 셀 인덱스)
+        expected_min_cells = 0
+        currency_full_text_idx = 0
+        rate_cell_indices = {}
 
-        # Referer 설정
         if target_url == REALTIME_EXCHANGE_CRAWL_URL:
-            current_request_headers["Referer"] = REFERER_REALTIME_EXCHANGE_URL
-        elif target_url == AVERAGE_EXCHANGE_CRAWL_URL:
-            current_request_headers["Referer"] = REFERER_AVERAGE_EXCHANGE_URL
+            logging.debug(
+                f"Setting parsing indices for REALTIME exchange rates from {target_url}"
+            )
+            expected_min_cells = 11  # 실시간 환율 테이블의 최소 셀 개수
+            currency_full_text_idx = 0
+            rate_cell_indices = {
+                "buy_rate": 1,
+                "sell_rate": 3,
+                "send_rate": 5,
+                "receive_rate": 6,
+                "standard_rate": 8,
+            }
 
-        log_inquiry_code = data.get("inqDvCd") or data.get("inqKindCd")
-        logging.info(
-            f"Attempting to send POST request to: {target_url} with inquiry code: {log_inquiry_code} and payload: {data}"
-        )
-        response = requests.post(
-            target_url, headers=current_request_headers, data=data, timeout=15
-        )
-        response.raise_for_status()
+        elif target_url == AVERAGE_EXCHANGE_CRAWL_URL:
+            logging.debug(
+                f"Setting parsing indices for AVERAGE exchange rates from {target_url}"
+            )
+            expected_min_cells = 9  # 평균 환율 테이블의 최소 셀 개수
+            currency_full_text_idx = 0
+            rate_cell_indices = {
+                "buy_rate": 1,
+                "sell_rate": 2,
+                "send_rate": 3,
+                "receive_rate": 4,
+                "standard_rate": 6,
+            }
 
-        logging.info(
-            f"Successfully received response (Status: {response.status_code}) from {target_url} for inquiry code: {log_inquiry_code}"
-        )
+        else:
+            logging.error(
+                f"Unknown target_url provided to _parse_exchange_rate_table: {target_url}"
+            )
+            raise ValueError(f"Unsupported URL for exchange rate parsing: {target_url}")
 
-        soup = BeautifulSoup(response.text, "html.parser")
-        exchange_rate_table = soup.find("table", class_="tblBasic leftNone")
+        for row in rows:
+            cells = row.find_all("td")
 
-        if exchange_rate_table:
-            table_body = exchange_rate_table.find("tbody")
-            if not table_body:
-                logging.error(
-                    f"Table body not found for URL: {target_url}, Payload: {data}. Full HTML: {response.text[:1000]}"
+            if len(cells) < expected_min_cells:
+                logging.warning(
+                    f"Skipping row due to insufficient cells for URL {target_url}, Inquiry Code: {log_inquiry_code}: Expected {expected_min_cells} cells, but found {len(cells)}. Raw row: {row.get_text(strip=True)}"
                 )
-                raise ValueError("tbody not found in exchange rate table.")
-
-            rows = table_body.find_all("tr")
+                continue
+            rate_texts = {}
+            try:
+                currency_full_text = cells[currency_full_text_idx].get_text(strip=True)
+                # 통화 코드와 고시 단위 ("JPY (100)" -> JPY, 100) 를 한 번에 추출
+                currency_code, unit = parse_currency_text(currency_full_text)
+
+                # Rates can be empty or "-" which should be treated as 0.0
+                rate_texts = {
+                    field: cells[index].get_text(strip=True)
+                    for field, index in rate_cell_indices.items()
+                }
+                rates = {
+                    field: parse_rate_text(text) for field, text in rate_texts.items()
+                }
 
-            # URL에 따른 파싱 로직 및 인덱스 설정
-            expected_min_cells = 0
-            currency_full_text_idx = 0
-            buy_rate_idx = 0
-            sell_rate_idx = 0
-            send_rate_idx = 0
-            receive_rate_idx = 0
-            standard_rate_idx = 0
-
-            if target_url == REALTIME_EXCHANGE_CRAWL_URL:
-                logging.info(
-                    f"Setting parsing indices for REALTIME exchange rates from {target_url}"
+                current_crawl_time_utc = (
+                    datetime.datetime.now(datetime.timezone.utc).isoformat(
+                        timespec="seconds"
+                    )
+                    + "Z"
                 )
-                expected_min_cells = 11  # 실시간 환율 테이블의 최소 셀 개수
-                currency_full_text_idx = 0
-                buy_rate_idx = 1
-                sell_rate_idx = 3
-                send_rate_idx = 5
-                receive_rate_idx = 6
-                standard_rate_idx = 8
-
-            elif target_url == AVERAGE_EXCHANGE_CRAWL_URL:
-                logging.info(
-                    f"Setting parsing indices for AVERAGE exchange rates from {target_url}"
+                current_crawl_time_kst = datetime.datetime.now(kst_timezone).isoformat(
+                    timespec="seconds"
                 )
-                expected_min_cells = 9  # 평균 환율 테이블의 최소 셀 개수
-                currency_full_text_idx = 0
-                buy_rate_idx = 1
-                sell_rate_idx = 2
-                send_rate_idx = 3
-                receive_rate_idx = 4
-                standard_rate_idx = 6
 
-            else:
+                # 환율 값은 은행 고시 단위 그대로, 1 단위당 값과 원래 표기는 따로 보관
+                rate_entry = {
+                    "currency_code": currency_code,
+                    **rates,
+                    "crawled_at_utc": current_crawl_time_utc,
+                    "crawled_at_kst": current_crawl_time_kst,
+                    "currency_text": currency_full_text,
+                }
+                all_extracted_rates.append(add_per_unit_rate(rate_entry, unit))
+                # 통화별 로그는 샘플링된 DEBUG 로만 남김
+                sampled_debug(
+                    "Extracted (Inquiry Code: %s): %s, Standard Rate: %s",
+                    log_inquiry_code,
+                    currency_code,
+                    rates["standard_rate"],
+                )
+
+            except ValueError as ve:
+                logging.error(
+                    f"Failed to convert rate string to float for currency_full_text: '{currency_full_text}' (URL: {target_url}, Inquiry Code: {log_inquiry_code}): {ve}. Raw strings: {rate_texts}",
+                    exc_info=True,
+                )
+                continue
+            except IndexError as ie:
                 logging.error(
-                    f"Unknown target_url provided to _fetch_and_parse_exchange_rate for parsing: {target_url}"
+                    f"Index error while parsing row (URL: {target_url}, Inquiry Code: {log_inquiry_code}): {ie}. Check cell indices. Raw row: {row.get_text(strip=True)}",
+                    exc_info=True,
                 )
-                raise ValueError(
-                    f"Unsupported URL for exchange rate parsing: {target_url}"
+                continue
+            except Exception as ex:
+                logging.error(
+                    f"An unexpected error occurred during row parsing (URL: {target_url}, Inquiry Code: {log_inquiry_code}): {ex}. Raw row: {row.get_text(strip=True)}",
+                    exc_info=True,
                 )
+                continue
 
-            for row in rows:
-                cells = row.find_all("td")
+    else:
+        logging.error(
+            f"Exchange rate table NOT found on the page for URL: {target_url}, Inquiry Code: {log_inquiry_code}. Check HTML structure or Payload. Full HTML: {html[:1000]}"
+        )
+    return all_extracted_rates
 
-                if len(cells) < expected_min_cells:
-                    logging.warning(
-                        f"Skipping row due to insufficient cells for URL {target_url}, Inquiry Code: {log_inquiry_code}: Expected {expected_min_cells} cells, but found {len(cells)}. Raw row: {row.get_text(strip=True)}"
-                    )
-                    continue
-                try:
-                    currency_full_text = cells[currency_full_text_idx].get_text(
-                        strip=True
-                    )
-                    currency_parts = currency_full_text.split()
-                    # 통화 코드 추출 로직 유지 (뒤의 (100) 등 제거)
-                    currency_code = (
-                        currency_parts[1]
-                        .replace("(100)", "")
-                        .replace("(10)", "")
-                        .strip()
-                        if len(currency_parts) > 1
-                        else currency_full_text.strip()
-                    )
 
-                    # Rates can be empty or "-" which should be treated as 0.0 or None
-                    buy_rate_str = (
-                        cells[buy_rate_idx].get_text(strip=True).replace(",", "")
-                    )
-                    sell_rate_str = (
-                        cells[sell_rate_idx].get_text(strip=True).replace(",", "")
-                    )
-                    send_rate_str = (
-                        cells[send_rate_idx].get_text(strip=True).replace(",", "")
-                    )
-                    receive_rate_str = (
-                        cells[receive_rate_idx].get_text(strip=True).replace(",", "")
-                    )
-                    standard_rate_str = (
-                        cells[standard_rate_idx].get_text(strip=True).replace(",", "")
-                    )
+# async 트리거용: aiohttp 로 요청하고 파싱(BeautifulSoup, CPU 작업)은 스레드에서 실행
+@exchange_rate_api_retry_async
+async def _fetch_and_parse_exchange_rate_async(
+    session: aiohttp.ClientSession,
+    target_url: str,
+    headers: dict,
+    data: dict,
+    kst_timezone: pytz.timezone,
+) -> list:
+    current_request_headers = headers.copy()
+    if target_url == REALTIME_EXCHANGE_CRAWL_URL:
+        current_request_headers["Referer"] = REFERER_REALTIME_EXCHANGE_URL
+    elif target_url == AVERAGE_EXCHANGE_CRAWL_URL:
+        current_request_headers["Referer"] = REFERER_AVERAGE_EXCHANGE_URL
 
-                    buy_rate = (
-                        float(buy_rate_str)
-                        if buy_rate_str and buy_rate_str != "-"
-                        else 0.0
-                    )
-                    sell_rate = (
-                        float(sell_rate_str)
-                        if sell_rate_str and sell_rate_str != "-"
-                        else 0.0
-                    )
-                    send_rate = (
-                        float(send_rate_str)
-                        if send_rate_str and send_rate_str != "-"
-                        else 0.0
-                    )
-                    receive_rate = (
-                        float(receive_rate_str)
-                        if receive_rate_str and receive_rate_str != "-"
-                        else 0.0
-                    )
-                    standard_rate = (
-                        float(standard_rate_str)
-                        if standard_rate_str and standard_rate_str != "-"
-                        else 0.0
-                    )
+    log_inquiry_code = data.get("inqDvCd") or data.get("inqKindCd")
+    logging.info(
+        f"Sending async POST request to {target_url} for inquiry code: {log_inquiry_code}"
+    )
+    with STAGE_METRICS.stage("exchange_rate.fetch"):
+        async with session.post(
+            target_url, headers=current_request_headers, data=data
+        ) as response:
+            body = await response.read()
+
+    # 아카이브(존재 확인, gzip, 업로드)는 블로킹 I/O 라 응답을 닫은 뒤 스레드에서
+    with STAGE_METRICS.stage("exchange_rate.archive"):
+        await asyncio.to_thread(
+            archive_raw_response,
+            "hana_exchange_rate",
+            _archive_inquiry_key(target_url, data, log_inquiry_code),
+            body,
+            status=response.status,
+            request={"url": target_url, "data": data},
+        )
+    response.raise_for_status()
+    encoding = response.get_encoding()
 
-                    current_crawl_time_utc = (
-                        datetime.datetime.now(datetime.timezone.utc).isoformat(
-                            timespec="seconds"
-                        )
-                        + "Z"
-                    )
-                    current_crawl_time_kst = datetime.datetime.now(
-                        kst_timezone
-                    ).isoformat(timespec="seconds")
-
-                    rate_entry = {
-                        "currency_code": currency_code,
-                        "buy_rate": buy_rate,
-                        "sell_rate": sell_rate,
-                        "send_rate": send_rate,
-                        "receive_rate": receive_rate,
-                        "standard_rate": standard_rate,
-                        "crawled_at_utc": current_crawl_time_utc,
-                        "crawled_at_kst": current_crawl_time_kst,
-                    }
-                    all_extracted_rates.append(rate_entry)
-                    logging.info(
-                        f"Extracted from {target_url.split('/')[-1]} (Inquiry Code: {log_inquiry_code}): {currency_code}, Standard Rate: {standard_rate}"
-                    )
+    logging.info(
+        f"Received response (Status: {response.status}, {len(body)} bytes) for inquiry code: {log_inquiry_code}"
+    )
+    with STAGE_METRICS.stage("exchange_rate.parse"):
+        return await asyncio.to_thread(
+            _parse_exchange_rate_table,
+            body.decode(encoding, errors="replace"),
+            target_url,
+            log_inquiry_code,
+            kst_timezone,
+        )
 
-                except ValueError as ve:
-                    logging.error(
-                        f"Failed to convert rate string to float for currency_full_text: '{currency_full_text}' (URL: {target_url}, Inquiry Code: {log_inquiry_code}): {ve}. Raw strings: B='{buy_rate_str}', S='{sell_rate_str}', Send='{send_rate_str}', Receive='{receive_rate_str}', Std='{standard_rate_str}'",
-                        exc_info=True,
-                    )
-                    continue
-                except IndexError as ie:
-                    logging.error(
-                        f"Index error while parsing row (URL: {target_url}, Inquiry Code: {log_inquiry_code}): {ie}. Check cell indices. Raw row: {row.get_text(strip=True)}",
-                        exc_info=True,
-                    )
-                    continue
-                except Exception as ex:
-                    logging.error(
-                        f"An unexpected error occurred during row parsing (URL: {target_url}, Inquiry Code: {log_inquiry_code}): {ex}. Raw row: {row.get_text(strip=True)}",
-                        exc_info=True,
-                    )
-                    continue
 
-        else:
-            logging.error(
-                f"Exchange rate table NOT found on the page for URL: {target_url}, Inquiry Code: {log_inquiry_code}. Check HTML structure or Payload. Full HTML: {response.text[:1000]}"
+# 원본 응답 아카이브 색인용 조회 키 (realtime:1 / average:2:20250701-20250718)
+def _archive_inquiry_key(target_url: str, data: dict, log_inquiry_code) -> str:
+    kind = "realtime" if target_url == REALTIME_EXCHANGE_CRAWL_URL else "average"
+    key = f"{kind}:{log_inquiry_code}"
+    if kind == "average" and data.get("inqStrDt"):
+        key += f":{data.get('inqStrDt')}-{data.get('inqEndDt')}"
+    return key
+
+
+# 내부 헬퍼 함수: 실제 웹 요청 및 HTML 파싱 (fetch/parse 단계별 지연 기록)
+# 재시도 없이 한 번만 요청 (헤지 조회처럼 지연 예산이 정해진 호출용)
+def _fetch_and_parse_exchange_rate_once(
+    target_url: str,
+    headers: dict,
+    data: dict,
+    kst_timezone: pytz.timezone,
+    timeout_seconds: float = 15,
+) -> list:
+    all_extracted_rates = []
+
+    try:
+        # headers 딕셔너리를 복사하여 Referer를 추가
+        current_request_headers = headers.copy()  # headers 인자를 복사하여 사용
+
+        # Referer 설정
+        if target_url == REALTIME_EXCHANGE_CRAWL_URL:
+            current_request_headers["Referer"] = REFERER_REALTIME_EXCHANGE_URL
+        elif target_url == AVERAGE_EXCHANGE_CRAWL_URL:
+            current_request_headers["Referer"] = REFERER_AVERAGE_EXCHANGE_URL
+
+        log_inquiry_code = data.get("inqDvCd") or data.get("inqKindCd")
+        # 요청 페이로드 전체는 남기지 않고 조회 코드만 기록
+        logging.info(
+            f"Sending POST request to {target_url} for inquiry code: {log_inquiry_code}"
+        )
+        with STAGE_METRICS.stage("exchange_rate.fetch"):
+            response = requests.post(
+                target_url,
+                headers=current_request_headers,
+                data=data,
+                timeout=timeout_seconds,
+            )
+        # 오류 응답도 원본 그대로 보관 (같은 본문은 한 번만 저장)
+        # fetch 지연에 아카이브 업로드 시간이 섞이지 않도록 단계를 나눠서 기록
+        with STAGE_METRICS.stage("exchange_rate.archive"):
+            archive_raw_response(
+                "hana_exchange_rate",
+                _archive_inquiry_key(target_url, data, log_inquiry_code),
+                response.content,
+                status=response.status_code,
+                request={"url": target_url, "data": data},
+            )
+        response.raise_for_status()
+
+        logging.info(
+            f"Received response (Status: {response.status_code}, {len(response.content)} bytes) for inquiry code: {log_inquiry_code}"
+        )
+
+        with STAGE_METRICS.stage("exchange_rate.parse"):
+            all_extracted_rates = _parse_exchange_rate_table(
+                response.text, target_url, log_inquiry_code, kst_timezone
             )
     except requests.exceptions.RequestException as re:
         logging.error(
@@ -322,16 +385,296 @@ def _fetch_and_parse_exchange_rate(
     return all_extracted_rates
 
 
-# get_exchange_rate_data 함수 (모든 유형 환율 통합 함수)
-def get_exchange_rate_data() -> list:
+# 재시도(20~120초 대기, 3회)를 붙인 기본 조회
+@exchange_rate_api_retry
+def _fetch_and_parse_exchange_rate(
+    target_url: str, headers: dict, data: dict, kst_timezone: pytz.timezone
+) -> list:
+    return _fetch_and_parse_exchange_rate_once(target_url, headers, data, kst_timezone)
+
+
+# 조회 결과 필드 이름 (조회 이름 -> 국가별 레코드의 필드)
+#   realtime -> realtime_rate, daily_avg -> daily_avg_rate, yearly_avg -> yearly_avg_rate,
+#   monthly_avg:YYYYMM -> monthly_avg_rates.YYYYMM
+INQUIRY_RECORD_FIELDS = {
+    "realtime": "realtime_rate",
+    "daily_avg": "daily_avg_rate",
+    "yearly_avg": "yearly_avg_rate",
+}
+MONTHLY_INQUIRY_PREFIX = "monthly_avg:"
+
+
+def inquiry_record_field(inquiry: str) -> str:
+    if inquiry.startswith(MONTHLY_INQUIRY_PREFIX):
+        return "monthly_avg_rates." + inquiry[len(MONTHLY_INQUIRY_PREFIX) :]
+    return INQUIRY_RECORD_FIELDS.get(inquiry, inquiry)
+
+
+def average_inquiry_names(current_kst_dt: datetime.datetime) -> list:
+    # fetch_average_rates 가 기록하는 조회 이름 (일평균, 최근 3개월 월평균, 연평균)
+    names = ["daily_avg"]
+    for i in range(3):
+        target_month = current_kst_dt.month - i
+        target_year = current_kst_dt.year
+        if target_month <= 0:
+            target_month += 12
+            target_year -= 1
+        names.append(f"{MONTHLY_INQUIRY_PREFIX}{target_year}{target_month:02d}")
+    return names + ["yearly_avg"]
+
+
+# 조회 하나를 격리 실행: 재시도 후에도 실패하면 예외 대신 None 을 반환하고 결과를 outcomes 에 기록
+def _run_inquiry(
+    inquiry: str, outcomes: list, target_url: str, data: dict, kst_timezone
+):
+    try:
+        rates = _fetch_and_parse_exchange_rate(
+            target_url, REQUEST_HEADERS, data, kst_timezone
+        )
+    except Exception as e:
+        # tenacity RetryError 는 마지막 시도의 예외를 기록
+        if hasattr(e, "last_attempt") and e.last_attempt.exception() is not None:
+            e = e.last_attempt.exception()
+        logging.error(f"Exchange rate inquiry '{inquiry}' failed after retries: {e}")
+        outcomes.append(
+            {"inquiry": inquiry, "status": "failed", "error": repr(e)[:200]}
+        )
+        return None
+    outcomes.append({"inquiry": inquiry, "status": "ok", "records": len(rates)})
+    return rates
+
+
+def _realtime_request_data(current_kst_dt: datetime.datetime) -> dict:
+    today_date_kst = current_kst_dt.date()
+    return {
+        "ajax": "true",
+        "curCd": "",
+        "tmpInqStrDt": get_kst_date_yyyy_mm_dd(today_date_kst),
+        "pbldDvCd": "3",
+        "pbldsqn": "",
+        "hid_key_data": "",
+        "inqStrDt": get_kst_date_yyyymmdd(today_date_kst),
+        "inqKindCd": "1",
+        "hid_enc_data": "",
+        "requestTarget": "searchContentDiv",
+    }
+
+
+# ------------------------------------------------------------------------------------------------------
+# 실시간 환율 조회 (5분 주기 파이프라인)
+# ------------------------------------------------------------------------------------------------------
+# timeout_seconds 를 주면 재시도 없이 한 번만 그 시간 안에 요청
+def fetch_realtime_rates(
+    current_kst_dt: datetime.datetime = None, timeout_seconds: float = None
+) -> list:
     kst_timezone = pytz.timezone("Asia/Seoul")
-    current_kst_dt = get_current_kst_datetime(kst_timezone)
+    if current_kst_dt is None:
+        current_kst_dt = get_current_kst_datetime(kst_timezone)
+
+    logging.info("Starting realtime exchange rate crawling...")
+    request_args = (
+        REALTIME_EXCHANGE_CRAWL_URL,
+        REQUEST_HEADERS,
+        _realtime_request_data(current_kst_dt),
+        kst_timezone,
+    )
+    if timeout_seconds is None:
+        realtime_rates = _fetch_and_parse_exchange_rate(*request_args)
+    else:
+        realtime_rates = _fetch_and_parse_exchange_rate_once(
+            *request_args, timeout_seconds=timeout_seconds
+        )
+    logging.info(
+        f"Completed realtime exchange rate crawling. {len(realtime_rates)} records processed."
+    )
+    return realtime_rates
+
+
+# fetch_realtime_rates 의 async 버전 (세션을 넘기면 웜 인스턴스에서 연결을 재사용)
+async def fetch_realtime_rates_async(
+    session: aiohttp.ClientSession = None, current_kst_dt: datetime.datetime = None
+) -> list:
+    kst_timezone = pytz.timezone("Asia/Seoul")
+    if current_kst_dt is None:
+        current_kst_dt = get_current_kst_datetime(kst_timezone)
+
+    logging.info("Starting async realtime exchange rate crawling...")
+    request_data = _realtime_request_data(current_kst_dt)
+    if session is None:
+        async with aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=15)
+        ) as own_session:
+            realtime_rates = await _fetch_and_parse_exchange_rate_async(
+                own_session,
+                REALTIME_EXCHANGE_CRAWL_URL,
+                REQUEST_HEADERS,
+                request_data,
+                kst_timezone,
+            )
+    else:
+        realtime_rates = await _fetch_and_parse_exchange_rate_async(
+            session,
+            REALTIME_EXCHANGE_CRAWL_URL,
+            REQUEST_HEADERS,
+            request_data,
+            kst_timezone,
+        )
+    logging.info(
+        f"Completed async realtime exchange rate crawling. {len(realtime_rates)} records processed."
+    )
+    return realtime_rates
+
+
+# ------------------------------------------------------------------------------------------------------
+# 일/월/연평균 환율 조회 (일 단위 파이프라인)
+# 반환: {"daily_avg": [...], "monthly_avg": {"YYYYMM": [...]}, "yearly_avg": [...]}
+# 조회별로 실패를 격리하며, 실패한 조회는 None 으로 두고 outcomes 에 결과를 남긴다
+# ------------------------------------------------------------------------------------------------------
+def fetch_average_rates(
+    current_kst_dt: datetime.datetime = None, outcomes: list = None
+) -> dict:
+    if outcomes is None:
+        outcomes = []
+    kst_timezone = pytz.timezone("Asia/Seoul")
+    if current_kst_dt is None:
+        current_kst_dt = get_current_kst_datetime(kst_timezone)
     today_date_kst = current_kst_dt.date()
     today_yyyymmdd = get_kst_date_yyyymmdd(today_date_kst)
     today_with_hyphens = get_kst_date_yyyy_mm_dd(today_date_kst)
     current_year = today_date_kst.year
     current_month = today_date_kst.month
 
+    logging.info("Starting daily average exchange rate crawling...")
+    daily_request_data = {
+        "ajax": "true",
+        "curCd": "",
+        "tmpInqStrDt": today_with_hyphens,
+        "inqStrDt": today_yyyymmdd,
+        "inqEndDt": today_yyyymmdd,
+        "inqDvCd": "1",
+        "pbldDvCd": "1",
+        "tmpPbldDvCd": "1",
+        "tmpInqStrDtY_m": current_kst_dt.strftime("%m"),
+        "tmpInqStrDtY_y": current_kst_dt.strftime("%Y"),
+        "tmpInqStrDt_p": today_yyyymmdd,
+        "tmpInqEndDt_p": today_yyyymmdd,
+        "requestTarget": "searchContentDiv",
+        "pbldsqn": "",
+        "hid_key_data": "",
+        "hid_enc_data": "",
+    }
+    daily_avg_rates = _run_inquiry(
+        "daily_avg",
+        outcomes,
+        AVERAGE_EXCHANGE_CRAWL_URL,
+        daily_request_data,
+        kst_timezone,
+    )
+    random_sleep(1, 3)
+    logging.info(
+        f"Completed daily average exchange rate crawling. {len(daily_avg_rates or [])} records processed."
+    )
+
+    logging.info("Starting monthly average exchange rate crawling (last 3 months)...")
+    monthly_avg_rates = {}
+    for i in range(3):
+        target_month = current_month - i
+        target_year = current_year
+        if target_month <= 0:
+            target_month += 12
+            target_year -= 1
+        month_first_day_yyyymmdd = get_first_day_of_month_yyyymmdd(
+            target_year, target_month
+        )
+
+        # 현재 코드에서는 `today_yyyymmdd`를 사용하고 있어 기존 로직을 따름
+        month_end_day_yyyymmdd_for_inqEndDt = today_yyyymmdd
+
+        monthly_request_data = {
+            "ajax": "true",
+            "curCd": "",
+            "tmpInqStrDt": f"{target_year}-{target_month:02d}-01",
+            "inqStrDt": month_first_day_yyyymmdd,
+            "inqEndDt": month_end_day_yyyymmdd_for_inqEndDt,
+            "inqDvCd": "2",
+            "pbldDvCd": "1",
+            "tmpPbldDvCd": "1",
+            "tmpInqStrDtY_m": f"{target_month:02d}",
+            "tmpInqStrDtY_y": str(target_year),
+            "tmpInqStrDt_p": month_first_day_yyyymmdd,
+            "tmpInqEndDt_p": month_end_day_yyyymmdd_for_inqEndDt,
+            "requestTarget": "searchContentDiv",
+            "pbldsqn": "",
+            "hid_key_data": "",
+            "hid_enc_data": "",
+        }
+        month_year_key = f"{target_year}{target_month:02d}"
+        monthly_avg_rates[month_year_key] = _run_inquiry(
+            MONTHLY_INQUIRY_PREFIX + month_year_key,
+            outcomes,
+            AVERAGE_EXCHANGE_CRAWL_URL,
+            monthly_request_data,
+            kst_timezone,
+        )
+        random_sleep(1, 3)
+    logging.info(
+        f"Completed monthly average exchange rate crawling. {len(monthly_avg_rates)} months processed."
+    )
+
+    logging.info("Starting yearly average exchange rate crawling...")
+    yearly_request_data = {
+        "ajax": "true",
+        "curCd": "",
+        "tmpInqStrDt": f"{current_year}-01-01",
+        "inqStrDt": get_first_day_of_year_yyyymmdd(current_year),
+        "inqEndDt": today_yyyymmdd,
+        "inqDvCd": "3",
+        "pbldDvCd": "1",
+        "tmpPbldDvCd": "1",
+        "tmpInqStrDtY_m": "01",
+        "tmpInqStrDtY_y": str(current_year),
+        "tmpInqStrDt_p": get_first_day_of_year_yyyymmdd(current_year),
+        "tmpInqEndDt_p": today_yyyymmdd,
+        "requestTarget": "searchContentDiv",
+        "pbldsqn": "",
+        "hid_key_data": "",
+        "hid_enc_data": "",
+    }
+    yearly_avg_rates = _run_inquiry(
+        "yearly_avg",
+        outcomes,
+        AVERAGE_EXCHANGE_CRAWL_URL,
+        yearly_request_data,
+        kst_timezone,
+    )
+    logging.info(
+        f"Completed yearly average exchange rate crawling. {len(yearly_avg_rates or [])} records processed."
+    )
+
+    return {
+        "daily_avg": daily_avg_rates,
+        "monthly_avg": monthly_avg_rates,
+        "yearly_avg": yearly_avg_rates,
+    }
+
+
+# ------------------------------------------------------------------------------------------------------
+# 조인 단계: 실시간/평균 환율 중 각각 가장 최근 결과로 국가별 통합 레코드 + 점수 생성
+# ------------------------------------------------------------------------------------------------------
+# stale_inquiries: {조회 이름: 마지막 정상 조회 시각} - 이번에 실패해 이전 캐시 값으로 채운 조회
+# failed_inquiries: 이번에 실패한 조회 이름 목록 (캐시로 채우지 못한 경우 포함)
+def build_exchange_rate_records(
+    realtime_rates: list,
+    average_rates: dict,
+    stale_inquiries: dict = None,
+    failed_inquiries: list = None,
+) -> list:
+    stale_fields = {
+        inquiry_record_field(inquiry): fetched_at
+        for inquiry, fetched_at in (stale_inquiries or {}).items()
+    }
+    failed_inquiries = list(failed_inquiries or [])
+
     # combined_currency_data의 키는 country_code_3 (CAN, USA 등) 또는 country_name_kor (유로존 국가의 경우)
     combined_currency_data = {}
 
@@ -425,31 +768,7 @@ def get_exchange_rate_data() -> list:
                     f"Unknown rate type: {rate_type} for currency code: {entry_currency_code}"
                 )
 
-    # ------------------------------------------------------------------------------------------------------
-    # 실시간 환율 데이터 크롤링
-    # ------------------------------------------------------------------------------------------------------
-    logging.info("Starting realtime exchange rate crawling...")
-    realtime_request_data = {
-        "ajax": "true",
-        "curCd": "",
-        "tmpInqStrDt": today_with_hyphens,
-        "pbldDvCd": "3",
-        "pbldsqn": "",
-        "hid_key_data": "",
-        "inqStrDt": today_yyyymmdd,
-        "inqKindCd": "1",
-        "hid_enc_data": "",
-        "requestTarget": "searchContentDiv",
-    }
-    realtime_rates = _fetch_and_parse_exchange_rate(
-        REALTIME_EXCHANGE_CRAWL_URL,
-        REQUEST_HEADERS,
-        realtime_request_data,
-        kst_timezone,
-    )
-    time.sleep(random.uniform(1, 3))
-
-    for entry in realtime_rates:
+    for entry in realtime_rates or []:
         _add_rate_to_combined_data(
             entry["currency_code"],
             "realtime",
@@ -458,199 +777,118 @@ def get_exchange_rate_data() -> list:
             crawled_kst=entry["crawled_at_kst"],
         )
 
-    logging.info(
-        f"Completed realtime exchange rate crawling. {len(realtime_rates)} records processed."
+    average_rates = average_rates or {}
+    # 파싱 시 표기에서 읽은 고시 단위 (없는 통화는 기본 단위 표)
+    quote_units = quote_units_from_rates(
+        average_rates.get("daily_avg"), average_rates.get("yearly_avg"), realtime_rates
     )
-
-    # ------------------------------------------------------------------------------------------------------
-    # 당일 일평균 환율 데이터 크롤링
-    # ------------------------------------------------------------------------------------------------------
-    logging.info("Starting daily average exchange rate crawling...")
-    daily_request_data = {
-        "ajax": "true",
-        "curCd": "",
-        "tmpInqStrDt": today_with_hyphens,
-        "inqStrDt": today_yyyymmdd,
-        "inqEndDt": today_yyyymmdd,
-        "inqDvCd": "1",
-        "pbldDvCd": "1",
-        "tmpPbldDvCd": "1",
-        "tmpInqStrDtY_m": current_kst_dt.strftime("%m"),
-        "tmpInqStrDtY_y": current_kst_dt.strftime("%Y"),
-        "tmpInqStrDt_p": today_yyyymmdd,
-        "tmpInqEndDt_p": today_yyyymmdd,
-        "requestTarget": "searchContentDiv",
-        "pbldsqn": "",
-        "hid_key_data": "",
-        "hid_enc_data": "",
-    }
-    daily_avg_rates = _fetch_and_parse_exchange_rate(
-        AVERAGE_EXCHANGE_CRAWL_URL, REQUEST_HEADERS, daily_request_data, kst_timezone
-    )
-    time.sleep(random.uniform(1, 3))
-
-    for entry in daily_avg_rates:
+    for entry in average_rates.get("daily_avg") or []:
         _add_rate_to_combined_data(
             entry["currency_code"], "daily_avg", entry["standard_rate"]
         )
-    logging.info(
-        f"Completed daily average exchange rate crawling. {len(daily_avg_rates)} records processed."
-    )
-
-    # ------------------------------------------------------------------------------------------------------
-    # 월평균 환율 데이터 크롤링
-    # ------------------------------------------------------------------------------------------------------
-    logging.info("Starting monthly average exchange rate crawling (last 3 months)...")
-    for i in range(3):
-        target_month = current_month - i
-        target_year = current_year
-        if target_month <= 0:
-            target_month += 12
-            target_year -= 1
-        month_first_day_yyyymmdd = get_first_day_of_month_yyyymmdd(
-            target_year, target_month
-        )
-
-        # 현재 코드에서는 `today_yyyymmdd`를 사용하고 있어 기존 로직을 따름
-        month_end_day_yyyymmdd_for_inqEndDt = today_yyyymmdd
-
-        monthly_request_data = {
-            "ajax": "true",
-            "curCd": "",
-            "tmpInqStrDt": f"{target_year}-{target_month:02d}-01",
-            "inqStrDt": month_first_day_yyyymmdd,
-            "inqEndDt": month_end_day_yyyymmdd_for_inqEndDt,
-            "inqDvCd": "2",
-            "pbldDvCd": "1",
-            "tmpPbldDvCd": "1",
-            "tmpInqStrDtY_m": f"{target_month:02d}",
-            "tmpInqStrDtY_y": str(target_year),
-            "tmpInqStrDt_p": month_first_day_yyyymmdd,
-            "tmpInqEndDt_p": month_end_day_yyyymmdd_for_inqEndDt,
-            "requestTarget": "searchContentDiv",
-            "pbldsqn": "",
-            "hid_key_data": "",
-            "hid_enc_data": "",
-        }
-        monthly_avg_result = _fetch_and_parse_exchange_rate(
-            AVERAGE_EXCHANGE_CRAWL_URL,
-            REQUEST_HEADERS,
-            monthly_request_data,
-            kst_timezone,
-        )
-        time.sleep(random.uniform(1, 3))
-
-        for entry in monthly_avg_result:
+    for month_year_key, entries in (average_rates.get("monthly_avg") or {}).items():
+        for entry in entries or []:
             _add_rate_to_combined_data(
                 entry["currency_code"],
                 "monthly_avg",
                 entry["standard_rate"],
-                month_year_key=f"{target_year}{target_month:02d}",
+                month_year_key=month_year_key,
             )
-    logging.info(
-        f"Completed monthly average exchange rate crawling. {len(monthly_avg_result)} records processed for the last 3 months."
-    )
-
-    # ------------------------------------------------------------------------------------------------------
-    # 연평균 환율 데이터 크롤링
-    # ------------------------------------------------------------------------------------------------------
-    logging.info("Starting yearly average exchange rate crawling...")
-    yearly_request_data = {
-        "ajax": "true",
-        "curCd": "",
-        "tmpInqStrDt": f"{current_year}-01-01",
-        "inqStrDt": get_first_day_of_year_yyyymmdd(current_year),
-        "inqEndDt": today_yyyymmdd,
-        "inqDvCd": "3",
-        "pbldDvCd": "1",
-        "tmpPbldDvCd": "1",
-        "tmpInqStrDtY_m": "01",
-        "tmpInqStrDtY_y": str(current_year),
-        "tmpInqStrDt_p": get_first_day_of_year_yyyymmdd(current_year),
-        "tmpInqEndDt_p": today_yyyymmdd,
-        "requestTarget": "searchContentDiv",
-        "pbldsqn": "",
-        "hid_key_data": "",
-        "hid_enc_data": "",
-    }
-    yearly_avg_rates = _fetch_and_parse_exchange_rate(
-        AVERAGE_EXCHANGE_CRAWL_URL, REQUEST_HEADERS, yearly_request_data, kst_timezone
-    )
-    time.sleep(random.uniform(1, 3))
-
-    for entry in yearly_avg_rates:
+    for entry in average_rates.get("yearly_avg") or []:
         _add_rate_to_combined_data(
             entry["currency_code"], "yearly_avg", entry["standard_rate"]
         )
-    logging.info(
-        f"Completed yearly average exchange rate crawling. {len(yearly_avg_rates)} records processed."
-    )
 
     logging.info(
         f"Starting country standardization and final data compilation for {len(combined_currency_data)} currency records."
     )
     final_exchange_rate_data_with_country_info = []
 
-    for country_key, rate_details in combined_currency_data.items():
-        # country_key는 MASTER_COUNTRY_CRAWLER_MAP의 키(country_code_3)와 동일
-        country_info = MASTER_COUNTRY_CRAWLER_MAP.get(country_key, {})
-
-        if not country_info:
-            logging.warning(
-                f"No corresponding country info found in MASTER_COUNTRY_CRAWLER_MAP for key '{country_key}'. Skipping."
-            )
-            continue  # 매핑 정보가 없으면 해당 데이터는 건너뜀
-
-        exchange_rate_score = 0.0
-        exchange_rate_change_percent = None
-
-        realtime_rate = rate_details.get("realtime_rate")
-        yearly_avg_rate = rate_details.get("yearly_avg_rate")
+    with STAGE_METRICS.stage("exchange_rate.score"):
+        for country_key, rate_details in combined_currency_data.items():
+            # country_key는 MASTER_COUNTRY_CRAWLER_MAP의 키(country_code_3)와 동일
+            country_info = MASTER_COUNTRY_CRAWLER_MAP.get(country_key, {})
 
-        # 실시간 환율과 연평균 환율이 모두 유효하고 연평균이 0보다 큰 경우에만 점수 계산
-        if (
-            realtime_rate is not None
-            and yearly_avg_rate is not None
-            and yearly_avg_rate > 0
-        ):
-            # 변동률 계산 : (실시간 환율 - 연평균 환율) / 연평균 환율 * 100
-            exchange_rate_change_percent = (
-                (realtime_rate - yearly_avg_rate) / yearly_avg_rate
-            ) * 100
-
-            # 점수 변환 (환율이 내리면 가점, 오르면 감점)
-            max_change_percent = 10.0  # 최대 허용 상승 변동률
-            min_change_percent = -10.0  # 최대 허용 하락 변동률
-            range_of_change = max_change_percent - min_change_percent
-
-            if range_of_change > 0:
-                # 점수 계산 : (최대 좋은 값 - 현재 변동률) / (총 범위) * 100
-                # 환율은 낮을수록 좋으므로, 변동률이 낮을수록(마이너스값) 점수가 높아지도록 계산
-                calculated_score = (
-                    (max_change_percent - exchange_rate_change_percent)
-                    / range_of_change
-                ) * 100.0
-                exchange_rate_score = max(0.0, min(calculated_score, 100.0))
+            if not country_info:
+                logging.warning(
+                    f"No corresponding country info found in MASTER_COUNTRY_CRAWLER_MAP for key '{country_key}'. Skipping."
+                )
+                continue  # 매핑 정보가 없으면 해당 데이터는 건너뜀
+
+            exchange_rate_score = 0.0
+            exchange_rate_change_percent = None
+
+            realtime_rate = rate_details.get("realtime_rate")
+            yearly_avg_rate = rate_details.get("yearly_avg_rate")
+
+            # 실시간 환율과 연평균 환율이 모두 유효하고 연평균이 0보다 큰 경우에만 점수 계산
+            if (
+                realtime_rate is not None
+                and yearly_avg_rate is not None
+                and yearly_avg_rate > 0
+            ):
+                # 변동률 계산 : (실시간 환율 - 연평균 환율) / 연평균 환율 * 100
+                exchange_rate_change_percent = (
+                    (realtime_rate - yearly_avg_rate) / yearly_avg_rate
+                ) * 100
+
+                # 점수 변환 (환율이 내리면 가점, 오르면 감점)
+                max_change_percent = 10.0  # 최대 허용 상승 변동률
+                min_change_percent = -10.0  # 최대 허용 하락 변동률
+                range_of_change = max_change_percent - min_change_percent
+
+                if range_of_change > 0:
+                    # 점수 계산 : (최대 좋은 값 - 현재 변동률) / (총 범위) * 100
+                    # 환율은 낮을수록 좋으므로, 변동률이 낮을수록(마이너스값) 점수가 높아지도록 계산
+                    calculated_score = (
+                        (max_change_percent - exchange_rate_change_percent)
+                        / range_of_change
+                    ) * 100.0
+                    exchange_rate_score = max(0.0, min(calculated_score, 100.0))
+                else:
+                    # 연 평균이 0 이거나 범위설정이 잘못 된 경우
+                    exchange_rate_score = 50.0  # 기본값
             else:
-                # 연 평균이 0 이거나 범위설정이 잘못 된 경우
-                exchange_rate_score = 50.0  # 기본값
-        else:
-            logging.warning(
-                f"Cannot calculate exchange rate score for {country_info.get('country_name_kor', country_key)} "
-                f"due to missing or zero realtime_rate ({realtime_rate}) or yearly_avg_rate ({yearly_avg_rate}). Setting score to 0."
+                logging.warning(
+                    f"Cannot calculate exchange rate score for {country_info.get('country_name_kor', country_key)} "
+                    f"due to missing or zero realtime_rate ({realtime_rate}) or yearly_avg_rate ({yearly_avg_rate}). Setting score to 0."
+                )
+                exchange_rate_score = 0.0  # 점수 계산 불가 시 0점으로 설정
+
+            rate_details["exchange_rate_change_percent"] = (
+                round(exchange_rate_change_percent, 2)
+                if exchange_rate_change_percent is not None
+                else None
+            )
+            rate_details["exchange_rate_score"] = round(exchange_rate_score, 2)
+
+            # 1 통화 단위당 원화 (항공권 가격 환산 등 절대값이 필요한 소비자용)
+            unit = quote_unit(rate_details.get("currency_code"), quote_units)
+            rate_details["quote_unit"] = unit
+            rate_details["realtime_rate_per_unit"] = per_unit_rate(realtime_rate, unit)
+            rate_details["yearly_avg_rate_per_unit"] = per_unit_rate(
+                yearly_avg_rate, unit
             )
-            exchange_rate_score = 0.0  # 점수 계산 불가 시 0점으로 설정
 
-        rate_details["exchange_rate_change_percent"] = (
-            round(exchange_rate_change_percent, 2)
-            if exchange_rate_change_percent is not None
-            else None
-        )
-        rate_details["exchange_rate_score"] = round(exchange_rate_score, 2)
+            # 부분 결과 표시: 이전 캐시 값으로 채운 필드와 실패한 조회
+            rate_details["stale_fields"] = stale_fields
+            rate_details["failed_inquiries"] = failed_inquiries
+            rate_details["is_partial"] = bool(stale_fields or failed_inquiries)
 
-        final_exchange_rate_data_with_country_info.append(rate_details)
+            final_exchange_rate_data_with_country_info.append(rate_details)
 
     logging.info(
         f"Total {len(final_exchange_rate_data_with_country_info)} combined currency records prepared with standardized country info."
     )
     return final_exchange_rate_data_with_country_info
+
+
+# get_exchange_rate_data 함수 (모든 유형 환율 통합 함수)
+# 실시간과 평균을 한 번에 조회해 조인 (오프라인 벤치마크/로컬 실행용)
+def get_exchange_rate_data() -> list:
+    current_kst_dt = get_current_kst_datetime(pytz.timezone("Asia/Seoul"))
+    realtime_rates = fetch_realtime_rates(current_kst_dt)
+    random_sleep(1, 3)
+    return build_exchange_rate_records(
+        realtime_rates, fetch_average_rates(current_kst_dt)
+    )
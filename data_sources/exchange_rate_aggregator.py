@@ -0,0 +1,395 @@
+import logging
+import datetime
+import json
+import math
+import random
+import time
+
+import numpy as np
+
+from data_sources.currency_slots import (
+    MAX_CURRENCY_SLOTS,
+    assign_slot,
+    slot_array_from_json,
+    slot_array_to_json,
+)
+
+# 실시간 기준환율 스트림으로 일/월/연평균과 EWMA 를 직접 집계하는 상태
+# (은행 평균 조회는 주기적인 대조(reconcile)에만 사용)
+AGGREGATOR_STATE_PATH = "exchange_rate_cache/aggregates.json"
+AGGREGATOR_STATE_VERSION = 1
+
+# fetch_average_rates 와 같이 이번 달 포함 최근 3개월 월평균을 유지
+RECENT_MONTHS = 3
+DEFAULT_EWMA_HALF_LIFE_HOURS = 24.0
+# 은행 평균과 대조하는 주기 (일). 그 사이에는 평균 조회를 하지 않음
+DEFAULT_RECONCILE_INTERVAL_DAYS = 7
+# 실시간/평균 트리거가 동시에 갱신할 때 조건부 쓰기(If-Match) 재시도 횟수
+MAX_UPDATE_ATTEMPTS = 5
+
+KST = datetime.timezone(datetime.timedelta(hours=9))
+
+
+def _weekday(day: datetime.date) -> bool:
+    return day.weekday() < 5
+
+
+def _business_days(start: datetime.date, end: datetime.date, business_day) -> int:
+    # [start, end) 영업일 수 (연간 최대 366회 판정)
+    days = (end - start).days
+    return sum(
+        1 for i in range(max(days, 0)) if business_day(start + datetime.timedelta(i))
+    )
+
+
+class RollingRateAggregator:
+    """
+    통화 슬롯별 배열로 유지하는 누적 합계/개수 (일, 월, 연) + 시간 가중 EWMA.
+    update() 는 조회 한 번에 통화 수만큼의 배열 연산 한 번 (기간 길이와 무관한 O(1)).
+    월/연평균은 은행 방식처럼 영업일별 일평균의 평균으로 계산한다.
+    """
+
+    def __init__(self, ewma_half_life_hours: float = DEFAULT_EWMA_HALF_LIFE_HOURS):
+        self.ewma_half_life_hours = ewma_half_life_hours
+        self.slots = {}
+        self.day = None  # KST date
+        self.month = None  # "YYYYMM"
+        self.year = None
+        self.day_sum = np.zeros(MAX_CURRENCY_SLOTS)
+        self.day_count = np.zeros(MAX_CURRENCY_SLOTS, dtype="int64")
+        self.month_sum = np.zeros(MAX_CURRENCY_SLOTS)
+        self.month_days = np.zeros(MAX_CURRENCY_SLOTS, dtype="int64")
+        self.year_sum = np.zeros(MAX_CURRENCY_SLOTS)
+        self.year_days = np.zeros(MAX_CURRENCY_SLOTS, dtype="int64")
+        self.closed_months = {}  # "YYYYMM" -> {통화: 월평균} (지난 달들)
+        self.ewma = np.full(MAX_CURRENCY_SLOTS, np.nan)
+        self.ewma_at = np.zeros(MAX_CURRENCY_SLOTS, dtype="int64")
+        self.last_update_at = None
+        self.reconciled_at = None
+
+    # --- 갱신 ---
+
+    def _vector(self, rates: dict) -> np.ndarray:
+        values = np.full(MAX_CURRENCY_SLOTS, np.nan)
+        for currency_code, rate in rates.items():
+            slot = assign_slot(self.slots, currency_code)
+            if slot is not None and rate is not None and rate > 0:
+                values[slot] = float(rate)
+        return values
+
+    def _close_day(self, business_day) -> None:
+        # 끝난 날의 일평균을 월/연 누적에 더함 (영업일만)
+        if self.day is None or not business_day(self.day):
+            return
+        present = self.day_count > 0
+        day_mean = np.divide(
+            self.day_sum,
+            self.day_count,
+            out=np.zeros(MAX_CURRENCY_SLOTS),
+            where=present,
+        )
+        self.month_sum += day_mean
+        self.month_days += present
+        self.year_sum += day_mean
+        self.year_days += present
+
+    def _roll_to(self, day: datetime.date, business_day) -> None:
+        self._close_day(business_day)
+        self.day_sum[:] = 0.0
+        self.day_count[:] = 0
+
+        month = day.strftime("%Y%m")
+        if month != self.month:
+            if self.month is not None:
+                self.closed_months[self.month] = self._to_currency_dict(
+                    self._period_means(self.month_sum, self.month_days, False)
+                )
+                for old_month in sorted(self.closed_months)[: -(RECENT_MONTHS - 1)]:
+                    del self.closed_months[old_month]
+            self.month = month
+            self.month_sum[:] = 0.0
+            self.month_days[:] = 0
+        if day.year != self.year:
+            self.year = day.year
+            self.year_sum[:] = 0.0
+            self.year_days[:] = 0
+        self.day = day
+
+    def update(
+        self, observed_at: datetime.datetime, rates: dict, business_day=_weekday
+    ) -> None:
+        """{통화 코드: 기준환율} 한 번의 실시간 조회를 반영"""
+        observed_kst = observed_at.astimezone(KST)
+        if self.day != observed_kst.date():
+            self._roll_to(observed_kst.date(), business_day)
+
+        values = self._vector(rates)
+        present = np.isfinite(values)
+        self.day_sum[present] += values[present]
+        self.day_count += present
+
+        # 조회 간격이 불규칙하므로 경과 시간 기준 가중치
+        timestamp = int(observed_at.timestamp())
+        elapsed_hours = (timestamp - self.ewma_at) / 3600.0
+        alpha = 1.0 - np.exp(-math.log(2) * elapsed_hours / self.ewma_half_life_hours)
+        first = present & ~np.isfinite(self.ewma)
+        updating = present & np.isfinite(self.ewma)
+        self.ewma[first] = values[first]
+        self.ewma[updating] += alpha[updating] * (
+            values[updating] - self.ewma[updating]
+        )
+        self.ewma_at[present] = timestamp
+        self.last_update_at = observed_at
+
+    # --- 조회 ---
+
+    def _period_means(self, sums, days, include_today: bool = True) -> np.ndarray:
+        sums = sums.copy()
+        days = days.copy()
+        if include_today:
+            today = self.day_count > 0
+            sums[today] += self.day_sum[today] / self.day_count[today]
+            days = days + today
+        return np.divide(
+            sums, days, out=np.full(MAX_CURRENCY_SLOTS, np.nan), where=days > 0
+        )
+
+    def _to_currency_dict(self, values: np.ndarray) -> dict:
+        return {
+            currency_code: round(float(values[slot]), 4)
+            for currency_code, slot in self.slots.items()
+            if np.isfinite(values[slot])
+        }
+
+    def daily_average(self) -> dict:
+        return self._to_currency_dict(
+            np.divide(
+                self.day_sum,
+                self.day_count,
+                out=np.full(MAX_CURRENCY_SLOTS, np.nan),
+                where=self.day_count > 0,
+            )
+        )
+
+    def monthly_average(self) -> dict:
+        return self._to_currency_dict(
+            self._period_means(self.month_sum, self.month_days)
+        )
+
+    def yearly_average(self) -> dict:
+        return self._to_currency_dict(self._period_means(self.year_sum, self.year_days))
+
+    def ewma_rates(self) -> dict:
+        return self._to_currency_dict(self.ewma)
+
+    def averages(self) -> dict:
+        """fetch_average_rates 와 같은 형식의 평균 환율"""
+
+        def _entries(averages: dict) -> list:
+            return [
+                {"currency_code": currency_code, "standard_rate": rate}
+                for currency_code, rate in averages.items()
+            ]
+
+        monthly = {
+            month: _entries(rates) for month, rates in self.closed_months.items()
+        }
+        if self.month is not None:
+            monthly[self.month] = _entries(self.monthly_average())
+        return {
+            "daily_avg": _entries(self.daily_average()),
+            "monthly_avg": dict(sorted(monthly.items(), reverse=True)),
+            "yearly_avg": _entries(self.yearly_average()),
+        }
+
+    def ready_for(
+        self,
+        now: datetime.datetime,
+        max_reconcile_age_days: float = DEFAULT_RECONCILE_INTERVAL_DAYS * 2,
+    ) -> bool:
+        # 올해 은행 평균과 대조한 적이 있고 너무 오래되지 않았을 때만 로컬 평균을 사용
+        if self.reconciled_at is None or self.year != now.astimezone(KST).year:
+            return False
+        return now - self.reconciled_at <= datetime.timedelta(
+            days=max_reconcile_age_days
+        )
+
+    def reconcile_due(
+        self,
+        now: datetime.datetime,
+        interval_days: float = DEFAULT_RECONCILE_INTERVAL_DAYS,
+    ) -> bool:
+        if self.reconciled_at is None or self.year != now.astimezone(KST).year:
+            return True
+        return now - self.reconciled_at >= datetime.timedelta(days=interval_days)
+
+    # --- 은행 평균과 대조 ---
+
+    def reconcile(
+        self, bank_averages: dict, now: datetime.datetime, business_day=_weekday
+    ) -> dict:
+        """
+        은행이 고시한 평균과 로컬 집계를 비교해 차이(%)를 기록하고,
+        어제까지의 월/연 누적을 은행 값으로 다시 맞춘다 (오늘 일평균은 로컬 값 유지).
+        반환: {"yearly_avg": {통화: 차이%}, "monthly_avg": {통화: 차이%}}
+        """
+        now_kst = now.astimezone(KST)
+        if self.day != now_kst.date():
+            self._roll_to(now_kst.date(), business_day)
+        month = now_kst.strftime("%Y%m")
+
+        bank_yearly = {
+            r["currency_code"]: r["standard_rate"]
+            for r in bank_averages.get("yearly_avg") or []
+        }
+        bank_monthly = {
+            month_key: {r["currency_code"]: r["standard_rate"] for r in rates or []}
+            for month_key, rates in (bank_averages.get("monthly_avg") or {}).items()
+        }
+
+        def _drift(local: dict, bank: dict) -> dict:
+            return {
+                currency_code: round((local[currency_code] / rate - 1.0) * 100.0, 4)
+                for currency_code, rate in bank.items()
+                if currency_code in local and rate
+            }
+
+        drift = {
+            "yearly_avg": _drift(self.yearly_average(), bank_yearly),
+            "monthly_avg": _drift(self.monthly_average(), bank_monthly.get(month, {})),
+        }
+
+        today = now_kst.date()
+        year_days = _business_days(datetime.date(today.year, 1, 1), today, business_day)
+        month_days = _business_days(today.replace(day=1), today, business_day)
+        # 아직 실시간 값이 없던 통화도 슬롯을 배정해 은행 값으로 시작
+        self._vector({currency_code: None for currency_code in bank_yearly})
+        for currency_code, rate in bank_yearly.items():
+            slot = self.slots.get(currency_code)
+            if slot is None or not rate:
+                continue
+            self.year_sum[slot] = rate * year_days
+            self.year_days[slot] = year_days
+        for currency_code, rate in bank_monthly.get(month, {}).items():
+            slot = self.slots.get(currency_code)
+            if slot is None or not rate:
+                continue
+            self.month_sum[slot] = rate * month_days
+            self.month_days[slot] = month_days
+        # 지난 달은 은행 값이 확정값
+        for month_key, rates in bank_monthly.items():
+            if month_key < month and rates:
+                self.closed_months[month_key] = dict(rates)
+        for old_month in sorted(self.closed_months)[: -(RECENT_MONTHS - 1)]:
+            del self.closed_months[old_month]
+        self.reconciled_at = now
+
+        worst = max(
+            (abs(v) for values in drift.values() for v in values.values()), default=0.0
+        )
+        logging.info(
+            f"Reconciled local exchange rate averages with bank averages "
+            f"({len(bank_yearly)} currencies, max drift {worst:.3f}%)."
+        )
+        return drift
+
+    # --- 저장 ---
+
+    def to_dict(self) -> dict:
+        return {
+            "version": AGGREGATOR_STATE_VERSION,
+            "ewma_half_life_hours": self.ewma_half_life_hours,
+            "slots": self.slots,
+            "day": self.day.isoformat() if self.day else None,
+            "month": self.month,
+            "year": self.year,
+            "day_sum": slot_array_to_json(self.day_sum),
+            "day_count": self.day_count.tolist(),
+            "month_sum": slot_array_to_json(self.month_sum),
+            "month_days": self.month_days.tolist(),
+            "year_sum": slot_array_to_json(self.year_sum),
+            "year_days": self.year_days.tolist(),
+            "closed_months": self.closed_months,
+            "ewma": slot_array_to_json(self.ewma),
+            "ewma_at": self.ewma_at.tolist(),
+            "last_update_at": (
+                self.last_update_at.isoformat() if self.last_update_at else None
+            ),
+            "reconciled_at": (
+                self.reconciled_at.isoformat() if self.reconciled_at else None
+            ),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RollingRateAggregator":
+        aggregator = cls(data.get("ewma_half_life_hours", DEFAULT_EWMA_HALF_LIFE_HOURS))
+        aggregator.slots = {k: int(v) for k, v in data.get("slots", {}).items()}
+        if data.get("day"):
+            aggregator.day = datetime.date.fromisoformat(data["day"])
+        aggregator.month = data.get("month")
+        aggregator.year = data.get("year")
+        aggregator.day_sum = slot_array_from_json(data.get("day_sum"), 0.0)
+        aggregator.day_count = slot_array_from_json(data.get("day_count"), 0, "int64")
+        aggregator.month_sum = slot_array_from_json(data.get("month_sum"), 0.0)
+        aggregator.month_days = slot_array_from_json(data.get("month_days"), 0, "int64")
+        aggregator.year_sum = slot_array_from_json(data.get("year_sum"), 0.0)
+        aggregator.year_days = slot_array_from_json(data.get("year_days"), 0, "int64")
+        aggregator.closed_months = data.get("closed_months") or {}
+        aggregator.ewma = slot_array_from_json(data.get("ewma"))
+        aggregator.ewma_at = slot_array_from_json(data.get("ewma_at"), 0, "int64")
+        for field in ("last_update_at", "reconciled_at"):
+            if data.get(field):
+                setattr(aggregator, field, datetime.datetime.fromisoformat(data[field]))
+        return aggregator
+
+
+def load_rate_aggregator(
+    backend, path: str = AGGREGATOR_STATE_PATH
+) -> RollingRateAggregator:
+    return _parse_rate_aggregator(backend.read(path), path)
+
+
+def _parse_rate_aggregator(data, path: str) -> RollingRateAggregator:
+    if data is None:
+        return RollingRateAggregator()
+    try:
+        return RollingRateAggregator.from_dict(json.loads(data))
+    except (ValueError, KeyError, TypeError) as e:
+        logging.warning(
+            f"Invalid rate aggregator state at {path}: {e}. Starting fresh."
+        )
+        return RollingRateAggregator()
+
+
+def save_rate_aggregator(
+    aggregator: RollingRateAggregator, backend, path: str = AGGREGATOR_STATE_PATH
+) -> str:
+    return backend.write(path, json.dumps(aggregator.to_dict()).encode("utf-8"))
+
+
+def update_rate_aggregator(
+    backend,
+    apply,
+    path: str = AGGREGATOR_STATE_PATH,
+    max_attempts: int = MAX_UPDATE_ATTEMPTS,
+) -> RollingRateAggregator:
+    """
+    상태를 읽어 apply(aggregator) 를 적용하고, 읽은 시점의 ETag 가 그대로일 때만 저장한다.
+    그 사이 다른 트리거가 저장했으면 다시 읽어 apply 를 재적용한다 (갱신 유실 방지).
+    """
+    for attempt in range(1, max_attempts + 1):
+        data, etag = backend.read_with_etag(path)
+        aggregator = _parse_rate_aggregator(data, path)
+        apply(aggregator)
+        payload = json.dumps(aggregator.to_dict()).encode("utf-8")
+        if backend.write_if_match(path, payload, etag):
+            return aggregator
+        logging.info(
+            f"Rate aggregator state at {path} changed concurrently "
+            f"(attempt {attempt}/{max_attempts}). Retrying."
+        )
+        time.sleep(random.uniform(0.05, 0.2) * attempt)
+    raise RuntimeError(
+        f"Rate aggregator state at {path} kept changing. "
+        f"Gave up after {max_attempts} attempts."
+    )
@@ -0,0 +1,240 @@
+import logging
+import datetime
+import json
+
+import numpy as np
+
+from data_sources.currency_slots import (
+    MAX_CURRENCY_SLOTS,
+    assign_slot,
+    slot_array_from_json,
+    slot_array_to_json,
+)
+
+# 실시간 기준환율 이상치 탐지 상태 (통화 슬롯별 고정 크기 배열)
+ANOMALY_STATE_PATH = "exchange_rate_cache/anomaly_state.json"
+ANOMALY_STATE_VERSION = 1
+
+# EWMA 평균/분산 가중치 (조회 1회당)
+DEFAULT_EWMA_ALPHA = 0.05
+# 이 횟수 이상 관측한 통화만 z-점수 판정 (그 전에는 0/단위 오류만 판정).
+# level_shift 뒤에는 새 수준에서 다시 워밍업하므로 약 12회 조회 동안 outlier 판정이 꺼짐
+WARMUP_OBSERVATIONS = 12
+# |z| 가 이보다 크면 outlier
+Z_THRESHOLD = 6.0
+# 분산 하한 (값이 거의 안 바뀌는 통화의 z 폭주 방지): 평균의 0.05%
+MIN_RELATIVE_STD = 0.0005
+# CUSUM 허용치 k / 임계치 h (z 단위)
+CUSUM_DRIFT = 0.5
+CUSUM_THRESHOLD = 8.0
+# 평균 대비 비율이 10 의 거듭제곱(±1, ±2)에 이만큼(log10) 가까우면 단위 오류 ("(100)" 누락 등)
+UNIT_MISMATCH_TOLERANCE = 0.05
+
+# 판정 결과
+ZERO_RATE = "zero_rate"  # "-" 셀 등으로 0.0 이 된 값
+UNIT_MISMATCH = "unit_mismatch"  # 10/100 배 차이 (통화 단위 표기 오파싱)
+OUTLIER = "outlier"  # |z| > Z_THRESHOLD
+LEVEL_SHIFT = "level_shift"  # CUSUM 으로 감지한 지속적인 수준 변화
+# 발행 전에 값 자체를 버리는 판정 (이력/집계에도 반영하지 않음)
+REJECTED_FLAGS = frozenset({ZERO_RATE, UNIT_MISMATCH})
+
+
+class RateAnomalyDetector:
+    """
+    통화별 EWMA 평균/분산, z-점수, 양방향 CUSUM 수준 변화 감지.
+    inspect() 는 조회 한 번의 모든 통화를 배열 연산으로 판정하고 상태를 갱신한다.
+    0/단위 오류 값은 통계에 반영하지 않고, outlier 는 CUSUM 에만 반영해
+    실제 급변이면 몇 번의 조회 뒤 level_shift 로 새 수준을 받아들인다.
+    """
+
+    def __init__(self, alpha: float = DEFAULT_EWMA_ALPHA):
+        self.alpha = alpha
+        self.slots = {}
+        self.mean = np.full(MAX_CURRENCY_SLOTS, np.nan)
+        self.var = np.zeros(MAX_CURRENCY_SLOTS)
+        self.count = np.zeros(MAX_CURRENCY_SLOTS)
+        self.cusum_pos = np.zeros(MAX_CURRENCY_SLOTS)
+        self.cusum_neg = np.zeros(MAX_CURRENCY_SLOTS)
+        self.last_inspected_at = None
+
+    def _slot_vector(self, rates: dict) -> tuple:
+        # (통화 코드 목록, 슬롯 인덱스 배열, 값 배열) - 슬롯이 없으면 새로 배정
+        currency_codes, slots, values = [], [], []
+        for currency_code, rate in rates.items():
+            slot = assign_slot(self.slots, currency_code)
+            if slot is None:
+                continue
+            currency_codes.append(currency_code)
+            slots.append(slot)
+            values.append(np.nan if rate is None else float(rate))
+        return (
+            currency_codes,
+            np.array(slots, dtype="int64"),
+            np.array(values, dtype="float64"),
+        )
+
+    def inspect(self, rates: dict, observed_at: datetime.datetime = None) -> dict:
+        """
+        {통화 코드: 기준환율} 을 판정하고 {통화 코드: {"flags": [...], "zscore": z}} 를 반환.
+        """
+        currency_codes, slots, values = self._slot_vector(rates)
+        if not len(slots):
+            return {}
+        mean = self.mean[slots]
+        std = np.sqrt(self.var[slots])
+        has_history = np.isfinite(mean)
+        warmed_up = self.count[slots] >= WARMUP_OBSERVATIONS
+
+        zero = ~np.isfinite(values) | (values <= 0.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_ratio = np.log10(values / mean)
+            nearest_power = np.round(log_ratio)
+            unit_mismatch = (
+                has_history
+                & ~zero
+                & (np.abs(nearest_power) >= 1)
+                & (np.abs(nearest_power) <= 2)
+                & (np.abs(log_ratio - nearest_power) <= UNIT_MISMATCH_TOLERANCE)
+            )
+            std_floor = np.maximum(std, np.abs(mean) * MIN_RELATIVE_STD)
+            z = np.where(has_history & ~zero, (values - mean) / std_floor, 0.0)
+        outlier = warmed_up & ~zero & ~unit_mismatch & (np.abs(z) > Z_THRESHOLD)
+
+        # CUSUM: 0/단위 오류가 아닌 값만, z 를 잘라서 누적
+        # (한 번 튄 값만으로는 임계치를 넘지 않고 연속 두 번 이상이어야 수준 변화)
+        usable = ~zero & ~unit_mismatch
+        clipped = np.clip(z, -Z_THRESHOLD, Z_THRESHOLD)
+        cusum_pos = np.where(
+            usable & warmed_up,
+            np.maximum(0.0, self.cusum_pos[slots] + clipped - CUSUM_DRIFT),
+            self.cusum_pos[slots],
+        )
+        cusum_neg = np.where(
+            usable & warmed_up,
+            np.maximum(0.0, self.cusum_neg[slots] - clipped - CUSUM_DRIFT),
+            self.cusum_neg[slots],
+        )
+        level_shift = (cusum_pos > CUSUM_THRESHOLD) | (cusum_neg > CUSUM_THRESHOLD)
+
+        # 상태 갱신: 처음 보는 통화는 값으로 시작, 수준 변화면 새 수준으로 재시작,
+        # 나머지 정상 값은 EWMA 평균/분산 갱신 (outlier 는 평균/분산에 반영하지 않음)
+        # 재시작하면 count 가 1 이 되어 WARMUP_OBSERVATIONS 회 동안 z-점수/CUSUM 판정 없음
+        start = usable & (~has_history | level_shift)
+        normal = usable & has_history & ~outlier & ~level_shift
+        delta = values - mean
+        new_mean = np.where(
+            start, values, np.where(normal, mean + self.alpha * delta, mean)
+        )
+        new_var = np.where(
+            start,
+            0.0,
+            np.where(
+                normal,
+                (1 - self.alpha) * (self.var[slots] + self.alpha * delta**2),
+                self.var[slots],
+            ),
+        )
+        self.mean[slots] = new_mean
+        self.var[slots] = np.nan_to_num(new_var)
+        self.count[slots] = np.where(start, 1, self.count[slots] + normal)
+        self.cusum_pos[slots] = np.where(level_shift, 0.0, cusum_pos)
+        self.cusum_neg[slots] = np.where(level_shift, 0.0, cusum_neg)
+        self.last_inspected_at = observed_at
+
+        results = {}
+        for index, currency_code in enumerate(currency_codes):
+            flags = [
+                name
+                for name, mask in (
+                    (ZERO_RATE, zero),
+                    (UNIT_MISMATCH, unit_mismatch),
+                    (OUTLIER, outlier),
+                    (LEVEL_SHIFT, level_shift),
+                )
+                if mask[index]
+            ]
+            results[currency_code] = {
+                "flags": flags,
+                "zscore": (
+                    round(float(z[index]), 2)
+                    if warmed_up[index] and not zero[index]
+                    else None
+                ),
+            }
+        return results
+
+    def to_dict(self) -> dict:
+        return {
+            "version": ANOMALY_STATE_VERSION,
+            "alpha": self.alpha,
+            "slots": self.slots,
+            "mean": slot_array_to_json(self.mean),
+            "var": slot_array_to_json(self.var),
+            "count": slot_array_to_json(self.count),
+            "cusum_pos": slot_array_to_json(self.cusum_pos),
+            "cusum_neg": slot_array_to_json(self.cusum_neg),
+            "last_inspected_at": (
+                self.last_inspected_at.isoformat() if self.last_inspected_at else None
+            ),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RateAnomalyDetector":
+        detector = cls(data.get("alpha", DEFAULT_EWMA_ALPHA))
+        detector.slots = {k: int(v) for k, v in data.get("slots", {}).items()}
+        detector.mean = slot_array_from_json(data.get("mean"))
+        for field in ("var", "count", "cusum_pos", "cusum_neg"):
+            setattr(detector, field, slot_array_from_json(data.get(field), 0.0))
+        if data.get("last_inspected_at"):
+            detector.last_inspected_at = datetime.datetime.fromisoformat(
+                data["last_inspected_at"]
+            )
+        return detector
+
+
+def screen_realtime_rates(
+    detector: RateAnomalyDetector, realtime_rates: list, observed_at=None
+) -> tuple:
+    """
+    실시간 환율 목록을 판정해 (발행할 환율 목록, {통화 코드: 판정 결과}) 를 반환.
+    0/단위 오류 값은 목록에서 빼고, 나머지 판정은 결과로만 남긴다.
+    """
+    results = detector.inspect(
+        {r["currency_code"]: r["standard_rate"] for r in realtime_rates}, observed_at
+    )
+    accepted = [
+        r
+        for r in realtime_rates
+        if not REJECTED_FLAGS.intersection(
+            results.get(r["currency_code"], {}).get("flags", ())
+        )
+    ]
+    flagged = {code: result for code, result in results.items() if result["flags"]}
+    if flagged:
+        logging.warning(
+            "Exchange rate anomalies: "
+            + ", ".join(f"{code} {r['flags']}" for code, r in sorted(flagged.items()))
+            + f" ({len(realtime_rates) - len(accepted)} rates rejected)."
+        )
+    return accepted, results
+
+
+def load_anomaly_detector(
+    backend, path: str = ANOMALY_STATE_PATH
+) -> RateAnomalyDetector:
+    data = backend.read(path)
+    if data is None:
+        return RateAnomalyDetector()
+    try:
+        return RateAnomalyDetector.from_dict(json.loads(data))
+    except (ValueError, KeyError, TypeError) as e:
+        logging.warning(
+            f"Invalid anomaly detector state at {path}: {e}. Starting fresh."
+        )
+        return RateAnomalyDetector()
+
+
+def save_anomaly_detector(
+    detector: RateAnomalyDetector, backend, path: str = ANOMALY_STATE_PATH
+) -> str:
+    return backend.write(path, json.dumps(detector.to_dict()).encode("utf-8"))
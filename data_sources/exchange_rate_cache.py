@@ -0,0 +1,112 @@
+import logging
+import datetime
+import json
+
+from data_sources.storage_backend import get_default_backend
+
+# 환율 파이프라인 전용 컨테이너 (스케줄러 상태 / 최신 조회 결과 캐시)
+EXCHANGE_RATE_CONTAINER_NAME = "exchange-rate-data"
+
+# 조회 종류별 최신 결과 캐시 경로
+#   realtime: fetch_realtime_rates 결과 (list)
+#   averages: fetch_average_rates 결과 ({"daily_avg", "monthly_avg", "yearly_avg"})
+RATE_SNAPSHOT_PATHS = {
+    "realtime": "exchange_rate_cache/realtime.json",
+    "averages": "exchange_rate_cache/averages.json",
+}
+
+
+def get_exchange_rate_backend():
+    return get_default_backend(EXCHANGE_RATE_CONTAINER_NAME)
+
+
+def save_rate_snapshot(
+    backend,
+    kind: str,
+    rates,
+    fetched_at: datetime.datetime,
+    inquiry_fetched_at: dict = None,
+) -> str:
+    # inquiry_fetched_at: {조회 이름: 마지막 정상 조회 시각}
+    # 일부 조회만 성공한 경우 나머지는 이전 시각을 유지해 오래된 값임을 알 수 있게 한다
+    payload = {
+        "kind": kind,
+        "fetched_at": fetched_at.isoformat(timespec="seconds"),
+        "inquiry_fetched_at": inquiry_fetched_at or {},
+        "rates": rates,
+    }
+    return backend.write(
+        RATE_SNAPSHOT_PATHS[kind],
+        json.dumps(payload, ensure_ascii=False).encode("utf-8"),
+    )
+
+
+def load_rate_snapshot(backend, kind: str):
+    """가장 최근에 저장된 조회 결과. 없거나 손상된 경우 None"""
+    path = RATE_SNAPSHOT_PATHS[kind]
+    data = backend.read(path)
+    if data is None:
+        logging.info(f"No cached {kind} exchange rates at {path}.")
+        return None
+    try:
+        payload = json.loads(data)
+        payload["fetched_at"] = datetime.datetime.fromisoformat(payload["fetched_at"])
+        return payload
+    except (ValueError, KeyError, TypeError) as e:
+        logging.warning(f"Invalid cached {kind} exchange rates at {path}: {e}")
+        return None
+
+
+def _flatten_average_rates(average_rates: dict) -> dict:
+    # fetch_average_rates 결과를 {조회 이름: 값} 으로 펼침 (monthly_avg -> monthly_avg:YYYYMM)
+    flat = {
+        "daily_avg": average_rates.get("daily_avg"),
+        "yearly_avg": average_rates.get("yearly_avg"),
+    }
+    for month_year_key, rates in (average_rates.get("monthly_avg") or {}).items():
+        flat[f"monthly_avg:{month_year_key}"] = rates
+    return flat
+
+
+def merge_average_rates_with_last_good(
+    average_rates: dict, snapshot, fetched_at: datetime.datetime
+) -> tuple:
+    """
+    이번에 실패한(None) 평균 환율 조회를 마지막 정상 캐시 값으로 채운다 (average_rates 를 직접 수정).
+    반환: (조회별 마지막 정상 조회 시각, 캐시로 채운 조회 {이름: 마지막 정상 조회 시각})
+    """
+    cached = _flatten_average_rates((snapshot or {}).get("rates") or {})
+    cached_fetched_at = (snapshot or {}).get("inquiry_fetched_at") or {}
+    fetched_at_iso = fetched_at.isoformat(timespec="seconds")
+
+    inquiry_fetched_at = {}
+    stale_inquiries = {}
+    for inquiry, rates in _flatten_average_rates(average_rates).items():
+        if rates is not None:
+            inquiry_fetched_at[inquiry] = fetched_at_iso
+            continue
+        last_good = cached.get(inquiry)
+        if last_good is None:
+            continue
+        if inquiry.startswith("monthly_avg:"):
+            average_rates["monthly_avg"][inquiry.split(":", 1)[1]] = last_good
+        else:
+            average_rates[inquiry] = last_good
+        last_good_at = cached_fetched_at.get(inquiry) or snapshot[
+            "fetched_at"
+        ].isoformat(timespec="seconds")
+        inquiry_fetched_at[inquiry] = last_good_at
+        stale_inquiries[inquiry] = last_good_at
+    return inquiry_fetched_at, stale_inquiries
+
+
+def stale_inquiries_in_snapshot(snapshot) -> dict:
+    """스냅샷 시각보다 오래된(이전 실패 때 캐시로 채운) 조회 {이름: 마지막 정상 조회 시각}"""
+    if not snapshot:
+        return {}
+    snapshot_at = snapshot["fetched_at"].isoformat(timespec="seconds")
+    return {
+        inquiry: fetched_at
+        for inquiry, fetched_at in (snapshot.get("inquiry_fetched_at") or {}).items()
+        if fetched_at != snapshot_at
+    }
@@ -0,0 +1,299 @@
+import logging
+import datetime
+import json
+import os
+import threading
+
+import numpy as np
+
+from data_sources.currency_slots import MAX_CURRENCY_SLOTS, assign_slot
+from data_sources.storage_backend import local_output_dir
+
+# 조회 종류(rate_type)별 환율 이력 파일 (append-only, 고정 길이 레코드)
+#   <dir>/<rate_type>.bin         레코드: timestamp(int64, epoch 초) + 통화 슬롯별 float64 (없으면 NaN)
+#   <dir>/<rate_type>.slots.json  통화 코드 -> 슬롯 번호 (추가만 함)
+# numpy.memmap 으로 읽어서 범위 조회 / 평균 계산 시 파일 전체를 메모리에 복사하지 않는다
+# (memmap 이 필요해서 Blob 이 아닌 로컬 파일. Azure 에서는 ExchangeRateHistoryDir 를 $HOME 아래로)
+RATE_HISTORY_DIR_NAME = "rate_history"
+
+RECORD_DTYPE = np.dtype([("timestamp", "<i8"), ("rates", "<f8", (MAX_CURRENCY_SLOTS,))])
+
+KST = datetime.timezone(datetime.timedelta(hours=9))
+KST_OFFSET_SECONDS = 9 * 3600
+
+# 로컬 연평균을 쓰기 위한 최소 커버리지 (올해 경과 일수 중 이력이 있는 날의 비율)
+MIN_YEARLY_COVERAGE = 0.9
+
+
+def rate_history_enabled() -> bool:
+    return os.environ.get("DisableExchangeRateHistory", "").lower() not in (
+        "1",
+        "true",
+    )
+
+
+def default_history_dir() -> str:
+    # ExchangeRateHistoryDir 가 없으면 쓰기 가능한 local_output 아래 (run-from-package 면 임시 디렉토리)
+    configured = os.environ.get("ExchangeRateHistoryDir")
+    if configured:
+        return configured
+    directory = os.path.join(local_output_dir(), RATE_HISTORY_DIR_NAME)
+    if os.environ.get("WEBSITE_INSTANCE_ID"):
+        # 임시 디렉토리는 인스턴스가 재시작되면 비워져 로컬 연평균 커버리지가 채워지지 않음
+        logging.warning(
+            f"ExchangeRateHistoryDir is not set. Keeping rate history in {directory}, "
+            "which does not survive instance restarts."
+        )
+    return directory
+
+
+def _epoch_seconds(dt: datetime.datetime) -> int:
+    return int(dt.timestamp())
+
+
+class RateHistory:
+    """
+    rate_type 하나의 환율 이력. append() 는 레코드 하나를 파일 끝에 쓰고,
+    조회는 memmap 뷰(timestamps / rates)를 그대로 잘라서 쓴다.
+    timestamp 는 증가하는 순서로만 추가한다 (같거나 이전 시각은 무시).
+    """
+
+    def __init__(self, rate_type: str, directory: str = None):
+        self.rate_type = rate_type
+        self.directory = directory or default_history_dir()
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(self.directory, f"{rate_type}.bin")
+        self.slots_path = os.path.join(self.directory, f"{rate_type}.slots.json")
+        self._lock = threading.Lock()
+        self._slots = self._load_slots()
+        self._memmap = None
+        self._memmap_records = -1
+
+    def _load_slots(self) -> dict:
+        try:
+            with open(self.slots_path, "r", encoding="utf-8") as f:
+                return json.load(f)["slots"]
+        except FileNotFoundError:
+            return {}
+
+    def _save_slots(self) -> None:
+        temp_path = self.slots_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"max_slots": MAX_CURRENCY_SLOTS, "slots": self._slots},
+                f,
+                ensure_ascii=False,
+            )
+        os.replace(temp_path, self.slots_path)
+
+    @property
+    def currencies(self) -> list:
+        # 슬롯 순서대로의 통화 코드
+        return sorted(self._slots, key=self._slots.get)
+
+    def slot(self, currency_code: str):
+        return self._slots.get(currency_code)
+
+    def _record_count(self) -> int:
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+        # 중간에 끊긴 마지막 레코드는 무시
+        return size // RECORD_DTYPE.itemsize
+
+    def records(self) -> np.ndarray:
+        """전체 레코드의 읽기 전용 memmap (파일이 커졌을 때만 다시 매핑)"""
+        count = self._record_count()
+        if count != self._memmap_records:
+            self._memmap = (
+                np.memmap(self.path, dtype=RECORD_DTYPE, mode="r", shape=(count,))
+                if count
+                else np.empty(0, dtype=RECORD_DTYPE)
+            )
+            self._memmap_records = count
+        return self._memmap
+
+    def __len__(self) -> int:
+        return self._record_count()
+
+    def append(self, observed_at: datetime.datetime, rates: dict) -> bool:
+        """{통화 코드: 환율} 한 시점을 추가. 새 통화는 빈 슬롯을 배정한다"""
+        timestamp = _epoch_seconds(observed_at)
+        with self._lock:
+            existing = self.records()
+            if len(existing) and timestamp <= int(existing["timestamp"][-1]):
+                return False
+
+            record = np.zeros(1, dtype=RECORD_DTYPE)
+            record["timestamp"] = timestamp
+            record["rates"] = np.nan
+            slots_changed = False
+            for currency_code, rate in rates.items():
+                known = currency_code in self._slots
+                slot = assign_slot(self._slots, currency_code)
+                if slot is None:
+                    logging.warning(
+                        f"No free history slot for {currency_code} ({self.rate_type})."
+                    )
+                    continue
+                slots_changed = slots_changed or not known
+                if rate is not None:
+                    record["rates"][0, slot] = float(rate)
+            # 슬롯 정보를 먼저 저장해야 레코드를 읽을 때 통화를 알 수 있음
+            if slots_changed:
+                self._save_slots()
+            with open(self.path, "ab") as f:
+                f.write(record.tobytes())
+        return True
+
+    def range(
+        self, start: datetime.datetime = None, end: datetime.datetime = None
+    ) -> np.ndarray:
+        """[start, end) 구간 레코드 (memmap 슬라이스, 복사 없음)"""
+        records = self.records()
+        timestamps = records["timestamp"]
+        lo = (
+            np.searchsorted(timestamps, _epoch_seconds(start), side="left")
+            if start
+            else 0
+        )
+        hi = (
+            np.searchsorted(timestamps, _epoch_seconds(end), side="left")
+            if end
+            else len(records)
+        )
+        return records[lo:hi]
+
+    def series(self, currency_code: str, start=None, end=None) -> tuple:
+        """(timestamps, rates) 뷰. 통화가 없으면 빈 배열"""
+        records = self.range(start, end)
+        slot = self._slots.get(currency_code)
+        if slot is None:
+            return records["timestamp"], np.empty(0)
+        return records["timestamp"], records["rates"][:, slot]
+
+    def rolling_mean(self, currency_code: str, window: int, start=None, end=None):
+        """레코드 window 개 단위 이동 평균 (결측은 제외하고 평균)"""
+        timestamps, values = self.series(currency_code, start, end)
+        if len(values) < window:
+            return timestamps[:0], np.empty(0)
+        present = np.isfinite(values)
+        sums = np.concatenate(([0.0], np.cumsum(np.where(present, values, 0.0))))
+        counts = np.concatenate(([0], np.cumsum(present)))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = (sums[window:] - sums[:-window]) / (
+                counts[window:] - counts[:-window]
+            )
+        return timestamps[window - 1 :], means
+
+    def daily_means(self, start=None, end=None) -> tuple:
+        """
+        KST 날짜별 통화 평균 (날짜 수 x 슬롯 수). 하루 안의 조회 횟수와 무관하게
+        날짜마다 같은 가중치를 주기 위해 연/월 평균 전에 먼저 일 평균을 낸다.
+        반환: (KST 날짜 번호 배열(epoch 일), 일 평균 행렬)
+        """
+        records = self.range(start, end)
+        if not len(records):
+            return np.empty(0, dtype="int64"), np.empty((0, MAX_CURRENCY_SLOTS))
+        days = (records["timestamp"] + KST_OFFSET_SECONDS) // 86400
+        # 레코드가 시각순이므로 날짜 경계에서 reduceat
+        boundaries = np.flatnonzero(np.diff(days, prepend=days[0] - 1))
+        rates = records["rates"]
+        present = np.isfinite(rates)
+        sums = np.add.reduceat(np.where(present, rates, 0.0), boundaries, axis=0)
+        counts = np.add.reduceat(present.astype("int64"), boundaries, axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = sums / counts
+        return days[boundaries], means
+
+    def period_average(self, start, end, min_coverage: float = 0.0) -> dict:
+        """
+        [start, end) 구간의 통화별 평균 (일 평균의 평균).
+        이력이 있는 날이 구간 일수 * min_coverage 보다 적은 통화는 제외한다.
+        """
+        days, means = self.daily_means(start, end)
+        if not len(days):
+            return {}
+        span_days = max(1, (end - start).days)
+        present = np.isfinite(means)
+        coverage = present.sum(axis=0) / span_days
+        with np.errstate(invalid="ignore", divide="ignore"):
+            averages = np.where(present, means, 0.0).sum(axis=0) / present.sum(axis=0)
+        return {
+            currency_code: round(float(averages[slot]), 4)
+            for currency_code, slot in self._slots.items()
+            if np.isfinite(averages[slot]) and coverage[slot] >= min_coverage
+        }
+
+    def yearly_average(
+        self, now: datetime.datetime, min_coverage: float = MIN_YEARLY_COVERAGE
+    ) -> dict:
+        # 올해 1월 1일(KST) ~ now 구간. 주말/휴일은 고시가 없으므로 영업일 비율로 커버리지 보정
+        now_kst = now.astimezone(KST)
+        start = datetime.datetime(now_kst.year, 1, 1, tzinfo=KST)
+        return self.period_average(start, now_kst, min_coverage * 5 / 7)
+
+
+# --- 프로세스 단위 기본 이력 (rate_type 별) ---
+_DEFAULT_HISTORIES = {}
+_DEFAULT_HISTORIES_LOCK = threading.Lock()
+
+
+def get_rate_history(rate_type: str) -> RateHistory:
+    with _DEFAULT_HISTORIES_LOCK:
+        history = _DEFAULT_HISTORIES.get(rate_type)
+        if history is None:
+            history = _DEFAULT_HISTORIES[rate_type] = RateHistory(rate_type)
+        return history
+
+
+def append_rate_history(
+    rate_type: str, observed_at: datetime.datetime, rates: list
+) -> bool:
+    # 이력 기록 실패가 수집을 막지 않도록 경고만 남김
+    if not rate_history_enabled() or not rates:
+        return False
+    try:
+        return get_rate_history(rate_type).append(
+            observed_at, {r["currency_code"]: r["standard_rate"] for r in rates}
+        )
+    except Exception as e:
+        logging.warning(f"Failed to append {rate_type} exchange rate history: {e}")
+        return False
+
+
+def local_yearly_average_rates(now: datetime.datetime) -> list:
+    """
+    실시간 환율 이력으로 계산한 연평균 ([{currency_code, standard_rate}]).
+    올해 이력이 충분하지 않은 통화는 빠진다 (은행 연평균 조회 결과를 그대로 사용)
+    """
+    if not rate_history_enabled():
+        return []
+    try:
+        averages = get_rate_history("realtime").yearly_average(now)
+    except Exception as e:
+        logging.warning(f"Failed to compute local yearly average rates: {e}")
+        return []
+    return [
+        {"currency_code": currency_code, "standard_rate": rate}
+        for currency_code, rate in averages.items()
+    ]
+
+
+def with_local_yearly_average(average_rates: dict, now: datetime.datetime) -> dict:
+    # 로컬 연평균이 있는 통화만 은행 연평균을 대체 (나머지는 은행 값 유지)
+    local_rates = local_yearly_average_rates(now)
+    if not local_rates:
+        return average_rates
+    local_currencies = {r["currency_code"] for r in local_rates}
+    bank_rates = [
+        r
+        for r in (average_rates.get("yearly_avg") or [])
+        if r["currency_code"] not in local_currencies
+    ]
+    logging.info(
+        f"Using locally computed yearly average for {len(local_rates)} currencies "
+        f"({len(bank_rates)} from bank inquiry)."
+    )
+    return {**average_rates, "yearly_avg": local_rates + bank_rates}
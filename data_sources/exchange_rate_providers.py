@@ -0,0 +1,359 @@
+import logging
+import abc
+import csv
+import datetime
+import os
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+
+from data_sources import exchage_rate_crawler
+from data_sources.currency_units import HANA_PER_100_UNIT_CURRENCIES, add_per_unit_rate
+from data_sources.retry_utils import exchange_rate_api_retry
+
+KST = datetime.timezone(datetime.timedelta(hours=9))
+
+# 헤지 요청 기본값
+DEFAULT_LATENCY_BUDGET_SECONDS = 20.0  # 이 시간 안에 건강한 응답이 없으면 실패
+# 1순위 단독 조회 시간 (0 이면 처음부터 모든 제공자 병렬 조회)
+DEFAULT_HEDGE_DELAY_SECONDS = 0.0
+# 대체 제공자가 먼저 답해도 1순위(하나은행, 실시간) 응답을 기다리는 시간
+DEFAULT_PREFER_PRIMARY_SECONDS = 3.0
+DEFAULT_CROSS_CHECK_GRACE_SECONDS = 2.0  # 채택 후 교차 검증용 응답을 더 기다리는 시간
+DEFAULT_CROSS_CHECK_TOLERANCE_PERCENT = 3.0  # 제공자 간 기준율 허용 편차
+MIN_HEALTHY_CURRENCIES = 5
+
+
+def _rate_entry(currency_code: str, standard_rate: float, crawled_at) -> dict:
+    # 하나은행 파서와 같은 모양의 레코드 (대체 제공자는 매매기준율만 제공)
+    return add_per_unit_rate(
+        {
+            "currency_code": currency_code,
+            "buy_rate": 0.0,
+            "sell_rate": 0.0,
+            "send_rate": 0.0,
+            "receive_rate": 0.0,
+            "standard_rate": standard_rate,
+            "crawled_at_utc": crawled_at.astimezone(datetime.timezone.utc).isoformat(
+                timespec="seconds"
+            )
+            + "Z",
+            "crawled_at_kst": crawled_at.astimezone(KST).isoformat(timespec="seconds"),
+        }
+    )
+
+
+class ExchangeRateProvider(abc.ABC):
+    """
+    실시간 원화 환율 제공자. fetch_realtime 은 fetch_realtime_rates 와 같은 모양의 list 를 반환.
+    timeout_seconds 를 주면 재시도 없이 한 번만, 그 시간 안에 요청한다 (헤지 조회용).
+    """
+
+    name = "base"
+
+    @abc.abstractmethod
+    def fetch_realtime(
+        self, current_kst_dt: datetime.datetime = None, timeout_seconds: float = None
+    ) -> list:
+        raise NotImplementedError
+
+
+class HanaBankProvider(ExchangeRateProvider):
+    """kebhana.com 실시간 환율 (기존 크롤러)"""
+
+    name = "hana"
+
+    def fetch_realtime(
+        self, current_kst_dt: datetime.datetime = None, timeout_seconds: float = None
+    ) -> list:
+        return exchage_rate_crawler.fetch_realtime_rates(
+            current_kst_dt, timeout_seconds=timeout_seconds
+        )
+
+
+class ReferenceRateXmlProvider(ExchangeRateProvider):
+    """
+    ECB eurofxref-daily.xml 형식의 기준 환율 피드 (1 EUR 당 각 통화).
+    KRW 환율로 교차 환산해 원화 기준 매매기준율을 만든다.
+    """
+
+    name = "reference_xml"
+
+    def __init__(self, url: str, timeout_seconds: float = 10):
+        self.url = url
+        self.timeout_seconds = timeout_seconds
+
+    def _download(self, timeout_seconds: float) -> bytes:
+        response = requests.get(self.url, timeout=timeout_seconds)
+        response.raise_for_status()
+        return response.content
+
+    @exchange_rate_api_retry
+    def _download_with_retry(self) -> bytes:
+        return self._download(self.timeout_seconds)
+
+    def fetch_realtime(
+        self, current_kst_dt: datetime.datetime = None, timeout_seconds: float = None
+    ) -> list:
+        crawled_at = current_kst_dt or datetime.datetime.now(KST)
+        if timeout_seconds is None:
+            body = self._download_with_retry()
+        else:
+            body = self._download(min(timeout_seconds, self.timeout_seconds))
+        return parse_reference_rate_xml(body, crawled_at)
+
+
+def parse_reference_rate_xml(body: bytes, crawled_at: datetime.datetime) -> list:
+    # 네임스페이스와 관계없이 currency/rate 속성을 가진 Cube 요소만 읽는다
+    per_eur = {"EUR": 1.0}
+    for element in ET.fromstring(body).iter():
+        currency = element.get("currency")
+        rate = element.get("rate")
+        if currency and rate:
+            per_eur[currency] = float(rate)
+
+    krw_per_eur = per_eur.get("KRW")
+    if not krw_per_eur:
+        raise ValueError("Reference rate feed has no KRW rate.")
+
+    rates = []
+    for currency_code, units_per_eur in per_eur.items():
+        if currency_code == "KRW" or units_per_eur <= 0:
+            continue
+        krw_per_unit = krw_per_eur / units_per_eur
+        if currency_code in HANA_PER_100_UNIT_CURRENCIES:
+            krw_per_unit *= 100
+        rates.append(_rate_entry(currency_code, round(krw_per_unit, 2), crawled_at))
+    return rates
+
+
+class CsvRateProvider(ExchangeRateProvider):
+    """
+    로컬 CSV (currency_code, standard_rate[, buy_rate, sell_rate, send_rate, receive_rate]).
+    값은 하나은행 고시 단위(JPY 등은 100 단위) 기준. 테스트/비상용.
+    """
+
+    name = "csv"
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def fetch_realtime(
+        self, current_kst_dt: datetime.datetime = None, timeout_seconds: float = None
+    ) -> list:
+        crawled_at = current_kst_dt or datetime.datetime.now(KST)
+        rates = []
+        with open(self.path, "r", encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                entry = _rate_entry(
+                    row["currency_code"].strip(),
+                    float(row["standard_rate"]),
+                    crawled_at,
+                )
+                for field in ("buy_rate", "sell_rate", "send_rate", "receive_rate"):
+                    if row.get(field):
+                        entry[field] = float(row[field])
+                rates.append(entry)
+        return rates
+
+
+def build_realtime_providers() -> list:
+    """
+    우선순위 순 제공자 목록. 하나은행이 항상 1순위이고, 환경 변수가 있으면 대체 제공자를 추가
+      ExchangeRateReferenceFeedUrl: ECB 형식 XML 피드 URL
+      ExchangeRateReferenceCsvPath: 로컬 CSV 경로
+    """
+    providers = [HanaBankProvider()]
+    feed_url = os.environ.get("ExchangeRateReferenceFeedUrl")
+    if feed_url:
+        providers.append(ReferenceRateXmlProvider(feed_url))
+    csv_path = os.environ.get("ExchangeRateReferenceCsvPath")
+    if csv_path:
+        providers.append(CsvRateProvider(csv_path))
+    return providers
+
+
+def is_healthy(rates) -> bool:
+    if not rates or len(rates) < MIN_HEALTHY_CURRENCIES:
+        return False
+    positive = sum(1 for entry in rates if (entry.get("standard_rate") or 0) > 0)
+    return positive >= len(rates) * 0.9
+
+
+def cross_check_rates(
+    primary: list,
+    other: list,
+    tolerance_percent: float = DEFAULT_CROSS_CHECK_TOLERANCE_PERCENT,
+) -> dict:
+    """공통 통화의 매매기준율 편차(%)를 비교"""
+    other_by_currency = {
+        entry["currency_code"]: entry["standard_rate"]
+        for entry in other
+        if entry.get("standard_rate")
+    }
+    compared = 0
+    max_deviation = 0.0
+    mismatched = {}
+    for entry in primary:
+        reference = other_by_currency.get(entry["currency_code"])
+        value = entry.get("standard_rate")
+        if not reference or not value:
+            continue
+        compared += 1
+        deviation = abs(value - reference) / reference * 100
+        max_deviation = max(max_deviation, deviation)
+        if deviation > tolerance_percent:
+            mismatched[entry["currency_code"]] = round(deviation, 2)
+    return {
+        "compared": compared,
+        "max_deviation_percent": round(max_deviation, 3),
+        "mismatched": mismatched,
+    }
+
+
+class HedgedFetchResult:
+    __slots__ = ("rates", "provider", "latency_ms", "outcomes", "cross_checks")
+
+    def __init__(self, rates, provider, latency_ms, outcomes, cross_checks):
+        self.rates = rates
+        self.provider = provider
+        self.latency_ms = latency_ms
+        # {provider: "ok" / "unhealthy" / "failed: ..." / "pending"}
+        self.outcomes = outcomes
+        self.cross_checks = cross_checks  # {provider: cross_check_rates 결과}
+
+
+def _collect_finished(futures: dict, outcomes: dict, results: dict) -> None:
+    # 새로 끝난 요청을 결과/상태에 반영 (건강한 응답만 results 에 담음)
+    for future, provider in futures.items():
+        if not future.done() or outcomes[provider.name] != "pending":
+            continue
+        try:
+            rates = future.result()
+        except Exception as e:
+            outcomes[provider.name] = f"failed: {e!r}"[:200]
+            continue
+        if is_healthy(rates):
+            outcomes[provider.name] = "ok"
+            results[provider.name] = rates
+        else:
+            outcomes[provider.name] = "unhealthy"
+
+
+def fetch_realtime_rates_hedged(
+    providers: list,
+    current_kst_dt: datetime.datetime = None,
+    latency_budget_seconds: float = DEFAULT_LATENCY_BUDGET_SECONDS,
+    hedge_delay_seconds: float = DEFAULT_HEDGE_DELAY_SECONDS,
+    cross_check_grace_seconds: float = DEFAULT_CROSS_CHECK_GRACE_SECONDS,
+    prefer_primary_seconds: float = DEFAULT_PREFER_PRIMARY_SECONDS,
+    tolerance_percent: float = DEFAULT_CROSS_CHECK_TOLERANCE_PERCENT,
+) -> HedgedFetchResult:
+    """
+    1순위 제공자를 먼저 조회하고, hedge_delay 가 지나거나 1순위가 실패하면 나머지도 병렬 조회한다
+    (hedge_delay=0 이면 처음부터 모두 병렬).
+    1순위의 건강한 응답을 우선 채택하되, prefer_primary 시간이 지나거나 1순위가 실패하면
+    가장 먼저 도착한 대체 제공자의 건강한 응답을 채택한다 (예산 안에서만).
+    채택 후 grace 시간 안에 도착한 다른 응답과 매매기준율을 교차 검증한다.
+    건강한 응답이 없으면 RuntimeError.
+    각 제공자는 재시도 없이 한 번만, 남은 예산을 타임아웃으로 조회한다
+    (예산 안에 끝날 수 없는 재시도가 호출이 끝난 뒤에도 스레드에 남지 않도록).
+    """
+    started = time.perf_counter()
+    deadline = started + latency_budget_seconds
+    hedge_at = started + hedge_delay_seconds
+    prefer_until = started + prefer_primary_seconds
+    primary = providers[0]
+
+    executor = ThreadPoolExecutor(
+        max_workers=len(providers), thread_name_prefix="rate-provider"
+    )
+    futures = {
+        executor.submit(
+            primary.fetch_realtime, current_kst_dt, latency_budget_seconds
+        ): primary
+    }
+    hedged = len(providers) == 1
+    outcomes = {provider.name: "pending" for provider in providers}
+    results = {}
+    chosen = None
+    chosen_latency_ms = None
+    grace_deadline = None
+
+    try:
+        while True:
+            _collect_finished(futures, outcomes, results)
+            now = time.perf_counter()
+            if chosen is None and results:
+                # 1순위가 아직 진행 중이면 prefer_primary 시간까지는 1순위 응답을 기다림
+                if primary.name in results:
+                    chosen = primary
+                elif outcomes[primary.name] != "pending" or now >= prefer_until:
+                    chosen = min(
+                        (p for p in providers if p.name in results),
+                        key=providers.index,
+                    )
+                if chosen is not None:
+                    chosen_latency_ms = (now - started) * 1000
+                    grace_deadline = now + cross_check_grace_seconds
+
+            primary_failed = outcomes[primary.name] not in ("pending", "ok")
+            if not hedged and (now >= hedge_at or primary_failed):
+                for provider in providers[1:]:
+                    future = executor.submit(
+                        provider.fetch_realtime,
+                        current_kst_dt,
+                        max(deadline - now, 0.1),
+                    )
+                    futures[future] = provider
+                hedged = True
+
+            pending = [future for future in futures if not future.done()]
+            if chosen is not None:
+                # hedge 전에 1순위가 답했거나, 교차 검증할 응답이 더 없으면 종료
+                if not hedged or not pending:
+                    break
+                stop_at = min(deadline, grace_deadline)
+            else:
+                if hedged and not pending:
+                    break
+                stop_at = deadline if hedged else min(hedge_at, deadline)
+                if results:
+                    stop_at = min(stop_at, prefer_until)
+
+            remaining = stop_at - now
+            if remaining <= 0:
+                if chosen is not None or now >= deadline:
+                    break
+                continue
+            if pending:
+                wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+    finally:
+        # 예산을 넘긴 요청은 기다리지 않음 (타임아웃이 예산 이하라 곧 끝남)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if chosen is None:
+        raise RuntimeError(
+            f"No healthy exchange rate provider within budget: {outcomes}"
+        )
+
+    cross_checks = {
+        name: cross_check_rates(results[chosen.name], rates, tolerance_percent)
+        for name, rates in results.items()
+        if name != chosen.name
+    }
+    for name, check in cross_checks.items():
+        if check["mismatched"]:
+            logging.warning(
+                f"Exchange rate cross-check {chosen.name} vs {name}: "
+                f"{len(check['mismatched'])}/{check['compared']} currencies differ by more than "
+                f"{tolerance_percent}% (max {check['max_deviation_percent']}%)."
+            )
+    logging.info(
+        f"Realtime exchange rates from provider '{chosen.name}' in {chosen_latency_ms:.0f} ms. Outcomes: {outcomes}"
+    )
+    return HedgedFetchResult(
+        results[chosen.name], chosen.name, chosen_latency_ms, outcomes, cross_checks
+    )
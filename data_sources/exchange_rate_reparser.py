@@ -0,0 +1,345 @@
+import datetime
+import gzip
+import io
+import logging
+import os
+import tarfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+
+from data_sources.exchage_rate_crawler import (
+    AVERAGE_EXCHANGE_CRAWL_URL,
+    REALTIME_EXCHANGE_CRAWL_URL,
+    _parse_exchange_rate_table,
+)
+from data_sources.raw_response_archive import (
+    CODEC_EXTENSIONS,
+    _decompress,
+    get_raw_archive,
+    object_path,
+)
+
+# 저장된 하나은행 응답(HTML)을 라이브 요청 없이 다시 파싱하는 배치 도구
+# (레이아웃 수정 후 재처리, 감사용 재현 등)
+
+KST = datetime.timezone(datetime.timedelta(hours=9))
+
+HTML_SUFFIXES = (".html", ".htm", ".html.gz", ".htm.gz")
+# 파일 이름에 이 문자열이 있으면 종류 판별 (없으면 테이블 셀 수로 판별)
+KIND_NAME_HINTS = {
+    "realtime": ("realtime", "wpfxd651_01i"),
+    "average": ("average", "avg", "wpfxd651_06i"),
+}
+KIND_TARGET_URLS = {
+    "realtime": REALTIME_EXCHANGE_CRAWL_URL,
+    "average": AVERAGE_EXCHANGE_CRAWL_URL,
+}
+# 실시간 테이블의 최소 셀 수 (평균 테이블은 9)
+REALTIME_MIN_CELLS = 11
+
+# 원본 응답 아카이브(raw_response_archive)에서 하나은행 응답을 찾을 때 쓰는 source
+ARCHIVE_SOURCE = "hana_exchange_rate"
+
+# 워커 하나에 한 번에 넘기는 파일 수 (프로세스 간 왕복 비용을 나눠 냄)
+DEFAULT_CHUNK_SIZE = 32
+
+RECORD_COLUMNS = (
+    "source_file",
+    "snapshot_at_utc",
+    "kind",
+    "currency_code",
+    "buy_rate",
+    "sell_rate",
+    "send_rate",
+    "receive_rate",
+    "standard_rate",
+)
+RATE_COLUMNS = ("buy_rate", "sell_rate", "send_rate", "receive_rate", "standard_rate")
+
+
+def _is_html_name(name: str) -> bool:
+    return name.lower().endswith(HTML_SUFFIXES)
+
+
+def _decode_html(name: str, payload: bytes) -> str:
+    lowered = name.lower()
+    if lowered.endswith(".gz"):
+        payload = gzip.decompress(payload)
+    elif lowered.endswith(f".{CODEC_EXTENSIONS['zstd']}"):
+        payload = _decompress("zstd", payload)
+    try:
+        return payload.decode("utf-8")
+    except UnicodeDecodeError:
+        # 예전 응답 중 EUC-KR(CP949) 로 저장된 파일
+        return payload.decode("cp949", errors="replace")
+
+
+def detect_kind(name: str, html: str) -> str:
+    """파일 이름 힌트 -> 첫 데이터 행의 셀 수 순서로 실시간/평균 응답을 판별"""
+    lowered = os.path.basename(name).lower()
+    for kind, hints in KIND_NAME_HINTS.items():
+        if any(hint in lowered for hint in hints):
+            return kind
+    tbody_at = html.find("<tbody")
+    row_end = html.find("</tr>", tbody_at)
+    if tbody_at < 0 or row_end < 0:
+        return "average"
+    first_row = html[tbody_at:row_end]
+    return "realtime" if first_row.count("<td") >= REALTIME_MIN_CELLS else "average"
+
+
+# --- 입력: 디렉토리 / tarball / 원본 응답 아카이브 ---
+
+
+def iter_directory_sources(root: str):
+    # 워커가 직접 읽도록 경로만 넘김 (큰 아카이브도 부모 프로세스 메모리에 올리지 않음)
+    for dir_path, _, file_names in os.walk(root):
+        for file_name in sorted(file_names):
+            if not _is_html_name(file_name):
+                continue
+            path = os.path.join(dir_path, file_name)
+            yield (os.path.relpath(path, root), os.stat(path).st_mtime, path, None)
+
+
+def iter_tarball_sources(tar_path: str):
+    # 압축 tar 는 순차로만 읽을 수 있으므로 본문을 읽어서 넘김
+    with tarfile.open(tar_path, "r:*") as archive:
+        for member in archive:
+            if not member.isfile() or not _is_html_name(member.name):
+                continue
+            extracted = archive.extractfile(member)
+            if extracted is None:
+                continue
+            yield (member.name, member.mtime, None, extracted.read())
+
+
+def iter_archive_sources(
+    since: datetime.datetime,
+    until: datetime.datetime = None,
+    source: str = ARCHIVE_SOURCE,
+    archive=None,
+):
+    """
+    아카이브 색인에서 기간 안의 응답을 찾아 백엔드로 본문을 읽는다.
+    본문은 압축된 채로 넘기고(이름의 확장자로 워커가 해제), 조회 시각(fetched_at)을 mtime 으로 쓴다.
+    이름은 "<inquiry>@<fetched_at>.<확장자>" (inquiry 의 realtime/average 로 종류 판별)
+    """
+    archive = archive or get_raw_archive()
+    for entry in archive.iter_range(source, since, until):
+        if entry.get("status") is not None and entry["status"] >= 400:
+            continue
+        codec = entry.get("codec", "gzip")
+        payload = archive.backend.read(object_path(entry["sha256"], codec))
+        if payload is None:
+            logging.warning(f"Archived body {entry['sha256']} is missing. Skipping.")
+            continue
+        fetched_at = datetime.datetime.fromisoformat(entry["fetched_at"])
+        name = f"{entry['inquiry']}@{entry['fetched_at']}.{CODEC_EXTENSIONS[codec]}"
+        yield (name, fetched_at.timestamp(), None, payload)
+
+
+def iter_html_sources(input_path: str):
+    if os.path.isdir(input_path):
+        return iter_directory_sources(input_path)
+    if tarfile.is_tarfile(input_path):
+        return iter_tarball_sources(input_path)
+    raise ValueError(f"Input must be a directory or tarball: {input_path}")
+
+
+def _chunked(iterable, size: int):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# --- 워커 ---
+
+
+def parse_html_chunk(chunk: list, kind: str = "auto") -> tuple:
+    """
+    (파일 이름, mtime, 경로, 본문) 묶음을 파싱해 컬럼 단위 dict 와 실패 목록을 반환.
+    crawled_at 대신 파일 저장 시각(mtime)을 snapshot_at_utc 로 사용한다.
+    """
+    columns = {column: [] for column in RECORD_COLUMNS}
+    failures = []
+    for name, mtime, path, payload in chunk:
+        try:
+            if payload is None:
+                with open(path, "rb") as f:
+                    payload = f.read()
+            html = _decode_html(name, payload)
+            file_kind = detect_kind(name, html) if kind == "auto" else kind
+            rates = _parse_exchange_rate_table(
+                html, KIND_TARGET_URLS[file_kind], name, KST
+            )
+        except Exception as e:
+            failures.append((name, str(e)))
+            continue
+        if not rates:
+            failures.append((name, "no exchange rate rows"))
+            continue
+
+        snapshot_at = datetime.datetime.fromtimestamp(mtime, datetime.timezone.utc)
+        for rate in rates:
+            columns["source_file"].append(name)
+            columns["snapshot_at_utc"].append(snapshot_at)
+            columns["kind"].append(file_kind)
+            columns["currency_code"].append(rate["currency_code"])
+            for rate_column in RATE_COLUMNS:
+                columns[rate_column].append(rate[rate_column])
+    return columns, failures
+
+
+# --- 병렬 실행 ---
+
+
+def reparse_exchange_rate_archive(
+    input_path: str,
+    max_workers: int = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    kind: str = "auto",
+) -> tuple:
+    """
+    디렉토리/tarball 의 저장된 HTML 을 ProcessPoolExecutor 로 나눠 파싱한다.
+    반환: (정규화된 환율 DataFrame, [(파일 이름, 오류)])
+    """
+    return reparse_exchange_rate_sources(
+        iter_html_sources(input_path), max_workers, chunk_size, kind
+    )
+
+
+def reparse_raw_response_archive(
+    since: datetime.datetime,
+    until: datetime.datetime = None,
+    source: str = ARCHIVE_SOURCE,
+    archive=None,
+    max_workers: int = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    kind: str = "auto",
+) -> tuple:
+    """원본 응답 아카이브 색인의 기간(since <= fetched_at < until) 응답을 다시 파싱한다."""
+    return reparse_exchange_rate_sources(
+        iter_archive_sources(since, until, source, archive),
+        max_workers,
+        chunk_size,
+        kind,
+    )
+
+
+def reparse_exchange_rate_sources(
+    sources,
+    max_workers: int = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    kind: str = "auto",
+) -> tuple:
+    """
+    (이름, mtime, 경로, 본문) 입력을 청크로 묶어 ProcessPoolExecutor 로 나눠 파싱한다.
+    진행 중인 청크 수를 워커 수의 2배로 제한해 tarball/아카이브 본문이 메모리에 쌓이지 않게 한다.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    max_in_flight = max_workers * 2
+    blocks = []
+    failures = []
+    file_count = 0
+
+    def _drain(done):
+        for future in done:
+            columns, chunk_failures = future.result()
+            blocks.append(pd.DataFrame(columns, columns=list(RECORD_COLUMNS)))
+            failures.extend(chunk_failures)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = set()
+        for chunk in _chunked(sources, chunk_size):
+            file_count += len(chunk)
+            if len(in_flight) >= max_in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                _drain(done)
+            in_flight.add(executor.submit(parse_html_chunk, chunk, kind))
+        done, _ = wait(in_flight)
+        _drain(done)
+
+    records = (
+        pd.concat(blocks, ignore_index=True)
+        if blocks
+        else pd.DataFrame(columns=list(RECORD_COLUMNS))
+    )
+    records = records.astype({"kind": "category", "currency_code": "category"})
+    records = records.sort_values(
+        ["snapshot_at_utc", "kind", "currency_code"], ignore_index=True
+    )
+    logging.info(
+        f"Re-parsed {file_count} stored exchange rate pages into {len(records)} rows "
+        f"({len(failures)} failed) with {max_workers} workers."
+    )
+    return records, failures
+
+
+def write_records(records: pd.DataFrame, output_path: str) -> None:
+    # 확장자로 형식 결정: .parquet (기본, zstd) / .csv
+    if output_path.lower().endswith(".csv"):
+        records.to_csv(output_path, index=False, encoding="utf-8-sig")
+        return
+    buffer = io.BytesIO()
+    records.to_parquet(buffer, engine="pyarrow", compression="zstd", index=False)
+    with open(output_path, "wb") as f:
+        f.write(buffer.getvalue())
+
+
+# CLI로도 사용 가능하게
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="저장된 하나은행 환율 HTML 을 병렬로 다시 파싱해 컬럼 형식으로 저장"
+    )
+    parser.add_argument(
+        "input_path",
+        nargs="?",
+        help="HTML 디렉토리 또는 tar(.gz) 경로 (--since 를 주면 생략, 원본 응답 아카이브에서 읽음)",
+    )
+    parser.add_argument("output_path", help="결과 경로 (.parquet 또는 .csv)")
+    parser.add_argument(
+        "--since",
+        type=datetime.datetime.fromisoformat,
+        help="아카이브 조회 시작 시각 (ISO 8601, 시간대 없으면 KST)",
+    )
+    parser.add_argument(
+        "--until",
+        type=datetime.datetime.fromisoformat,
+        help="아카이브 조회 끝 시각 (미포함, 기본: 현재)",
+    )
+    parser.add_argument("--source", default=ARCHIVE_SOURCE, help="아카이브 source")
+    parser.add_argument("--workers", type=int, default=0, help="0 이면 CPU 수")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument(
+        "--kind", choices=("auto", "realtime", "average"), default="auto"
+    )
+    args = parser.parse_args()
+
+    if (args.input_path is None) == (args.since is None):
+        parser.error("input_path 와 --since 중 하나만 지정하세요")
+
+    logging.basicConfig(level=logging.INFO)
+    if args.since is not None:
+        records, failures = reparse_raw_response_archive(
+            args.since,
+            args.until,
+            args.source,
+            max_workers=args.workers or None,
+            chunk_size=args.chunk_size,
+            kind=args.kind,
+        )
+    else:
+        records, failures = reparse_exchange_rate_archive(
+            args.input_path, args.workers or None, args.chunk_size, args.kind
+        )
+    write_records(records, args.output_path)
+    for name, error in failures:
+        logging.warning(f"Failed to re-parse {name}: {error}")
@@ -0,0 +1,272 @@
+import logging
+import datetime
+import hashlib
+import json
+import os
+import statistics
+
+# 원화 시장 영업일/시간 캘린더 (수동 관리: 매년 공휴일 추가 필요)
+CALENDAR_FILE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "config", "krw_market_calendar.json"
+)
+
+# 스케줄러 상태 저장 경로 (flight_price_writer 백엔드 기준)
+POLLING_STATE_PATH = "exchange_rate_schedule/state.json"
+POLLING_STATE_VERSION = 1
+
+KST = datetime.timezone(datetime.timedelta(hours=9))
+
+# 타이머 트리거(5분) 보다 짧은 간격은 의미가 없으므로 하한
+DEFAULT_MIN_INTERVAL_MINUTES = 5
+# 장중에 값이 계속 같아도 이 간격보다 길게 쉬지 않음
+DEFAULT_MAX_MARKET_INTERVAL_MINUTES = 30
+# 장외(고시 시간 밖) 간격
+DEFAULT_OFF_HOURS_INTERVAL_MINUTES = 180
+# 값이 바뀌지 않을 때마다 간격을 늘리는 배수
+DEFAULT_BACKOFF_FACTOR = 1.5
+# 학습에 쓰는 변경 간격 이력 수
+DEFAULT_MAX_CHANGE_HISTORY = 200
+# 학습값을 쓰기 위한 최소 표본 수
+MIN_LEARNING_SAMPLES = 3
+# 타이머 지연(수 초)으로 한 주기를 통째로 건너뛰지 않도록 허용하는 여유
+DUE_SLACK_SECONDS = 30
+
+
+def _parse_hhmm(value: str) -> datetime.time:
+    hour, minute = value.split(":")
+    return datetime.time(int(hour), int(minute))
+
+
+class MarketCalendar:
+    """원화 시장 영업일(주말/공휴일 제외)과 장중/고시 시간대 판단."""
+
+    def __init__(
+        self,
+        holidays,
+        market_open: datetime.time,
+        market_close: datetime.time,
+        publication_start: datetime.time,
+        publication_end: datetime.time,
+        covered_years=(),
+    ):
+        self.holidays = frozenset(holidays)
+        self.market_open = market_open
+        self.market_close = market_close
+        self.publication_start = publication_start
+        self.publication_end = publication_end
+        self.covered_years = frozenset(covered_years)
+
+    def is_business_day(self, day: datetime.date) -> bool:
+        return day.weekday() < 5 and day not in self.holidays
+
+    def in_market_hours(self, now_kst: datetime.datetime) -> bool:
+        return self.market_open <= now_kst.time() < self.market_close
+
+    def in_publication_window(self, now_kst: datetime.datetime) -> bool:
+        return self.publication_start <= now_kst.time() < self.publication_end
+
+
+def load_market_calendar(path: str = CALENDAR_FILE_PATH) -> MarketCalendar:
+    with open(path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    holidays = {
+        datetime.date.fromisoformat(day)
+        for days in config.get("holidays", {}).values()
+        for day in days
+    }
+    return MarketCalendar(
+        holidays=holidays,
+        market_open=_parse_hhmm(config.get("market_open", "09:00")),
+        market_close=_parse_hhmm(config.get("market_close", "15:30")),
+        publication_start=_parse_hhmm(config.get("publication_start", "08:30")),
+        publication_end=_parse_hhmm(config.get("publication_end", "18:00")),
+        covered_years={int(year) for year in config.get("holidays", {})},
+    )
+
+
+class PollingState:
+    """마지막 조회/변경 시각, 마지막 값 지문, 연속 미변경 횟수, 시간대별 변경 간격 이력."""
+
+    __slots__ = (
+        "last_poll_at",
+        "last_change_at",
+        "last_fingerprint",
+        "unchanged_streak",
+        "change_gaps",
+    )
+
+    def __init__(self):
+        self.last_poll_at = None
+        self.last_change_at = None
+        self.last_fingerprint = None
+        self.unchanged_streak = 0
+        self.change_gaps = []  # [(변경 감지 시각의 hour, 직전 변경과의 간격(분))]
+
+    def to_dict(self) -> dict:
+        return {
+            "version": POLLING_STATE_VERSION,
+            "last_poll_at": (
+                self.last_poll_at.isoformat() if self.last_poll_at else None
+            ),
+            "last_change_at": (
+                self.last_change_at.isoformat() if self.last_change_at else None
+            ),
+            "last_fingerprint": self.last_fingerprint,
+            "unchanged_streak": self.unchanged_streak,
+            "change_gaps": [list(gap) for gap in self.change_gaps],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PollingState":
+        state = cls()
+        if data.get("last_poll_at"):
+            state.last_poll_at = datetime.datetime.fromisoformat(data["last_poll_at"])
+        if data.get("last_change_at"):
+            state.last_change_at = datetime.datetime.fromisoformat(
+                data["last_change_at"]
+            )
+        state.last_fingerprint = data.get("last_fingerprint")
+        state.unchanged_streak = int(data.get("unchanged_streak", 0))
+        state.change_gaps = [
+            (int(hour), float(minutes)) for hour, minutes in data.get("change_gaps", [])
+        ]
+        return state
+
+
+class AdaptivePollingScheduler:
+    """
+    실시간 환율 조회 여부를 결정하는 스케줄러. 타이머는 고정 주기로 깨어나고,
+    여기서 "지금 조회할 차례인지"를 판단해 불필요한 크롤링을 건너뛴다.
+
+    - 주말/공휴일: 조회하지 않음 (상태가 비어 있으면 최초 1회만)
+    - 고시 시간대: 학습한 변경 주기의 절반 간격으로 조회, 값이 그대로면 점점 간격을 늘림
+    - 고시 시간 밖: 과거에 그 시각에 변경이 관측된 적이 없으면 긴 간격으로만 조회
+    """
+
+    def __init__(
+        self,
+        calendar: MarketCalendar,
+        min_interval_minutes: float = DEFAULT_MIN_INTERVAL_MINUTES,
+        max_market_interval_minutes: float = DEFAULT_MAX_MARKET_INTERVAL_MINUTES,
+        off_hours_interval_minutes: float = DEFAULT_OFF_HOURS_INTERVAL_MINUTES,
+        backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+        max_change_history: int = DEFAULT_MAX_CHANGE_HISTORY,
+    ):
+        self.calendar = calendar
+        self.min_interval_minutes = min_interval_minutes
+        self.max_market_interval_minutes = max_market_interval_minutes
+        self.off_hours_interval_minutes = off_hours_interval_minutes
+        self.backoff_factor = backoff_factor
+        self.max_change_history = max_change_history
+
+    def learned_change_interval(self, state: PollingState, hour: int):
+        """해당 시간대에 관측된 변경 간격의 중앙값(분). 표본이 부족하면 전체 중앙값, 그래도 없으면 None"""
+        hour_gaps = [
+            minutes for gap_hour, minutes in state.change_gaps if gap_hour == hour
+        ]
+        if len(hour_gaps) >= MIN_LEARNING_SAMPLES:
+            return statistics.median(hour_gaps)
+        all_gaps = [minutes for _, minutes in state.change_gaps]
+        if len(all_gaps) >= MIN_LEARNING_SAMPLES:
+            return statistics.median(all_gaps)
+        return None
+
+    def _has_changes_at_hour(self, state: PollingState, hour: int) -> bool:
+        return any(gap_hour == hour for gap_hour, _ in state.change_gaps)
+
+    def current_interval(self, state: PollingState, now_kst: datetime.datetime):
+        """지금 시점의 조회 간격(분). None 이면 오늘은 조회하지 않음"""
+        if not self.calendar.is_business_day(now_kst.date()):
+            return None
+
+        active = self.calendar.in_publication_window(
+            now_kst
+        ) or self._has_changes_at_hour(state, now_kst.hour)
+        if not active:
+            return self.off_hours_interval_minutes
+
+        learned = self.learned_change_interval(state, now_kst.hour)
+        # 변경 주기의 절반 간격으로 조회하면 변경 후 평균 지연은 주기의 1/4
+        base = learned / 2 if learned is not None else self.min_interval_minutes
+        max_interval = (
+            self.max_market_interval_minutes
+            if self.calendar.in_market_hours(now_kst)
+            else self.max_market_interval_minutes * 2
+        )
+        base = min(max(base, self.min_interval_minutes), max_interval)
+        return min(base * self.backoff_factor**state.unchanged_streak, max_interval)
+
+    def decide(self, state: PollingState, now_kst: datetime.datetime) -> tuple:
+        """(조회 여부, 사유) 반환"""
+        if state.last_poll_at is None:
+            return True, "no previous poll"
+        if (
+            self.calendar.covered_years
+            and now_kst.year not in self.calendar.covered_years
+        ):
+            logging.warning(
+                f"KRW market calendar has no holidays for {now_kst.year}. Only weekends are skipped."
+            )
+
+        interval = self.current_interval(state, now_kst)
+        if interval is None:
+            return False, f"{now_kst.date()} is not a KRW business day"
+
+        due_at = state.last_poll_at + datetime.timedelta(minutes=interval)
+        if now_kst + datetime.timedelta(seconds=DUE_SLACK_SECONDS) >= due_at:
+            return True, f"due (interval {interval:.1f} min)"
+        return False, (
+            f"next poll at {due_at.astimezone(KST).isoformat(timespec='minutes')} "
+            f"(interval {interval:.1f} min, unchanged x{state.unchanged_streak})"
+        )
+
+    def record_poll(
+        self, state: PollingState, now_kst: datetime.datetime, fingerprint: str
+    ) -> bool:
+        """조회 결과를 상태에 반영하고 값이 바뀌었는지 반환"""
+        changed = fingerprint != state.last_fingerprint
+        if changed:
+            previous_change = state.last_change_at
+            # 같은 날 고시 시간대 안의 연속 변경만 주기 학습에 사용 (야간 공백 제외)
+            if (
+                previous_change is not None
+                and state.last_fingerprint is not None
+                and previous_change.astimezone(KST).date() == now_kst.date()
+                and self.calendar.in_publication_window(previous_change.astimezone(KST))
+            ):
+                gap_minutes = (now_kst - previous_change).total_seconds() / 60
+                state.change_gaps.append((now_kst.hour, round(gap_minutes, 2)))
+                del state.change_gaps[: -self.max_change_history]
+            state.last_change_at = now_kst
+            state.last_fingerprint = fingerprint
+            state.unchanged_streak = 0
+        else:
+            state.unchanged_streak += 1
+        state.last_poll_at = now_kst
+        return changed
+
+
+def rates_fingerprint(records: list, rate_field: str = "realtime_rate") -> str:
+    # 통화별 고시 환율 집합의 지문. 값이 하나라도 바뀌면 달라진다
+    pairs = sorted(
+        {(record.get("currency_code"), record.get(rate_field)) for record in records},
+        key=lambda pair: (pair[0] or "", pair[1] if pair[1] is not None else -1.0),
+    )
+    return hashlib.sha1(json.dumps(pairs).encode("utf-8")).hexdigest()
+
+
+def load_polling_state(backend, path: str = POLLING_STATE_PATH) -> PollingState:
+    data = backend.read(path)
+    if data is None:
+        return PollingState()
+    try:
+        return PollingState.from_dict(json.loads(data))
+    except (ValueError, KeyError, TypeError) as e:
+        logging.warning(f"Invalid polling state at {path}: {e}. Starting fresh.")
+        return PollingState()
+
+
+def save_polling_state(
+    state: PollingState, backend, path: str = POLLING_STATE_PATH
+) -> str:
+    return backend.write(path, json.dumps(state.to_dict()).encode("utf-8"))
@@ -0,0 +1,256 @@
+import logging
+import asyncio
+import datetime
+import json
+import os
+import sys
+import time
+import aiohttp
+import pandas as pd
+from data_sources.raw_response_archive import archive_raw_response
+from data_sources.retry_utils import create_retry_decorator
+from data_sources.flight_price_extractor import (
+    QUERY_COUNTRY_COLUMN,
+    extract_flight_info,
+)
+
+# Kiwi (RapidAPI) one-way 조회 URL - 로컬 스텁 서버로 바꿀 수 있도록 환경 변수 우선
+KIWI_API_URL = os.environ.get(
+    "KiwiApiUrl", "https://kiwi-com-cheap-flights.p.rapidapi.com/one-way"
+)
+KIWI_API_HOST = "kiwi-com-cheap-flights.p.rapidapi.com"
+
+# RapidAPI 플랜 한도에 맞춘 기본값
+DEFAULT_REQUESTS_PER_SECOND = 2.0
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_REQUEST_TIMEOUT_SECONDS = 60
+
+# 조회 파라미터 (목적지/날짜 제외)
+KIWI_QUERY_DEFAULTS = {
+    "currency": "krw",  # 가격 통화
+    "locale": "ko",  # 언어 설정
+    "adults": "1",
+    "children": "0",
+    "infants": "0",
+    "handbags": "1",  # 손 가방 수
+    "holdbags": "0",  # 위탁 수하물 수
+    "cabinClass": "ECONOMY",  # 좌석 클래스
+    "sortBy": "QUALITY",  # 품질 기준으로 정렬
+    "sortOrder": "ASCENDING",
+    "applyMixedClasses": "true",  # 혼합 클래스 허용
+    "allowReturnFromDifferentCity": "true",
+    "allowChangeInboundDestination": "true",
+    "allowChangeInboundSource": "true",
+    "allowDifferentStationConnection": "true",
+    "enableSelfTransfer": "true",
+    "allowOvernightStopover": "true",
+    "enableTrueHiddenCity": "true",
+    "enableThrowAwayTicketing": "true",
+    "outbound": "SUNDAY,WEDNESDAY,THURSDAY,FRIDAY,SATURDAY,MONDAY,TUESDAY",  # 출발일 설정
+    "transportTypes": "FLIGHT",
+    "contentProviders": "FLIXBUS_DIRECTS,FRESH,KAYAK,KIWI",
+    "limit": "1000",  # 최대 1000
+}
+
+# --- 목적지 설정 로딩 ---
+FLIGHT_DESTINATIONS_FILE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "config", "flight_destinations.json"
+)
+
+try:
+    with open(FLIGHT_DESTINATIONS_FILE_PATH, "r", encoding="utf-8") as f:
+        FLIGHT_DESTINATIONS_CONFIG = json.load(f)
+    logging.info(
+        f"Flight destinations loaded successfully from {FLIGHT_DESTINATIONS_FILE_PATH}."
+    )
+except FileNotFoundError:
+    logging.critical(
+        f"Flight destinations file not found at {FLIGHT_DESTINATIONS_FILE_PATH}. Exiting."
+    )
+    sys.exit(1)  # 중요한 파일이 없으므로 프로그램 종료
+except json.JSONDecodeError as e:
+    logging.critical(f"Error decoding JSON flight destinations file: {e}. Exiting.")
+    sys.exit(1)  # JSON 파일 손상이므로 프로그램 종료
+
+
+class KiwiRetryableStatusError(Exception):
+    """429 / 5xx 응답 (재시도 대상). 그 외 4xx 는 재시도하지 않는다."""
+
+
+KIWI_RETRYABLE_EXCEPTIONS = (
+    aiohttp.ClientConnectionError,
+    aiohttp.ClientPayloadError,
+    asyncio.TimeoutError,
+    KiwiRetryableStatusError,
+)
+
+# Kiwi API 용 재시도 (목적지 단위로 적용)
+kiwi_api_retry = create_retry_decorator(
+    min_wait_seconds=5,
+    max_wait_seconds=60,
+    max_attempts=3,
+    retry_exceptions=KIWI_RETRYABLE_EXCEPTIONS,
+)
+
+
+class AsyncRateLimiter:
+    """요청 시작 간격을 1/rate 초 이상으로 유지하는 간단한 비동기 리미터."""
+
+    def __init__(self, requests_per_second: float):
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+def build_destination_queries(
+    start_date: str, end_date: str, destinations_config: dict = None
+) -> dict:
+    # 국가 코드(2자리) -> Kiwi 쿼리 파라미터
+    config = destinations_config or FLIGHT_DESTINATIONS_CONFIG
+    queries = {}
+    for country_code_2, cities in config["destinations"].items():
+        queries[country_code_2] = {
+            "source": config.get("source", "City:ICN"),
+            "destination": ",".join(cities),
+            "outboundDepartmentDateStart": start_date,
+            "outboundDepartmentDateEnd": end_date,
+            **KIWI_QUERY_DEFAULTS,
+        }
+    return queries
+
+
+async def _fetch_destination(
+    session: aiohttp.ClientSession,
+    limiter: AsyncRateLimiter,
+    semaphore: asyncio.Semaphore,
+    url: str,
+    country_code_2: str,
+    params: dict,
+) -> bytes:
+    @kiwi_api_retry
+    async def _fetch_with_retry() -> bytes:
+        async with semaphore:
+            await limiter.acquire()
+            started = time.perf_counter()
+            async with session.get(url, params=params) as response:
+                body = await response.read()
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                # 응답 본문은 남기지 않고 크기와 지연 시간만 로깅
+                logging.info(
+                    f"Kiwi {country_code_2}: status={response.status}, "
+                    f"bytes={len(body)}, latency={elapsed_ms:.0f}ms"
+                )
+                if response.status == 429 or response.status >= 500:
+                    raise KiwiRetryableStatusError(
+                        f"Kiwi {country_code_2}: retryable status {response.status}"
+                    )
+                response.raise_for_status()
+                return body
+
+    return await _fetch_with_retry()
+
+
+async def fetch_flight_responses(
+    queries: dict,
+    api_key: str = None,
+    url: str = None,
+    requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    timeout_seconds: float = DEFAULT_REQUEST_TIMEOUT_SECONDS,
+) -> dict:
+    """
+    목적지별 Kiwi 응답 본문을 동시에 수집한다. (국가 코드 -> bytes)
+    실패한 목적지는 재시도 후에도 실패하면 결과에서 제외하고 로그만 남긴다.
+    """
+    headers = {
+        "x-rapidapi-key": api_key or os.environ.get("RAPIDAPI_KEY", ""),
+        "x-rapidapi-host": KIWI_API_HOST,
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
+        "Accept-Encoding": "gzip, deflate",
+    }
+    limiter = AsyncRateLimiter(requests_per_second)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    connector = aiohttp.TCPConnector(limit=max_concurrency, ttl_dns_cache=300)
+    timeout = aiohttp.ClientTimeout(total=timeout_seconds, connect=10)
+
+    async with aiohttp.ClientSession(
+        headers=headers, connector=connector, timeout=timeout
+    ) as session:
+        country_codes = list(queries.keys())
+        results = await asyncio.gather(
+            *(
+                _fetch_destination(
+                    session,
+                    limiter,
+                    semaphore,
+                    url or KIWI_API_URL,
+                    code,
+                    queries[code],
+                )
+                for code in country_codes
+            ),
+            return_exceptions=True,
+        )
+
+    responses = {}
+    for country_code_2, result in zip(country_codes, results):
+        if isinstance(result, BaseException):
+            # 응답 URL/본문 대신 상태 코드 또는 예외 종류만 남긴다
+            reason = (
+                f"status={result.status}"
+                if isinstance(result, aiohttp.ClientResponseError)
+                else repr(result)
+            )
+            logging.error(
+                f"Kiwi {country_code_2}: request failed after retries ({reason})."
+            )
+            continue
+        responses[country_code_2] = result
+    return responses
+
+
+def collect_flight_prices(
+    start_date: str = None, end_date: str = None, **fetch_kwargs
+) -> pd.DataFrame:
+    # 기본 조회 기간: 오늘(KST)부터 14일
+    kst = datetime.timezone(datetime.timedelta(hours=9))
+    today = datetime.datetime.now(kst)
+    start_date = start_date or today.strftime("%Y-%m-%dT00:00:00")
+    end_date = end_date or (today + datetime.timedelta(days=14)).strftime(
+        "%Y-%m-%dT00:00:00"
+    )
+
+    queries = build_destination_queries(start_date, end_date)
+    started = time.perf_counter()
+    responses = asyncio.run(fetch_flight_responses(queries, **fetch_kwargs))
+    logging.info(
+        f"Collected {len(responses)}/{len(queries)} Kiwi destinations "
+        f"({sum(len(b) for b in responses.values())} bytes) in {time.perf_counter() - started:.1f}s."
+    )
+
+    all_dfs = []
+    for country_code_2, body in responses.items():
+        archive_raw_response(
+            "kiwi_flight", country_code_2, body, request=queries[country_code_2]
+        )
+        try:
+            flight_df = extract_flight_info(body)
+            # 경유 여정은 segment 의 도착 국가가 경유지라서 조회한 목적지를 따로 기록
+            flight_df[QUERY_COUNTRY_COLUMN] = pd.Series(
+                country_code_2, index=flight_df.index, dtype="string"
+            )
+            all_dfs.append(flight_df)
+        except Exception as e:
+            logging.error(f"Failed to parse Kiwi response for {country_code_2}: {e}")
+
+    if not all_dfs:
+        return pd.DataFrame()
+    return pd.concat(all_dfs, ignore_index=True)
@@ -0,0 +1,181 @@
+import logging
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_sources.country_reference import get_country_reference
+from data_sources.currency_units import quote_unit
+from data_sources.exchange_rate_cache import (
+    get_exchange_rate_backend,
+    load_rate_snapshot,
+)
+from data_sources.flight_price_writer import (
+    destination_country_column,
+    itinerary_rows,
+)
+
+# 항공권 가격(원화)을 조회 목적지 국가 통화 / USD 로 환산한 열
+# (경유 여정의 segment 도착 국가는 경유지라서 조회 목적지 열을 기준으로 함)
+PRICE_COLUMN = "가격"
+LOCAL_CURRENCY_COLUMN = "현지_통화"
+LOCAL_PRICE_COLUMN = "현지_통화_가격"
+USD_PRICE_COLUMN = "USD_가격"
+
+# 최신 실시간 환율 캐시를 다시 읽는 간격 (실시간 환율 조회 주기와 같음)
+RATE_TABLE_TTL_SECONDS = 300
+
+
+class FlightRateTable:
+    """
+    최신 실시간 환율 조회 결과로 만든 환산표.
+    krw_per_unit: 통화 코드 -> 1 통화 단위당 원화 (Series, 0/결측 제외)
+    """
+
+    __slots__ = ("krw_per_unit", "fetched_at")
+
+    def __init__(self, krw_per_unit: pd.Series, fetched_at=None):
+        self.krw_per_unit = krw_per_unit
+        self.fetched_at = fetched_at
+
+    @classmethod
+    def from_rates(cls, rates: list, fetched_at=None) -> "FlightRateTable":
+        # standard_rate_per_unit 이 없는 예전 캐시는 고시 단위 표로 나눔
+        krw_per_unit = {}
+        for entry in rates or []:
+            per_unit = entry.get("standard_rate_per_unit")
+            if per_unit is None and entry.get("standard_rate"):
+                per_unit = entry["standard_rate"] / quote_unit(entry["currency_code"])
+            if per_unit and per_unit > 0:
+                krw_per_unit[entry["currency_code"]] = float(per_unit)
+        # 원화 가격을 원화로 환산하는 경우 (국내선 등)
+        krw_per_unit.setdefault("KRW", 1.0)
+        return cls(
+            pd.Series(krw_per_unit, dtype="float64", name="krw_per_unit"), fetched_at
+        )
+
+    def __len__(self) -> int:
+        return len(self.krw_per_unit)
+
+    @property
+    def usd_krw(self) -> float:
+        return float(self.krw_per_unit.get("USD", np.nan))
+
+
+def _get_code2_to_currency() -> dict:
+    return {
+        record["country_code_2"]: record["currency_code"]
+        for record in get_country_reference().countries
+        if record["country_code_2"] and record["currency_code"]
+    }
+
+
+def convert_flight_prices(
+    flight: pd.DataFrame, rate_table: FlightRateTable
+) -> pd.DataFrame:
+    """
+    원화 가격에 목적지 국가 통화 코드, 현지 통화 가격, USD 가격 열을 추가한 DataFrame.
+    국가 -> 통화 -> 환율은 카테고리별로 한 번만 조회하고 가격 나눗셈은 배열 연산.
+    환율이 없는 통화는 NaN.
+    """
+    converted = flight.copy()
+    local_currency = (
+        converted[destination_country_column(converted)]
+        .astype("category")
+        .map(_get_code2_to_currency())
+    )
+    krw_per_unit = (
+        local_currency.astype("category")
+        .map(rate_table.krw_per_unit)
+        .astype("float64")
+        .to_numpy()
+    )
+    prices = converted[PRICE_COLUMN].to_numpy(dtype="float64")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        converted[LOCAL_PRICE_COLUMN] = np.round(prices / krw_per_unit, 2)
+        converted[USD_PRICE_COLUMN] = np.round(prices / rate_table.usd_krw, 2)
+    converted[LOCAL_CURRENCY_COLUMN] = local_currency.astype("string")
+    return converted
+
+
+def summarize_converted_prices(converted: pd.DataFrame) -> dict:
+    """
+    조회 목적지 국가(2자리)별 {local_currency_code, mean_price_local, mean_price_usd}.
+    평균은 itinerary 당 한 행으로 계산.
+    """
+    if converted.empty or LOCAL_PRICE_COLUMN not in converted:
+        return {}
+    grouped = (
+        itinerary_rows(converted)
+        .groupby(destination_country_column(converted), sort=False)
+        .agg(
+            local_currency_code=(LOCAL_CURRENCY_COLUMN, "first"),
+            mean_price_local=(LOCAL_PRICE_COLUMN, "mean"),
+            mean_price_usd=(USD_PRICE_COLUMN, "mean"),
+        )
+    )
+    return {
+        country_code_2: {
+            "local_currency_code": (
+                None if pd.isna(row.local_currency_code) else row.local_currency_code
+            ),
+            "mean_price_local": (
+                None
+                if pd.isna(row.mean_price_local)
+                else round(float(row.mean_price_local), 2)
+            ),
+            "mean_price_usd": (
+                None
+                if pd.isna(row.mean_price_usd)
+                else round(float(row.mean_price_usd), 2)
+            ),
+        }
+        for country_code_2, row in grouped.iterrows()
+    }
+
+
+# --- 프로세스 단위 환산표 (RATE_TABLE_TTL_SECONDS 동안 재사용) ---
+_RATE_TABLE = None
+_RATE_TABLE_LOADED_AT = 0.0
+_RATE_TABLE_LOCK = threading.Lock()
+
+
+def get_flight_rate_table(backend=None):
+    """환율 파이프라인이 저장한 최신 실시간 환율 캐시로 만든 환산표. 캐시가 없으면 None"""
+    global _RATE_TABLE, _RATE_TABLE_LOADED_AT
+    with _RATE_TABLE_LOCK:
+        if (
+            _RATE_TABLE is not None
+            and time.monotonic() - _RATE_TABLE_LOADED_AT < RATE_TABLE_TTL_SECONDS
+        ):
+            return _RATE_TABLE
+        snapshot = load_rate_snapshot(
+            backend or get_exchange_rate_backend(), "realtime"
+        )
+        if snapshot is None:
+            return None
+        _RATE_TABLE = FlightRateTable.from_rates(
+            snapshot["rates"], snapshot["fetched_at"]
+        )
+        _RATE_TABLE_LOADED_AT = time.monotonic()
+        logging.info(
+            f"Loaded flight rate table with {len(_RATE_TABLE)} currencies "
+            f"(rates fetched at {snapshot['fetched_at'].isoformat()})."
+        )
+        return _RATE_TABLE
+
+
+def convert_flight_prices_with_cached_rates(flight: pd.DataFrame) -> pd.DataFrame:
+    # 환산 실패가 수집을 막지 않도록 경고만 남기고 원본 그대로 반환
+    try:
+        rate_table = get_flight_rate_table()
+        if rate_table is None:
+            logging.warning(
+                "No cached exchange rates. Skipping flight price conversion."
+            )
+            return flight
+        return convert_flight_prices(flight, rate_table)
+    except Exception as e:
+        logging.warning(f"Failed to convert flight prices: {e}")
+        return flight
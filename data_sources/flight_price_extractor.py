@@ -0,0 +1,133 @@
+import logging
+import io
+import ijson
+import pandas as pd
+
+# Kiwi one-way 응답에서 추출하는 컬럼 (기존 extract_flight_info 와 동일한 이름/순서) -> dtype
+# 출발 7개, 도착 7개, 항공사/운임/비행시간 4개, itinerary 단위 가격 2개 순서를 유지해야 한다
+# 마지막 여정_번호는 응답 안 itinerary 순번 (같은 itinerary 의 segment 는 같은 번호)
+FLIGHT_COLUMN_SCHEMA = {
+    "출발_공항_코드": "string",
+    "출발_도시_이름": "string",
+    "출발_도시_ID": "string",
+    "출발_국가_코드": "string",
+    "출발_위도": "float64",
+    "출발_경도": "float64",
+    "출발_시간": "string",
+    "도착_공항_코드": "string",
+    "도착_도시_이름": "string",
+    "도착_도시_ID": "string",
+    "도착_국가_코드": "string",
+    "도착_위도": "float64",
+    "도착_경도": "float64",
+    "도착_시간": "string",
+    "항공사": "string",
+    "항공사_코드": "string",
+    "운임_클래스": "string",
+    "비행_시간_초": "Int64",
+    "가격": "float64",
+    "할인여부": "boolean",
+    "여정_번호": "Int64",
+}
+ITINERARY_COLUMN = "여정_번호"
+# 수집기가 응답마다 붙이는 조회 목적지 국가(2자리). segment 의 도착_국가_코드 는 경유지일 수 있음
+QUERY_COUNTRY_COLUMN = "조회_국가_코드"
+
+FLIGHT_COLUMNS = list(FLIGHT_COLUMN_SCHEMA.keys())
+
+_EMPTY = {}
+
+
+def _iter_itineraries(source):
+    # 이미 파싱된 dict 는 그대로, bytes/str/파일 객체는 ijson 으로 itinerary 단위 스트리밍
+    if isinstance(source, dict):
+        yield from source.get("itineraries") or []
+        return
+    if isinstance(source, str):
+        source = source.encode("utf-8")
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    yield from ijson.items(source, "itineraries.item", use_float=True)
+
+
+def _append_station_columns(appenders, endpoint) -> None:
+    # source/destination 한쪽의 공항/도시/국가/좌표/시간 7개 컬럼을 순서대로 추가
+    station = endpoint.get("station") or _EMPTY
+    city = station.get("city") or _EMPTY
+    gps = station.get("gps") or _EMPTY
+    appenders[0](station.get("code"))
+    appenders[1](city.get("name"))
+    appenders[2](city.get("legacyId"))
+    appenders[3]((station.get("country") or _EMPTY).get("code"))
+    appenders[4](gps.get("lat"))
+    appenders[5](gps.get("lng"))
+    appenders[6](endpoint.get("localTime"))
+
+
+def extract_flight_columns(source) -> dict:
+    """
+    Kiwi 응답(bytes, 파일 객체 또는 파싱된 dict)을 itinerary 단위로 스트리밍하며
+    segment 마다 dict 를 만들지 않고 컬럼별 리스트에 바로 값을 쌓는다.
+    """
+    columns = {column: [] for column in FLIGHT_COLUMNS}
+    appenders = [columns[column].append for column in FLIGHT_COLUMNS]
+    source_appenders = appenders[0:7]
+    destination_appenders = appenders[7:14]
+    (
+        append_carrier_name,
+        append_carrier_code,
+        append_cabin_class,
+        append_duration,
+        append_price,
+        append_discounted,
+        append_itinerary,
+    ) = appenders[14:21]
+
+    for itinerary_number, itinerary in enumerate(_iter_itineraries(source)):
+        price_info = itinerary.get("price") or _EMPTY
+        price = price_info.get("amount")
+        price_before_discount = price_info.get("priceBeforeDiscount", price)
+        is_discounted = price != price_before_discount
+
+        sector_segments = (itinerary.get("sector") or _EMPTY).get(
+            "sectorSegments"
+        ) or ()
+        for sector in sector_segments:
+            segment = sector.get("segment") or _EMPTY
+            carrier = segment.get("carrier") or _EMPTY
+            _append_station_columns(source_appenders, segment.get("source") or _EMPTY)
+            _append_station_columns(
+                destination_appenders, segment.get("destination") or _EMPTY
+            )
+            append_carrier_name(carrier.get("name"))
+            append_carrier_code(carrier.get("code"))
+            append_cabin_class(segment.get("cabinClass"))
+            append_duration(segment.get("duration"))
+            append_price(price)
+            append_discounted(is_discounted)
+            append_itinerary(itinerary_number)
+
+    return columns
+
+
+def columns_to_dataframe(columns: dict) -> pd.DataFrame:
+    # 컬럼 리스트를 스키마 dtype 으로 한 번에 변환
+    data = {}
+    for column, dtype in FLIGHT_COLUMN_SCHEMA.items():
+        values = columns.get(column, [])
+        if dtype in ("float64", "Int64"):
+            series = pd.to_numeric(pd.Series(values, dtype="object"), errors="coerce")
+            data[column] = series.astype(dtype)
+        else:
+            data[column] = pd.Series(values, dtype=dtype)
+    return pd.DataFrame(data, columns=FLIGHT_COLUMNS)
+
+
+def extract_flight_info(source) -> pd.DataFrame:
+    """
+    기존 _archive/flight_price_preprocessing.extract_flight_info 와 같은 컬럼을 반환하되,
+    응답 bytes 에서 타입이 지정된 컬럼으로 바로 변환한다.
+    """
+    df = columns_to_dataframe(extract_flight_columns(source))
+    logging.info(f"Extracted {len(df)} flight segments.")
+    return df
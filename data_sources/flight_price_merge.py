@@ -0,0 +1,262 @@
+import logging
+import os
+import numpy as np
+import pandas as pd
+from data_sources.country_reference import get_country_reference
+
+# 청크 모드 기본 행 수
+DEFAULT_CHUNK_SIZE = 200_000
+
+# 가격 상태/점수 (평균 대비 상승: -1, 동일: 0, 하락: +1)
+PRICE_STATUS_UP = "상승"
+PRICE_STATUS_SAME = "동일"
+PRICE_STATUS_DOWN = "하락"
+
+# 파일 경로 -> (파일 시그니처, 인덱스). 파일이 바뀌지 않으면 호출 간에 재사용
+_LOOKUP_INDEX_CACHE = {}
+
+
+def _file_signature(path: str) -> tuple:
+    stat = os.stat(path)
+    return (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+
+def _cached(kind: str, path: str, builder):
+    signature = _file_signature(path)
+    cached = _LOOKUP_INDEX_CACHE.get((kind, signature[0]))
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    index = builder(path)
+    _LOOKUP_INDEX_CACHE[(kind, signature[0])] = (signature, index)
+    logging.info(f"Built {kind} lookup index from {path}.")
+    return index
+
+
+def _build_airport_city_index(city_meta_csv: str) -> pd.Series:
+    # 공항코드 -> 도시코드 Series (airport_codes 정제/분해는 인덱스 생성 시 한 번만)
+    city_meta_df = pd.read_csv(
+        city_meta_csv, usecols=["airport_codes", "final_city_code"], dtype="string"
+    )
+    city_meta_df = city_meta_df.dropna(subset=["airport_codes", "final_city_code"])
+    airport_codes = (
+        city_meta_df["airport_codes"]
+        .str.replace(r"[\[\]' ]", "", regex=True)
+        .str.split(",")
+    )
+    exploded = (
+        city_meta_df.assign(공항코드=airport_codes)
+        .explode("공항코드")
+        .dropna(subset=["공항코드"])
+    )
+    exploded = exploded[exploded["공항코드"] != ""]
+    # 같은 공항이 여러 도시에 걸린 경우 첫 번째 도시를 사용 (merge 시 행이 늘어나지 않도록)
+    exploded = exploded.drop_duplicates(subset=["공항코드"], keep="first")
+    return pd.Series(
+        exploded["final_city_code"].to_numpy(),
+        index=pd.Index(exploded["공항코드"].to_numpy(), name="공항코드"),
+        name="도착_도시코드_3자리",
+    )
+
+
+def _build_avg_price_index(avg_csv: str) -> pd.Series:
+    # (city_code, month) -> avg_price
+    avg = pd.read_csv(avg_csv, usecols=["city_code", "month", "avg_price"])
+    avg = avg.drop_duplicates(subset=["city_code", "month"], keep="first")
+    return pd.Series(
+        avg["avg_price"].to_numpy(dtype="float64"),
+        index=pd.MultiIndex.from_arrays(
+            [avg["city_code"].astype("string"), avg["month"].astype("int64")],
+            names=["city_code", "month"],
+        ),
+        name="avg_price",
+    )
+
+
+def _get_code2_to_code3() -> dict:
+    # 국가 참조 인덱스(프로세스 단위 객체)가 같으면 호출 간에 재사용
+    reference = get_country_reference()
+    cached = _LOOKUP_INDEX_CACHE.get(("code2_to_code3", None))
+    if cached is not None and cached[0] is reference:
+        return cached[1]
+    index = {
+        record["country_code_2"]: record["country_code_3"]
+        for record in reference.countries
+        if record["country_code_2"] and record["country_code_3"]
+    }
+    _LOOKUP_INDEX_CACHE[("code2_to_code3", None)] = (reference, index)
+    return index
+
+
+def _lookup_avg_price_positions(
+    arrival_airport: pd.Series, arrival_month: pd.Series, avg_price_index: pd.Series
+) -> np.ndarray:
+    # (공항 카테고리 코드, 월) 조합을 정수 키로 묶어 고유 조합만 인덱스에서 찾고 행으로 펼침
+    # 월이 없으면 0, 공항이 없으면 카테고리 코드 -1 -> 둘 다 매칭되지 않음
+    airport_codes = arrival_airport.cat.codes.to_numpy(dtype="int64")
+    months = arrival_month.fillna(0).to_numpy(dtype="int64")
+    pair_keys, inverse = np.unique(
+        (airport_codes + 1) * 13 + months, return_inverse=True
+    )
+    # 코드 -1 이 마지막 원소(None)를 가리키도록
+    categories = np.append(arrival_airport.cat.categories.to_numpy(dtype=object), None)
+    unique_lookup = pd.MultiIndex.from_arrays(
+        [
+            pd.array(categories[pair_keys // 13 - 1], dtype="string"),
+            pair_keys % 13,
+        ]
+    )
+    return avg_price_index.index.get_indexer(unique_lookup)[inverse.reshape(-1)]
+
+
+def merge_flight_frame(
+    flight: pd.DataFrame, avg_price_index: pd.Series, airport_city_index: pd.Series
+) -> pd.DataFrame:
+    """
+    DataFrame 하나를 평균가격/도시코드/국가코드 인덱스와 결합한다. (merge 없이 인덱스 조회)
+    """
+    merged = flight.copy()
+    arrival_airport = merged["도착_공항_코드"].astype("category")
+    merged["도착_월"] = pd.to_datetime(merged["도착_시간"]).dt.month
+
+    # 평균 가격: (도착_공항_코드, 도착_월) 의 인덱스 위치를 카테고리 코드로 한 번에 구함
+    positions = _lookup_avg_price_positions(
+        arrival_airport, merged["도착_월"], avg_price_index
+    )
+    matched = positions >= 0
+    avg_price = np.where(
+        matched, avg_price_index.to_numpy()[np.where(matched, positions, 0)], np.nan
+    )
+    merged["도착_도시코드"] = pd.Series(
+        np.where(matched, arrival_airport.astype(object), None), index=merged.index
+    ).astype("string")
+    merged["월"] = pd.Series(
+        np.where(matched, merged["도착_월"], np.nan), index=merged.index
+    ).astype("Int64")
+    merged["평균가격"] = avg_price
+
+    # 가격 차이, 증감률, 상태, 점수 컬럼 추가 (행 단위 apply 대신 np.select)
+    price_diff = merged["가격"].to_numpy(dtype="float64") - avg_price
+    merged["가격차이"] = price_diff
+    with np.errstate(divide="ignore", invalid="ignore"):
+        merged["증감률(%)"] = np.round(price_diff / avg_price * 100, 2)
+    conditions = [price_diff > 0, price_diff < 0]
+    merged["가격상태"] = pd.Categorical(
+        np.select(conditions, [PRICE_STATUS_UP, PRICE_STATUS_DOWN], PRICE_STATUS_SAME),
+        categories=[PRICE_STATUS_UP, PRICE_STATUS_SAME, PRICE_STATUS_DOWN],
+    )
+    merged["점수"] = np.select(conditions, [-1, 1], 0)
+
+    # 공항코드 -> 도시코드 (카테고리별로 한 번만 조회)
+    merged["도착_도시코드_3자리"] = arrival_airport.map(airport_city_index).astype(
+        "string"
+    )
+
+    # 국가 코드 2자리 -> 3자리
+    code2_to_code3 = _get_code2_to_code3()
+    merged["도착_국가_3자리"] = (
+        merged["도착_국가_코드"].astype("category").map(code2_to_code3).astype("string")
+    )
+    merged["출발_국가_3자리"] = (
+        merged["출발_국가_코드"].astype("category").map(code2_to_code3).astype("string")
+    )
+    return merged
+
+
+def _get_avg_price_index(avg_source) -> pd.Series:
+    # 평균가격 csv 경로 또는 FlightPriceStatsStore (누적 통계 저장소)
+    if hasattr(avg_source, "avg_price_index"):
+        return avg_source.avg_price_index()
+    return _cached("avg_price", avg_source, _build_avg_price_index)
+
+
+def merge_flight_with_avg(
+    flight,
+    avg_csv,
+    city_meta_csv: str,
+    output_csv: str = None,
+) -> pd.DataFrame:
+    """
+    flight 데이터(DataFrame 또는 csv 경로)를 평균가격과 도착_공항_코드+월 기준으로 결합하고
+    가격차이/증감률/가격상태/점수, 도시코드, 국가 3자리 코드를 추가한다.
+    avg_csv 에는 평균가격 csv 경로 대신 FlightPriceStatsStore 를 넘길 수 있다.
+    city_meta_csv 는 공항코드 -> 도시코드 메타 데이터 (airport_codes, final_city_code 컬럼).
+    평균가격/공항 메타 인덱스는 파일이 바뀌지 않는 한 호출 간에 캐시된다.
+    """
+    flight_df = pd.read_csv(flight) if isinstance(flight, str) else flight
+    merged = merge_flight_frame(
+        flight_df,
+        _get_avg_price_index(avg_csv),
+        _cached("airport_city", city_meta_csv, _build_airport_city_index),
+    )
+    if output_csv:
+        merged.to_csv(output_csv, index=False, encoding="utf-8-sig")
+        logging.info(
+            f"Merged flight prices saved to {output_csv} ({len(merged)} rows)."
+        )
+    return merged
+
+
+def merge_flight_with_avg_chunked(
+    flight_csv: str,
+    avg_csv,
+    output_csv: str,
+    city_meta_csv: str,
+    chunksize: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """
+    메모리보다 큰 flight csv 를 chunksize 행씩 읽어 결합하고 output_csv 에 이어서 쓴다.
+    처리한 전체 행 수를 반환한다.
+    """
+    avg_price_index = _get_avg_price_index(avg_csv)
+    airport_city_index = _cached(
+        "airport_city", city_meta_csv, _build_airport_city_index
+    )
+
+    total_rows = 0
+    for chunk_number, chunk in enumerate(pd.read_csv(flight_csv, chunksize=chunksize)):
+        merged = merge_flight_frame(chunk, avg_price_index, airport_city_index)
+        merged.to_csv(
+            output_csv,
+            index=False,
+            mode="w" if chunk_number == 0 else "a",
+            header=chunk_number == 0,
+            encoding="utf-8-sig" if chunk_number == 0 else "utf-8",
+        )
+        total_rows += len(merged)
+
+    logging.info(
+        f"Merged {total_rows} flight rows in chunks of {chunksize} into {output_csv}."
+    )
+    return total_rows
+
+
+# CLI로도 사용 가능하게
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="flight와 flight_avg를 도착_공항_코드+월 기준으로 결합 및 점수화"
+    )
+    parser.add_argument("flight_csv", help="flight 데이터 csv 경로")
+    parser.add_argument("avg_csv", help="평균가격 데이터 csv 경로")
+    parser.add_argument("output_csv", help="결합 결과 저장 경로")
+    parser.add_argument(
+        "--city-meta-csv",
+        required=True,
+        help="공항코드 -> 도시코드 메타 csv (airport_codes, final_city_code)",
+    )
+    parser.add_argument("--chunksize", type=int, default=0, help="0 이면 한 번에 처리")
+    args = parser.parse_args()
+
+    if args.chunksize:
+        merge_flight_with_avg_chunked(
+            args.flight_csv,
+            args.avg_csv,
+            args.output_csv,
+            args.city_meta_csv,
+            args.chunksize,
+        )
+    else:
+        merge_flight_with_avg(
+            args.flight_csv, args.avg_csv, args.city_meta_csv, args.output_csv
+        )
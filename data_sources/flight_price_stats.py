@@ -0,0 +1,337 @@
+import logging
+import json
+import math
+import numpy as np
+import pandas as pd
+
+from data_sources.flight_price_writer import itinerary_rows
+
+# 통계 저장 경로 (flight_price_writer 백엔드 기준)
+FLIGHT_PRICE_STATS_PATH = "flight_price_stats/stats.json"
+FLIGHT_PRICE_STATS_VERSION = 1
+
+# t-digest 압축 계수 (키당 centroid 수 상한 ~ compression)
+DEFAULT_TDIGEST_COMPRESSION = 100
+
+# 통계 키: 기존 flight_price_avg.csv 와 동일하게 (도착_공항_코드, 도착 월)
+CITY_CODE_COLUMN = "도착_공항_코드"
+ARRIVAL_TIME_COLUMN = "도착_시간"
+PRICE_COLUMN = "가격"
+
+
+class TDigest:
+    """
+    근사 분위수용 merging t-digest. centroid(평균, 가중치)만 유지하므로
+    누적 데이터 양과 관계없이 키당 메모리가 compression 수준으로 고정된다.
+    """
+
+    __slots__ = ("compression", "means", "weights")
+
+    def __init__(
+        self, compression: int = DEFAULT_TDIGEST_COMPRESSION, means=None, weights=None
+    ):
+        self.compression = compression
+        self.means = np.asarray(means if means is not None else [], dtype="float64")
+        self.weights = np.asarray(
+            weights if weights is not None else [], dtype="float64"
+        )
+
+    @property
+    def total_weight(self) -> float:
+        return float(self.weights.sum())
+
+    def _k(self, q: float) -> float:
+        # k1 스케일 함수: 양 끝(최소/최대 근처)일수록 centroid 를 잘게 유지
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _q(self, k: float) -> float:
+        return (math.sin(k * 2 * math.pi / self.compression) + 1) / 2
+
+    def update(self, values) -> None:
+        values = np.asarray(values, dtype="float64")
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        # 같은 가격은 미리 묶어서 병합 루프 길이를 줄임
+        unique_values, counts = np.unique(values, return_counts=True)
+        self._merge(
+            np.concatenate([self.means, unique_values]),
+            np.concatenate([self.weights, counts.astype("float64")]),
+        )
+
+    def _merge(self, means: np.ndarray, weights: np.ndarray) -> None:
+        order = np.argsort(means, kind="mergesort")
+        means = means[order]
+        weights = weights[order]
+        total = weights.sum()
+
+        merged_means = []
+        merged_weights = []
+        weight_so_far = 0.0
+        current_mean = means[0]
+        current_weight = weights[0]
+        q_limit = self._q(min(self._k(0.0) + 1, self.compression / 4))
+
+        for mean, weight in zip(means[1:], weights[1:]):
+            if (weight_so_far + current_weight + weight) / total <= q_limit:
+                current_weight += weight
+                current_mean += (mean - current_mean) * weight / current_weight
+            else:
+                merged_means.append(current_mean)
+                merged_weights.append(current_weight)
+                weight_so_far += current_weight
+                q_limit = self._q(
+                    min(self._k(weight_so_far / total) + 1, self.compression / 4)
+                )
+                current_mean = mean
+                current_weight = weight
+        merged_means.append(current_mean)
+        merged_weights.append(current_weight)
+
+        self.means = np.asarray(merged_means, dtype="float64")
+        self.weights = np.asarray(merged_weights, dtype="float64")
+
+    def _centers(self) -> np.ndarray:
+        # 각 centroid 중심의 누적 가중치 위치
+        return np.cumsum(self.weights) - self.weights / 2
+
+    def quantile(self, q: float, min_value: float, max_value: float) -> float:
+        if self.means.size == 0:
+            return None
+        total = self.total_weight
+        xs = np.concatenate([[0.0], self._centers(), [total]])
+        ys = np.concatenate([[min_value], self.means, [max_value]])
+        return float(np.interp(q * total, xs, ys))
+
+    def cdf(self, value: float, min_value: float, max_value: float) -> float:
+        if self.means.size == 0:
+            return None
+        total = self.total_weight
+        xs = np.concatenate([[min_value], self.means, [max_value]])
+        ys = np.concatenate([[0.0], self._centers(), [total]])
+        return float(np.interp(value, xs, ys) / total)
+
+
+class PriceAggregate:
+    """(도시, 월) 하나의 누적 통계: 건수/합계/최소/최대 + Welford 평균/분산 + t-digest."""
+
+    __slots__ = ("count", "total", "min_price", "max_price", "mean", "m2", "digest")
+
+    def __init__(self, compression: int = DEFAULT_TDIGEST_COMPRESSION):
+        self.count = 0
+        self.total = 0.0
+        self.min_price = math.inf
+        self.max_price = -math.inf
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.digest = TDigest(compression)
+
+    def merge_batch(self, count, total, min_price, max_price, mean, m2, values) -> None:
+        # Chan 의 병렬 Welford 결합: 배치 통계를 기존 통계에 O(1)로 합친다
+        new_count = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / new_count
+        self.m2 += m2 + delta * delta * self.count * count / new_count
+        self.count = new_count
+        self.total += total
+        self.min_price = min(self.min_price, min_price)
+        self.max_price = max(self.max_price, max_price)
+        self.digest.update(values)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "min": self.min_price,
+            "max": self.max_price,
+            "mean": self.mean,
+            "m2": self.m2,
+            "centroids": [self.digest.means.tolist(), self.digest.weights.tolist()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, compression: int) -> "PriceAggregate":
+        aggregate = cls(compression)
+        aggregate.count = data["count"]
+        aggregate.total = data["sum"]
+        aggregate.min_price = data["min"]
+        aggregate.max_price = data["max"]
+        aggregate.mean = data["mean"]
+        aggregate.m2 = data["m2"]
+        means, weights = data.get("centroids") or ([], [])
+        aggregate.digest = TDigest(compression, means, weights)
+        return aggregate
+
+
+class FlightPriceStatsStore:
+    """
+    (city_code, month) 별 누적 항공권 가격 통계. 일별 flight 배치로만 갱신하고
+    과거 flight csv 를 다시 읽지 않는다. 평균/가격 위치 조회는 dict 한 번.
+    """
+
+    def __init__(self, compression: int = DEFAULT_TDIGEST_COMPRESSION):
+        self.compression = compression
+        self.aggregates = {}  # (city_code, month) -> PriceAggregate
+
+    def __len__(self) -> int:
+        return len(self.aggregates)
+
+    def update_from_flights(self, flight_df: pd.DataFrame) -> int:
+        """
+        flight 배치(extract_flight_info 결과)로 통계를 갱신하고 갱신된 키 수를 반환.
+        가격은 itinerary 단위이므로 itinerary 당 한 번, 최종 도착 segment 의 공항/월로 집계한다
+        (경유 공항에는 넣지 않음).
+        """
+        flight_df = itinerary_rows(flight_df, keep="last")
+        batch = pd.DataFrame(
+            {
+                "city_code": flight_df[CITY_CODE_COLUMN].astype("string"),
+                "month": pd.to_datetime(flight_df[ARRIVAL_TIME_COLUMN]).dt.month,
+                "price": pd.to_numeric(flight_df[PRICE_COLUMN], errors="coerce"),
+            }
+        ).dropna()
+        if batch.empty:
+            return 0
+
+        # 배치 통계는 groupby 로 한 번에 계산하고, 키별로 기존 통계와 결합
+        grouped = batch.groupby(["city_code", "month"], sort=False)["price"]
+        batch_stats = grouped.agg(["count", "sum", "min", "max", "mean"])
+        batch_stats["m2"] = grouped.var(ddof=0).fillna(0.0) * batch_stats["count"]
+        values_by_key = grouped.apply(lambda s: s.to_numpy())
+
+        for key, row in batch_stats.iterrows():
+            key = (str(key[0]), int(key[1]))
+            aggregate = self.aggregates.get(key)
+            if aggregate is None:
+                aggregate = self.aggregates[key] = PriceAggregate(self.compression)
+            aggregate.merge_batch(
+                int(row["count"]),
+                float(row["sum"]),
+                float(row["min"]),
+                float(row["max"]),
+                float(row["mean"]),
+                float(row["m2"]),
+                values_by_key[(key[0], key[1])],
+            )
+
+        logging.info(
+            f"Flight price stats updated: {len(batch_stats)} keys from {len(batch)} prices "
+            f"({len(self.aggregates)} keys total)."
+        )
+        return len(batch_stats)
+
+    def get(self, city_code: str, month: int):
+        return self.aggregates.get((city_code, month))
+
+    def average(self, city_code: str, month: int):
+        aggregate = self.aggregates.get((city_code, month))
+        return aggregate.total / aggregate.count if aggregate else None
+
+    def price_position(self, city_code: str, month: int, price: float):
+        """최소~최대 구간에서 가격 위치 (0 ~ 1). 최소 == 최대 이면 0.5"""
+        aggregate = self.aggregates.get((city_code, month))
+        if aggregate is None:
+            return None
+        price_range = aggregate.max_price - aggregate.min_price
+        if price_range <= 0:
+            return 0.5
+        return min(max((price - aggregate.min_price) / price_range, 0.0), 1.0)
+
+    def price_percentile(self, city_code: str, month: int, price: float):
+        """t-digest 기준 가격 백분위 (0 ~ 1)."""
+        aggregate = self.aggregates.get((city_code, month))
+        if aggregate is None:
+            return None
+        return aggregate.digest.cdf(price, aggregate.min_price, aggregate.max_price)
+
+    def quantile(self, city_code: str, month: int, q: float):
+        aggregate = self.aggregates.get((city_code, month))
+        if aggregate is None:
+            return None
+        return aggregate.digest.quantile(q, aggregate.min_price, aggregate.max_price)
+
+    def to_frame(self) -> pd.DataFrame:
+        # flight_price_avg.csv 와 같은 컬럼 + 추가 통계
+        rows = [
+            {
+                "city_code": city_code,
+                "month": month,
+                "avg_price": aggregate.total / aggregate.count,
+                "min_price": aggregate.min_price,
+                "max_price": aggregate.max_price,
+                "std_price": math.sqrt(aggregate.variance),
+                "median_price": aggregate.digest.quantile(
+                    0.5, aggregate.min_price, aggregate.max_price
+                ),
+                "count": aggregate.count,
+            }
+            for (city_code, month), aggregate in self.aggregates.items()
+        ]
+        return pd.DataFrame(
+            rows,
+            columns=[
+                "city_code",
+                "month",
+                "avg_price",
+                "min_price",
+                "max_price",
+                "std_price",
+                "median_price",
+                "count",
+            ],
+        )
+
+    def avg_price_index(self) -> pd.Series:
+        # flight_price_merge 가 쓰는 (city_code, month) -> avg_price 인덱스
+        keys = list(self.aggregates.keys())
+        return pd.Series(
+            [self.aggregates[key].total / self.aggregates[key].count for key in keys],
+            index=(
+                pd.MultiIndex.from_tuples(keys, names=["city_code", "month"])
+                if keys
+                else pd.MultiIndex.from_arrays([[], []], names=["city_code", "month"])
+            ),
+            name="avg_price",
+            dtype="float64",
+        )
+
+    def to_json_bytes(self) -> bytes:
+        payload = {
+            "version": FLIGHT_PRICE_STATS_VERSION,
+            "compression": self.compression,
+            "stats": [
+                {"city_code": city_code, "month": month, **aggregate.to_dict()}
+                for (city_code, month), aggregate in self.aggregates.items()
+            ],
+        }
+        return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+    @classmethod
+    def from_json_bytes(cls, data: bytes) -> "FlightPriceStatsStore":
+        payload = json.loads(data)
+        store = cls(payload.get("compression", DEFAULT_TDIGEST_COMPRESSION))
+        for entry in payload.get("stats", []):
+            store.aggregates[(entry["city_code"], int(entry["month"]))] = (
+                PriceAggregate.from_dict(entry, store.compression)
+            )
+        return store
+
+
+def load_flight_price_stats(
+    backend, path: str = FLIGHT_PRICE_STATS_PATH
+) -> FlightPriceStatsStore:
+    data = backend.read(path)
+    if data is None:
+        logging.info(f"No flight price stats found at {path}. Starting a new store.")
+        return FlightPriceStatsStore()
+    return FlightPriceStatsStore.from_json_bytes(data)
+
+
+def save_flight_price_stats(
+    store: FlightPriceStatsStore, backend, path: str = FLIGHT_PRICE_STATS_PATH
+) -> str:
+    return backend.write(path, store.to_json_bytes())
@@ -0,0 +1,91 @@
+import logging
+import datetime
+import io
+import pandas as pd
+
+from data_sources.flight_price_extractor import ITINERARY_COLUMN, QUERY_COUNTRY_COLUMN
+
+# Blob 컨테이너 / 데이터셋 루트
+FLIGHT_PRICE_CONTAINER_NAME = "flight-price-data"
+FLIGHT_PRICE_DATASET_PREFIX = "flight_prices"
+
+# 파티션 컬럼 (Hive 스타일: collected_date=YYYY-MM-DD/dest_country=JP)
+PARTITION_DATE_KEY = "collected_date"
+PARTITION_COUNTRY_KEY = "dest_country"
+DESTINATION_COUNTRY_COLUMN = "도착_국가_코드"
+PRICE_COLUMN = "가격"
+
+
+def destination_country_column(df: pd.DataFrame) -> str:
+    # 조회 목적지 열이 있으면 그것, 없으면 (수집기를 거치지 않은 DataFrame) segment 도착 국가
+    return (
+        QUERY_COUNTRY_COLUMN
+        if QUERY_COUNTRY_COLUMN in df.columns
+        else DESTINATION_COUNTRY_COLUMN
+    )
+
+
+def itinerary_rows(df: pd.DataFrame, keep: str = "first") -> pd.DataFrame:
+    # 가격 통계용: itinerary 당 한 행 (가격은 itinerary 단위라 segment 수만큼 중복됨)
+    # segment 는 순서대로 쌓이므로 keep="last" 면 최종 도착 segment 의 행
+    if ITINERARY_COLUMN not in df.columns:
+        return df
+    keys = [ITINERARY_COLUMN]
+    if QUERY_COUNTRY_COLUMN in df.columns:
+        keys.insert(0, QUERY_COUNTRY_COLUMN)
+    return df.drop_duplicates(keys, keep=keep)
+
+
+def _to_parquet_bytes(df: pd.DataFrame) -> bytes:
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, engine="pyarrow", compression="zstd", index=False)
+    return buffer.getvalue()
+
+
+def write_flight_prices_parquet(
+    df: pd.DataFrame, backend, collected_at: datetime.datetime
+) -> list:
+    """
+    항공권 DataFrame 을 수집일/조회 목적지 국가별 Parquet 파일로 나눠서 쓴다.
+    파티션마다 한 번만 직렬화하며, 파티션별 요약(국가, 건수, 가격 통계, 경로)을 반환한다.
+    가격 통계는 itinerary 당 한 행으로 계산한다.
+    """
+    collected_date = collected_at.strftime("%Y-%m-%d")
+    run_id = collected_at.strftime("%H%M%S")
+    summaries = []
+
+    for country_code, partition_df in df.groupby(
+        destination_country_column(df), sort=True, dropna=False
+    ):
+        country_key = country_code if isinstance(country_code, str) else "unknown"
+        path = (
+            f"{FLIGHT_PRICE_DATASET_PREFIX}/{PARTITION_DATE_KEY}={collected_date}/"
+            f"{PARTITION_COUNTRY_KEY}={country_key}/part-{run_id}.parquet"
+        )
+        data = _to_parquet_bytes(partition_df)
+        written_path = backend.write(path, data)
+
+        itineraries = itinerary_rows(partition_df)
+        prices = itineraries[PRICE_COLUMN]
+        summaries.append(
+            {
+                "destination_country_code_2": country_key,
+                "segment_count": int(len(partition_df)),
+                "itinerary_count": int(len(itineraries)),
+                "min_price": float(prices.min()) if prices.notna().any() else None,
+                "median_price": (
+                    float(prices.median()) if prices.notna().any() else None
+                ),
+                "mean_price": (
+                    round(float(prices.mean()), 2) if prices.notna().any() else None
+                ),
+                "parquet_path": written_path,
+                "parquet_bytes": len(data),
+            }
+        )
+
+    logging.info(
+        f"Wrote {len(summaries)} flight price partitions "
+        f"({sum(s['parquet_bytes'] for s in summaries)} bytes) for {collected_date}."
+    )
+    return summaries
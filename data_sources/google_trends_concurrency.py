@@ -0,0 +1,343 @@
+import logging
+import json
+import os
+import random
+import threading
+import time
+
+from data_sources.google_trends_plan import get_google_trends_backend
+
+# googleTrendsProcessor 동시 실행 수 자동 조절 (AIMD)
+#   - 요청이 429 없이 목표 지연 안에 끝나면 limit 을 조금씩 올리고 (limit 개 성공마다 +1)
+#   - 429 를 받거나 목표 지연을 넘으면 limit 을 절반으로 (cooldown 동안 한 번만)
+# 호스트(host.json queues 설정)는 인스턴스당 최대 batchSize + newBatchThreshold 개까지 호출을
+# 넘겨주고, 실제로 Google 에 동시에 요청하는 수는 토큰 개수(limit)로 제한한다
+CONCURRENCY_STATE_PATH = "google_trends_concurrency/state.json"
+TOKEN_BLOB_PREFIX = "google_trends_concurrency/tokens"
+
+DEFAULT_MIN_CONCURRENCY = 1
+# host.json 의 batchSize(4) + newBatchThreshold(4) 와 맞춤
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_INITIAL_CONCURRENCY = 2
+# 요청 1건 목표 지연 (build_payload 후 30~60초 대기 + 응답. 재시도 대기는 최소 120초)
+DEFAULT_TARGET_LATENCY_SECONDS = 150.0
+DECREASE_FACTOR = 0.5
+DECREASE_COOLDOWN_SECONDS = 120
+# 처리량/429 비율을 계산하는 최근 구간과 보관할 최대 표본 수
+REPORT_WINDOW_SECONDS = 1800
+MAX_SAMPLES = 256
+
+# 토큰을 기다리는 최대 시간. 넘으면 메시지를 지연시켜 큐에 다시 넣음
+DEFAULT_TOKEN_WAIT_SECONDS = 120
+TOKEN_POLL_SECONDS = 3.0
+# 토큰 blob lease 길이와 갱신 주기. 호출이 비정상 종료되면 갱신이 멈춰 lease 가 저절로 풀림
+TOKEN_LEASE_SECONDS = 60
+TOKEN_RENEW_SECONDS = 20
+# 여러 인스턴스가 동시에 반납할 때 공유 상태 조건부 쓰기(If-Match) 재시도 횟수
+MAX_STATE_UPDATE_ATTEMPTS = 5
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+def concurrency_gate_enabled() -> bool:
+    return os.environ.get("DisableGoogleTrendsConcurrencyGate", "").lower() not in (
+        "1",
+        "true",
+    )
+
+
+class AimdConcurrencyController:
+    """
+    관측한 429/지연으로 동시 실행 수(limit)를 정하는 AIMD 제어기.
+    record() 로 요청 결과를 넣고 current_limit 으로 허용 개수를 읽는다.
+    상태는 to_dict()/load_state() 로 저장해 인스턴스 간에 공유한다 (ETag 조건부 쓰기).
+    """
+
+    def __init__(
+        self,
+        min_limit: int = DEFAULT_MIN_CONCURRENCY,
+        max_limit: int = DEFAULT_MAX_CONCURRENCY,
+        initial_limit: int = DEFAULT_INITIAL_CONCURRENCY,
+        target_latency_seconds: float = DEFAULT_TARGET_LATENCY_SECONDS,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency_seconds = target_latency_seconds
+        self.limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.last_decrease_at = 0.0
+        # [(끝난 시각(epoch 초), 지연 초, 429 여부)]
+        self.samples = []
+
+    @property
+    def current_limit(self) -> int:
+        return max(self.min_limit, int(self.limit))
+
+    def record(
+        self, latency_seconds: float, rate_limited: bool, now: float = None
+    ) -> None:
+        now = time.time() if now is None else now
+        self.samples.append((now, round(latency_seconds, 3), bool(rate_limited)))
+        self.samples = [
+            s
+            for s in self.samples[-MAX_SAMPLES:]
+            if now - s[0] <= REPORT_WINDOW_SECONDS
+        ]
+
+        if rate_limited or latency_seconds > self.target_latency_seconds:
+            # 곱셈 감소 (같은 혼잡으로 연달아 줄지 않도록 cooldown)
+            if now - self.last_decrease_at >= DECREASE_COOLDOWN_SECONDS:
+                self.limit = max(float(self.min_limit), self.limit * DECREASE_FACTOR)
+                self.last_decrease_at = now
+        else:
+            # 덧셈 증가: limit 개 성공마다 +1
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+
+    def report(self, now: float = None) -> dict:
+        """현재 limit 과 최근 구간의 처리량(요청/분), 429 비율, 지연 p50/p90"""
+        now = time.time() if now is None else now
+        recent = [s for s in self.samples if now - s[0] <= REPORT_WINDOW_SECONDS]
+        if not recent:
+            return {"concurrency_limit": self.current_limit, "requests": 0}
+        span_minutes = max(now - recent[0][0], 60.0) / 60.0
+        latencies = sorted(s[1] for s in recent)
+        return {
+            "concurrency_limit": self.current_limit,
+            "requests": len(recent),
+            "throughput_per_minute": round(len(recent) / span_minutes, 2),
+            "rate_limited_ratio": round(sum(s[2] for s in recent) / len(recent), 3),
+            "latency_p50_seconds": latencies[len(latencies) // 2],
+            "latency_p90_seconds": latencies[int(len(latencies) * 0.9)],
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "limit": self.limit,
+            "last_decrease_at": self.last_decrease_at,
+            "samples": self.samples,
+        }
+
+    def load_state(self, data: dict) -> "AimdConcurrencyController":
+        # 범위(min/max/목표 지연)는 환경 설정을 따르고 관측 상태만 복원
+        self.limit = min(
+            max(float(data.get("limit", self.limit)), self.min_limit), self.max_limit
+        )
+        self.last_decrease_at = float(data.get("last_decrease_at", 0.0))
+        self.samples = [tuple(s) for s in data.get("samples", [])][-MAX_SAMPLES:]
+        return self
+
+
+class LocalConcurrencyTokens:
+    """프로세스 안에서만 유효한 토큰 (Blob 이 없는 로컬 실행용 stand-in)"""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._held = set()
+
+    def acquire(self, get_limit, timeout: float):
+        # get_limit() 은 기다리는 동안에도 다시 읽어서 limit 이 오르면 바로 들어옴
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while len(self._held) >= get_limit():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._condition.wait(min(remaining, TOKEN_POLL_SECONDS))
+            token = next(i for i in range(len(self._held) + 1) if i not in self._held)
+            self._held.add(token)
+            return token
+
+    def release(self, token) -> None:
+        with self._condition:
+            self._held.discard(token)
+            self._condition.notify_all()
+
+    def in_flight(self) -> int:
+        with self._condition:
+            return len(self._held)
+
+
+class _LeaseToken:
+    """잡은 토큰 blob lease 와 그 lease 를 주기적으로 갱신하는 스레드"""
+
+    def __init__(self, index: int, lease):
+        self.index = index
+        self.lease = lease
+        self._released = threading.Event()
+        self._renewer = threading.Thread(
+            target=self._renew_until_released,
+            name=f"trends-token-{index:02d}",
+            daemon=True,
+        )
+        self._renewer.start()
+
+    def _renew_until_released(self) -> None:
+        while not self._released.wait(TOKEN_RENEW_SECONDS):
+            try:
+                self.lease.renew()
+            except Exception as e:
+                # 갱신을 못 하면 lease 가 만료되어 다른 호출이 토큰을 가져갈 수 있음
+                logging.warning(
+                    f"Failed to renew Google Trends token {self.index}: {e}"
+                )
+                return
+
+    def release(self) -> None:
+        self._released.set()
+        self._renewer.join()
+        self.lease.release()
+
+
+class BlobLeaseConcurrencyTokens:
+    """
+    토큰 blob(tokens/token-00 ...) 의 lease 로 인스턴스 간 동시 실행 수를 맞춤.
+    앞의 limit 개 토큰 중 lease 가 없는 것을 잡는다. limit 이 줄어도 이미 잡힌 뒤쪽 토큰은
+    끝날 때까지 유지되고, 새 호출은 줄어든 개수만큼만 들어온다.
+    lease 는 TOKEN_LEASE_SECONDS 짜리를 잡고 있는 동안 갱신하므로, 호출이 죽으면 따로
+    끊지 않아도 만료되어 풀린다.
+    """
+
+    def __init__(self, container_client, prefix: str = TOKEN_BLOB_PREFIX):
+        self.container_client = container_client
+        self.prefix = prefix
+
+    def _try_acquire(self, index: int):
+        from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
+
+        blob = self.container_client.get_blob_client(f"{self.prefix}/token-{index:02d}")
+        try:
+            lease = blob.acquire_lease(lease_duration=TOKEN_LEASE_SECONDS)
+        except ResourceNotFoundError:
+            try:
+                blob.upload_blob(b"", overwrite=False)
+            except ResourceExistsError:
+                pass
+            return None
+        except ResourceExistsError:
+            # 409 LeaseAlreadyPresent: 다른 호출이 잡고 있는 토큰
+            # (인증/5xx/스로틀링 오류는 올려 보내 게이트 없이 진행하게 함)
+            return None
+        return _LeaseToken(index, lease)
+
+    def acquire(self, get_limit, timeout: float):
+        deadline = time.monotonic() + timeout
+        while True:
+            limit = get_limit()
+            for index in random.sample(range(limit), limit):
+                token = self._try_acquire(index)
+                if token is not None:
+                    return token
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(TOKEN_POLL_SECONDS * random.uniform(0.5, 1.5))
+
+    def release(self, token) -> None:
+        try:
+            token.release()
+        except Exception as e:
+            # 해제에 실패해도 갱신이 멈췄으므로 TOKEN_LEASE_SECONDS 안에 만료됨
+            logging.warning(f"Failed to release Google Trends token {token.index}: {e}")
+
+
+class GoogleTrendsConcurrencyGate:
+    """
+    acquire() 로 토큰을 받고 요청 뒤 release() 에 지연/429 여부를 넘기면
+    공유 상태의 AIMD limit 을 갱신하고 현재 limit / 처리량을 로그로 남긴다.
+    """
+
+    def __init__(self, tokens, backend, controller_factory=AimdConcurrencyController):
+        self.tokens = tokens
+        self.backend = backend
+        self.controller_factory = controller_factory
+        self._lock = threading.Lock()
+
+    def _load_controller(self) -> AimdConcurrencyController:
+        return self._parse_controller(self.backend.read(CONCURRENCY_STATE_PATH))
+
+    def _parse_controller(self, data) -> AimdConcurrencyController:
+        controller = self.controller_factory()
+        if data is not None:
+            try:
+                controller.load_state(json.loads(data))
+            except (ValueError, TypeError) as e:
+                logging.warning(f"Invalid Google Trends concurrency state: {e}")
+        return controller
+
+    def current_limit(self) -> int:
+        with self._lock:
+            return self._load_controller().current_limit
+
+    def acquire(self, timeout: float = DEFAULT_TOKEN_WAIT_SECONDS):
+        return self.tokens.acquire(self.current_limit, timeout)
+
+    def release(self, token, latency_seconds: float, rate_limited: bool) -> dict:
+        self.tokens.release(token)
+        # 읽은 시점의 ETag 가 그대로일 때만 저장하고, 다른 인스턴스가 먼저 저장했으면
+        # 다시 읽어 record() 를 재적용 (429 뒤의 limit 감소가 덮어써지지 않게)
+        with self._lock:
+            for attempt in range(1, MAX_STATE_UPDATE_ATTEMPTS + 1):
+                data, etag = self.backend.read_with_etag(CONCURRENCY_STATE_PATH)
+                controller = self._parse_controller(data)
+                previous_limit = controller.current_limit
+                controller.record(latency_seconds, rate_limited)
+                report = controller.report()
+                state = {**controller.to_dict(), "report": report}
+                if self.backend.write_if_match(
+                    CONCURRENCY_STATE_PATH, json.dumps(state).encode("utf-8"), etag
+                ):
+                    break
+                logging.info(
+                    f"Google Trends concurrency state changed concurrently "
+                    f"(attempt {attempt}/{MAX_STATE_UPDATE_ATTEMPTS}). Retrying."
+                )
+                time.sleep(random.uniform(0.05, 0.2) * attempt)
+            else:
+                raise RuntimeError(
+                    f"Google Trends concurrency state kept changing. "
+                    f"Gave up after {MAX_STATE_UPDATE_ATTEMPTS} attempts."
+                )
+        logging.info(
+            f"Google Trends concurrency {previous_limit} -> {report['concurrency_limit']} "
+            f"(latency {latency_seconds:.1f}s, rate limited: {rate_limited}). {report}"
+        )
+        return report
+
+
+def _default_controller() -> AimdConcurrencyController:
+    return AimdConcurrencyController(
+        min_limit=int(
+            _env_float("GoogleTrendsMinConcurrency", DEFAULT_MIN_CONCURRENCY)
+        ),
+        max_limit=int(
+            _env_float("GoogleTrendsMaxConcurrency", DEFAULT_MAX_CONCURRENCY)
+        ),
+        target_latency_seconds=_env_float(
+            "GoogleTrendsTargetLatencySeconds", DEFAULT_TARGET_LATENCY_SECONDS
+        ),
+    )
+
+
+# --- 프로세스 단위 기본 게이트 ---
+_DEFAULT_GATE = None
+_DEFAULT_GATE_LOCK = threading.Lock()
+
+
+def get_trends_concurrency_gate() -> GoogleTrendsConcurrencyGate:
+    # Blob 백엔드면 토큰 blob lease 로 인스턴스 간 조정, 아니면 프로세스 안 잠금
+    global _DEFAULT_GATE
+    if _DEFAULT_GATE is None:
+        with _DEFAULT_GATE_LOCK:
+            if _DEFAULT_GATE is None:
+                backend = get_google_trends_backend()
+                container_client = getattr(backend, "container_client", None)
+                tokens = (
+                    BlobLeaseConcurrencyTokens(container_client)
+                    if container_client is not None
+                    else LocalConcurrencyTokens()
+                )
+                _DEFAULT_GATE = GoogleTrendsConcurrencyGate(
+                    tokens, backend, _default_controller
+                )
+    return _DEFAULT_GATE
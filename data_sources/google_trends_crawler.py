@@ -1,9 +1,8 @@
 import logging
+import asyncio
 import datetime
 import json
 import os
-import random
-import time
 import pytz
 import pandas as pd
 from pytrends.request import TrendReq
@@ -16,6 +15,8 @@ from tenacity import (
 )
 from requests.exceptions import RequestException
 from pytrends.exceptions import TooManyRequestsError
+from data_sources.raw_response_archive import archive_raw_response
+from data_sources.retry_utils import random_sleep, random_sleep_async
 
 
 # 재시도 로깅을 위한 헬퍼 함수
@@ -28,17 +29,126 @@ def retry_log(retry_state):
     )
 
 
+# 기본 앵커 키워드 (수집 계획에서 geo 별로 다른 앵커를 줄 수 있음)
+DEFAULT_ANCHOR_KEYWORD = "해외여행"
+
+
+# 429 응답인지 (동시 실행 수 조절에 사용)
+def is_rate_limited_error(error: Exception) -> bool:
+    if isinstance(error, TooManyRequestsError):
+        return True
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None) == 429
+
+
+# interest_over_time 결과를 키워드별 원시 성장률/관심도 지표로 요약 (sync/async 공용)
+def summarize_trend_frame(
+    time_series_data,
+    keywords_in_group: list,
+    anchor_keyword: str = DEFAULT_ANCHOR_KEYWORD,
+) -> list:
+    if time_series_data is None or time_series_data.empty:
+        logging.warning(f"그룹 '{keywords_in_group}'에 대한 데이터가 없습니다.")
+        return []
+
+    if "isPartial" in time_series_data.columns:
+        time_series_data = time_series_data.drop(columns=["isPartial"])
+
+    result_for_group = []
+
+    last_15_days_data = time_series_data.iloc[-15:]
+    previous_15_days_data = time_series_data.iloc[-30:-15]
+
+    W_growth = 0.7  # 가중치 정의
+    W_interest = 0.3  # 가중치 정의
+
+    for keyword_in_group in keywords_in_group:
+        if keyword_in_group == anchor_keyword:
+            continue
+
+        if keyword_in_group in time_series_data.columns:
+            raw_growth = 0.0
+            if previous_15_days_data[keyword_in_group].mean() > 0:
+                raw_growth = (
+                    last_15_days_data[keyword_in_group].mean()
+                    - previous_15_days_data[keyword_in_group].mean()
+                ) / previous_15_days_data[keyword_in_group].mean()
+            elif last_15_days_data[keyword_in_group].mean() > 0:
+                # 이전 평균이 0에 가깝지만, 최근 평균이 유의미하게 증가한 경우
+                # 아주 작은값(epsilon)을 사용하여 분모 0이 되는 오류를 방지하고, 실제 성장 규모를 반영
+                epsilon = 1e-6
+                raw_growth = last_15_days_data[keyword_in_group].mean() / epsilon
+
+            current_interest = time_series_data[keyword_in_group].iloc[-1]
+            if pd.isna(current_interest):
+                current_interest = 0.0
+
+            # 앵커 키워드 데이터 추출
+            anchor_growth = 0.0
+            anchor_growth = 0.0
+            anchor_interest = 0.0
+            if anchor_keyword in time_series_data.columns:
+                if previous_15_days_data[anchor_keyword].mean() > 0:
+                    anchor_growth = (
+                        last_15_days_data[anchor_keyword].mean()
+                        - previous_15_days_data[anchor_keyword].mean()
+                    ) / previous_15_days_data[anchor_keyword].mean()
+                elif (
+                    last_15_days_data[anchor_keyword].mean() > 0
+                ):  # 이전 평균이 0인데 현재 값이 있으면 100% 성장
+                    anchor_growth = 1.0
+                anchor_interest = time_series_data[anchor_keyword].iloc[-1]
+                if pd.isna(anchor_interest):
+                    anchor_interest = 0.0
+
+            result_for_group.append(
+                {
+                    "keyword": keyword_in_group,
+                    "trend_score_raw_growth": raw_growth,
+                    "trend_score_current_interest": current_interest,
+                    "anchor_growth": anchor_growth,
+                    "anchor_interest": anchor_interest,
+                }
+            )
+        else:
+            logging.warning(
+                f"키워드 '{keyword_in_group}'에 대한 데이터 컬럼을 찾을 수 없습니다. 건너뜁니다."
+            )
+
+    return result_for_group
+
+
+# pytrends 는 원본 JSON 을 노출하지 않으므로 interest_over_time 결과를 그대로 보관
+def _archive_trend_frame(
+    time_series_data, keywords_in_group: list, timeframe: str, geo: str
+) -> None:
+    if time_series_data is None:
+        return
+    archive_raw_response(
+        "google_trends",
+        f"{geo}|{timeframe}|{','.join(keywords_in_group)}",
+        time_series_data.to_json(orient="split", date_format="iso").encode("utf-8"),
+        request={"keywords": keywords_in_group, "timeframe": timeframe, "geo": geo},
+    )
+
+
 # 특정 키워드 그룹의 Google Trends 데이터를 가져와 처리하는 로직 함수
 def get_trends_data_for_group(
-    keywords_in_group: list, timeframe: str = "today 3-m", geo: str = "KR"
+    keywords_in_group: list,
+    timeframe: str = "today 3-m",
+    geo: str = "KR",
+    anchor_keyword: str = DEFAULT_ANCHOR_KEYWORD,
+    outcomes: list = None,
 ) -> list:
     logging.info(f"Google Trends 데이터 처리 시작: 그룹 {keywords_in_group}")
+    # outcomes 를 넘기면 {"rate_limited": 429 횟수, "succeeded": 성공 여부} 를 추가
+    outcome = {"rate_limited": 0, "succeeded": False}
+    if outcomes is not None:
+        outcomes.append(outcome)
 
     pytrends_connector = TrendReq(hl="ko-KR", tz=540)
     pd.set_option("future.no_silent_downcasting", True)
 
-    anchor_keyword = "해외여행"
-
     @retry(
         wait=wait_exponential(multiplier=1, min=120, max=600),
         stop=stop_after_attempt(3),
@@ -49,85 +159,90 @@ def get_trends_data_for_group(
     )
     def _fetch_trend_data_with_retry():
         logging.info(f"Google Trends API 요청 중: {keywords_in_group}")
-        pytrends_connector.build_payload(
-            keywords_in_group, cat=0, timeframe=timeframe, geo=geo, gprop=""
-        )
-        time.sleep(random.uniform(30, 60))
-        time_series_data = pytrends_connector.interest_over_time()
+        try:
+            pytrends_connector.build_payload(
+                keywords_in_group, cat=0, timeframe=timeframe, geo=geo, gprop=""
+            )
+            random_sleep(30, 60)
+            time_series_data = pytrends_connector.interest_over_time()
+        except Exception as e:
+            outcome["rate_limited"] += is_rate_limited_error(e)
+            raise
+        _archive_trend_frame(time_series_data, keywords_in_group, timeframe, geo)
         return time_series_data
 
     try:
         time_series_data = _fetch_trend_data_with_retry()
+        outcome["succeeded"] = True
+
+        return summarize_trend_frame(
+            time_series_data, keywords_in_group, anchor_keyword
+        )
+
+    except RequestException as e:
+        logging.exception(f"그룹 '{keywords_in_group}'에 대한 요청 오류: {e}")
+        return []
+    except Exception as e:
+        logging.exception(f"그룹 '{keywords_in_group}' 처리 중 예상치 못한 오류: {e}")
+        return []
 
-        if time_series_data is None or time_series_data.empty:
-            logging.warning(f"그룹 '{keywords_in_group}'에 대한 데이터가 없습니다.")
-            return []
-
-        if "isPartial" in time_series_data.columns:
-            time_series_data = time_series_data.drop(columns=["isPartial"])
-
-        result_for_group = []
-
-        last_15_days_data = time_series_data.iloc[-15:]
-        previous_15_days_data = time_series_data.iloc[-30:-15]
-
-        W_growth = 0.7  # 가중치 정의
-        W_interest = 0.3  # 가중치 정의
-
-        for keyword_in_group in keywords_in_group:
-            if keyword_in_group == anchor_keyword:
-                continue
-
-            if keyword_in_group in time_series_data.columns:
-                raw_growth = 0.0
-                if previous_15_days_data[keyword_in_group].mean() > 0:
-                    raw_growth = (
-                        last_15_days_data[keyword_in_group].mean()
-                        - previous_15_days_data[keyword_in_group].mean()
-                    ) / previous_15_days_data[keyword_in_group].mean()
-                elif last_15_days_data[keyword_in_group].mean() > 0:
-                    # 이전 평균이 0에 가깝지만, 최근 평균이 유의미하게 증가한 경우
-                    # 아주 작은값(epsilon)을 사용하여 분모 0이 되는 오류를 방지하고, 실제 성장 규모를 반영
-                    epsilon = 1e-6
-                    raw_growth = last_15_days_data[keyword_in_group].mean() / epsilon
-
-                current_interest = time_series_data[keyword_in_group].iloc[-1]
-                if pd.isna(current_interest):
-                    current_interest = 0.0
-
-                # 앵커 키워드 데이터 추출
-                anchor_growth = 0.0
-                anchor_growth = 0.0
-                anchor_interest = 0.0
-                if anchor_keyword in time_series_data.columns:
-                    if previous_15_days_data[anchor_keyword].mean() > 0:
-                        anchor_growth = (
-                            last_15_days_data[anchor_keyword].mean()
-                            - previous_15_days_data[anchor_keyword].mean()
-                        ) / previous_15_days_data[anchor_keyword].mean()
-                    elif (
-                        last_15_days_data[anchor_keyword].mean() > 0
-                    ):  # 이전 평균이 0인데 현재 값이 있으면 100% 성장
-                        anchor_growth = 1.0
-                    anchor_interest = time_series_data[anchor_keyword].iloc[-1]
-                    if pd.isna(anchor_interest):
-                        anchor_interest = 0.0
-
-                result_for_group.append(
-                    {
-                        "keyword": keyword_in_group,
-                        "trend_score_raw_growth": raw_growth,
-                        "trend_score_current_interest": current_interest,
-                        "anchor_growth": anchor_growth,
-                        "anchor_interest": anchor_interest,
-                    }
-                )
-            else:
-                logging.warning(
-                    f"키워드 '{keyword_in_group}'에 대한 데이터 컬럼을 찾을 수 없습니다. 건너뜁니다."
-                )
-
-        return result_for_group
+
+# get_trends_data_for_group 의 async 버전
+# pytrends 는 requests 기반이라 요청만 스레드에서 실행하고, 요청 사이 대기와 재시도 대기는 asyncio.sleep
+async def get_trends_data_for_group_async(
+    keywords_in_group: list,
+    timeframe: str = "today 3-m",
+    geo: str = "KR",
+    anchor_keyword: str = DEFAULT_ANCHOR_KEYWORD,
+    outcomes: list = None,
+) -> list:
+    logging.info(f"Google Trends 데이터 처리 시작 (async): 그룹 {keywords_in_group}")
+    # outcomes 를 넘기면 {"rate_limited": 429 횟수, "succeeded": 성공 여부} 를 추가
+    outcome = {"rate_limited": 0, "succeeded": False}
+    if outcomes is not None:
+        outcomes.append(outcome)
+
+    pytrends_connector = TrendReq(hl="ko-KR", tz=540)
+    pd.set_option("future.no_silent_downcasting", True)
+
+    @retry(
+        wait=wait_exponential(multiplier=1, min=120, max=600),
+        stop=stop_after_attempt(3),
+        retry=retry_if_exception_type(
+            (RequestException, ResponseError, TooManyRequestsError)
+        ),
+        before_sleep=retry_log,
+    )
+    async def _fetch_trend_data_with_retry():
+        logging.info(f"Google Trends API 요청 중: {keywords_in_group}")
+        try:
+            await asyncio.to_thread(
+                pytrends_connector.build_payload,
+                keywords_in_group,
+                cat=0,
+                timeframe=timeframe,
+                geo=geo,
+                gprop="",
+            )
+            await random_sleep_async(30, 60)
+            time_series_data = await asyncio.to_thread(
+                pytrends_connector.interest_over_time
+            )
+        except Exception as e:
+            outcome["rate_limited"] += is_rate_limited_error(e)
+            raise
+        await asyncio.to_thread(
+            _archive_trend_frame, time_series_data, keywords_in_group, timeframe, geo
+        )
+        return time_series_data
+
+    try:
+        time_series_data = await _fetch_trend_data_with_retry()
+        outcome["succeeded"] = True
+
+        return summarize_trend_frame(
+            time_series_data, keywords_in_group, anchor_keyword
+        )
 
     except RequestException as e:
         logging.exception(f"그룹 '{keywords_in_group}'에 대한 요청 오류: {e}")
@@ -0,0 +1,298 @@
+import logging
+import datetime
+import hashlib
+import json
+import os
+
+from data_sources.storage_backend import get_default_backend
+
+# Google Trends 수집 계획: 국가별 키워드 변형(한글/영문/주요 도시) x 대상(geo, timeframe)
+# 을 중복 없이 펼쳐 4개씩 묶은 요청 목록. 요청 예산을 넘는 부분은 실행마다 돌아가며 미룬다
+PLAN_CONFIG_FILE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "config", "google_trends_plan.json"
+)
+MASTER_MAP_FILE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "config", "master_country_crawler.json"
+)
+FLIGHT_DESTINATIONS_FILE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "config", "flight_destinations.json"
+)
+
+# 트렌드 파이프라인 전용 컨테이너 (수집 계획 캐시)
+GOOGLE_TRENDS_CONTAINER_NAME = "google-trends-data"
+PLAN_CACHE_PATH = "google_trends_plan/latest.json"
+
+DEFAULT_ANCHOR_KEYWORD = "해외여행"
+DEFAULT_PLAN_CONFIG = {
+    "batch_size": 4,
+    "request_budget": 15,
+    "message_spacing_seconds": 0,
+    "max_cities_per_country": 0,
+    "keyword_templates": {"kor": "{google_trend_keyword_kor}"},
+    "targets": [
+        {
+            "name": "kr_kor_3m",
+            "geo": "KR",
+            "timeframe": "today 3-m",
+            "variants": ["kor"],
+            "anchor_keyword": DEFAULT_ANCHOR_KEYWORD,
+            "primary": True,
+        }
+    ],
+}
+
+# 요청 1건 예상 소요 시간 (build_payload 후 30~60초 대기 + 응답)
+ESTIMATED_SECONDS_PER_REQUEST = 50
+# 큐 메시지 visibility timeout 최대값 (7일)
+MAX_MESSAGE_DELAY_SECONDS = 7 * 24 * 3600
+
+
+def get_google_trends_backend():
+    return get_default_backend(GOOGLE_TRENDS_CONTAINER_NAME)
+
+
+def _load_json(path: str, default):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        logging.warning(f"{path} not found. Using defaults.")
+        return default
+
+
+def load_plan_config(path: str = PLAN_CONFIG_FILE_PATH) -> dict:
+    config = _load_json(path, DEFAULT_PLAN_CONFIG)
+    templates = config.get("keyword_templates", {})
+    for target in config.get("targets", []):
+        unknown = [v for v in target.get("variants", []) if v not in templates]
+        if unknown:
+            raise ValueError(
+                f"Unknown keyword variants for target {target.get('name')}: {unknown}"
+            )
+    if not any(target.get("primary") for target in config.get("targets", [])):
+        raise ValueError("Google Trends plan needs at least one primary target.")
+    return config
+
+
+def _normalize_keyword(keyword: str) -> str:
+    return " ".join(keyword.lower().split())
+
+
+def _city_name(destination: str) -> str:
+    # "City:buenos_aires_ar" -> "buenos aires"
+    legacy_id = destination.split(":", 1)[-1]
+    return legacy_id.rsplit("_", 1)[0].replace("_", " ")
+
+
+def expand_country_keywords(
+    country_info: dict, variants: list, templates: dict, cities: list
+) -> list:
+    """국가 하나의 키워드 변형 [(변형 이름, 키워드)] (값이 없는 변형은 제외)"""
+    keywords = []
+    for variant in variants:
+        template = templates[variant]
+        if "{city}" in template:
+            keywords.extend((variant, template.format(city=city)) for city in cities)
+            continue
+        try:
+            keyword = template.format(**country_info)
+        except KeyError:
+            continue
+        keywords.append((variant, keyword))
+    return [(variant, keyword.strip()) for variant, keyword in keywords if keyword]
+
+
+def build_collection_plan(
+    config: dict, master_map: dict, destinations: dict, rotation: int = 0
+) -> dict:
+    """
+    수집 계획. requests 는 이번 실행에 보낼 요청(큐 메시지 하나 = pytrends 요청 하나),
+    deferred 는 예산을 넘어 이번에 미룬 요청의 key.
+    주 대상(primary) 요청은 항상 포함하고, 나머지는 rotation 만큼 밀어서 예산만큼 채운다.
+    """
+    batch_size = config.get("batch_size", 4)
+    templates = config.get("keyword_templates", {})
+    max_cities = config.get("max_cities_per_country", 0)
+
+    seen = set()
+    duplicates = 0
+    keyword_count = 0
+    batches = []
+    for target in config.get("targets", []):
+        geo, timeframe = target.get("geo", "KR"), target.get("timeframe", "today 3-m")
+        anchor_keyword = target.get("anchor_keyword", DEFAULT_ANCHOR_KEYWORD)
+        keyword_countries = {}
+        for country_code_3, country_info in master_map.items():
+            cities = [
+                _city_name(d)
+                for d in destinations.get(country_info.get("country_code_2"), [])
+            ][:max_cities]
+            for _, keyword in expand_country_keywords(
+                country_info, target.get("variants", []), templates, cities
+            ):
+                # 같은 geo/timeframe 에서 대소문자/공백만 다른 키워드는 한 번만 요청
+                dedupe_key = (geo, timeframe, _normalize_keyword(keyword))
+                if dedupe_key in seen or keyword == anchor_keyword:
+                    duplicates += 1
+                    continue
+                seen.add(dedupe_key)
+                keyword_countries[keyword] = country_code_3
+
+        keywords = list(keyword_countries)
+        keyword_count += len(keywords)
+        for i in range(0, len(keywords), batch_size):
+            chunk = keywords[i : i + batch_size]
+            batches.append(
+                {
+                    "key": f"{geo or 'WORLD'}|{timeframe}|{','.join(sorted(chunk))}",
+                    "target": target.get("name"),
+                    "primary": bool(target.get("primary")),
+                    "geo": geo,
+                    "timeframe": timeframe,
+                    "anchor_keyword": anchor_keyword,
+                    "keywords": chunk,
+                    "keyword_countries": {k: keyword_countries[k] for k in chunk},
+                }
+            )
+
+    primary = [b for b in batches if b["primary"]]
+    secondary = [b for b in batches if not b["primary"]]
+    budget = max(config.get("request_budget", len(batches)), len(primary))
+    secondary_slots = budget - len(primary)
+    if secondary and secondary_slots < len(secondary):
+        offset = (rotation * secondary_slots) % len(secondary)
+        secondary = secondary[offset:] + secondary[:offset]
+    scheduled = primary + secondary[:secondary_slots]
+    deferred = [b["key"] for b in secondary[secondary_slots:]]
+
+    spacing = config.get("message_spacing_seconds", 0)
+    for index, request in enumerate(scheduled):
+        request["delay_seconds"] = min(index * spacing, MAX_MESSAGE_DELAY_SECONDS)
+
+    plan_id = hashlib.sha256(
+        "\n".join(sorted(b["key"] for b in batches)).encode("utf-8")
+    ).hexdigest()[:16]
+    return {
+        "plan_id": plan_id,
+        "rotation": rotation,
+        "requests": scheduled,
+        "deferred": deferred,
+        "budget": {
+            "keywords": keyword_count,
+            "duplicates_removed": duplicates,
+            "requests_total": len(batches),
+            "request_budget": budget,
+            "requests_scheduled": len(scheduled),
+            "requests_deferred": len(deferred),
+            "estimated_request_seconds": len(scheduled) * ESTIMATED_SECONDS_PER_REQUEST,
+            "schedule_span_seconds": scheduled[-1]["delay_seconds"] if scheduled else 0,
+        },
+    }
+
+
+def diff_plans(previous: dict, current: dict) -> dict:
+    """이전/현재 계획의 요청 key 비교 (보낸 요청 + 미룬 요청 전체 기준)"""
+
+    def _keys(plan):
+        if not plan:
+            return set()
+        return {r["key"] for r in plan.get("requests", [])} | set(
+            plan.get("deferred", [])
+        )
+
+    previous_keys, current_keys = _keys(previous), _keys(current)
+    return {
+        "added": sorted(current_keys - previous_keys),
+        "removed": sorted(previous_keys - current_keys),
+        "unchanged": len(current_keys & previous_keys),
+    }
+
+
+def load_cached_plan(backend, path: str = PLAN_CACHE_PATH):
+    data = backend.read(path)
+    if data is None:
+        return None
+    try:
+        return json.loads(data)
+    except ValueError as e:
+        logging.warning(f"Invalid cached Google Trends plan at {path}: {e}")
+        return None
+
+
+def save_plan(backend, plan: dict, path: str = PLAN_CACHE_PATH) -> str:
+    return backend.write(path, json.dumps(plan, ensure_ascii=False).encode("utf-8"))
+
+
+def get_collection_plan(backend=None, now: datetime.datetime = None) -> dict:
+    """
+    설정/국가 맵으로 이번 실행의 계획을 만들고, 캐시된 이전 계획과 비교해 로그를 남긴 뒤 저장.
+    같은 계획이 이어지면 rotation 을 하나씩 올려 미룬 요청이 다음 실행에 먼저 들어가게 한다.
+    """
+    backend = backend or get_google_trends_backend()
+    config = load_plan_config()
+    master_map = _load_json(MASTER_MAP_FILE_PATH, {})
+    destinations = _load_json(FLIGHT_DESTINATIONS_FILE_PATH, {}).get("destinations", {})
+    previous = load_cached_plan(backend)
+    plan = build_collection_plan(config, master_map, destinations)
+    if previous and previous.get("plan_id") == plan["plan_id"]:
+        plan = build_collection_plan(
+            config,
+            master_map,
+            destinations,
+            rotation=previous.get("rotation", 0) + 1,
+        )
+    plan["created_at"] = (
+        now or datetime.datetime.now(datetime.timezone.utc)
+    ).isoformat(timespec="seconds")
+
+    diff = diff_plans(previous, plan)
+    logging.info(
+        f"Google Trends plan {plan['plan_id']} (rotation {plan['rotation']}): "
+        f"{plan['budget']}. Changes since last run: {len(diff['added'])} added, "
+        f"{len(diff['removed'])} removed, {diff['unchanged']} unchanged."
+    )
+    try:
+        save_plan(backend, plan)
+    except Exception as e:
+        logging.warning(f"Failed to cache Google Trends plan: {e}")
+    return plan
+
+
+def plan_request_message(request: dict, request_time: str) -> dict:
+    # googleTrendsProcessor 가 읽는 큐 메시지 (앵커 키워드를 마지막에 붙임)
+    return {
+        "keywords": request["keywords"] + [request["anchor_keyword"]],
+        "timeframe": request["timeframe"],
+        "geo": request["geo"],
+        "anchor_keyword": request["anchor_keyword"],
+        "keyword_countries": request["keyword_countries"],
+        "plan_target": request["target"],
+        "primary": request["primary"],
+        "request_time": request_time,
+    }
+
+
+# CLI로도 사용 가능하게 (계획/예산 확인용, 캐시는 건드리지 않음)
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Google Trends 수집 계획 미리보기")
+    parser.add_argument("--config", default=PLAN_CONFIG_FILE_PATH)
+    parser.add_argument("--rotation", type=int, default=0)
+    parser.add_argument("--show-requests", action="store_true")
+    args = parser.parse_args()
+
+    preview = build_collection_plan(
+        load_plan_config(args.config),
+        _load_json(MASTER_MAP_FILE_PATH, {}),
+        _load_json(FLIGHT_DESTINATIONS_FILE_PATH, {}).get("destinations", {}),
+        rotation=args.rotation,
+    )
+    print(json.dumps(preview["budget"], indent=2))
+    if args.show_requests:
+        for request in preview["requests"]:
+            print(
+                f"+{request['delay_seconds']:>6}s {request['target']:<14} "
+                f"{request['geo'] or 'WORLD':<5} {request['timeframe']:<10} "
+                f"{request['keywords']}"
+            )
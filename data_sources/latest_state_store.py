@@ -0,0 +1,434 @@
+import logging
+import datetime
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+from data_sources.destination_scoring import (
+    NON_COUNTRY_CODES,
+    SIGNAL_COLUMNS,
+    load_scoring_config,
+    score_signal_frame,
+)
+from data_sources.flight_price_merge import _get_code2_to_code3, merge_flight_frame
+from data_sources.flight_price_writer import destination_country_column, itinerary_rows
+from data_sources.storage_backend import local_output_dir
+
+# 국가(country_code_3)별 최신 상태를 프로세스 안에서 유지하는 SQLite 테이블
+# 각 파이프라인은 전송 직후 자기 열만 upsert 하고, 순위/조회는 이 테이블만 읽는다
+# (스케일 아웃된 인스턴스마다 따로 유지되는 뷰. 원본 이력은 Event Hub / Blob 에 있음)
+LATEST_STATE_DB_FILE_NAME = "latest_state.sqlite3"
+LATEST_STATE_TABLE = "country_latest_state"
+# 환율 파이프라인이 upsert 할 때 함께 쌓는 국가별 실시간 환율 이력 (보관 기간만큼)
+RATE_HISTORY_TABLE = "country_rate_history"
+RATE_HISTORY_RETENTION_DAYS = 30
+
+# 열 이름 -> SQLite 타입. 파이프라인별로 자기 열만 갱신한다
+STATE_COLUMNS = {
+    "country_code_3": "TEXT PRIMARY KEY",
+    "country_code_2": "TEXT",
+    "currency_code": "TEXT",
+    # 환율 파이프라인
+    "realtime_rate": "REAL",
+    "yearly_avg_rate": "REAL",
+    "exchange_rate_change_percent": "REAL",
+    "exchange_rate_score": "REAL",
+    "exchange_rate_is_partial": "INTEGER",
+    "exchange_rate_updated_at": "TEXT",
+    # 트렌드 파이프라인
+    "trend_keyword": "TEXT",
+    "final_trend_score": "REAL",
+    "trend_current_interest": "INTEGER",
+    "trend_updated_at": "TEXT",
+    # 항공권 파이프라인
+    "flight_segment_count": "INTEGER",
+    "flight_min_price": "REAL",
+    "flight_median_price": "REAL",
+    "flight_mean_price": "REAL",
+    "flight_price_score": "REAL",
+    "flight_updated_at": "TEXT",
+}
+
+PIPELINE_COLUMNS = {
+    "exchange_rate": (
+        "country_code_2",
+        "currency_code",
+        "realtime_rate",
+        "yearly_avg_rate",
+        "exchange_rate_change_percent",
+        "exchange_rate_score",
+        "exchange_rate_is_partial",
+        "exchange_rate_updated_at",
+    ),
+    "google_trends": (
+        "country_code_2",
+        "trend_keyword",
+        "final_trend_score",
+        "trend_current_interest",
+        "trend_updated_at",
+    ),
+    "flight_price": (
+        "country_code_2",
+        "flight_segment_count",
+        "flight_min_price",
+        "flight_median_price",
+        "flight_mean_price",
+        "flight_price_score",
+        "flight_updated_at",
+    ),
+}
+
+
+def default_latest_state_path() -> str:
+    # LatestStateDbPath 가 없으면 다른 로컬 출력과 같은 (쓰기 가능한) local_output 아래
+    return os.environ.get("LatestStateDbPath") or os.path.join(
+        local_output_dir(), LATEST_STATE_DB_FILE_NAME
+    )
+
+
+class LatestStateStore:
+    """
+    country_code_3 를 키로 하는 최신 상태 테이블 (SQLite, WAL).
+    upsert() 는 파이프라인 자기 열만 덮어써서 다른 파이프라인 값은 유지하고,
+    get() / get_many() / to_frame() 으로 단건/일괄 조회, ranking() 으로 현재 순위를 계산한다.
+    연결 하나를 잠금으로 보호하므로 여러 스레드(sync 트리거)와 이벤트 루프에서 같이 써도 된다.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or default_latest_state_path()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            columns = ", ".join(
+                f"{name} {kind}" for name, kind in STATE_COLUMNS.items()
+            )
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {LATEST_STATE_TABLE} ({columns})"
+            )
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {RATE_HISTORY_TABLE} ("
+                "country_code_3 TEXT NOT NULL, observed_at TEXT NOT NULL, "
+                "realtime_rate REAL, exchange_rate_score REAL, "
+                "PRIMARY KEY (country_code_3, observed_at))"
+            )
+        # 이 연결에서 커밋한 횟수 (다른 연결의 커밋은 PRAGMA data_version 으로 감지)
+        self._generation = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def upsert(self, pipeline: str, rows: list) -> int:
+        """
+        rows: country_code_3 와 PIPELINE_COLUMNS[pipeline] 열을 가진 dict 목록.
+        없는 국가는 추가하고, 있는 국가는 해당 파이프라인 열만 갱신한다. 반영한 행 수를 반환.
+        """
+        columns = PIPELINE_COLUMNS[pipeline]
+        values = [
+            (row["country_code_3"],) + tuple(row.get(c) for c in columns)
+            for row in rows
+            if row.get("country_code_3") not in NON_COUNTRY_CODES
+        ]
+        if not values:
+            return 0
+        # country_code_2 는 이미 값이 있으면 유지 (트렌드 'N/A' 등으로 덮어쓰지 않게)
+        assignments = ", ".join(
+            (
+                f"{c} = COALESCE({LATEST_STATE_TABLE}.{c}, excluded.{c})"
+                if c == "country_code_2"
+                else f"{c} = excluded.{c}"
+            )
+            for c in columns
+        )
+        sql = (
+            f"INSERT INTO {LATEST_STATE_TABLE} (country_code_3, {', '.join(columns)}) "
+            f"VALUES ({', '.join('?' * (len(columns) + 1))}) "
+            f"ON CONFLICT(country_code_3) DO UPDATE SET {assignments}"
+        )
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(sql, values)
+                if pipeline == "exchange_rate":
+                    self._append_rate_history(rows)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._generation += 1
+        return len(values)
+
+    def _append_rate_history(self, rows: list) -> None:
+        # 같은 조회 시각은 한 번만 (재전송 시 중복 방지) + 보관 기간이 지난 이력 삭제
+        self._conn.executemany(
+            f"INSERT OR IGNORE INTO {RATE_HISTORY_TABLE} "
+            "(country_code_3, observed_at, realtime_rate, exchange_rate_score) "
+            "VALUES (?, ?, ?, ?)",
+            [
+                (
+                    row["country_code_3"],
+                    row["exchange_rate_updated_at"],
+                    row.get("realtime_rate"),
+                    row.get("exchange_rate_score"),
+                )
+                for row in rows
+                if row.get("country_code_3") not in NON_COUNTRY_CODES
+                and row.get("exchange_rate_updated_at")
+                and row.get("realtime_rate") is not None
+            ],
+        )
+        cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(
+            days=RATE_HISTORY_RETENTION_DAYS
+        )
+        self._conn.execute(
+            f"DELETE FROM {RATE_HISTORY_TABLE} WHERE observed_at < ?",
+            (cutoff.isoformat(timespec="seconds"),),
+        )
+
+    def version(self) -> str:
+        """테이블 내용이 바뀌면 달라지는 값 (응답 캐시 무효화용)"""
+        with self._lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            return f"{data_version}.{self._generation}"
+
+    def get(self, country_code_3: str):
+        """국가 하나의 최신 상태 dict. 없으면 None"""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT * FROM {LATEST_STATE_TABLE} WHERE country_code_3 = ?",
+                (country_code_3,),
+            ).fetchone()
+        return dict(row) if row is not None else None
+
+    def get_many(self, country_codes: list = None) -> list:
+        """여러 국가(없으면 전체)의 최신 상태 dict 목록 (country_code_3 순)"""
+        sql = f"SELECT * FROM {LATEST_STATE_TABLE}"
+        params = ()
+        if country_codes is not None:
+            country_codes = list(country_codes)
+            if not country_codes:
+                return []
+            sql += f" WHERE country_code_3 IN ({', '.join('?' * len(country_codes))})"
+            params = tuple(country_codes)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY country_code_3", params)
+            return [dict(row) for row in rows.fetchall()]
+
+    def rate_history(self, country_code_3: str, since: str = None) -> list:
+        """국가의 실시간 환율 이력 [{observed_at, realtime_rate, exchange_rate_score}] (시간순)"""
+        sql = (
+            "SELECT observed_at, realtime_rate, exchange_rate_score "
+            f"FROM {RATE_HISTORY_TABLE} WHERE country_code_3 = ?"
+        )
+        params = (country_code_3,)
+        if since:
+            sql += " AND observed_at >= ?"
+            params += (since,)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY observed_at", params)
+            return [dict(row) for row in rows.fetchall()]
+
+    def to_frame(self) -> pd.DataFrame:
+        # 전체 테이블을 country_code_3 인덱스 DataFrame 으로 (타입은 STATE_COLUMNS 기준)
+        with self._lock:
+            cursor = self._conn.execute(f"SELECT * FROM {LATEST_STATE_TABLE}")
+            rows = cursor.fetchall()
+        frame = pd.DataFrame.from_records(
+            [tuple(row) for row in rows], columns=list(STATE_COLUMNS)
+        )
+        real_columns = [c for c, kind in STATE_COLUMNS.items() if kind == "REAL"]
+        integer_columns = [c for c, kind in STATE_COLUMNS.items() if kind == "INTEGER"]
+        frame = frame.astype(
+            {
+                **{c: "float64" for c in real_columns},
+                **{c: "Int64" for c in integer_columns},
+            }
+        )
+        return frame.set_index("country_code_3")
+
+    def ranking(
+        self, top: int = None, config: dict = None, engine=None
+    ) -> pd.DataFrame:
+        """
+        저장된 최신 신호로 destination_scoring 의 매력도 순위를 계산.
+        engine(DestinationScoringEngine)을 주면 지난 호출 이후 값이 바뀐 국가만 다시 점수화한다
+        (engine 은 호출하는 쪽이 유지하고, 같은 engine 을 여러 스레드에서 동시에 넘기지 않는다).
+        """
+        frame = self.to_frame()
+        if engine is not None:
+            engine.update_signals(frame[list(engine.signals)])
+            scored = engine.frame.drop(columns="updated_at").astype(
+                {"signal_count": "int64"}
+            )
+        else:
+            scored = score_signal_frame(
+                frame[list(SIGNAL_COLUMNS)], config or load_scoring_config()
+            )
+        scored = scored.join(frame[["country_code_2", "currency_code"]])
+        ranked = scored.dropna(subset=["attractiveness_score"]).sort_values(
+            "attractiveness_score", ascending=False, kind="stable"
+        )
+        ranked["rank"] = range(1, len(ranked) + 1)
+        return ranked.head(top) if top else ranked
+
+
+# --- 파이프라인 결과 -> 상태 행 ---
+
+
+def exchange_rate_state_rows(records: list) -> list:
+    # build_exchange_rate_records 결과 (국가별 dict)
+    return [
+        {
+            "country_code_3": record.get("country_code_3"),
+            "country_code_2": record.get("country_code_2"),
+            "currency_code": record.get("currency_code"),
+            "realtime_rate": record.get("realtime_rate"),
+            "yearly_avg_rate": record.get("yearly_avg_rate"),
+            "exchange_rate_change_percent": record.get("exchange_rate_change_percent"),
+            "exchange_rate_score": record.get("exchange_rate_score"),
+            "exchange_rate_is_partial": int(bool(record.get("is_partial"))),
+            "exchange_rate_updated_at": record.get("realtime_crawled_at_utc"),
+        }
+        for record in records
+    ]
+
+
+def trend_state_rows(events: list) -> list:
+    # build_trend_event 결과. 같은 국가는 마지막 키워드 값 사용
+    # 수집 계획의 보조 신호(영문/도시 키워드, 다른 geo/기간)는 최신 점수에 반영하지 않음
+    rows = {}
+    for event in events:
+        if not event.get("is_primary_signal", True):
+            continue
+        rows[event.get("country_code_3")] = {
+            "country_code_3": event.get("country_code_3"),
+            "country_code_2": event.get("country_code_2"),
+            "trend_keyword": event.get("keyword"),
+            "final_trend_score": event.get("final_trend_score"),
+            "trend_current_interest": event.get("trend_score_current_interest"),
+            "trend_updated_at": event.get("crawled_at_kst"),
+        }
+    return list(rows.values())
+
+
+def flight_price_state_rows(
+    flight_df: pd.DataFrame,
+    partition_summaries: list,
+    avg_price_index: pd.Series,
+    collected_at: datetime.datetime,
+) -> list:
+    """
+    write_flight_prices_parquet 의 국가별 요약 + 누적 평균가 대비 점수(-1/0/+1 의 국가 평균).
+    avg_price_index 는 이번 배치를 반영하기 전 통계를 넘겨야 한다.
+    """
+    code2_to_code3 = _get_code2_to_code3()
+    scores = pd.Series(dtype="float64")
+    if not flight_df.empty and len(avg_price_index):
+        # itinerary 당 한 번, 최종 도착 공항/월의 평균가와 비교하고 조회 목적지 국가로 묶음
+        # (경유지로만 내리는 국가에는 점수를 넣지 않음)
+        merged = merge_flight_frame(
+            itinerary_rows(flight_df, keep="last"),
+            avg_price_index,
+            pd.Series(dtype="string"),
+        )
+        # 비교할 평균가가 없는 구간은 점수에서 제외
+        merged = merged[merged["평균가격"].notna()]
+        destination = merged[destination_country_column(merged)].astype("string")
+        scores = (
+            merged["점수"]
+            .groupby(destination.map(code2_to_code3), observed=True)
+            .mean()
+        )
+
+    updated_at = collected_at.isoformat(timespec="seconds")
+    rows = []
+    for summary in partition_summaries:
+        country_code_3 = code2_to_code3.get(summary["destination_country_code_2"])
+        if country_code_3 is None:
+            continue
+        score = scores.get(country_code_3)
+        rows.append(
+            {
+                "country_code_3": country_code_3,
+                "country_code_2": summary["destination_country_code_2"],
+                "flight_segment_count": summary["segment_count"],
+                "flight_min_price": summary["min_price"],
+                "flight_median_price": summary["median_price"],
+                "flight_mean_price": summary["mean_price"],
+                "flight_price_score": None if pd.isna(score) else float(score),
+                "flight_updated_at": updated_at,
+            }
+        )
+    return rows
+
+
+# --- 프로세스 단위 기본 저장소 ---
+_DEFAULT_STORE = None
+_DEFAULT_STORE_LOCK = threading.Lock()
+
+
+def get_latest_state_store():
+    global _DEFAULT_STORE
+    if _DEFAULT_STORE is None:
+        with _DEFAULT_STORE_LOCK:
+            if _DEFAULT_STORE is None:
+                _DEFAULT_STORE = LatestStateStore()
+    return _DEFAULT_STORE
+
+
+def upsert_latest_state(pipeline: str, rows: list) -> int:
+    # 상태 갱신 실패가 전송을 막지 않도록 경고만 남김
+    try:
+        upserted = get_latest_state_store().upsert(pipeline, rows)
+        logging.info(f"Upserted {upserted} {pipeline} rows into latest state store.")
+        return upserted
+    except Exception as e:
+        logging.warning(f"Failed to upsert {pipeline} latest state: {e}")
+        return 0
+
+
+# CLI로도 사용 가능하게
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="국가별 최신 상태 / 현재 순위 조회")
+    parser.add_argument(
+        "--db", default=None, help="SQLite 경로 (기본: LatestStateDbPath)"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    rank_parser = subparsers.add_parser("rank", help="현재 매력도 순위")
+    rank_parser.add_argument("--top", type=int, default=20)
+    get_parser = subparsers.add_parser("get", help="국가별 최신 상태")
+    get_parser.add_argument("country_codes", nargs="+", help="country_code_3")
+    args = parser.parse_args()
+
+    store = LatestStateStore(args.db)
+    started = time.perf_counter()
+    if args.command == "rank":
+        result = store.ranking(top=args.top)[
+            [
+                "rank",
+                "attractiveness_score",
+                "signal_count",
+                *SIGNAL_COLUMNS,
+            ]
+        ]
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with pd.option_context("display.width", 160, "display.max_columns", None):
+            print(result.round(2))
+    else:
+        result = store.get_many(args.country_codes)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        for row in result:
+            print(row)
+    print(f"({elapsed_ms:.1f} ms)")
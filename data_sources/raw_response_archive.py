@@ -0,0 +1,242 @@
+import logging
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import threading
+import uuid
+
+from data_sources.storage_backend import get_default_backend
+
+# 원본 응답 아카이브 전용 컨테이너
+RAW_ARCHIVE_CONTAINER_NAME = "raw-response-archive"
+
+# 본문: 내용 해시로 저장 (같은 응답은 한 번만 저장)
+#   raw_archive/objects/ab/abcdef....gz
+# 색인: 함수 호출 단위 JSON Lines (source, inquiry, fetched_at -> sha256)
+#   raw_archive/index/source=hana_exchange_rate/date=2025-07-18/093000_123456-<id>.jsonl
+RAW_OBJECT_PREFIX = "raw_archive/objects"
+RAW_INDEX_PREFIX = "raw_archive/index"
+
+# 압축 코덱 -> 확장자. zstd 는 zstandard 패키지가 있을 때만 사용
+CODEC_EXTENSIONS = {"gzip": "gz", "zstd": "zst"}
+# 웜 인스턴스에서 이미 저장을 확인한 해시를 기억하는 최대 개수
+MAX_KNOWN_HASHES = 100_000
+
+KST = datetime.timezone(datetime.timedelta(hours=9))
+
+
+def raw_archive_enabled() -> bool:
+    return os.environ.get("DisableRawResponseArchive", "").lower() not in (
+        "1",
+        "true",
+    )
+
+
+def _default_codec() -> str:
+    codec = os.environ.get("RawResponseArchiveCodec", "gzip").lower()
+    if codec == "zstd":
+        try:
+            import zstandard  # noqa: F401
+        except ImportError:
+            logging.warning("zstandard is not installed. Archiving raw bodies as gzip.")
+            return "gzip"
+    return codec if codec in CODEC_EXTENSIONS else "gzip"
+
+
+def _compress(codec: str, body: bytes) -> bytes:
+    if codec == "zstd":
+        import zstandard
+
+        return zstandard.ZstdCompressor(level=10).compress(body)
+    # mtime=0 으로 같은 본문이면 압축 결과도 같게
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        import zstandard
+
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def object_path(sha256: str, codec: str = "gzip") -> str:
+    return f"{RAW_OBJECT_PREFIX}/{sha256[:2]}/{sha256}.{CODEC_EXTENSIONS[codec]}"
+
+
+class RawResponseArchive:
+    """
+    업스트림 원본 응답을 내용 해시 기준으로 압축 저장하고, 조회 단위 색인을 남기는 싱크.
+    본문은 put() 시점에 바로 저장하고, 색인 항목은 모아 두었다가 flush() 에서 한 파일로 쓴다.
+    여러 스레드(헤지 조회)에서 동시에 호출해도 된다.
+    """
+
+    def __init__(self, backend, codec: str = None):
+        self.backend = backend
+        self.codec = codec or _default_codec()
+        self._known_hashes = set()
+        self._pending_index = []
+        self._lock = threading.Lock()
+
+    def put(
+        self,
+        source: str,
+        inquiry: str,
+        body: bytes,
+        fetched_at: datetime.datetime = None,
+        status: int = None,
+        request: dict = None,
+    ) -> str:
+        """본문을 저장(이미 있으면 건너뜀)하고 색인 항목을 쌓은 뒤 sha256 을 반환"""
+        fetched_at = fetched_at or datetime.datetime.now(KST)
+        sha256 = hashlib.sha256(body).hexdigest()
+        path = object_path(sha256, self.codec)
+
+        with self._lock:
+            known = sha256 in self._known_hashes
+        stored = False
+        if not known:
+            if not self.backend.exists(path):
+                self.backend.write(path, _compress(self.codec, body))
+                stored = True
+            with self._lock:
+                if len(self._known_hashes) >= MAX_KNOWN_HASHES:
+                    self._known_hashes.clear()
+                self._known_hashes.add(sha256)
+
+        entry = {
+            "source": source,
+            "inquiry": inquiry,
+            "fetched_at": fetched_at.isoformat(timespec="milliseconds"),
+            "sha256": sha256,
+            "codec": self.codec,
+            "bytes": len(body),
+            "status": status,
+            "request": request,
+            "new_object": stored,
+        }
+        with self._lock:
+            self._pending_index.append(entry)
+        return sha256
+
+    def flush(self) -> list:
+        """쌓인 색인 항목을 (source, 날짜) 별 JSON Lines 파일로 쓰고 경로 목록을 반환"""
+        with self._lock:
+            entries, self._pending_index = self._pending_index, []
+        if not entries:
+            return []
+
+        grouped = {}
+        for entry in entries:
+            fetched_at = datetime.datetime.fromisoformat(entry["fetched_at"])
+            key = (entry["source"], fetched_at.astimezone(KST).date().isoformat())
+            grouped.setdefault(key, []).append(entry)
+
+        written = []
+        flushed_at = datetime.datetime.now(KST).strftime("%H%M%S_%f")
+        for (source, date), group in sorted(grouped.items()):
+            path = (
+                f"{RAW_INDEX_PREFIX}/source={source}/date={date}/"
+                f"{flushed_at}-{uuid.uuid4().hex[:8]}.jsonl"
+            )
+            data = "\n".join(json.dumps(e, ensure_ascii=False) for e in group) + "\n"
+            written.append(self.backend.write(path, data.encode("utf-8")))
+
+        new_objects = sum(1 for e in entries if e["new_object"])
+        logging.info(
+            f"Archived {len(entries)} raw responses ({new_objects} new bodies, "
+            f"{len(entries) - new_objects} deduplicated) in {len(written)} index files."
+        )
+        return written
+
+    def get(self, sha256: str, codec: str = None) -> bytes:
+        """해시로 원본 본문을 읽는다. 없으면 None"""
+        codecs = (
+            [codec]
+            if codec
+            else [self.codec] + [c for c in CODEC_EXTENSIONS if c != self.codec]
+        )
+        for candidate in codecs:
+            data = self.backend.read(object_path(sha256, candidate))
+            if data is not None:
+                return _decompress(candidate, data)
+        return None
+
+    def iter_index(self, source: str, date: str):
+        """source 의 해당 날짜(YYYY-MM-DD, KST) 색인 항목을 fetched_at 순으로"""
+        entries = []
+        for path in self.backend.list_paths(
+            f"{RAW_INDEX_PREFIX}/source={source}/date={date}/"
+        ):
+            data = self.backend.read(path)
+            if not data:
+                continue
+            entries.extend(
+                json.loads(line) for line in data.decode("utf-8").splitlines() if line
+            )
+        return iter(sorted(entries, key=lambda e: e["fetched_at"]))
+
+    def iter_range(
+        self, source: str, since: datetime.datetime, until: datetime.datetime = None
+    ):
+        """source 의 since <= fetched_at < until 색인 항목을 fetched_at 순으로 (날짜 폴더 단위로 읽음)"""
+        # 시간대가 없는 값은 KST 로 취급
+        since = since if since.tzinfo else since.replace(tzinfo=KST)
+        until = until or datetime.datetime.now(KST)
+        until = until if until.tzinfo else until.replace(tzinfo=KST)
+        day = since.astimezone(KST).date()
+        last_day = until.astimezone(KST).date()
+        while day <= last_day:
+            for entry in self.iter_index(source, day.isoformat()):
+                fetched_at = datetime.datetime.fromisoformat(entry["fetched_at"])
+                if since <= fetched_at < until:
+                    yield entry
+            day += datetime.timedelta(days=1)
+
+
+# --- 프로세스 단위 기본 아카이브 (웜 인스턴스에서 저장 확인한 해시를 재사용) ---
+_DEFAULT_ARCHIVE = None
+_DEFAULT_ARCHIVE_LOCK = threading.Lock()
+
+
+def get_raw_archive():
+    global _DEFAULT_ARCHIVE
+    if _DEFAULT_ARCHIVE is None:
+        with _DEFAULT_ARCHIVE_LOCK:
+            if _DEFAULT_ARCHIVE is None:
+                _DEFAULT_ARCHIVE = RawResponseArchive(
+                    get_default_backend(RAW_ARCHIVE_CONTAINER_NAME)
+                )
+    return _DEFAULT_ARCHIVE
+
+
+def archive_raw_response(
+    source: str,
+    inquiry: str,
+    body: bytes,
+    status: int = None,
+    request: dict = None,
+    fetched_at: datetime.datetime = None,
+):
+    # 아카이브 실패가 수집을 막지 않도록 경고만 남김
+    if not raw_archive_enabled():
+        return None
+    try:
+        return get_raw_archive().put(
+            source, inquiry, body, fetched_at=fetched_at, status=status, request=request
+        )
+    except Exception as e:
+        logging.warning(f"Failed to archive raw {source} response ({inquiry}): {e}")
+        return None
+
+
+def flush_raw_archive() -> list:
+    if not raw_archive_enabled() or _DEFAULT_ARCHIVE is None:
+        return []
+    try:
+        return _DEFAULT_ARCHIVE.flush()
+    except Exception as e:
+        logging.warning(f"Failed to write raw response archive index: {e}")
+        return []
@@ -1,4 +1,9 @@
 import logging
+import asyncio
+import os
+import random
+import time
+import aiohttp
 from tenacity import (
     retry,
     wait_exponential,
@@ -52,3 +57,27 @@ exchange_rate_api_retry = create_retry_decorator(
     max_attempts=3,  # 3회
     retry_exceptions=(RequestException,),  # RequestException만 재시도
 )
+
+# 환율 API용 데코레이터 (async 트리거의 aiohttp 요청용)
+# tenacity 는 async 함수에 붙이면 asyncio.sleep 으로 대기하므로 이벤트 루프를 막지 않음
+exchange_rate_api_retry_async = create_retry_decorator(
+    min_wait_seconds=20,
+    max_wait_seconds=120,
+    max_attempts=3,
+    retry_exceptions=(aiohttp.ClientError, asyncio.TimeoutError),
+)
+
+
+# 요청 사이 랜덤 지연 헬퍼
+# DisableCrawlerRandomSleep 환경 변수가 true 이면 지연을 건너뜀 (오프라인 벤치마크/리플레이용)
+def random_sleep(min_seconds: float, max_seconds: float) -> None:
+    if os.environ.get("DisableCrawlerRandomSleep", "").lower() in ("1", "true"):
+        return
+    time.sleep(random.uniform(min_seconds, max_seconds))
+
+
+# random_sleep 의 async 버전 (대기 중에도 같은 워커에서 다른 호출을 처리)
+async def random_sleep_async(min_seconds: float, max_seconds: float) -> None:
+    if os.environ.get("DisableCrawlerRandomSleep", "").lower() in ("1", "true"):
+        return
+    await asyncio.sleep(random.uniform(min_seconds, max_seconds))
@@ -0,0 +1,183 @@
+import logging
+import gzip
+import hashlib
+import json
+import math
+import threading
+from collections import OrderedDict
+
+from data_sources.destination_scoring import (
+    SIGNAL_COLUMNS,
+    DestinationScoringEngine,
+    load_scoring_config,
+)
+from data_sources.latest_state_store import get_latest_state_store
+
+# HTTP 조회 응답 캐시: 최신 상태 저장소가 바뀔 때까지 직렬화된 본문(JSON / gzip)과 ETag 를 재사용
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+# 이보다 작은 본문은 gzip 하지 않음 (헤더 비용이 더 큼)
+GZIP_MIN_BYTES = 1024
+# 캐시할 응답 수 상한 (페이지/국가/이력 조합별 1개)
+MAX_CACHED_RESPONSES = 512
+
+
+class CachedResponse:
+    __slots__ = ("body", "gzip_body", "etag")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        # mtime=0 으로 같은 본문이면 압축 결과도 같게
+        self.gzip_body = (
+            gzip.compress(body, compresslevel=6, mtime=0)
+            if len(body) >= GZIP_MIN_BYTES
+            else None
+        )
+        # 내용 기준 ETag: 다른 국가만 바뀐 경우 이 응답의 ETag 는 그대로 (304 유지)
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:20]}"'
+
+
+def _clean(value):
+    # NaN / pandas 결측 -> null, numpy 숫자 -> 파이썬 숫자
+    if value is None:
+        return None
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float):
+        return None if math.isnan(value) else round(value, 4)
+    return value
+
+
+class ScoreQueryCache:
+    """
+    LatestStateStore 위의 읽기 전용 응답 캐시.
+    저장소 version() 이 바뀌면(크롤러가 upsert 하면) 순위와 응답을 모두 버리고 다음 요청에서 다시 만든다.
+    순위는 DestinationScoringEngine 에 누적해서, 신호가 바뀐 국가만 다시 점수화한다.
+    """
+
+    def __init__(self, store=None, config: dict = None):
+        self.store = store or get_latest_state_store()
+        self.config = config or load_scoring_config()
+        self._lock = threading.Lock()
+        self._engine = DestinationScoringEngine(self.config)
+        self._engine_lock = threading.Lock()
+        self._version = None
+        self._ranking = None
+        self._responses = OrderedDict()
+
+    def _sync_version(self) -> None:
+        version = self.store.version()
+        with self._lock:
+            if version != self._version:
+                self._version = version
+                self._ranking = None
+                self._responses.clear()
+
+    def _ranking_frame(self):
+        with self._lock:
+            ranking = self._ranking
+        if ranking is None:
+            with self._engine_lock:
+                ranking = self.store.ranking(config=self.config, engine=self._engine)
+            with self._lock:
+                self._ranking = ranking
+        return ranking
+
+    def _cached(self, key: tuple, builder) -> CachedResponse:
+        self._sync_version()
+        with self._lock:
+            response = self._responses.get(key)
+            if response is not None:
+                self._responses.move_to_end(key)
+                return response
+        payload = builder()
+        response = CachedResponse(
+            json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode(
+                "utf-8"
+            )
+        )
+        with self._lock:
+            self._responses[key] = response
+            while len(self._responses) > MAX_CACHED_RESPONSES:
+                self._responses.popitem(last=False)
+        return response
+
+    def _score_item(self, country_code_3: str, row) -> dict:
+        return {
+            "rank": _clean(row["rank"]),
+            "country_code_3": country_code_3,
+            "country_code_2": _clean(row["country_code_2"]),
+            "currency_code": _clean(row["currency_code"]),
+            "attractiveness_score": _clean(row["attractiveness_score"]),
+            "signal_count": _clean(row["signal_count"]),
+            **{signal: _clean(row[signal]) for signal in SIGNAL_COLUMNS},
+        }
+
+    def scores_page(self, page: int = 1, page_size: int = DEFAULT_PAGE_SIZE):
+        """매력도 순위의 한 페이지 (page 는 1부터)"""
+
+        def _build():
+            ranking = self._ranking_frame()
+            total = len(ranking)
+            total_pages = max(1, math.ceil(total / page_size))
+            start = (page - 1) * page_size
+            rows = ranking.iloc[start : start + page_size]
+            return {
+                "page": page,
+                "page_size": page_size,
+                "total": total,
+                "total_pages": total_pages,
+                "next_page": page + 1 if page < total_pages else None,
+                "items": [
+                    self._score_item(country_code_3, row)
+                    for country_code_3, row in rows.iterrows()
+                ],
+            }
+
+        return self._cached(("scores", page, page_size), _build)
+
+    def country_score(self, country_code_3: str):
+        """국가 하나의 점수 + 최신 상태. 저장소에 없는 국가면 None"""
+        state = self.store.get(country_code_3)
+        if state is None:
+            return None
+
+        def _build():
+            ranking = self._ranking_frame()
+            score = (
+                self._score_item(country_code_3, ranking.loc[country_code_3])
+                if country_code_3 in ranking.index
+                else None
+            )
+            return {"score": score, "state": {k: _clean(v) for k, v in state.items()}}
+
+        return self._cached(("country", country_code_3), _build)
+
+    def rate_history(self, country_code_3: str, since: str = None):
+        def _build():
+            history = self.store.rate_history(country_code_3, since)
+            return {
+                "country_code_3": country_code_3,
+                "since": since,
+                "count": len(history),
+                "items": history,
+            }
+
+        return self._cached(("rates", country_code_3, since), _build)
+
+
+# --- 프로세스 단위 기본 캐시 (크롤러와 같은 워커의 최신 상태 저장소를 읽음) ---
+_DEFAULT_CACHE = None
+_DEFAULT_CACHE_LOCK = threading.Lock()
+
+
+def get_score_query_cache():
+    global _DEFAULT_CACHE
+    if _DEFAULT_CACHE is None:
+        with _DEFAULT_CACHE_LOCK:
+            if _DEFAULT_CACHE is None:
+                _DEFAULT_CACHE = ScoreQueryCache()
+                logging.info(
+                    f"Score query cache attached to {_DEFAULT_CACHE.store.path}."
+                )
+    return _DEFAULT_CACHE
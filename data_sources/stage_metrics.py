@@ -0,0 +1,161 @@
+import bisect
+import logging
+import math
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+# 단계 지연 히스토그램 버킷: 0.1ms ~ 약 10분, 1.25배 간격 (상대 오차 ~12%)
+# 버킷 수가 고정이라 웜 인스턴스에서 호출이 누적되어도 단계당 메모리는 일정하다
+BUCKET_GROWTH_FACTOR = 1.25
+BUCKET_MIN_MS = 0.1
+BUCKET_MAX_MS = 600_000.0
+LATENCY_BUCKET_BOUNDS_MS = tuple(
+    BUCKET_MIN_MS * BUCKET_GROWTH_FACTOR**i
+    for i in range(
+        int(math.log(BUCKET_MAX_MS / BUCKET_MIN_MS, BUCKET_GROWTH_FACTOR)) + 2
+    )
+)
+
+# 행 단위 디버그 로그 샘플링 비율 (0 ~ 1). 기본 1%
+DEBUG_LOG_SAMPLE_RATE = float(os.environ.get("StageDebugLogSampleRate", "0.01"))
+
+
+class StageHistogram:
+    """단계 하나의 지연 분포: 고정 버킷 카운트 + 건수/합계/최소/최대/오류 수."""
+
+    __slots__ = ("counts", "count", "total_ms", "min_ms", "max_ms", "errors")
+
+    def __init__(self):
+        # 마지막 칸은 BUCKET_MAX_MS 초과분
+        self.counts = [0] * (len(LATENCY_BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = math.inf
+        self.max_ms = 0.0
+        self.errors = 0
+
+    def observe(self, elapsed_ms: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKET_BOUNDS_MS, elapsed_ms)] += 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.min_ms = min(self.min_ms, elapsed_ms)
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def percentile(self, q: float):
+        """버킷 안에서 선형 보간한 근사 분위수 (ms). 관측값이 없으면 None"""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count == 0:
+                continue
+            if seen + bucket_count >= rank:
+                lower = LATENCY_BUCKET_BOUNDS_MS[index - 1] if index > 0 else 0.0
+                upper = (
+                    LATENCY_BUCKET_BOUNDS_MS[index]
+                    if index < len(LATENCY_BUCKET_BOUNDS_MS)
+                    else self.max_ms
+                )
+                estimate = lower + (upper - lower) * (rank - seen) / bucket_count
+                # 버킷 경계 때문에 실제 관측 범위를 벗어나지 않도록 보정
+                return min(max(estimate, self.min_ms), self.max_ms)
+            seen += bucket_count
+        return self.max_ms
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_ms": self.total_ms / self.count if self.count else None,
+            "min_ms": self.min_ms if self.count else None,
+            "p50_ms": self.percentile(0.5),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": self.max_ms if self.count else None,
+        }
+
+
+class StageMetricsRegistry:
+    """
+    프로세스 단위 단계별 지연 히스토그램 저장소.
+    stage() 로 감싼 구간의 소요 시간을 기록하고, summary() 로 p50/p99 를 조회한다.
+    """
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def _get(self, name: str) -> StageHistogram:
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, StageHistogram())
+        return histogram
+
+    def observe(self, name: str, elapsed_ms: float, error: bool = False) -> None:
+        histogram = self._get(name)
+        with self._lock:
+            histogram.observe(elapsed_ms)
+            if error:
+                histogram.errors += 1
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        with STAGE_METRICS.stage("exchange_rate.fetch"):
+            ...
+        예외가 나도 소요 시간은 기록하고 오류 수를 올린 뒤 예외를 그대로 전파한다.
+        """
+        started = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.observe(name, (time.perf_counter() - started) * 1000, error)
+
+    def summary(self, prefix: str = "") -> dict:
+        with self._lock:
+            return {
+                name: histogram.to_dict()
+                for name, histogram in sorted(self._histograms.items())
+                if name.startswith(prefix)
+            }
+
+    def log_summary(self, prefix: str = "") -> None:
+        # 호출당 한 줄씩 단계별 요약만 남긴다 (행/페이로드 단위 로그 대신)
+        for name, stats in self.summary(prefix).items():
+            logging.info(
+                "Stage %s: count=%d errors=%d p50=%.1fms p99=%.1fms max=%.1fms",
+                name,
+                stats["count"],
+                stats["errors"],
+                stats["p50_ms"],
+                stats["p99_ms"],
+                stats["max_ms"],
+            )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+
+# --- 프로세스 단위 기본 레지스트리 ---
+STAGE_METRICS = StageMetricsRegistry()
+
+
+def sampled_debug(message: str, *args, sample_rate: float = None) -> None:
+    """
+    DEBUG 레벨이 켜져 있고 샘플에 뽑힌 경우에만 로그를 남긴다.
+    %-포맷 인자를 그대로 넘기므로 샘플에서 빠지면 문자열을 만들지 않는다.
+    """
+    rate = DEBUG_LOG_SAMPLE_RATE if sample_rate is None else sample_rate
+    if rate <= 0 or not logging.getLogger().isEnabledFor(logging.DEBUG):
+        return
+    if rate >= 1 or random.random() < rate:
+        logging.debug(message, *args)
@@ -0,0 +1,148 @@
+import hashlib
+import os
+import tempfile
+import threading
+
+# 파이프라인 공용 저장소 백엔드 (Blob 컨테이너 / 로컬 디렉토리).
+# 모든 백엔드는 write / read / exists / list_paths 와 조건부 갱신용
+# read_with_etag / write_if_match 를 제공한다
+
+LOCAL_OUTPUT_DIR_NAME = "local_output"
+
+
+def local_output_dir() -> str:
+    # 작업 디렉토리 아래 local_output. run-from-package 배포는 wwwroot(작업 디렉토리)가
+    # 읽기 전용이라 임시 디렉토리 아래를 사용
+    base_dir = os.getcwd()
+    if os.environ.get("WEBSITE_RUN_FROM_PACKAGE") or not os.access(base_dir, os.W_OK):
+        base_dir = tempfile.gettempdir()
+    return os.path.join(base_dir, LOCAL_OUTPUT_DIR_NAME)
+
+
+# 로컬 백엔드의 조건부 쓰기(비교 후 교체)를 프로세스 안에서 직렬화
+_LOCAL_CONDITIONAL_WRITE_LOCK = threading.Lock()
+
+
+def _content_etag(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class LocalFileSystemBackend:
+    """로컬 디렉토리에 쓰는 백엔드 (로컬 실행/테스트용)."""
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+
+    def write(self, path: str, data: bytes) -> str:
+        full_path = os.path.join(self.root_dir, *path.split("/"))
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "wb") as f:
+            f.write(data)
+        return full_path
+
+    def read(self, path: str):
+        # 파일이 없으면 None
+        full_path = os.path.join(self.root_dir, *path.split("/"))
+        try:
+            with open(full_path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def read_with_etag(self, path: str) -> tuple:
+        # (본문, ETag). 파일이 없으면 (None, None). 로컬은 내용 해시를 ETag 로 사용
+        data = self.read(path)
+        return data, (_content_etag(data) if data is not None else None)
+
+    def write_if_match(self, path: str, data: bytes, etag) -> bool:
+        # 현재 ETag 가 etag 와 같을 때만 쓰고 True (etag 가 None 이면 파일이 없을 때만)
+        with _LOCAL_CONDITIONAL_WRITE_LOCK:
+            if self.read_with_etag(path)[1] != etag:
+                return False
+            self.write(path, data)
+            return True
+
+    def exists(self, path: str) -> bool:
+        return os.path.isfile(os.path.join(self.root_dir, *path.split("/")))
+
+    def list_paths(self, prefix: str) -> list:
+        # prefix 아래 파일의 상대 경로 ("/" 구분) 목록
+        base_dir = os.path.join(self.root_dir, *prefix.rstrip("/").split("/"))
+        paths = []
+        for dir_path, _, file_names in os.walk(base_dir):
+            for file_name in file_names:
+                relative = os.path.relpath(
+                    os.path.join(dir_path, file_name), self.root_dir
+                )
+                paths.append(relative.replace(os.sep, "/"))
+        return sorted(paths)
+
+
+class BlobStorageBackend:
+    """Azure Blob Storage 컨테이너에 쓰는 백엔드."""
+
+    def __init__(self, connection_string: str, container_name: str):
+        # azure-storage-blob 은 Blob 백엔드를 쓸 때만 필요
+        from azure.storage.blob import BlobServiceClient
+
+        self.container_client = BlobServiceClient.from_connection_string(
+            connection_string
+        ).get_container_client(container_name)
+
+    def write(self, path: str, data: bytes) -> str:
+        self.container_client.upload_blob(name=path, data=data, overwrite=True)
+        return path
+
+    def read(self, path: str):
+        from azure.core.exceptions import ResourceNotFoundError
+
+        try:
+            return self.container_client.download_blob(path).readall()
+        except ResourceNotFoundError:
+            return None
+
+    def read_with_etag(self, path: str) -> tuple:
+        from azure.core.exceptions import ResourceNotFoundError
+
+        try:
+            downloader = self.container_client.download_blob(path)
+        except ResourceNotFoundError:
+            return None, None
+        return downloader.readall(), downloader.properties.etag
+
+    def write_if_match(self, path: str, data: bytes, etag) -> bool:
+        # If-Match(etag) 조건부 업로드. etag 가 None 이면 Blob 이 없을 때만 생성
+        from azure.core import MatchConditions
+        from azure.core.exceptions import ResourceExistsError, ResourceModifiedError
+
+        try:
+            if etag is None:
+                self.container_client.upload_blob(name=path, data=data, overwrite=False)
+            else:
+                self.container_client.upload_blob(
+                    name=path,
+                    data=data,
+                    overwrite=True,
+                    etag=etag,
+                    match_condition=MatchConditions.IfNotModified,
+                )
+        except (ResourceExistsError, ResourceModifiedError):
+            return False
+        return True
+
+    def exists(self, path: str) -> bool:
+        return self.container_client.get_blob_client(path).exists()
+
+    def list_paths(self, prefix: str) -> list:
+        return sorted(
+            blob.name
+            for blob in self.container_client.list_blobs(name_starts_with=prefix)
+        )
+
+
+def get_default_backend(container_name: str):
+    # BlobStorageConnectionString 이 있으면 Blob, 없으면 local_output/<컨테이너 이름> 디렉토리
+    connection_string = os.environ.get("BlobStorageConnectionString")
+    if connection_string:
+        return BlobStorageBackend(connection_string, container_name)
+    return LocalFileSystemBackend(os.path.join(local_output_dir(), container_name))
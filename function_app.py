@@ -23,20 +23,59 @@ else:
 
 app = func.FunctionApp()
 
+# async def 트리거 사용 여부 (UseAsyncFunctionTriggers=true)
+# 켜면 exchangeRateCrawler / googleTrendsCrawler / googleTrendsProcessor 를 async 버전으로 등록해
+# 요청/대기 중에도 한 워커가 여러 호출을 동시에 처리한다 (함수 이름은 동일)
+USE_ASYNC_TRIGGERS = os.environ.get("UseAsyncFunctionTriggers", "").lower() in (
+    "1",
+    "true",
+)
+
 # --- 각 함수 모듈을 임포트하고 함수를 'app' 객체에 등록하는 로직 ---
-from functions.exchange_rate_trigger import register_exchange_rate_crawler
+from functions.exchange_rate_trigger import (
+    register_exchange_rate_average_crawler,
+    register_exchange_rate_crawler,
+    register_exchange_rate_crawler_async,
+)
 
 # 임포트한 register_exchange_rate_crawler 함수를 호출하여
 # 'app' 객체에 실제 exchangeRateCrawler 함수를 등록
-register_exchange_rate_crawler(app)
+if USE_ASYNC_TRIGGERS:
+    register_exchange_rate_crawler_async(app)
+else:
+    register_exchange_rate_crawler(app)
+# 평균 환율은 별도 파이프라인(exchangeRateAverageCrawler)에서 하루 한 번 갱신
+register_exchange_rate_average_crawler(app)
 
 # --- Google Trends Crawler 함수 ---
-from functions.google_trends_trigger import register_google_trends_crawler
+from functions.google_trends_trigger import (
+    register_google_trends_crawler,
+    register_google_trends_crawler_async,
+)
+
+if USE_ASYNC_TRIGGERS:
+    register_google_trends_crawler_async(app)
+else:
+    register_google_trends_crawler(app)
+
+from functions.google_trends_processor import (
+    register_google_trends_processor,
+    register_google_trends_processor_async,
+)
+
+if USE_ASYNC_TRIGGERS:
+    register_google_trends_processor_async(app)
+else:
+    register_google_trends_processor(app)
+
+# --- Flight Price Crawler 함수 ---
+from functions.flight_price_trigger import register_flight_price_crawler
 
-register_google_trends_crawler(app)
+register_flight_price_crawler(app)
 
-from functions.google_trends_processor import register_google_trends_processor
+# --- 국가별 점수/환율 이력 HTTP 조회 함수 ---
+from functions.score_query_trigger import register_destination_score_api
 
-register_google_trends_processor(app)
+register_destination_score_api(app)
 
 logging.info("Azure Function App initialization complete.")
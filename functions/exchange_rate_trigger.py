@@ -1,15 +1,323 @@
 import logging
+import asyncio
 import datetime
 import json
 import os
 import azure.functions as func
 
 # data_sources 크롤링 로직 함수
-from data_sources.exchage_rate_crawler import get_exchange_rate_data
+from data_sources.exchage_rate_crawler import (
+    average_inquiry_names,
+    build_exchange_rate_records,
+    fetch_average_rates,
+    fetch_realtime_rates,
+    fetch_realtime_rates_async,
+)
+from data_sources.exchange_rate_cache import (
+    get_exchange_rate_backend,
+    load_rate_snapshot,
+    merge_average_rates_with_last_good,
+    save_rate_snapshot,
+    stale_inquiries_in_snapshot,
+)
+from data_sources.exchange_rate_providers import (
+    build_realtime_providers,
+    fetch_realtime_rates_hedged,
+)
+from data_sources.exchange_rate_aggregator import (
+    DEFAULT_RECONCILE_INTERVAL_DAYS,
+    load_rate_aggregator,
+    update_rate_aggregator,
+)
+from data_sources.exchange_rate_anomaly import (
+    load_anomaly_detector,
+    save_anomaly_detector,
+    screen_realtime_rates,
+)
+from data_sources.exchange_rate_history import (
+    append_rate_history,
+    with_local_yearly_average,
+)
+from data_sources.latest_state_store import (
+    exchange_rate_state_rows,
+    upsert_latest_state,
+)
+from data_sources.raw_response_archive import flush_raw_archive
+from data_sources.stage_metrics import STAGE_METRICS
+from data_sources.storage_backend import local_output_dir
+from data_sources.exchange_rate_scheduler import (
+    KST,
+    AdaptivePollingScheduler,
+    load_market_calendar,
+    load_polling_state,
+    rates_fingerprint,
+    save_polling_state,
+)
+
+# 적응형 조회 스케줄러 (타이머는 5분마다 깨어나고, 실제 크롤링 여부는 스케줄러가 결정)
+try:
+    POLLING_SCHEDULER = AdaptivePollingScheduler(load_market_calendar())
+except Exception as e:
+    logging.error(f"Failed to load KRW market calendar: {e}. Polling every run.")
+    POLLING_SCHEDULER = None
+
+
+# 은행 평균 환율과 로컬 집계를 대조하는 주기 (일). 그 사이 평균 파이프라인은 로컬 집계만 사용
+RECONCILE_INTERVAL_DAYS = float(
+    os.environ.get("ExchangeRateReconcileDays", DEFAULT_RECONCILE_INTERVAL_DAYS)
+)
+
+
+def _business_day(day: datetime.date) -> bool:
+    if POLLING_SCHEDULER is None:
+        return day.weekday() < 5
+    return POLLING_SCHEDULER.calendar.is_business_day(day)
+
+
+# 실시간 환율 제공자 (하나은행 + 환경 변수로 설정한 대체 제공자)
+REALTIME_PROVIDERS = build_realtime_providers()
+
+
+def _fetch_realtime(now_kst) -> tuple:
+    # 대체 제공자가 없으면 하나은행만 직접 조회
+    if len(REALTIME_PROVIDERS) == 1:
+        return fetch_realtime_rates(now_kst), REALTIME_PROVIDERS[0].name
+    result = fetch_realtime_rates_hedged(REALTIME_PROVIDERS, now_kst)
+    return result.rates, result.provider
+
+
+def _adaptive_polling_enabled() -> bool:
+    return POLLING_SCHEDULER is not None and os.environ.get(
+        "DisableExchangeRateAdaptivePolling", ""
+    ).lower() not in ("1", "true")
+
+
+def _load_cached_snapshot(backend, kind: str):
+    # 캐시 저장소 장애가 있어도 조인은 가진 데이터만으로 진행
+    try:
+        snapshot = load_rate_snapshot(backend, kind)
+    except Exception as e:
+        logging.warning(f"Failed to load cached {kind} exchange rates: {e}")
+        return None
+    if snapshot is not None:
+        logging.info(
+            f"Using cached {kind} exchange rates fetched at {snapshot['fetched_at']}."
+        )
+    return snapshot
+
+
+def _save_cached_rates(
+    backend, kind: str, rates, fetched_at, inquiry_fetched_at: dict = None
+) -> None:
+    try:
+        save_rate_snapshot(backend, kind, rates, fetched_at, inquiry_fetched_at)
+    except Exception as e:
+        logging.warning(f"Failed to cache {kind} exchange rates: {e}")
+
+
+# 로컬 평균 집계 상태를 읽어 갱신 함수(update/reconcile)를 적용하고 조건부(ETag)로 저장. 실패하면 None
+def _update_rate_aggregator(backend, apply):
+    try:
+        return update_rate_aggregator(backend, apply)
+    except Exception as e:
+        logging.warning(f"Failed to update exchange rate aggregator: {e}")
+        return None
+
+
+# 발행 전 실시간 환율 이상치 판정. 0/단위 오류 값은 빼고 나머지 판정 결과는 레코드에 남김
+# 반환: (발행할 실시간 환율, {통화 코드: 판정 결과}). 판정 실패 시 원본 그대로
+def _screen_realtime_rates(backend, now_kst, realtime_rates: list) -> tuple:
+    if not realtime_rates:
+        return realtime_rates, {}
+    try:
+        with STAGE_METRICS.stage("exchange_rate.anomaly"):
+            detector = load_anomaly_detector(backend)
+            accepted, anomalies = screen_realtime_rates(
+                detector, realtime_rates, now_kst
+            )
+            save_anomaly_detector(detector, backend)
+        return accepted, anomalies
+    except Exception as e:
+        logging.warning(f"Failed to screen realtime exchange rates: {e}")
+        return realtime_rates, {}
+
+
+# 평균 환율 5개 조회를 각각 격리 실행하고, 실패한 조회는 마지막 정상 캐시 값으로 채워 캐시를 갱신
+# 반환: (평균 환율, 캐시로 채운 조회 {이름: 시각}, 실패한 조회 목록, 성공한 조회 수)
+def _refresh_average_rates(backend, now_kst, cached_snapshot) -> tuple:
+    outcomes = []
+    with STAGE_METRICS.stage("exchange_rate.averages"):
+        average_rates = fetch_average_rates(now_kst, outcomes)
+
+    failed_inquiries = [o["inquiry"] for o in outcomes if o["status"] == "failed"]
+    succeeded = len(outcomes) - len(failed_inquiries)
+    if failed_inquiries:
+        logging.warning(
+            f"{len(failed_inquiries)}/{len(outcomes)} average exchange rate inquiries failed: {failed_inquiries}"
+        )
+
+    inquiry_fetched_at, stale_inquiries = merge_average_rates_with_last_good(
+        average_rates, cached_snapshot, now_kst
+    )
+    if succeeded:
+        _save_cached_rates(
+            backend, "averages", average_rates, now_kst, inquiry_fetched_at
+        )
+    return average_rates, stale_inquiries, failed_inquiries, succeeded
+
+
+# 조인된 국가별 환율 레코드를 Event Hub 로 전송하고 로컬 파일에도 저장
+def _publish_exchange_rate_records(
+    all_exchange_rates_data: list, event_output: func.Out[str]
+) -> None:
+    if not all_exchange_rates_data:
+        logging.warning("No exchange rates data extracted.")
+        return
+
+    logging.info(f"Total {len(all_exchange_rates_data)} exchange rates extracted.")
+
+    events_to_send = []
+    for rate_entry in all_exchange_rates_data:
+        # 각 환율 데이터를 JSON 문자열로 변환
+        events_to_send.append(json.dumps(rate_entry, ensure_ascii=False))
+
+    # Event Hub로 데이터를 전송
+    try:
+        with STAGE_METRICS.stage("exchange_rate.publish"):
+            event_output.set(events_to_send)
+        logging.info(f"Total {len(events_to_send)} events sent to Event Hub.")
+    except Exception as e:
+        logging.error(f"Failed to send events to Event Hub: {e}")
+
+    # 국가별 최신 상태 갱신 (순위 조회용)
+    upsert_latest_state(
+        "exchange_rate", exchange_rate_state_rows(all_exchange_rates_data)
+    )
+
+    # 로컬 파일에 저장 (Azure Blob Storage 대신 -> 나중에 Blob에 저장)
+    try:
+        timestamp_str = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        file_name = f"local_exchange_rates_{timestamp_str}.json"
+
+        output_dir = local_output_dir()
+        os.makedirs(output_dir, exist_ok=True)
+        output_path = os.path.join(output_dir, file_name)
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(all_exchange_rates_data, f, indent=4, ensure_ascii=False)
+        logging.info(
+            f"Successfully saved exchange rates data to local file: {output_path}."
+        )
+    except Exception as file_ex:
+        logging.error(f"Failed to save exchange rates data to local file: {file_ex}.")
+
+
+# 이번 주기에 크롤링할 차례인지 스케줄러에 확인. 반환: (조회 여부, 스케줄러 상태 또는 None)
+def _decide_polling(cache_backend, now_kst) -> tuple:
+    if not _adaptive_polling_enabled():
+        return True, None
+    try:
+        polling_state = load_polling_state(cache_backend)
+        should_poll, reason = POLLING_SCHEDULER.decide(polling_state, now_kst)
+    except Exception as e:
+        # 상태 저장소 문제로 데이터 수집이 멈추지 않도록 조회를 진행
+        logging.warning(f"Polling scheduler unavailable: {e}. Crawling anyway.")
+        polling_state, should_poll, reason = None, True, "scheduler error"
+    if not should_poll:
+        logging.info(f"Skipping exchange rate crawl: {reason}")
+        return False, None
+    logging.info(f"Crawling exchange rates: {reason}")
+    return True, polling_state
+
+
+# 조인에 쓸 평균 환율. 반환: (평균 환율, 캐시로 채운 조회, 실패한 조회 목록)
+# 은행 평균과 대조된 로컬 집계가 있으면 그 값을, 없으면 평균 파이프라인이 저장한 최신 캐시를 사용
+# 캐시가 아직 없으면(최초 배포 직후 등) 평균은 비워서 부분 결과로 발행하고,
+# 은행 평균 조회는 exchangeRateAverageCrawler 에 맡긴다 (실시간 지연을 평균 조회와 분리)
+def _resolve_average_rates(cache_backend, now_kst, aggregator) -> tuple:
+    if aggregator is not None and aggregator.ready_for(now_kst):
+        return aggregator.averages(), {}, []
+
+    averages_snapshot = _load_cached_snapshot(cache_backend, "averages")
+    failed_inquiries = []
+    if averages_snapshot is not None:
+        average_rates = averages_snapshot["rates"]
+        stale_inquiries = stale_inquiries_in_snapshot(averages_snapshot)
+    else:
+        logging.warning(
+            "Average exchange rate cache is empty. Publishing realtime rates "
+            "without averages until exchangeRateAverageCrawler fills it."
+        )
+        average_rates, stale_inquiries = {}, {}
+        failed_inquiries = average_inquiry_names(now_kst)
+    # 올해 실시간 이력이 충분하면 은행 연평균 대신 로컬 이력의 연평균 사용
+    average_rates = with_local_yearly_average(average_rates or {}, now_kst)
+    return average_rates, stale_inquiries, failed_inquiries
+
+
+# 실시간 환율 조회 이후 단계: 캐시/스케줄러 갱신 + 캐시된 최신 평균 환율과 조인 + 전송
+def _join_and_publish_realtime(
+    cache_backend,
+    now_kst,
+    polling_state,
+    realtime_rates: list,
+    realtime_provider: str,
+    event_output: func.Out[str],
+) -> None:
+    # 캐시/이력/집계에 쌓기 전에 "-" 로 0 이 된 값, 단위 오파싱 값을 걸러냄
+    realtime_rates, anomalies = _screen_realtime_rates(
+        cache_backend, now_kst, realtime_rates
+    )
+    if realtime_rates:
+        _save_cached_rates(cache_backend, "realtime", realtime_rates, now_kst)
+        # 로컬 이력에 쌓아 연평균을 직접 계산할 수 있게
+        append_rate_history("realtime", now_kst, realtime_rates)
+    # 일/월/연평균 누적 집계에 이번 조회를 반영 (O(1))
+    aggregator = _update_rate_aggregator(
+        cache_backend,
+        lambda a: a.update(
+            now_kst,
+            {r["currency_code"]: r["standard_rate"] for r in realtime_rates or []},
+            _business_day,
+        ),
+    )
+
+    # 값 변경 여부를 기록해 다음 조회 간격을 학습
+    if polling_state is not None and realtime_rates:
+        try:
+            changed = POLLING_SCHEDULER.record_poll(
+                polling_state,
+                now_kst,
+                rates_fingerprint(realtime_rates, "standard_rate"),
+            )
+            save_polling_state(polling_state, cache_backend)
+            logging.info(
+                f"Realtime rates {'changed' if changed else 'unchanged'} "
+                f"(unchanged x{polling_state.unchanged_streak})."
+            )
+        except Exception as e:
+            logging.warning(f"Failed to update polling state: {e}")
+
+    average_rates, stale_inquiries, failed_inquiries = _resolve_average_rates(
+        cache_backend, now_kst, aggregator
+    )
+
+    with STAGE_METRICS.stage("exchange_rate.join"):
+        all_exchange_rates_data = build_exchange_rate_records(
+            realtime_rates, average_rates, stale_inquiries, failed_inquiries
+        )
+    for record in all_exchange_rates_data:
+        record["realtime_provider"] = realtime_provider
+        anomaly = anomalies.get(record.get("currency_code")) or {}
+        record["rate_anomalies"] = anomaly.get("flags", [])
+        record["realtime_rate_zscore"] = anomaly.get("zscore")
+    _publish_exchange_rate_records(all_exchange_rates_data, event_output)
+    # 이번 호출에서 받은 원본 응답의 색인 기록
+    flush_raw_archive()
 
 
 # 이 함수는 외부(function_app.py)로부터 Azure Functions 앱 인스턴스(app_instance)를 받아
 # 그 인스턴스에 실제 트리거 함수를 등록하는 역할을 함
+# 실시간 환율 파이프라인: 실시간 1회 조회 + 캐시된 최신 평균 환율과 조인
 def register_exchange_rate_crawler(app_instance):
     @app_instance.timer_trigger(
         schedule="0 */5 * * * *",
@@ -33,45 +341,206 @@ def register_exchange_rate_crawler(app_instance):
         if myTimer.past_due:
             logging.info("Timer run was overdue!")
 
-        # get_exchange_rate_data 함수를 호출하여 실제 환율 데이터를 가져옴
-        all_exchange_rates_data = get_exchange_rate_data()
+        now_kst = datetime.datetime.now(KST)
+        cache_backend = get_exchange_rate_backend()
+
+        should_poll, polling_state = _decide_polling(cache_backend, now_kst)
+        if not should_poll:
+            return
+
+        # 실시간 환율만 조회 (평균 환율 조회 지연/실패와 분리)
+        try:
+            with STAGE_METRICS.stage("exchange_rate.realtime"):
+                realtime_rates, realtime_provider = _fetch_realtime(now_kst)
+        except Exception as e:
+            # 새 실시간 값이 없으면 같은 값을 다시 보내지 않고 다음 주기를 기다림
+            logging.error(f"Realtime exchange rate inquiry failed after retries: {e}")
+            flush_raw_archive()
+            STAGE_METRICS.log_summary("exchange_rate.")
+            return
+
+        _join_and_publish_realtime(
+            cache_backend,
+            now_kst,
+            polling_state,
+            realtime_rates,
+            realtime_provider,
+            event_output,
+        )
+
+        # 웜 인스턴스에서 누적된 단계별 p50/p99 지연
+        STAGE_METRICS.log_summary("exchange_rate.")
+        logging.info("Python exchangeRateCrawler function completed.")
+
 
-        # 가져온 데이터가 있다면 처리
-        if all_exchange_rates_data:
+# 대체 제공자가 없으면 aiohttp 로 하나은행만 조회, 있으면 헤지 조회(스레드 풀)를 스레드에서 실행
+async def _fetch_realtime_async(now_kst) -> tuple:
+    if len(REALTIME_PROVIDERS) == 1:
+        rates = await fetch_realtime_rates_async(current_kst_dt=now_kst)
+        return rates, REALTIME_PROVIDERS[0].name
+    result = await asyncio.to_thread(
+        fetch_realtime_rates_hedged, REALTIME_PROVIDERS, now_kst
+    )
+    return result.rates, result.provider
+
+
+# exchangeRateCrawler 의 async 버전 (UseAsyncFunctionTriggers 설정 시 등록)
+# 하나은행 요청/재시도 대기는 이벤트 루프에서, 캐시/스케줄러 저장소 I/O 는 스레드에서 실행해
+# 조회를 기다리는 동안 같은 워커가 다른 호출(트렌드 큐 처리 등)을 처리할 수 있다
+def register_exchange_rate_crawler_async(app_instance):
+    @app_instance.timer_trigger(
+        schedule="0 */5 * * * *",
+        run_on_startup=False,
+        use_monitor=False,
+        arg_name="myTimer",
+    )
+    @app_instance.event_hub_output(
+        arg_name="event_output",
+        event_hub_name=os.environ.get("ExchangeRateEventHubName"),
+        connection="EventHubConnectionString",
+    )
+    async def exchangeRateCrawler(
+        myTimer: func.TimerRequest, event_output: func.Out[str]
+    ) -> None:
+        utc_timestamp = datetime.datetime.utcnow().isoformat() + "+00:00"
+        logging.info(
+            f"Python exchangeRateCrawler (async) function started at {utc_timestamp}."
+        )
+
+        if myTimer.past_due:
+            logging.info("Timer run was overdue!")
+
+        now_kst = datetime.datetime.now(KST)
+        cache_backend = get_exchange_rate_backend()
+
+        should_poll, polling_state = await asyncio.to_thread(
+            _decide_polling, cache_backend, now_kst
+        )
+        if not should_poll:
+            return
+
+        try:
+            with STAGE_METRICS.stage("exchange_rate.realtime"):
+                realtime_rates, realtime_provider = await _fetch_realtime_async(now_kst)
+        except Exception as e:
+            logging.error(f"Realtime exchange rate inquiry failed after retries: {e}")
+            await asyncio.to_thread(flush_raw_archive)
+            STAGE_METRICS.log_summary("exchange_rate.")
+            return
+
+        await asyncio.to_thread(
+            _join_and_publish_realtime,
+            cache_backend,
+            now_kst,
+            polling_state,
+            realtime_rates,
+            realtime_provider,
+            event_output,
+        )
+
+        STAGE_METRICS.log_summary("exchange_rate.")
+        logging.info("Python exchangeRateCrawler (async) function completed.")
+
+
+# 새 평균 환율을 캐시된 최신 실시간 환율과 조인해 전송
+def _publish_averages_with_cached_realtime(
+    cache_backend,
+    average_rates: dict,
+    stale_inquiries: dict,
+    failed_inquiries: list,
+    event_output: func.Out[str],
+) -> None:
+    realtime_snapshot = _load_cached_snapshot(cache_backend, "realtime")
+    realtime_rates = realtime_snapshot["rates"] if realtime_snapshot else []
+
+    with STAGE_METRICS.stage("exchange_rate.join"):
+        all_exchange_rates_data = build_exchange_rate_records(
+            realtime_rates, average_rates, stale_inquiries, failed_inquiries
+        )
+    _publish_exchange_rate_records(all_exchange_rates_data, event_output)
+
+
+# 평균 환율 파이프라인: 대조 주기마다 일/월/연평균 5회 조회 후 캐시/로컬 집계 갱신,
+# 그 외에는 로컬 집계 평균만으로 캐시된 최신 실시간 환율과 조인
+def register_exchange_rate_average_crawler(app_instance):
+    @app_instance.timer_trigger(
+        schedule="0 30 9 * * 1-5",  # 평일 18:30 KST (UTC 09:30), 고시 마감 후 하루 한 번
+        run_on_startup=False,
+        use_monitor=False,
+        arg_name="myTimer",
+    )
+    @app_instance.event_hub_output(
+        arg_name="event_output",
+        event_hub_name=os.environ.get("ExchangeRateEventHubName"),
+        connection="EventHubConnectionString",
+    )
+    def exchangeRateAverageCrawler(
+        myTimer: func.TimerRequest, event_output: func.Out[str]
+    ) -> None:
+        utc_timestamp = datetime.datetime.utcnow().isoformat() + "+00:00"
+        logging.info(
+            f"Python exchangeRateAverageCrawler function started at {utc_timestamp}."
+        )
+
+        if myTimer.past_due:
+            logging.info("Timer run was overdue!")
+
+        now_kst = datetime.datetime.now(KST)
+        cache_backend = get_exchange_rate_backend()
+
+        # 대조 주기가 아니면 은행 조회 없이 로컬 집계로 평균 환율을 발행
+        try:
+            aggregator = load_rate_aggregator(cache_backend)
+        except Exception as e:
+            logging.warning(f"Failed to load exchange rate aggregator: {e}")
+            aggregator = None
+        if aggregator is not None and not aggregator.reconcile_due(
+            now_kst, RECONCILE_INTERVAL_DAYS
+        ):
             logging.info(
-                f"Total {len(all_exchange_rates_data)} exchange rates extracted."
+                f"Using local rolling averages (last reconciled at "
+                f"{aggregator.reconciled_at.isoformat(timespec='seconds')})."
+            )
+            _publish_averages_with_cached_realtime(
+                cache_backend, aggregator.averages(), {}, [], event_output
             )
+            STAGE_METRICS.log_summary("exchange_rate.")
+            logging.info("Python exchangeRateAverageCrawler function completed.")
+            return
 
-            events_to_send = []
-            for rate_entry in all_exchange_rates_data:
-                # 각 환율 데이터를 JSON 문자열로 변환
-                events_to_send.append(json.dumps(rate_entry, ensure_ascii=False))
-
-            # Event Hub로 데이터를 전송
-            try:
-                event_output.set(events_to_send)
-                logging.info(f"Total {len(events_to_send)} events sent to Event Hub.")
-            except Exception as e:
-                logging.error(f"Failed to send events to Event Hub: {e}")
-
-            # 로컬 파일에 저장 (Azure Blob Storage 대신 -> 나중에 Blob에 저장)
-            try:
-                timestamp_str = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-                file_name = f"local_exchange_rates_{timestamp_str}.json"
-
-                output_dir = os.path.join(os.getcwd(), "local_output")
-                os.makedirs(output_dir, exist_ok=True)
-                output_path = os.path.join(output_dir, file_name)
-                with open(output_path, "w", encoding="utf-8") as f:
-                    json.dump(all_exchange_rates_data, f, indent=4, ensure_ascii=False)
-                logging.info(
-                    f"Successfully saved exchange rates data to local file: {output_path}."
-                )
-            except Exception as file_ex:
-                logging.error(
-                    f"Failed to save exchange rates data to local file: {file_ex}."
-                )
-        else:
-            logging.warning("No exchange rates data extracted.")
+        average_rates, stale_inquiries, failed_inquiries, succeeded = (
+            _refresh_average_rates(
+                cache_backend,
+                now_kst,
+                _load_cached_snapshot(cache_backend, "averages"),
+            )
+        )
+        if not succeeded:
+            # 새로 얻은 값이 하나도 없으면 이전 결과를 다시 보내지 않음
+            logging.error(
+                "All average exchange rate inquiries failed. Nothing to publish."
+            )
+            flush_raw_archive()
+            STAGE_METRICS.log_summary("exchange_rate.")
+            return
 
-        logging.info("Python exchangeRateCrawler function completed.")
+        # 은행 일평균도 이력으로 남김 (로컬 집계와 대조용)
+        append_rate_history("daily_avg", now_kst, average_rates.get("daily_avg"))
+        # 은행 평균으로 로컬 월/연 누적을 다시 맞춤 (실패한 조회는 이전 값으로 대조하지 않음)
+        if not failed_inquiries:
+            _update_rate_aggregator(
+                cache_backend,
+                lambda a: a.reconcile(average_rates, now_kst, _business_day),
+            )
+
+        _publish_averages_with_cached_realtime(
+            cache_backend,
+            average_rates,
+            stale_inquiries,
+            failed_inquiries,
+            event_output,
+        )
+        flush_raw_archive()
+
+        STAGE_METRICS.log_summary("exchange_rate.")
+        logging.info("Python exchangeRateAverageCrawler function completed.")
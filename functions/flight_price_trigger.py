@@ -0,0 +1,124 @@
+import logging
+import datetime
+import json
+import os
+import azure.functions as func
+import pandas as pd
+
+# data_sources 수집/저장 로직 함수
+from data_sources.flight_price_collector import collect_flight_prices
+from data_sources.flight_price_currency import (
+    convert_flight_prices_with_cached_rates,
+    summarize_converted_prices,
+)
+from data_sources.latest_state_store import (
+    flight_price_state_rows,
+    upsert_latest_state,
+)
+from data_sources.raw_response_archive import flush_raw_archive
+from data_sources.flight_price_writer import (
+    FLIGHT_PRICE_CONTAINER_NAME,
+    write_flight_prices_parquet,
+)
+from data_sources.storage_backend import get_default_backend
+from data_sources.flight_price_stats import (
+    load_flight_price_stats,
+    save_flight_price_stats,
+)
+
+
+def register_flight_price_crawler(app_instance):
+    @app_instance.timer_trigger(
+        schedule="0 0 0 * * *",  # 매일 자정에 실행
+        run_on_startup=False,
+        use_monitor=False,
+        arg_name="myTimer",
+    )
+    @app_instance.event_hub_output(
+        arg_name="event_output",
+        event_hub_name=os.environ.get("FlightPriceEventHubName"),
+        connection="EventHubConnectionString",
+    )
+    def flightPriceCrawler(
+        myTimer: func.TimerRequest, event_output: func.Out[str]
+    ) -> None:
+        utc_timestamp = datetime.datetime.utcnow().isoformat() + "+00:00"
+        logging.info(f"Python flightPriceCrawler function started at {utc_timestamp}.")
+
+        if myTimer.past_due:
+            logging.info("Timer run was overdue!")
+
+        flight_df = collect_flight_prices()
+        # 목적지별 Kiwi 원본 응답의 색인 기록
+        flush_raw_archive()
+        if flight_df.empty:
+            logging.warning("No flight price data collected.")
+            return
+
+        # 환율 파이프라인의 최신 실시간 환율로 현지 통화 / USD 가격 열 추가 (추가 API 호출 없음)
+        flight_df = convert_flight_prices_with_cached_rates(flight_df)
+        converted_summaries = summarize_converted_prices(flight_df)
+
+        kst_timezone = datetime.timezone(datetime.timedelta(hours=9))
+        collected_at = datetime.datetime.now(kst_timezone)
+
+        # 전체 데이터는 Parquet 으로 한 번만 직렬화해서 저장
+        backend = get_default_backend(FLIGHT_PRICE_CONTAINER_NAME)
+        try:
+            partition_summaries = write_flight_prices_parquet(
+                flight_df, backend, collected_at
+            )
+        except Exception as e:
+            logging.error(
+                f"Failed to write flight price parquet files: {e}", exc_info=True
+            )
+            return
+
+        # (도시, 월) 별 누적 가격 통계를 이번 배치로만 갱신 (과거 파일 재스캔 없음)
+        # 최신 상태의 항공권 점수는 이번 배치 반영 전 평균가와 비교
+        previous_avg_price_index = None
+        try:
+            stats_store = load_flight_price_stats(backend)
+            previous_avg_price_index = stats_store.avg_price_index()
+            stats_store.update_from_flights(flight_df)
+            save_flight_price_stats(stats_store, backend)
+        except Exception as e:
+            logging.error(f"Failed to update flight price stats: {e}", exc_info=True)
+
+        # 국가별 최신 상태 갱신 (순위 조회용)
+        try:
+            state_rows = flight_price_state_rows(
+                flight_df,
+                partition_summaries,
+                (
+                    previous_avg_price_index
+                    if previous_avg_price_index is not None
+                    else pd.Series(dtype="float64")
+                ),
+                collected_at,
+            )
+        except Exception as e:
+            logging.warning(f"Failed to build flight price latest state: {e}")
+            state_rows = []
+        upsert_latest_state("flight_price", state_rows)
+
+        # Event Hub 에는 국가별 요약 이벤트만 전송
+        events_to_send = []
+        for summary in partition_summaries:
+            summary_event = {
+                "dataType": "flightPriceSummary",
+                **summary,
+                **converted_summaries.get(summary["destination_country_code_2"], {}),
+                "collected_at_kst": collected_at.isoformat(timespec="seconds"),
+            }
+            events_to_send.append(json.dumps(summary_event, ensure_ascii=False))
+
+        try:
+            event_output.set(events_to_send)
+            logging.info(
+                f"Total {len(events_to_send)} flight summary events sent to Event Hub."
+            )
+        except Exception as e:
+            logging.error(f"Failed to send flight summary events to Event Hub: {e}")
+
+        logging.info("Python flightPriceCrawler function completed.")
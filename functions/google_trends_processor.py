@@ -1,4 +1,5 @@
 import logging
+import asyncio
 import json
 import os
 import datetime
@@ -18,74 +19,255 @@ from tenacity import (
 )
 
 from data_sources.google_trends_crawler import (
+    DEFAULT_ANCHOR_KEYWORD,
     get_trends_data_for_group,
+    get_trends_data_for_group_async,
 )
-
-# --- STANDARD_COUNTRY_MAP ---
-STANDARD_COUNTRY_MAP = {}
-
-# 맵 파일 경로
-MAP_FILE_PATH = os.path.join(
-    os.path.dirname(os.path.dirname(__file__)), "config", "standard_country_map.json"
+from data_sources.google_trends_concurrency import (
+    DEFAULT_TOKEN_WAIT_SECONDS,
+    concurrency_gate_enabled,
+    get_trends_concurrency_gate,
+)
+from data_sources.country_reference import (
+    compile_country_reference,
+    get_country_reference,
 )
+from data_sources.latest_state_store import trend_state_rows, upsert_latest_state
+from data_sources.raw_response_archive import flush_raw_archive
+from data_sources.stage_metrics import STAGE_METRICS, sampled_debug
+
+# --- 국가 참조 인덱스 (standard_country_map.json + master_country_crawler.json) ---
+# 로드 실패 시 최소한의 기본 맵으로 인덱스를 구성
+FALLBACK_STANDARD_COUNTRY_MAP = {
+    "아르헨티나": {
+        "korean_name": "아르헨티나",
+        "english_name": "Argentina",
+        "country_code_3": "ARG",
+        "country_code_2": "AR",
+    },
+    "해외여행": {
+        "korean_name": "해외여행_전체",
+        "english_name": "Global Travel",
+        "country_code_3": "GLOBAL",
+        "country_code_2": "XX",
+    },
+}
 
 try:
-    with open(MAP_FILE_PATH, "r", encoding="utf-8") as f:
-        STANDARD_COUNTRY_MAP = json.load(f)
-    logging.info(
-        f"Standard country mapping data loaded successfully from {MAP_FILE_PATH}."
-    )
-except FileNotFoundError:
-    logging.error(f"Mapping file not found at {MAP_FILE_PATH}. Using fallback map.")
-    # 로드 실패 시 최소한의 기본 맵 (새로운 키 이름으로)
-    STANDARD_COUNTRY_MAP = {
-        "아르헨티나": {
-            "korean_name": "아르헨티나",
-            "english_name": "Argentina",
-            "country_code_3": "ARG",
-            "country_code_2": "AR",
-        },
-        "해외여행": {
-            "korean_name": "해외여행_전체",
-            "english_name": "Global Travel",
-            "country_code_3": "GLOBAL",
-            "country_code_2": "XX",
-        },
-    }
-except json.JSONDecodeError as e:
-    logging.error(f"Error decoding JSON mapping file: {e}. Using fallback map.")
-    STANDARD_COUNTRY_MAP = {
-        "아르헨티나": {
-            "korean_name": "아르헨티나",
-            "english_name": "Argentina",
-            "country_code_3": "ARG",
-            "country_code_2": "AR",
-        },
-        "해외여행": {
-            "korean_name": "해외여행_전체",
-            "english_name": "Global Travel",
-            "country_code_3": "GLOBAL",
-            "country_code_2": "XX",
-        },
-    }
+    COUNTRY_REFERENCE = get_country_reference()
 except Exception as e:
-    logging.error(f"Unexpected error loading mapping file: {e}. Using fallback map.")
-    STANDARD_COUNTRY_MAP = {
-        "아르헨티나": {
-            "korean_name": "아르헨티나",
-            "english_name": "Argentina",
-            "country_code_3": "ARG",
-            "country_code_2": "AR",
-        },
-        "해외여행": {
-            "korean_name": "해외여행_전체",
-            "english_name": "Global Travel",
-            "country_code_3": "GLOBAL",
-            "country_code_2": "XX",
-        },
+    logging.error(f"Failed to load country reference: {e}. Using fallback map.")
+    COUNTRY_REFERENCE = compile_country_reference(FALLBACK_STANDARD_COUNTRY_MAP, {})
+
+
+# 큐 메시지의 수집 계획 정보 (계획 없이 만든 예전 메시지는 한글 키워드, KR, 주 신호)
+def _message_context(message_body: dict) -> dict:
+    return {
+        "geo": message_body.get("geo", "KR"),
+        "timeframe": message_body.get("timeframe", "today 3-m"),
+        "anchor_keyword": message_body.get("anchor_keyword", DEFAULT_ANCHOR_KEYWORD),
+        "keyword_countries": message_body.get("keyword_countries") or {},
+        "plan_target": message_body.get("plan_target"),
+        "primary": message_body.get("primary", True),
+    }
+
+
+# 트렌드 원시 지표 하나를 점수화하고 표준 국가 정보를 붙여 Event Hub 이벤트 dict 로 변환
+def build_trend_event(
+    item: dict, current_crawl_time_kst: str, message_context: dict = None
+) -> dict:
+    keyword = item.get("keyword")
+    message_context = message_context or _message_context({})
+
+    # -- 국가명 표준화 로직
+    # 참조 인덱스에 "<국가명> 여행" 키워드와 '해외여행' 앵커가 별칭으로 등록되어 있어
+    # 문자열 치환 없이 dict 한 번으로 표준 정보를 조회
+    # 영문/도시 키워드는 수집 계획이 메시지에 넣어 준 국가 코드로 조회
+    country_code_hint = message_context["keyword_countries"].get(keyword)
+    country_info = COUNTRY_REFERENCE.resolve(country_code_hint or keyword) or {}
+
+    # 조회된 정보 딕셔너리에서 각 컬럼 값 추출
+    country_korean_name = country_info.get("korean_name", "Unknown_Korean")
+    country_english_name = country_info.get("english_name", "Unknown_English")
+    country_code_3 = country_info.get("country_code_3", "N/A")
+    country_code_2 = country_info.get("country_code_2", "N/A")
+    # --- 국가명 표준화 로직 끝 ---
+
+    raw_growth_val = (
+        float(item.get("trend_score_raw_growth"))
+        if pd.notna(item.get("trend_score_raw_growth"))
+        else 0.0
+    )
+    raw_growth = (
+        float(item.get("trend_score_raw_growth"))
+        if pd.notna(item.get("trend_score_raw_growth"))
+        else None
+    )
+    current_interest = (
+        int(item.get("trend_score_current_interest"))
+        if pd.notna(item.get("trend_score_current_interest"))
+        else None
+    )  # int 또는 float으로 명시적 변환
+    anchor_growth = (
+        float(item.get("anchor_growth"))
+        if pd.notna(item.get("anchor_growth"))
+        else None
+    )
+    anchor_interest = (
+        int(item.get("anchor_interest"))
+        if pd.notna(item.get("anchor_interest"))
+        else None
+    )
+    if raw_growth_val > 0:
+        scaled_raw_growth = np.log10(1 + raw_growth_val)
+    elif raw_growth_val < 0:
+        # 음수 성장은 원본 값을 유지. 음수값이 크지 않기에
+        scaled_raw_growth = raw_growth_val
+    else:
+        # raw_growth가 0인 경우
+        scaled_raw_growth = 0.0
+
+    # final_trend_score 계산
+    W_growth = 0.7
+    W_interest = 0.3
+
+    max_log_growth_scale = 10.0
+    normalized_scaled_raw_growth = 0.0
+
+    if scaled_raw_growth > 0:
+        # 양수 성장률을 0-100 스케일로 변환
+        normalized_scaled_raw_growth = (
+            scaled_raw_growth / max_log_growth_scale
+        ) * 100.0
+        # 최대 100을 넘지 않도록
+        normalized_scaled_raw_growth = min(normalized_scaled_raw_growth, 100.0)
+    elif scaled_raw_growth < 0:
+        # 음수 성장률에 대한 처리
+        normalized_scaled_raw_growth = 0.0
+    else:
+        # 0인 경우
+        normalized_scaled_raw_growth = 0.0
+
+    final_trend_score = (normalized_scaled_raw_growth * W_growth) + (
+        current_interest * W_interest
+    )
+    # 최종 스코어가 0-100을 벗어나지 않도록 설정
+    final_trend_score = max(0.0, min(final_trend_score, 100.0))
+
+    return {
+        "dataType": "googleTrend",
+        "keyword": keyword,
+        "country_korean_name": country_korean_name,
+        "country_english_name": country_english_name,
+        "country_code_3": country_code_3,
+        "country_code_2": country_code_2,
+        "final_trend_score": final_trend_score,
+        "trend_score_raw_growth": raw_growth_val,
+        "scaled_raw_growth": scaled_raw_growth,
+        "trend_score_current_interest": current_interest,
+        "anchor_growth": anchor_growth,
+        "anchor_interest": anchor_interest,
+        "geo": message_context["geo"],
+        "timeframe": message_context["timeframe"],
+        "trend_plan_target": message_context["plan_target"],
+        "is_primary_signal": message_context["primary"],
+        "crawled_at_kst": current_crawl_time_kst,
     }
 
 
+# 트렌드 지표를 점수화해 Event Hub 로 전송 (sync/async 트리거 공용)
+def _publish_trend_events(
+    processed_trend_data_list: list,
+    keywords_to_process: list,
+    event_output: func.Out[str],
+    message_context: dict = None,
+) -> None:
+    if processed_trend_data_list:
+        kst_timezone = pytz.timezone("Asia/Seoul")
+        current_crawl_time_utc = datetime.datetime.now(
+            datetime.timezone.utc
+        ).isoformat()
+        current_crawl_time_kst = datetime.datetime.now(kst_timezone).isoformat()
+
+        events_to_send = []
+        trend_events = []
+        with STAGE_METRICS.stage("google_trends.score"):
+            for item in processed_trend_data_list:
+                final_data_to_send = build_trend_event(
+                    item, current_crawl_time_kst, message_context
+                )
+                trend_events.append(final_data_to_send)
+                events_to_send.append(
+                    json.dumps(final_data_to_send, ensure_ascii=False)
+                )
+
+        # 여러 이벤트를 한 번에 Event Hub로 보냄
+        with STAGE_METRICS.stage("google_trends.publish"):
+            event_output.set(events_to_send)
+        logging.info(
+            f"처리된 Google Trend 데이터 {len(events_to_send)}개 Event Hub로 전송 완료."
+        )
+        # 국가별 최신 상태 갱신 (순위 조회용)
+        upsert_latest_state("google_trends", trend_state_rows(trend_events))
+    else:
+        logging.warning(
+            f"키워드 {keywords_to_process} 처리 후 트렌드 데이터를 얻지 못했습니다. Event Hub로 전송하지 않습니다."
+        )
+
+
+# 토큰을 못 받은 메시지를 다시 넣을 때 보이기 전 지연 (초, 여기에 0~50% 지터)
+REQUEUE_DELAY_SECONDS = 120
+
+
+# 동시 실행 토큰 받기. 반환: (gate, token)
+# 게이트를 끄거나 게이트 자체에 오류가 나면 (None, None) 으로 제한 없이 진행 (파이프라인은 막지 않음)
+# 기다려도 토큰을 못 받으면 (gate, None)
+def _acquire_concurrency_token():
+    if not concurrency_gate_enabled():
+        return None, None
+    try:
+        gate = get_trends_concurrency_gate()
+        with STAGE_METRICS.stage("google_trends.wait_token"):
+            return gate, gate.acquire(DEFAULT_TOKEN_WAIT_SECONDS)
+    except Exception as e:
+        logging.warning(f"Google Trends concurrency gate unavailable: {e}")
+        return None, None
+
+
+# 토큰 반납 + 이번 요청의 지연/429 여부로 동시 실행 수 갱신
+def _release_concurrency_token(
+    gate, token, latency_seconds: float, outcomes: list
+) -> None:
+    if gate is None:
+        return
+    rate_limited = any(outcome["rate_limited"] for outcome in outcomes)
+    try:
+        gate.release(token, latency_seconds, rate_limited)
+    except Exception as e:
+        logging.warning(f"Failed to update Google Trends concurrency: {e}")
+
+
+# 토큰을 못 받은 메시지를 지연시켜 큐에 다시 넣음
+# 실패하면 예외를 올려서 호스트가 같은 메시지를 재시도하게 함 (maxDequeueCount 까지)
+def _requeue_message(message_body: dict) -> None:
+    from azure.storage.queue import BinaryBase64EncodePolicy, QueueClient
+
+    delay_seconds = int(REQUEUE_DELAY_SECONDS * random.uniform(1.0, 1.5))
+    queue_client = QueueClient.from_connection_string(
+        conn_str=os.environ["AzureWebJobsStorage"],
+        queue_name=os.environ["GoogleTrendsQueueName"],
+        message_encode_policy=BinaryBase64EncodePolicy(),
+    )
+    queue_client.send_message(
+        json.dumps(message_body, ensure_ascii=False).encode("utf-8"),
+        visibility_timeout=delay_seconds,
+    )
+    logging.warning(
+        f"No Google Trends concurrency token within {DEFAULT_TOKEN_WAIT_SECONDS}s. "
+        f"Requeued {message_body.get('keywords')} (+{delay_seconds}s)."
+    )
+
+
 # --- [Azure Function: 큐 메시지 소비자 (Consumer)] ---
 # 이 함수는 큐에 메시지가 들어올 때마다 자동으로 실행
 def register_google_trends_processor(app_instance):
@@ -106,147 +288,124 @@ def register_google_trends_processor(app_instance):
 
         logging.info("Google Trends Processor 시작")
 
-        logging.info(f"큐 메시지 수신: {msg.get_body().decode('utf-8')}")
         message_body = json.loads(msg.get_body().decode("utf-8"))
+        # 메시지 본문 전체는 샘플링된 DEBUG 로만 남김
+        sampled_debug("큐 메시지 수신: %s", message_body)
 
         # 메시지에서 키워드 리스트를 가져온다.
         keywords_to_process = message_body.get("keywords")
-        timeframe = message_body.get("timeframe", "today 3-m")
-        geo = message_body.get("geo", "KR")
+        message_context = _message_context(message_body)
+        timeframe = message_context["timeframe"]
+        geo = message_context["geo"]
 
         if not keywords_to_process:
             logging.error("큐 메시지에 'keywords' 리스트가 없습니다. 건너뜁니다.")
             return
 
+        # 동시에 Google 에 요청하는 수를 AIMD 로 정한 토큰 수만큼으로 제한
+        gate, token = _acquire_concurrency_token()
+        if gate is not None and token is None:
+            _requeue_message(message_body)
+            return
+
         # data_sources의 get_trends_data_for_group 함수를 호출
-        processed_trend_data_list = get_trends_data_for_group(
+        logging.info(f"키워드 {len(keywords_to_process)}개 처리 (geo={geo})")
+        outcomes = []
+        started = time.monotonic()
+        try:
+            with STAGE_METRICS.stage("google_trends.fetch"):
+                processed_trend_data_list = get_trends_data_for_group(
+                    keywords_to_process,
+                    timeframe=timeframe,
+                    geo=geo,
+                    anchor_keyword=message_context["anchor_keyword"],
+                    outcomes=outcomes,
+                )
+        finally:
+            _release_concurrency_token(
+                gate, token, time.monotonic() - started, outcomes
+            )
+        # 이번 메시지에서 받은 원본 응답의 색인 기록
+        flush_raw_archive()
+
+        # 데이터를 성공적으로 가져왔다면 Event Hub로 보낸다.
+        _publish_trend_events(
+            processed_trend_data_list,
             keywords_to_process,
-            timeframe=timeframe,
-            geo=geo,
+            event_output,
+            message_context,
         )
 
-        # 데이터를 성공적으로 가져왔다면 Event Hub로 보낸다.
-        if processed_trend_data_list:
-            kst_timezone = pytz.timezone("Asia/Seoul")
-            current_crawl_time_utc = datetime.datetime.now(
-                datetime.timezone.utc
-            ).isoformat()
-            current_crawl_time_kst = datetime.datetime.now(kst_timezone).isoformat()
-
-            events_to_send = []
-            for item in processed_trend_data_list:
-                keyword = item.get("keyword")
+        # 웜 인스턴스에서 누적된 단계별 p50/p99 지연
+        STAGE_METRICS.log_summary("google_trends.")
 
-                # -- 국가명 표준화 로직
-                # keyword에서 "여행" 을 제거하여 순수한 한글 국가명 추출
-                korean_country_name = (
-                    keyword.replace(" 여행", "") if "여행" in keyword else keyword
-                )
 
-                # STANDARD_COUNTRY_MAP을 사용하여 해당 국가의 모든 표준 정보 딕셔너리 조회
-                country_info = STANDARD_COUNTRY_MAP.get(korean_country_name, {})
+# googleTrendsProcessor 의 async 버전 (UseAsyncFunctionTriggers 설정 시 등록)
+# pytrends 요청 사이 30~60초 대기를 asyncio.sleep 으로 해서, 대기 중에도 같은 워커가
+# 다른 큐 메시지나 환율 타이머를 처리할 수 있다
+def register_google_trends_processor_async(app_instance):
 
-                # '해외여행' 앵커 키워드에 대한 처리
-                if keyword == "해외여행":
-                    country_info = STANDARD_COUNTRY_MAP.get("해외여행", {})
+    @app_instance.queue_trigger(
+        arg_name="msg",
+        queue_name=os.environ.get("GoogleTrendsQueueName"),
+        connection="AzureWebJobsStorage",
+    )
+    @app_instance.event_hub_output(
+        arg_name="event_output",
+        event_hub_name=os.environ.get("GoogleTrendsEventHubName"),
+        connection="EventHubConnectionString",
+    )
+    async def googleTrendsProcessor(
+        msg: func.QueueMessage, event_output: func.Out[str]
+    ) -> None:
 
-                # 조회된 정보 딕셔너리에서 각 컬럼 값 추출
-                country_korean_name = country_info.get("korean_name", "Unknown_Korean")
-                country_english_name = country_info.get(
-                    "english_name", "Unknown_English"
-                )
-                country_code_3 = country_info.get("country_code_3", "N/A")
-                country_code_2 = country_info.get("country_code_2", "N/A")
-                # --- 국가명 표준화 로직 끝 ---
-
-                raw_growth_val = (
-                    float(item.get("trend_score_raw_growth"))
-                    if pd.notna(item.get("trend_score_raw_growth"))
-                    else 0.0
-                )
-                raw_growth = (
-                    float(item.get("trend_score_raw_growth"))
-                    if pd.notna(item.get("trend_score_raw_growth"))
-                    else None
-                )
-                current_interest = (
-                    int(item.get("trend_score_current_interest"))
-                    if pd.notna(item.get("trend_score_current_interest"))
-                    else None
-                )  # int 또는 float으로 명시적 변환
-                anchor_growth = (
-                    float(item.get("anchor_growth"))
-                    if pd.notna(item.get("anchor_growth"))
-                    else None
-                )
-                anchor_interest = (
-                    int(item.get("anchor_interest"))
-                    if pd.notna(item.get("anchor_interest"))
-                    else None
-                )
-                if raw_growth_val > 0:
-                    scaled_raw_growth = np.log10(1 + raw_growth_val)
-                elif raw_growth_val < 0:
-                    # 음수 성장은 원본 값을 유지. 음수값이 크지 않기에
-                    scaled_raw_growth = raw_growth_val
-                else:
-                    # raw_growth가 0인 경우
-                    scaled_raw_growth = 0.0
-
-                # final_trend_score 계산
-                W_growth = 0.7
-                W_interest = 0.3
-
-                max_log_growth_scale = 10.0
-                normalized_scaled_raw_growth = 0.0
-
-                if scaled_raw_growth > 0:
-                    # 양수 성장률을 0-100 스케일로 변환
-                    normalized_scaled_raw_growth = (
-                        scaled_raw_growth / max_log_growth_scale
-                    ) * 100.0
-                    # 최대 100을 넘지 않도록
-                    normalized_scaled_raw_growth = min(
-                        normalized_scaled_raw_growth, 100.0
-                    )
-                elif scaled_raw_growth < 0:
-                    # 음수 성장률에 대한 처리
-                    normalized_scaled_raw_growth = 0.0
-                else:
-                    # 0인 경우
-                    normalized_scaled_raw_growth = 0.0
-
-                final_trend_score = (normalized_scaled_raw_growth * W_growth) + (
-                    current_interest * W_interest
-                )
-                # 최종 스코어가 0-100을 벗어나지 않도록 설정
-                final_trend_score = max(0.0, min(final_trend_score, 100.0))
-
-                final_data_to_send = {
-                    "dataType": "googleTrend",
-                    "keyword": keyword,
-                    "country_korean_name": country_korean_name,
-                    "country_english_name": country_english_name,
-                    "country_code_3": country_code_3,
-                    "country_code_2": country_code_2,
-                    "final_trend_score": final_trend_score,
-                    "trend_score_raw_growth": raw_growth_val,
-                    "scaled_raw_growth": scaled_raw_growth,
-                    "trend_score_current_interest": current_interest,
-                    "anchor_growth": anchor_growth,
-                    "anchor_interest": anchor_interest,
-                    "crawled_at_kst": current_crawl_time_kst,
-                }
-                events_to_send.append(
-                    json.dumps(final_data_to_send, ensure_ascii=False)
-                )
+        logging.info("Google Trends Processor 시작 (async)")
 
-            # 여러 이벤트를 한 번에 Event Hub로 보냄
-            event_output.set(events_to_send)
-            logging.info(
-                f"처리된 Google Trend 데이터 {len(events_to_send)}개 Event Hub로 전송 완료."
-            )
-        else:
-            logging.warning(
-                f"큐 메시지 '{message_body}' 처리 후 트렌드 데이터를 얻지 못했습니다. Event Hub로 전송하지 않습니다."
+        message_body = json.loads(msg.get_body().decode("utf-8"))
+        sampled_debug("큐 메시지 수신: %s", message_body)
+
+        keywords_to_process = message_body.get("keywords")
+        message_context = _message_context(message_body)
+        timeframe = message_context["timeframe"]
+        geo = message_context["geo"]
+
+        if not keywords_to_process:
+            logging.error("큐 메시지에 'keywords' 리스트가 없습니다. 건너뜁니다.")
+            return
+
+        # 토큰 대기(blob lease 조회/로컬 잠금)는 스레드에서
+        gate, token = await asyncio.to_thread(_acquire_concurrency_token)
+        if gate is not None and token is None:
+            await asyncio.to_thread(_requeue_message, message_body)
+            return
+
+        logging.info(f"키워드 {len(keywords_to_process)}개 처리 (geo={geo})")
+        outcomes = []
+        started = time.monotonic()
+        try:
+            with STAGE_METRICS.stage("google_trends.fetch"):
+                processed_trend_data_list = await get_trends_data_for_group_async(
+                    keywords_to_process,
+                    timeframe=timeframe,
+                    geo=geo,
+                    anchor_keyword=message_context["anchor_keyword"],
+                    outcomes=outcomes,
+                )
+        finally:
+            await asyncio.to_thread(
+                _release_concurrency_token,
+                gate,
+                token,
+                time.monotonic() - started,
+                outcomes,
             )
+        await asyncio.to_thread(flush_raw_archive)
+
+        _publish_trend_events(
+            processed_trend_data_list,
+            keywords_to_process,
+            event_output,
+            message_context,
+        )
+
+        STAGE_METRICS.log_summary("google_trends.")
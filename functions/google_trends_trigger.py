@@ -1,11 +1,12 @@
 import logging
+import asyncio
 import datetime
 import json
 import os
 import azure.functions as func
 from azure.storage.queue import QueueClient, BinaryBase64EncodePolicy
-import time
-import random
+from data_sources.google_trends_plan import get_collection_plan, plan_request_message
+from data_sources.retry_utils import random_sleep, random_sleep_async
 import sys
 
 # --- MASTER_COUNTRY_CRAWLER_MAP 로딩 ---
@@ -41,10 +42,13 @@ except Exception as e:
 anchor_keyword = "해외여행"
 
 
-def register_google_trends_crawler(app_instance):
+# Google Trends API에 보낼 키워드 묶음 4개 (앵커 키워드 포함 시 총 5개)
+BATCH_SIZE_FOR_TRENDS_API = 4
+
 
-    # Google Trends 검색 키워드 목록을 MASTER_COUNTRY_CRAWLER_MAP에서 동적으로 생성
-    # 모든 국가 정보를 돌면서 google_trend_keyword_kor 필드의 값을 추출
+# Google Trends 검색 키워드 목록을 MASTER_COUNTRY_CRAWLER_MAP에서 동적으로 생성
+# 모든 국가 정보를 돌면서 google_trend_keyword_kor 필드의 값을 추출
+def load_search_keywords() -> list:
     all_search_keywords_values = []
     for country_code_3, country_info in MASTER_COUNTRY_CRAWLER_MAP.items():
         keyword = country_info.get("google_trend_keyword_kor")
@@ -56,10 +60,81 @@ def register_google_trends_crawler(app_instance):
                 f"is missing 'google_trend_keyword_kor' in MASTER_COUNTRY_CRAWLER_MAP. Skipping for Google Trends."
             )
 
-    total_keyword_count = len(all_search_keywords_values)
     logging.info(
-        f"Dynamically loaded {total_keyword_count} Google Trends keywords from MASTER_COUNTRY_CRAWLER_MAP."
+        f"Dynamically loaded {len(all_search_keywords_values)} Google Trends keywords from MASTER_COUNTRY_CRAWLER_MAP."
     )
+    return all_search_keywords_values
+
+
+# 4개씩 키워드를 묶고 앵커 키워드를 더해 큐 메시지(bytes) 목록을 만듬
+def build_trend_task_messages(all_search_keywords_values: list) -> list:
+    messages_to_send_in_batches = []
+    for i in range(0, len(all_search_keywords_values), BATCH_SIZE_FOR_TRENDS_API):
+        current_country_keywords_chunk = all_search_keywords_values[
+            i : i + BATCH_SIZE_FOR_TRENDS_API
+        ]
+        # 여기에 앵커 키워드를 추가하여 총 5개 키워드 묶음을 만듬
+        keywords_for_api_request = current_country_keywords_chunk + [anchor_keyword]
+
+        task_message = {
+            # 키워드 리스트 자체를 보냄
+            "keywords": keywords_for_api_request,
+            "timeframe": "today 3-m",
+            "geo": "KR",  # 한국 지역에서 검색하는 것을 유지
+            "request_time": datetime.datetime.utcnow().isoformat(),
+        }
+        messages_to_send_in_batches.append(
+            json.dumps(task_message, ensure_ascii=False).encode("utf-8")
+        )
+    return messages_to_send_in_batches
+
+
+# 수집 계획(config/google_trends_plan.json)으로 큐 메시지 목록을 만듬
+# 반환: [(메시지 bytes, 보이기 전 지연 초)]. 계획을 만들지 못하면 기존 한글 키워드 메시지 (지연 0)
+def build_trend_plan_messages(all_search_keywords_values: list) -> list:
+    try:
+        plan = get_collection_plan()
+    except Exception as e:
+        logging.error(
+            f"Failed to build Google Trends collection plan: {e}. Using default keywords."
+        )
+        return [
+            (message, 0)
+            for message in build_trend_task_messages(all_search_keywords_values)
+        ]
+    request_time = datetime.datetime.utcnow().isoformat()
+    return [
+        (
+            json.dumps(
+                plan_request_message(request, request_time), ensure_ascii=False
+            ).encode("utf-8"),
+            request["delay_seconds"],
+        )
+        for request in plan["requests"]
+    ]
+
+
+def _queue_settings():
+    # (연결 문자열, 큐 이름). 하나라도 없으면 None
+    queue_connection_string = os.environ.get("AzureWebJobsStorage")
+    queue_name = os.environ.get("GoogleTrendsQueueName")
+
+    if not queue_connection_string:
+        logging.error(
+            "AzureWebJobsStorage connection string is not set. Cannot proceed with queue operations."
+        )
+        return None
+    if not queue_name:
+        logging.error(
+            "GoogleTrendsQueueName is not set. Cannot proceed with queue operations."
+        )
+        return None
+    return queue_connection_string, queue_name
+
+
+def register_google_trends_crawler(app_instance):
+
+    all_search_keywords_values = load_search_keywords()
 
     # Google Trends 데이터를 수집하는 Azure Function
     @app_instance.timer_trigger(
@@ -75,19 +150,10 @@ def register_google_trends_crawler(app_instance):
             logging.info("Timer run was overdue!")
         logging.info(f"Python googleTrendsCrawler function started at {utc_timestamp}.")
 
-        queue_connection_string = os.environ.get("AzureWebJobsStorage")
-        queue_name = os.environ.get("GoogleTrendsQueueName")
-
-        if not queue_connection_string:
-            logging.error(
-                "AzureWebJobsStorage connection string is not set. Cannot proceed with queue operations."
-            )
-            return
-        if not queue_name:
-            logging.error(
-                "GoogleTrendsQueueName is not set. Cannot proceed with queue operations."
-            )
+        settings = _queue_settings()
+        if settings is None:
             return
+        queue_connection_string, queue_name = settings
 
         try:
             queue_client = QueueClient.from_connection_string(
@@ -103,42 +169,26 @@ def register_google_trends_crawler(app_instance):
             )
             return  # 큐 연결 실패 시 더 이상 진행하지 않음
 
-        # Google Trends API에 보낼 키워드 묶음 4개 (앵커 키워드 포함 시 총 5개)
-        batch_size_for_trends_api = 4
-
-        messages_to_send_in_batches = []
-        # 4개씩 키워드를 묶어서 메시지를 만듬
-        for i in range(0, total_keyword_count, batch_size_for_trends_api):
-            current_country_keywords_chunk = all_search_keywords_values[
-                i : i + batch_size_for_trends_api
-            ]
-            # 여기에 앵커 키워드를 추가하여 총 5개 키워드 묶음을 만듬
-            keywords_for_api_request = current_country_keywords_chunk + [anchor_keyword]
-
-            task_message = {
-                # 키워드 리스트 자체를 보냄
-                "keywords": keywords_for_api_request,
-                "timeframe": "today 3-m",
-                "geo": "KR",  # 한국 지역에서 검색하는 것을 유지
-                "request_time": datetime.datetime.utcnow().isoformat(),
-            }
-            messages_to_send_in_batches.append(
-                json.dumps(task_message, ensure_ascii=False).encode("utf-8")
-            )
+        messages_to_send_in_batches = build_trend_plan_messages(
+            all_search_keywords_values
+        )
 
         total_messages_sent = 0
 
         try:
             # Azure Queue Storage Batching 대신 개별 메시지를 보내되, 지연을 줘서 과도한 요청 방지
-            for message_content in messages_to_send_in_batches:
-                queue_client.send_message(message_content)
+            # 계획의 지연만큼 visibility timeout 을 줘서 Google 요청이 한꺼번에 몰리지 않게 함
+            for message_content, delay_seconds in messages_to_send_in_batches:
+                queue_client.send_message(
+                    message_content, visibility_timeout=delay_seconds or None
+                )
                 # UTF-8 디코딩하여 로깅 시 가독성 확보
                 logging.info(
-                    f"큐에 메시지 전송 완료: {message_content.decode('utf-8')[:100]}..."
+                    f"큐에 메시지 전송 완료 (+{delay_seconds}s): {message_content.decode('utf-8')[:100]}..."
                 )
                 total_messages_sent += 1
                 # 요청 사이에 랜덤 지연을 줘서 API 부하를 줄임
-                time.sleep(random.uniform(1, 3))
+                random_sleep(1, 3)
         except Exception as e:
             logging.error(
                 f"Error sending messages to queue: {e}", exc_info=True
@@ -147,3 +197,59 @@ def register_google_trends_crawler(app_instance):
         logging.info(
             f"Python googleTrendsCrawler (Producer) function completed. Total {total_messages_sent} batches sent to '{queue_name}'"
         )
+
+
+# googleTrendsCrawler 의 async 버전 (UseAsyncFunctionTriggers 설정 시 등록)
+# azure.storage.queue.aio 클라이언트로 보내고, 메시지 사이 지연은 asyncio.sleep
+def register_google_trends_crawler_async(app_instance):
+
+    all_search_keywords_values = load_search_keywords()
+
+    @app_instance.timer_trigger(
+        schedule="0 0 13,19 * * *",  # 매일 13시 19시에 실행
+        run_on_startup=False,
+        use_monitor=False,
+        arg_name="myTimer",
+    )
+    async def googleTrendsCrawler(myTimer: func.TimerRequest) -> None:
+        utc_timestamp = datetime.datetime.utcnow().isoformat()
+        if myTimer.past_due:
+            logging.info("Timer run was overdue!")
+        logging.info(
+            f"Python googleTrendsCrawler (async) function started at {utc_timestamp}."
+        )
+
+        settings = _queue_settings()
+        if settings is None:
+            return
+        queue_connection_string, queue_name = settings
+
+        # azure-storage-queue 의 aio 클라이언트는 aiohttp 전송을 사용
+        from azure.storage.queue.aio import QueueClient as AsyncQueueClient
+
+        messages_to_send_in_batches = await asyncio.to_thread(
+            build_trend_plan_messages, all_search_keywords_values
+        )
+        total_messages_sent = 0
+
+        try:
+            async with AsyncQueueClient.from_connection_string(
+                conn_str=queue_connection_string,
+                queue_name=queue_name,
+                message_encode_policy=BinaryBase64EncodePolicy(),
+            ) as queue_client:
+                for message_content, delay_seconds in messages_to_send_in_batches:
+                    await queue_client.send_message(
+                        message_content, visibility_timeout=delay_seconds or None
+                    )
+                    logging.info(
+                        f"큐에 메시지 전송 완료 (+{delay_seconds}s): {message_content.decode('utf-8')[:100]}..."
+                    )
+                    total_messages_sent += 1
+                    await random_sleep_async(1, 3)
+        except Exception as e:
+            logging.error(f"Error sending messages to queue: {e}", exc_info=True)
+
+        logging.info(
+            f"Python googleTrendsCrawler (async Producer) function completed. Total {total_messages_sent} batches sent to '{queue_name}'"
+        )
@@ -0,0 +1,128 @@
+import logging
+import json
+import re
+import azure.functions as func
+
+# data_sources 조회 로직 함수
+from data_sources.score_query_cache import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    get_score_query_cache,
+)
+
+COUNTRY_CODE_3_PATTERN = re.compile(r"^[A-Z]{3}$")
+# 클라이언트가 매번 ETag 로 재검증하도록 (304 면 본문 없이 응답)
+CACHE_CONTROL = "no-cache"
+
+
+def _error(status_code: int, message: str) -> func.HttpResponse:
+    return func.HttpResponse(
+        json.dumps({"error": message}, ensure_ascii=False),
+        status_code=status_code,
+        mimetype="application/json",
+        charset="utf-8",
+    )
+
+
+def _etag_matches(req: func.HttpRequest, etag: str) -> bool:
+    if_none_match = req.headers.get("If-None-Match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # 약한 비교 (W/ 접두사 무시)
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in candidates
+
+
+def _cached_http_response(req: func.HttpRequest, cached) -> func.HttpResponse:
+    """ETag/If-None-Match 와 Accept-Encoding(gzip) 을 반영해 캐시된 본문으로 응답"""
+    headers = {
+        "ETag": cached.etag,
+        "Cache-Control": CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+    }
+    if _etag_matches(req, cached.etag):
+        return func.HttpResponse(status_code=304, headers=headers)
+
+    body = cached.body
+    accept_encoding = req.headers.get("Accept-Encoding", "").lower()
+    if cached.gzip_body is not None and "gzip" in accept_encoding:
+        body = cached.gzip_body
+        headers["Content-Encoding"] = "gzip"
+    return func.HttpResponse(
+        body,
+        status_code=200,
+        headers=headers,
+        mimetype="application/json",
+        charset="utf-8",
+    )
+
+
+def _int_param(req: func.HttpRequest, name: str, default: int, maximum: int) -> int:
+    value = req.params.get(name)
+    if value is None or value == "":
+        return default
+    parsed = int(value)  # 숫자가 아니면 ValueError -> 400
+    if parsed < 1 or parsed > maximum:
+        raise ValueError(f"{name} must be between 1 and {maximum}")
+    return parsed
+
+
+def _country_code(req: func.HttpRequest):
+    country_code_3 = (req.route_params.get("country_code_3") or "").upper()
+    if country_code_3 and not COUNTRY_CODE_3_PATTERN.match(country_code_3):
+        raise ValueError(f"Invalid country_code_3: {country_code_3}")
+    return country_code_3 or None
+
+
+# 크롤러들이 갱신한 국가별 최신 상태(latest_state_store)를 HTTP 로 조회
+#   GET /api/scores?page=1&page_size=50   매력도 순위 (페이지)
+#   GET /api/scores/{country_code_3}      국가 점수 + 최신 상태
+#   GET /api/rates/{country_code_3}?since=2025-07-01T00:00:00   실시간 환율 이력
+def register_destination_score_api(app_instance):
+    @app_instance.route(
+        route="scores/{country_code_3?}",
+        methods=["GET"],
+        auth_level=func.AuthLevel.FUNCTION,
+    )
+    def destinationScores(req: func.HttpRequest) -> func.HttpResponse:
+        try:
+            country_code_3 = _country_code(req)
+            page = _int_param(req, "page", 1, 10_000)
+            page_size = _int_param(req, "page_size", DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+        except ValueError as e:
+            return _error(400, str(e))
+
+        try:
+            cache = get_score_query_cache()
+            if country_code_3:
+                cached = cache.country_score(country_code_3)
+                if cached is None:
+                    return _error(404, f"No state for {country_code_3}")
+            else:
+                cached = cache.scores_page(page, page_size)
+        except Exception as e:
+            logging.error(f"Failed to build destination score response: {e}")
+            return _error(500, "Failed to read destination scores")
+        return _cached_http_response(req, cached)
+
+    @app_instance.route(
+        route="rates/{country_code_3}",
+        methods=["GET"],
+        auth_level=func.AuthLevel.FUNCTION,
+    )
+    def exchangeRateHistory(req: func.HttpRequest) -> func.HttpResponse:
+        try:
+            country_code_3 = _country_code(req)
+        except ValueError as e:
+            return _error(400, str(e))
+
+        try:
+            cached = get_score_query_cache().rate_history(
+                country_code_3, req.params.get("since") or None
+            )
+        except Exception as e:
+            logging.error(f"Failed to build exchange rate history response: {e}")
+            return _error(500, "Failed to read exchange rate history")
+        return _cached_http_response(req, cached)
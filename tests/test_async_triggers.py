@@ -0,0 +1,52 @@
+import logging
+import os
+
+from benchmarks.bench_async_triggers import run_trigger_comparison
+from data_sources import (
+    exchage_rate_crawler,
+    google_trends_crawler,
+    raw_response_archive,
+)
+
+LATENCY_SECONDS = 0.5
+MESSAGES = 4
+
+
+def test_async_worker_serves_invocations_concurrently(tmp_path, monkeypatch):
+    # 스텁으로 바꾼 모듈 값과 환경 변수는 테스트 뒤 되돌림
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(
+        google_trends_crawler, "TrendReq", google_trends_crawler.TrendReq
+    )
+    monkeypatch.setattr(
+        exchage_rate_crawler,
+        "REALTIME_EXCHANGE_CRAWL_URL",
+        exchage_rate_crawler.REALTIME_EXCHANGE_CRAWL_URL,
+    )
+    for name in (
+        "DisableCrawlerRandomSleep",
+        "DisableExchangeRateAdaptivePolling",
+        "DisableGoogleTrendsConcurrencyGate",
+    ):
+        monkeypatch.setenv(name, "true")
+    monkeypatch.delenv("DisableRawResponseArchive", raising=False)
+    monkeypatch.setattr(raw_response_archive, "_DEFAULT_ARCHIVE", None)
+    logging.disable(logging.CRITICAL)
+    try:
+        result = run_trigger_comparison(LATENCY_SECONDS, MESSAGES)
+    finally:
+        logging.disable(logging.NOTSET)
+
+    # 원본 응답 아카이브가 켜진 상태로 실행됐는지
+    assert os.listdir(
+        tmp_path
+        / "local_output"
+        / raw_response_archive.RAW_ARCHIVE_CONTAINER_NAME
+        / raw_response_archive.RAW_OBJECT_PREFIX
+    )
+    assert result["async_events"] == result["sync_events"] > 0
+    # 호출마다 업스트림 지연이 한 번씩 있으므로 차례로 하면 지연의 합 이상,
+    # 이벤트 루프가 막히지 않으면 동시 호출은 그 합보다 확실히 짧아야 함
+    total_latency = LATENCY_SECONDS * result["invocations"]
+    assert result["sync_elapsed"] >= total_latency
+    assert result["async_elapsed"] < total_latency * 0.6
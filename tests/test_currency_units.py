@@ -0,0 +1,48 @@
+import pytest
+
+from data_sources.currency_units import (
+    add_per_unit_rate,
+    parse_currency_text,
+    parse_rate_text,
+)
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("미국 USD", ("USD", 1)),
+        ("일본 JPY (100)", ("JPY", 100)),
+        ("인도네시아 IDR(100)", ("IDR", 100)),
+        ("IDR(100)", ("IDR", 100)),
+        # 단위 표기가 없어도 100 단위 고시 통화는 기본 단위
+        ("베트남 VND", ("VND", 100)),
+        # 코드가 없는 표기는 원문 그대로
+        ("  유로  ", ("유로", 1)),
+    ],
+)
+def test_parse_currency_text(text, expected):
+    assert parse_currency_text(text) == expected
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [("1,400.50", 1400.5), (" 9.47 ", 9.47), ("-1.5", -1.5), ("-", 0.0), ("", 0.0)],
+)
+def test_parse_rate_text(text, expected):
+    assert parse_rate_text(text) == expected
+
+
+@pytest.mark.parametrize("text", ["N/A", "1,400.5원", "1.2.3"])
+def test_parse_rate_text_rejects_non_numeric(text):
+    with pytest.raises(ValueError):
+        parse_rate_text(text)
+
+
+def test_add_per_unit_rate_keeps_quoted_rate():
+    entry = add_per_unit_rate({"currency_code": "JPY", "standard_rate": 950.0})
+    assert entry == {
+        "currency_code": "JPY",
+        "standard_rate": 950.0,
+        "quote_unit": 100,
+        "standard_rate_per_unit": 9.5,
+    }
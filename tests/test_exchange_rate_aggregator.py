@@ -0,0 +1,169 @@
+import datetime
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from data_sources import exchange_rate_aggregator
+from data_sources.exchange_rate_aggregator import (
+    KST,
+    RollingRateAggregator,
+    load_rate_aggregator,
+    update_rate_aggregator,
+)
+from data_sources.storage_backend import LocalFileSystemBackend
+
+OBSERVED_AT = datetime.datetime(2026, 10, 19, 10, 0, tzinfo=KST)
+
+
+def _at(year, month, day, hour=10):
+    return datetime.datetime(year, month, day, hour, 0, tzinfo=KST)
+
+
+def _bank_entries(rates: dict) -> list:
+    return [
+        {"currency_code": currency_code, "standard_rate": rate}
+        for currency_code, rate in rates.items()
+    ]
+
+
+def test_concurrent_updates_are_not_lost(tmp_path):
+    backend = LocalFileSystemBackend(str(tmp_path))
+    updates = 8
+
+    def _apply(aggregator):
+        # 읽기와 쓰기 사이를 벌려 다른 스레드의 저장과 겹치게
+        aggregator.update(OBSERVED_AT, {"USD": 1400.0})
+        time.sleep(0.02)
+
+    with ThreadPoolExecutor(max_workers=updates) as executor:
+        list(
+            executor.map(
+                lambda _: update_rate_aggregator(backend, _apply, max_attempts=50),
+                range(updates),
+            )
+        )
+
+    aggregator = load_rate_aggregator(backend)
+    assert aggregator.day_count[aggregator.slots["USD"]] == updates
+
+
+def test_update_gives_up_when_state_keeps_changing(tmp_path, monkeypatch):
+    monkeypatch.setattr(exchange_rate_aggregator.time, "sleep", lambda _: None)
+    backend = LocalFileSystemBackend(str(tmp_path))
+
+    def _apply(aggregator):
+        # 매번 다른 트리거가 먼저 저장한 것처럼
+        backend.write(
+            exchange_rate_aggregator.AGGREGATOR_STATE_PATH,
+            json.dumps(
+                {"last_update_at": datetime.datetime.now(KST).isoformat()}
+            ).encode("utf-8"),
+        )
+
+    with pytest.raises(RuntimeError):
+        update_rate_aggregator(backend, _apply, max_attempts=3)
+
+
+def test_averages_are_means_of_business_day_means():
+    aggregator = RollingRateAggregator()
+    # 월(10/19): 1400, 1410 -> 일평균 1405 / 화(10/20): 1420
+    aggregator.update(_at(2026, 10, 19, 10), {"USD": 1400.0, "JPY": 950.0})
+    aggregator.update(_at(2026, 10, 19, 11), {"USD": 1410.0})
+    assert aggregator.daily_average() == {"USD": 1405.0, "JPY": 950.0}
+
+    aggregator.update(_at(2026, 10, 20), {"USD": 1420.0})
+    assert aggregator.daily_average() == {"USD": 1420.0}
+    # 조회 횟수가 아니라 영업일별 일평균의 평균
+    assert aggregator.monthly_average() == {"USD": 1412.5, "JPY": 950.0}
+    assert aggregator.yearly_average() == {"USD": 1412.5, "JPY": 950.0}
+
+    # 토요일 값은 월/연 누적에 들어가지 않음
+    aggregator.update(_at(2026, 10, 24), {"USD": 2000.0})
+    aggregator.update(_at(2026, 10, 26), {"USD": 1430.0})
+    assert aggregator.monthly_average()["USD"] == 1418.3333
+    assert aggregator.month_days[aggregator.slots["USD"]] == 2
+
+
+def test_month_and_year_rollover_trims_closed_months():
+    aggregator = RollingRateAggregator()
+    aggregator.update(_at(2026, 10, 19), {"USD": 1400.0})
+    aggregator.update(_at(2026, 11, 2), {"USD": 1410.0})
+    aggregator.update(_at(2026, 12, 1), {"USD": 1420.0})
+    aggregator.update(_at(2027, 1, 4), {"USD": 1430.0})
+
+    # 이번 달 포함 최근 3개월만 유지
+    assert aggregator.closed_months == {
+        "202611": {"USD": 1410.0},
+        "202612": {"USD": 1420.0},
+    }
+    averages = aggregator.averages()
+    assert list(averages["monthly_avg"]) == ["202701", "202612", "202611"]
+    # 해가 바뀌면 연 누적은 새로 시작
+    assert aggregator.yearly_average() == {"USD": 1430.0}
+    assert aggregator.year_days[aggregator.slots["USD"]] == 0
+
+    restored = RollingRateAggregator.from_dict(
+        json.loads(json.dumps(aggregator.to_dict()))
+    )
+    assert restored.averages() == averages
+
+
+def test_reconcile_overwrites_month_and_year_accumulators():
+    aggregator = RollingRateAggregator()
+    aggregator.update(_at(2026, 10, 19), {"USD": 1400.0})
+    now = _at(2026, 10, 21)
+    bank = {
+        "yearly_avg": _bank_entries({"USD": 1300.0, "EUR": 1500.0}),
+        "monthly_avg": {
+            "202610": _bank_entries({"USD": 1350.0}),
+            "202609": _bank_entries({"USD": 1340.0}),
+            "202608": _bank_entries({"USD": 1330.0}),
+            "202607": _bank_entries({"USD": 1320.0}),
+        },
+    }
+
+    drift = aggregator.reconcile(bank, now)
+
+    # 차이는 덮어쓰기 전 로컬 값 기준
+    assert drift["yearly_avg"] == {"USD": round((1400.0 / 1300.0 - 1.0) * 100.0, 4)}
+    assert drift["monthly_avg"] == {"USD": round((1400.0 / 1350.0 - 1.0) * 100.0, 4)}
+    # 어제까지의 영업일 수만큼 은행 평균으로 다시 채움
+    usd = aggregator.slots["USD"]
+    assert aggregator.year_days[usd] == np.busday_count("2026-01-01", "2026-10-21")
+    assert aggregator.month_days[usd] == np.busday_count("2026-10-01", "2026-10-21")
+    assert aggregator.yearly_average() == {"USD": 1300.0, "EUR": 1500.0}
+    assert aggregator.monthly_average() == {"USD": 1350.0}
+    assert aggregator.closed_months == {
+        "202608": {"USD": 1330.0},
+        "202609": {"USD": 1340.0},
+    }
+    assert aggregator.reconciled_at == now
+
+    # 대조 이후 실시간 값은 은행 값 위에 이어서 누적
+    aggregator.update(now, {"USD": 1310.0})
+    year_days = int(aggregator.year_days[usd])
+    assert aggregator.yearly_average()["USD"] == round(
+        (1300.0 * year_days + 1310.0) / (year_days + 1), 4
+    )
+
+
+def test_ready_for_and_reconcile_due():
+    aggregator = RollingRateAggregator()
+    now = _at(2026, 10, 21)
+    assert not aggregator.ready_for(now)
+    assert aggregator.reconcile_due(now)
+
+    aggregator.reconcile({"yearly_avg": _bank_entries({"USD": 1300.0})}, now)
+    assert aggregator.ready_for(now)
+    assert not aggregator.reconcile_due(now + datetime.timedelta(days=6))
+    assert aggregator.reconcile_due(now + datetime.timedelta(days=7))
+    assert aggregator.ready_for(now + datetime.timedelta(days=14))
+    assert not aggregator.ready_for(now + datetime.timedelta(days=15))
+
+    # 새해에는 올해 은행 평균과 다시 대조하기 전까지 사용하지 않음
+    new_year = _at(2027, 1, 2)
+    assert not aggregator.ready_for(new_year)
+    assert aggregator.reconcile_due(new_year)
@@ -0,0 +1,105 @@
+import datetime
+
+import pytest
+
+from data_sources.currency_units import parse_rate_text
+from data_sources.exchange_rate_anomaly import (
+    LEVEL_SHIFT,
+    MIN_RELATIVE_STD,
+    OUTLIER,
+    UNIT_MISMATCH,
+    WARMUP_OBSERVATIONS,
+    Z_THRESHOLD,
+    ZERO_RATE,
+    RateAnomalyDetector,
+    screen_realtime_rates,
+)
+
+KST = datetime.timezone(datetime.timedelta(hours=9))
+OBSERVED_AT = datetime.datetime(2026, 10, 19, 10, 0, tzinfo=KST)
+
+
+def _warmed_up_detector(polls: int = WARMUP_OBSERVATIONS + 8) -> RateAnomalyDetector:
+    detector = RateAnomalyDetector()
+    for i in range(polls):
+        # 평균 1400 근처에서 조금씩 흔들리는 값
+        detector.inspect({"USD": 1400.0 + (2.0 if i % 2 else -2.0)})
+    return detector
+
+
+def _std_floor(detector: RateAnomalyDetector, currency_code: str) -> float:
+    slot = detector.slots[currency_code]
+    mean = detector.mean[slot]
+    return max(detector.var[slot] ** 0.5, abs(mean) * MIN_RELATIVE_STD)
+
+
+def test_zero_and_dash_rates_are_rejected():
+    detector = _warmed_up_detector()
+    mean_before = detector.mean[detector.slots["USD"]]
+    realtime_rates = [
+        {"currency_code": "USD", "standard_rate": parse_rate_text("-")},
+        {"currency_code": "JPY", "standard_rate": 0.0},
+        {"currency_code": "EUR", "standard_rate": 1600.0},
+    ]
+
+    accepted, results = screen_realtime_rates(detector, realtime_rates, OBSERVED_AT)
+
+    assert [r["currency_code"] for r in accepted] == ["EUR"]
+    assert results["USD"] == {"flags": [ZERO_RATE], "zscore": None}
+    assert results["JPY"]["flags"] == [ZERO_RATE]
+    # 버린 값은 통계에 반영하지 않음
+    assert detector.mean[detector.slots["USD"]] == mean_before
+    assert detector.last_inspected_at == OBSERVED_AT
+
+
+@pytest.mark.parametrize("factor", [0.01, 100.0, 0.1])
+def test_unit_mismatch_is_rejected_before_warm_up(factor):
+    detector = RateAnomalyDetector()
+    detector.inspect({"JPY": 950.0})
+
+    # "(100)" 단위를 놓친 값 등은 워밍업 전에도 판정
+    result = detector.inspect({"JPY": 950.0 * factor})
+
+    assert result["JPY"]["flags"] == [UNIT_MISMATCH]
+    assert detector.mean[detector.slots["JPY"]] == 950.0
+    assert detector.count[detector.slots["JPY"]] == 1
+
+
+def test_outlier_threshold_applies_after_warm_up():
+    detector = RateAnomalyDetector()
+    for _ in range(WARMUP_OBSERVATIONS - 1):
+        detector.inspect({"USD": 1400.0})
+    # 워밍업 전에는 z-점수 판정 없음
+    assert detector.inspect({"USD": 1500.0})["USD"] == {"flags": [], "zscore": None}
+
+    detector = _warmed_up_detector()
+    mean = detector.mean[detector.slots["USD"]]
+    std = _std_floor(detector, "USD")
+    inside = detector.inspect({"USD": mean + (Z_THRESHOLD - 1) * std})["USD"]
+    assert inside["flags"] == []
+    assert inside["zscore"] == pytest.approx(Z_THRESHOLD - 1, abs=0.01)
+
+    std = _std_floor(detector, "USD")
+    mean = detector.mean[detector.slots["USD"]]
+    outside = detector.inspect({"USD": mean - (Z_THRESHOLD + 1) * std})["USD"]
+    assert outside["flags"] == [OUTLIER]
+    assert outside["zscore"] < -Z_THRESHOLD
+    # outlier 는 평균에 반영하지 않음
+    assert detector.mean[detector.slots["USD"]] == mean
+
+
+def test_level_shift_is_accepted_after_repeated_polls():
+    detector = _warmed_up_detector()
+
+    first = detector.inspect({"USD": 1500.0})["USD"]
+    second = detector.inspect({"USD": 1500.0})["USD"]
+
+    # 한 번 튄 값은 outlier, 같은 수준이 이어지면 새 수준으로 받아들임
+    assert first["flags"] == [OUTLIER]
+    assert second["flags"] == [OUTLIER, LEVEL_SHIFT]
+    slot = detector.slots["USD"]
+    assert detector.mean[slot] == 1500.0
+    assert detector.cusum_pos[slot] == 0.0
+    # 새 수준에서 다시 워밍업: 그동안은 z-점수 판정이 꺼짐
+    assert detector.count[slot] == 1
+    assert detector.inspect({"USD": 1700.0})["USD"] == {"flags": [], "zscore": None}
@@ -0,0 +1,22 @@
+import datetime
+import os
+import tempfile
+
+from data_sources.exchange_rate_history import KST, RateHistory, default_history_dir
+
+
+def test_history_moves_off_read_only_package_root(tmp_path, monkeypatch):
+    # run-from-package: 작업 디렉토리(wwwroot)는 읽기 전용
+    monkeypatch.setenv("WEBSITE_RUN_FROM_PACKAGE", "1")
+    monkeypatch.delenv("ExchangeRateHistoryDir", raising=False)
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+
+    directory = default_history_dir()
+    assert directory.startswith(str(tmp_path))
+    assert not directory.startswith(os.getcwd())
+
+    history = RateHistory("realtime")
+    assert history.append(
+        datetime.datetime(2026, 10, 19, 10, tzinfo=KST), {"USD": 1400.0}
+    )
+    assert len(history) == 1
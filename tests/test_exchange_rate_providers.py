@@ -0,0 +1,110 @@
+import datetime
+
+import pytest
+
+from benchmarks.bench_exchange_rate_providers import (
+    REFERENCE_FEED_PATH,
+    build_reference_rate_xml,
+)
+from benchmarks.bench_pipeline import HANA_REALTIME_PATH
+from benchmarks.fixtures import build_hana_realtime_html
+from benchmarks.stub_server import StubServer, static_handler
+from data_sources import exchage_rate_crawler
+from data_sources.exchange_rate_providers import (
+    ExchangeRateProvider,
+    HanaBankProvider,
+    ReferenceRateXmlProvider,
+    fetch_realtime_rates_hedged,
+)
+
+KST = datetime.timezone(datetime.timedelta(hours=9))
+BUDGET_SECONDS = 2.0
+
+
+@pytest.fixture(autouse=True)
+def _offline(monkeypatch):
+    monkeypatch.setenv("DisableCrawlerRandomSleep", "true")
+    monkeypatch.setenv("DisableRawResponseArchive", "true")
+    monkeypatch.setattr(
+        exchage_rate_crawler,
+        "REALTIME_EXCHANGE_CRAWL_URL",
+        exchage_rate_crawler.REALTIME_EXCHANGE_CRAWL_URL,
+    )
+
+
+@pytest.fixture(scope="module")
+def hana_html():
+    return build_hana_realtime_html()
+
+
+@pytest.fixture(scope="module")
+def hana_rates(hana_html):
+    return exchage_rate_crawler._parse_exchange_rate_table(
+        hana_html, exchage_rate_crawler.REALTIME_EXCHANGE_CRAWL_URL, "1", KST
+    )
+
+
+def _fetch(hana_html, feed_xml, hana_status=200, feed_status=200):
+    hana_routes = {
+        HANA_REALTIME_PATH: static_handler(
+            hana_html.encode("utf-8"), "text/html; charset=UTF-8", hana_status
+        )
+    }
+    feed_routes = {
+        REFERENCE_FEED_PATH: static_handler(feed_xml, "text/xml", feed_status)
+    }
+    with StubServer(hana_routes) as hana, StubServer(feed_routes) as feed:
+        exchage_rate_crawler.REALTIME_EXCHANGE_CRAWL_URL = hana.url(HANA_REALTIME_PATH)
+        providers = [
+            HanaBankProvider(),
+            ReferenceRateXmlProvider(feed.url(REFERENCE_FEED_PATH)),
+        ]
+        try:
+            return fetch_realtime_rates_hedged(
+                providers,
+                datetime.datetime.now(KST),
+                latency_budget_seconds=BUDGET_SECONDS,
+                prefer_primary_seconds=BUDGET_SECONDS / 2,
+                cross_check_grace_seconds=0.5,
+            )
+        finally:
+            # 헤지 조회는 한 번씩만 요청 (예산을 넘는 재시도 없음)
+            assert hana.request_count == 1
+            assert feed.request_count <= 1
+
+
+def test_primary_failure_falls_back_to_secondary(hana_html, hana_rates):
+    result = _fetch(hana_html, build_reference_rate_xml(hana_rates), hana_status=503)
+
+    assert result.provider == "reference_xml"
+    assert result.outcomes["hana"].startswith("failed")
+    assert result.latency_ms < BUDGET_SECONDS * 1000
+    assert {entry["currency_code"] for entry in result.rates} >= {"USD", "JPY"}
+
+
+def test_cross_check_mismatch_is_flagged(hana_html, hana_rates):
+    feed_xml = build_reference_rate_xml(hana_rates, skew={"USD": 5.0})
+    result = _fetch(hana_html, feed_xml)
+
+    assert result.provider == "hana"
+    check = result.cross_checks["reference_xml"]
+    assert "USD" in check["mismatched"]
+    assert check["compared"] > len(check["mismatched"])
+
+
+def test_all_providers_failing_raises(hana_html, hana_rates):
+    with pytest.raises(RuntimeError, match="No healthy exchange rate provider"):
+        _fetch(
+            hana_html,
+            build_reference_rate_xml(hana_rates),
+            hana_status=503,
+            feed_status=503,
+        )
+
+
+def test_provider_must_implement_fetch_realtime():
+    class _Incomplete(ExchangeRateProvider):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        _Incomplete()
@@ -0,0 +1,55 @@
+import datetime
+
+from benchmarks.fixtures import build_hana_average_html, build_hana_realtime_html
+from data_sources.exchange_rate_reparser import reparse_raw_response_archive
+from data_sources.raw_response_archive import KST, RawResponseArchive
+from data_sources.storage_backend import LocalFileSystemBackend
+
+
+def test_reparse_reads_archive_index_range(tmp_path):
+    archive = RawResponseArchive(LocalFileSystemBackend(str(tmp_path)), codec="gzip")
+    realtime = build_hana_realtime_html().encode("utf-8")
+    average = build_hana_average_html().encode("utf-8")
+    start = datetime.datetime(2026, 10, 18, 23, 50, tzinfo=KST)
+    # 날짜 경계를 넘는 조회 + 같은 본문 중복 + 실패 응답 + 기간 밖 응답
+    archive.put("hana_exchange_rate", "realtime:1", realtime, start, status=200)
+    archive.put(
+        "hana_exchange_rate",
+        "realtime:2",
+        realtime,
+        start + datetime.timedelta(minutes=20),
+        status=200,
+    )
+    archive.put(
+        "hana_exchange_rate",
+        "average:3:20261001-20261018",
+        average,
+        start + datetime.timedelta(minutes=21),
+        status=200,
+    )
+    archive.put(
+        "hana_exchange_rate",
+        "realtime:4",
+        b"<html>busy</html>",
+        start + datetime.timedelta(minutes=22),
+        status=503,
+    )
+    archive.put(
+        "hana_exchange_rate",
+        "realtime:5",
+        realtime,
+        start + datetime.timedelta(hours=2),
+        status=200,
+    )
+    archive.flush()
+
+    records, failures = reparse_raw_response_archive(
+        start, start + datetime.timedelta(hours=1), archive=archive, max_workers=1
+    )
+
+    assert failures == []
+    assert records["source_file"].nunique() == 3
+    assert set(records["kind"]) == {"realtime", "average"}
+    assert records["snapshot_at_utc"].min() == start.astimezone(datetime.timezone.utc)
+    per_file = records.groupby("source_file").size()
+    assert (per_file > 0).all()
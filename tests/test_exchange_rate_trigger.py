@@ -0,0 +1,51 @@
+import datetime
+
+from data_sources.exchage_rate_crawler import build_exchange_rate_records
+from data_sources.storage_backend import LocalFileSystemBackend
+from functions import exchange_rate_trigger
+
+NOW_KST = datetime.datetime(2026, 1, 19, 10, 0, tzinfo=exchange_rate_trigger.KST)
+
+
+def test_realtime_run_does_not_fetch_averages_when_cache_is_empty(
+    tmp_path, monkeypatch
+):
+    monkeypatch.setenv("DisableExchangeRateHistory", "true")
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("realtime trigger must not query bank averages")
+
+    monkeypatch.setattr(exchange_rate_trigger, "fetch_average_rates", _fail)
+    average_rates, stale_inquiries, failed_inquiries = (
+        exchange_rate_trigger._resolve_average_rates(
+            LocalFileSystemBackend(str(tmp_path)), NOW_KST, None
+        )
+    )
+
+    assert average_rates == {}
+    assert stale_inquiries == {}
+    # 월평균은 해를 넘겨 최근 3개월
+    assert failed_inquiries == [
+        "daily_avg",
+        "monthly_avg:202601",
+        "monthly_avg:202512",
+        "monthly_avg:202511",
+        "yearly_avg",
+    ]
+    records = build_exchange_rate_records(
+        [
+            {
+                "currency_code": "USD",
+                "standard_rate": 1400.0,
+                "crawled_at_utc": "2026-01-19T01:00:00+00:00",
+                "crawled_at_kst": "2026-01-19T10:00:00+09:00",
+            }
+        ],
+        average_rates,
+        stale_inquiries,
+        failed_inquiries,
+    )
+    usa = next(r for r in records if r["country_code_3"] == "USA")
+    assert usa["realtime_rate"] == 1400.0
+    assert usa["yearly_avg_rate"] is None
+    assert usa["is_partial"] is True
@@ -0,0 +1,103 @@
+import threading
+
+import pytest
+
+from benchmarks.bench_flight_extractor import build_synthetic_payload
+from benchmarks.stub_server import StubResponse, StubServer
+from data_sources import flight_price_collector
+from data_sources.flight_price_collector import (
+    FLIGHT_DESTINATIONS_CONFIG,
+    KIWI_RETRYABLE_EXCEPTIONS,
+    QUERY_COUNTRY_COLUMN,
+    build_destination_queries,
+    collect_flight_prices,
+)
+from data_sources.retry_utils import create_retry_decorator
+
+START_DATE = "2026-11-01T00:00:00"
+END_DATE = "2026-11-15T00:00:00"
+
+
+@pytest.fixture(autouse=True)
+def _offline(monkeypatch):
+    monkeypatch.setenv("DisableRawResponseArchive", "true")
+    # 재시도 정책(횟수/대상 예외)은 그대로, 대기만 0초
+    monkeypatch.setattr(
+        flight_price_collector,
+        "kiwi_api_retry",
+        create_retry_decorator(
+            min_wait_seconds=0,
+            max_wait_seconds=0,
+            max_attempts=3,
+            retry_exceptions=KIWI_RETRYABLE_EXCEPTIONS,
+        ),
+    )
+
+
+def _destination(country_code_2: str) -> str:
+    return ",".join(FLIGHT_DESTINATIONS_CONFIG["destinations"][country_code_2])
+
+
+class _KiwiStub:
+    """목적지별로 정한 상태 코드를 차례로 돌려주고 (다 쓰면 200) 요청 수를 센다"""
+
+    def __init__(self, statuses: dict, payload: bytes):
+        self.statuses = {k: list(v) for k, v in statuses.items()}
+        self.payload = payload
+        self.requests = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, method, query, body):
+        destination = query["destination"][0]
+        with self.lock:
+            self.requests[destination] = self.requests.get(destination, 0) + 1
+            pending = self.statuses.get(destination)
+            status = pending.pop(0) if pending else 200
+        if status != 200:
+            return StubResponse(b'{"error": "stub"}', status=status)
+        return StubResponse(self.payload)
+
+
+def test_queries_cover_configured_destinations():
+    queries = build_destination_queries(START_DATE, END_DATE)
+
+    assert set(queries) == set(FLIGHT_DESTINATIONS_CONFIG["destinations"])
+    assert queries["JP"]["destination"] == _destination("JP")
+    assert queries["JP"]["source"] == FLIGHT_DESTINATIONS_CONFIG["source"]
+    assert queries["JP"]["outboundDepartmentDateStart"] == START_DATE
+
+
+def test_collector_retries_per_destination_over_gzip():
+    payload = build_synthetic_payload(20, segments=2)
+    stub = _KiwiStub(
+        {
+            _destination("JP"): [429, 429],  # 두 번 429 뒤 성공
+            _destination("TH"): [503],  # 한 번 5xx 뒤 성공
+            _destination("US"): [500, 502, 503],  # 재시도를 다 써도 실패
+            _destination("FR"): [404],  # 재시도하지 않는 4xx
+        },
+        payload,
+    )
+    with StubServer({"/one-way": stub}) as server:
+        flights = collect_flight_prices(
+            START_DATE,
+            END_DATE,
+            api_key="stub",
+            url=server.url("/one-way"),
+            requests_per_second=1000,
+        )
+
+    configured = set(FLIGHT_DESTINATIONS_CONFIG["destinations"])
+    assert set(flights[QUERY_COUNTRY_COLUMN].unique()) == configured - {"US", "FR"}
+    assert stub.requests[_destination("JP")] == 3
+    assert stub.requests[_destination("TH")] == 2
+    assert stub.requests[_destination("US")] == 3
+    assert stub.requests[_destination("FR")] == 1
+    # 나머지 목적지는 한 번씩만
+    others = configured - {"JP", "TH", "US", "FR"}
+    assert all(stub.requests[_destination(code)] == 1 for code in others)
+    # 성공 응답은 모두 gzip 으로 받아서 풀었음
+    succeeded = len(configured) - 2
+    assert server.gzip_response_count == succeeded
+    per_destination = flights.groupby(QUERY_COUNTRY_COLUMN, observed=True).size()
+    assert (per_destination == 40).all()
@@ -0,0 +1,30 @@
+import pandas as pd
+
+from data_sources.flight_price_stats import FlightPriceStatsStore
+
+
+def test_stats_count_each_itinerary_once_at_final_airport():
+    # 여정 0: ICN -> NRT 직항 / 여정 1: ICN -> PVG(경유) -> NRT / 여정 0(다른 조회): ICN -> BKK
+    flights = pd.DataFrame(
+        {
+            "조회_국가_코드": ["JP", "JP", "JP", "TH"],
+            "여정_번호": [0, 1, 1, 0],
+            "도착_공항_코드": ["NRT", "PVG", "NRT", "BKK"],
+            "도착_시간": [
+                "2026-11-02T10:00:00",
+                "2026-11-02T09:00:00",
+                "2026-11-02T15:00:00",
+                "2026-11-03T01:00:00",
+            ],
+            "가격": [300000, 200000, 200000, 400000],
+        }
+    )
+    stats = FlightPriceStatsStore()
+
+    assert stats.update_from_flights(flights) == 2
+
+    assert stats.get("PVG", 11) is None
+    nrt = stats.get("NRT", 11)
+    assert nrt.count == 2
+    assert stats.average("NRT", 11) == 250000
+    assert stats.get("BKK", 11).count == 1
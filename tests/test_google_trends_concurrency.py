@@ -0,0 +1,81 @@
+import json
+
+import pytest
+from azure.core.exceptions import HttpResponseError, ResourceExistsError
+
+from data_sources.google_trends_concurrency import (
+    CONCURRENCY_STATE_PATH,
+    AimdConcurrencyController,
+    BlobLeaseConcurrencyTokens,
+    GoogleTrendsConcurrencyGate,
+    LocalConcurrencyTokens,
+)
+from data_sources.storage_backend import LocalFileSystemBackend
+
+
+class _RacingBackend(LocalFileSystemBackend):
+    """첫 조건부 쓰기 직전에 다른 인스턴스의 반납이 먼저 저장되는 백엔드"""
+
+    def __init__(self, root_dir: str, concurrent_release):
+        super().__init__(root_dir)
+        self.concurrent_release = concurrent_release
+        self.attempts = 0
+
+    def write_if_match(self, path: str, data: bytes, etag) -> bool:
+        self.attempts += 1
+        if self.attempts == 1:
+            self.concurrent_release()
+        return super().write_if_match(path, data, etag)
+
+
+def _gate(backend):
+    return GoogleTrendsConcurrencyGate(
+        LocalConcurrencyTokens(), backend, AimdConcurrencyController
+    )
+
+
+def test_concurrent_release_keeps_other_instance_decrease(tmp_path):
+    other = _gate(LocalFileSystemBackend(str(tmp_path)))
+
+    def _other_instance_hits_429():
+        other.release(other.acquire(timeout=1), 30.0, rate_limited=True)
+
+    backend = _RacingBackend(str(tmp_path), _other_instance_hits_429)
+    gate = _gate(backend)
+    gate.release(gate.acquire(timeout=1), 30.0, rate_limited=False)
+
+    state = json.loads(backend.read(CONCURRENCY_STATE_PATH))
+    assert backend.attempts == 2
+    assert [sample[2] for sample in state["samples"]] == [True, False]
+    # 2 -> 429 로 1 -> 성공으로 1 + 1/1
+    assert state["limit"] == 2.0
+    assert state["last_decrease_at"] > 0
+
+
+class _FakeBlob:
+    def __init__(self, error):
+        self.error = error
+
+    def acquire_lease(self, lease_duration):
+        raise self.error
+
+
+class _FakeContainer:
+    def __init__(self, error):
+        self.error = error
+
+    def get_blob_client(self, name):
+        return _FakeBlob(self.error)
+
+
+def test_held_token_is_skipped_but_storage_errors_surface():
+    held = BlobLeaseConcurrencyTokens(
+        _FakeContainer(ResourceExistsError("LeaseAlreadyPresent"))
+    )
+    assert held.acquire(lambda: 2, timeout=0) is None
+
+    broken = BlobLeaseConcurrencyTokens(
+        _FakeContainer(HttpResponseError("AuthorizationFailure"))
+    )
+    with pytest.raises(HttpResponseError):
+        broken.acquire(lambda: 2, timeout=0)
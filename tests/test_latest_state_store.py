@@ -0,0 +1,53 @@
+import datetime
+
+import pandas as pd
+
+from data_sources.flight_price_stats import FlightPriceStatsStore
+from data_sources.latest_state_store import flight_price_state_rows
+
+COLLECTED_AT = datetime.datetime(
+    2026, 10, 19, 9, 0, tzinfo=datetime.timezone(datetime.timedelta(hours=9))
+)
+
+
+def _flights(price_via_shanghai: float) -> pd.DataFrame:
+    # 일본 조회: 여정 0 직항, 여정 1 은 상하이(중국) 경유 / 중국 조회: 여정 0 직항
+    return pd.DataFrame(
+        {
+            "조회_국가_코드": ["JP", "JP", "JP", "CN"],
+            "여정_번호": [0, 1, 1, 0],
+            "출발_국가_코드": ["KR", "KR", "CN", "KR"],
+            "도착_국가_코드": ["JP", "CN", "JP", "CN"],
+            "도착_공항_코드": ["NRT", "PVG", "NRT", "PVG"],
+            "도착_시간": [
+                "2026-11-02T10:00:00",
+                "2026-11-02T09:00:00",
+                "2026-11-02T15:00:00",
+                "2026-11-02T11:00:00",
+            ],
+            "가격": [300000.0, price_via_shanghai, price_via_shanghai, 200000.0],
+        }
+    )
+
+
+def test_flight_score_uses_queried_destination_once_per_itinerary():
+    stats = FlightPriceStatsStore()
+    stats.update_from_flights(_flights(300000.0))
+    summaries = [
+        {
+            "destination_country_code_2": country,
+            "segment_count": 0,
+            "min_price": None,
+            "median_price": None,
+            "mean_price": None,
+        }
+        for country in ("JP", "CN")
+    ]
+
+    # 경유 여정이 평균보다 싸짐: 일본은 (0 + 1) / 2, 중국(경유지)에는 영향 없음
+    rows = flight_price_state_rows(
+        _flights(100000.0), summaries, stats.avg_price_index(), COLLECTED_AT
+    )
+    scores = {row["country_code_3"]: row["flight_price_score"] for row in rows}
+
+    assert scores == {"JPN": 0.5, "CHN": 0.0}
@@ -0,0 +1,62 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_sources.destination_scoring import DEFAULT_SCORING_CONFIG
+from data_sources.latest_state_store import LatestStateStore
+from data_sources.score_query_cache import ScoreQueryCache
+
+MINMAX_CONFIG = {
+    "signals": {
+        **DEFAULT_SCORING_CONFIG["signals"],
+        "final_trend_score": {"weight": 0.4, "normalization": "minmax"},
+    },
+    "min_signals": 1,
+}
+
+
+def _exchange_rows(codes, scores):
+    return [
+        {
+            "country_code_3": code,
+            "country_code_2": code[:2],
+            "currency_code": f"{code}C",
+            "exchange_rate_score": float(score),
+            "exchange_rate_updated_at": "2026-10-19T00:00:00+00:00",
+        }
+        for code, score in zip(codes, scores)
+    ]
+
+
+def _trend_rows(codes, scores):
+    return [
+        {"country_code_3": code, "final_trend_score": float(score)}
+        for code, score in zip(codes, scores)
+    ]
+
+
+@pytest.mark.parametrize("config", [DEFAULT_SCORING_CONFIG, MINMAX_CONFIG])
+def test_incremental_ranking_matches_batch(config):
+    rng = np.random.default_rng(3)
+    codes = [f"C{i:02d}" for i in range(30)]
+    store = LatestStateStore(":memory:")
+    cache = ScoreQueryCache(store, config)
+
+    store.upsert("exchange_rate", _exchange_rows(codes, rng.uniform(0, 100, 30)))
+    store.upsert("google_trends", _trend_rows(codes[:20], rng.uniform(0, 100, 20)))
+    first = json.loads(cache.scores_page(page_size=100).body)
+
+    # 일부 국가만 바뀌고 새 국가가 추가된 뒤에도 배치 계산과 같아야 함
+    store.upsert("google_trends", _trend_rows(codes[5:8], [0.0, 55.0, 100.0]))
+    store.upsert("exchange_rate", _exchange_rows(["NEW"], [42.0]))
+    second = json.loads(cache.scores_page(page_size=100).body)
+
+    assert first != second
+    assert second["total"] == 31
+    assert len(cache._engine) == 31
+    pd.testing.assert_frame_equal(
+        store.ranking(config=config, engine=cache._engine),
+        store.ranking(config=config),
+    )
@@ -0,0 +1,27 @@
+from data_sources.storage_backend import get_default_backend
+
+
+def test_local_backend_keeps_containers_apart(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("BlobStorageConnectionString", raising=False)
+    flights = get_default_backend("flight-price-data")
+    rates = get_default_backend("exchange-rate-cache")
+
+    flights.write("state.json", b"flights")
+    rates.write("state.json", b"rates")
+
+    assert flights.read("state.json") == b"flights"
+    assert rates.read("state.json") == b"rates"
+    assert (tmp_path / "local_output" / "exchange-rate-cache" / "state.json").exists()
+
+
+def test_conditional_write_requires_current_etag(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    backend = get_default_backend("flight-price-data")
+
+    assert backend.write_if_match("state.json", b"v1", None)
+    assert not backend.write_if_match("state.json", b"v1 again", None)
+    data, etag = backend.read_with_etag("state.json")
+    assert backend.write_if_match("state.json", b"v2", etag)
+    assert not backend.write_if_match("state.json", b"v3", etag)
+    assert backend.read("state.json") == b"v2"